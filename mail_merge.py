@@ -5,10 +5,10 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Callable, Iterable, Protocol
 
-import pandas as pd
-
 
 EMAIL_PATTERN = re.compile(r"^[^@\s;]+@[^@\s;]+\.[^@\s;]+$")
+# File name of the combined PDF bundle written next to the per-key outputs.
+COMBINED_PDF_NAME = "_combined.pdf"
 
 
 @dataclass(frozen=True)
@@ -102,6 +102,8 @@ def render_placeholders(template: str, context: dict[str, object]) -> str:
 
 
 def _clean_cell(value) -> str:
+    import pandas as pd
+
     if value is None:
         return ""
     if pd.isna(value):
@@ -110,6 +112,8 @@ def _clean_cell(value) -> str:
 
 
 def read_recipient_headers(path: Path, sheet_name: str, header_row: int) -> list[str]:
+    import pandas as pd
+
     df = pd.read_excel(path, sheet_name=sheet_name, header=header_row - 1, nrows=0, dtype=object)
     return [str(column).strip() for column in df.columns]
 
@@ -125,6 +129,8 @@ def load_recipient_rows(
     if missing:
         raise ValueError("Recipient mapping missing required columns: " + ", ".join(missing))
 
+    import pandas as pd
+
     df = pd.read_excel(path, sheet_name=sheet_name, header=header_row - 1, dtype=object)
     rows: list[RecipientRow] = []
     key_col = column_mapping["key"]
@@ -362,6 +368,8 @@ def discover_split_results_from_folder(
             continue
         if path.name.startswith("~$"):
             continue
+        if path.name.lower() == COMBINED_PDF_NAME:
+            continue
         ext = path.suffix.lower()
         if ext not in [".xlsx", ".pdf"]:
             continue
@@ -3,32 +3,32 @@
 # Build exe: pyinstaller split_gui.spec
 # Dependencies: PySide6, PySide6-Fluent-Widgets, pandas, openpyxl
 
+import json
+import logging
 import os
 import re
-import io
 import shutil
 import subprocess
 import sys
-import json
+import tempfile
 import time
 from pathlib import Path
 
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-
-from PySide6.QtCore import Qt, Signal, QThread, QSettings, QTimer
-from PySide6.QtGui import QIcon
+from PySide6.QtCore import (
+    Qt, Signal, QThread, QSettings, QTimer, QObject, QCoreApplication,
+    QAbstractListModel, QAbstractTableModel, QModelIndex
+)
+from PySide6.QtGui import QColor, QIcon
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QFileDialog, QGridLayout, QSizePolicy
+    QFileDialog, QGridLayout, QSizePolicy, QAbstractItemView, QHeaderView
 )
 from qfluentwidgets import (
     ScrollArea, SimpleCardWidget,
     LineEdit, ComboBox, PushButton, PrimaryPushButton,
     ProgressBar, SpinBox, TextEdit, InfoBar, InfoBarPosition,
     ToolButton, SubtitleLabel, BodyLabel, CaptionLabel,
-    CheckBox,
+    CheckBox, TableView, SearchLineEdit, IndeterminateProgressRing, MessageBox,
     isDarkTheme, qconfig, setTheme, Theme, FluentIcon as FIF
 )
 
@@ -36,6 +36,7 @@ from mail_merge import (
     all_jobs_valid,
     AttachmentSelection,
     build_email_jobs,
+    COMBINED_PDF_NAME,
     discover_split_results_from_folder,
     EmailJob,
     EmailTemplate,
@@ -44,25 +45,46 @@ from mail_merge import (
     read_recipient_headers,
     send_jobs,
     SendTimingOptions,
-    SplitResult,
+)
+from split_engine import (
+    auto_map_columns,
+    check_excel_availability,
+    cleanup_excel_com,
+    debug_excel_detection,
+    DEFAULT_LO_BATCH_SIZE,
+    detect_excel_header_row,
+    EVENT_KEY_STARTED,
+    EVENT_WARNING,
+    find_soffice,
+    join_output_name_parts,
+    output_extension,
+    output_requires_pdf,
+    OUTPUT_TYPE_BY_LABEL,
+    OUTPUT_TYPE_EXCEL,
+    OUTPUT_TYPE_EXCEL_AND_PDF,
+    OUTPUT_TYPE_LABELS,
+    OUTPUT_TYPE_PDF,
+    PDF_ENGINE_LO_POOL,
+    PDF_ENGINE_NATIVE,
+    read_excel_headers,
+    read_sheet_names,
+    read_key_counts,
+    read_template_headers,
+    reconvert_folder_pdfs,
+    split_excel_with_template,
+    split_kwargs_from_params,
+    SPLIT_JOURNAL_NAME,
+    SPLIT_MANIFEST_NAME,
+    TEMPLATE_MODE_BY_LABEL,
+    TEMPLATE_MODE_LABELS,
+    TEMPLATE_MODE_SOURCE_TEMPLATE,
+    TEMPLATE_MODE_TEMPLATE_FILE,
+    validate_column_mapping,
+    WATCH_POLL_INTERVAL,
+    watch_split,
+    xlwings_available,
 )
 
-TEMPLATE_MODE_TEMPLATE_FILE = "template_file"
-TEMPLATE_MODE_SOURCE_TEMPLATE = "source_template"
-TEMPLATE_MODE_LABELS = {
-    TEMPLATE_MODE_TEMPLATE_FILE: "Use Template File",
-    TEMPLATE_MODE_SOURCE_TEMPLATE: "Use Source as Template",
-}
-TEMPLATE_MODE_BY_LABEL = {label: key for key, label in TEMPLATE_MODE_LABELS.items()}
-OUTPUT_TYPE_EXCEL = "excel"
-OUTPUT_TYPE_PDF = "pdf"
-OUTPUT_TYPE_EXCEL_AND_PDF = "excel_and_pdf"
-OUTPUT_TYPE_LABELS = {
-    OUTPUT_TYPE_EXCEL: "Excel",
-    OUTPUT_TYPE_PDF: "PDF",
-    OUTPUT_TYPE_EXCEL_AND_PDF: "Excel + PDF",
-}
-OUTPUT_TYPE_BY_LABEL = {label: key for key, label in OUTPUT_TYPE_LABELS.items()}
 APP_ICON_FILE = "excel-split.ico"
 APP_USER_MODEL_ID = "Faizalindrak.ExcelSplitter.1.0"
 PATH_FIELD_WIDTH = 460
@@ -71,6 +93,9 @@ COMBO_FIELD_WIDTH = 190
 SMALL_FIELD_WIDTH = 120
 NAME_FIELD_WIDTH = 160
 FIELD_CONTROL_HEIGHT = 40
+# Pipeline stages whose worker count can be set; 0 keeps the engine default.
+STAGE_WORKER_FIELDS = (("render", "Render Workers"), ("serialize", "Serialize Workers"), ("pdf", "PDF Workers"))
+MAX_STAGE_WORKERS = 16
 DASHBOARD_LIGHT_PALETTE = {
     "root": "#f5f7fb",
     "card": "#ffffff",
@@ -84,14 +109,6 @@ DASHBOARD_DARK_PALETTE = {
     "text": "#f5f5f5",
 }
 
-# ==== (Opsional) xlwings untuk PDF via Excel COM ====
-try:
-    import xlwings as xw
-    XLWINGS_AVAILABLE = True
-except Exception:
-    XLWINGS_AVAILABLE = False
-
-
 # ----------------- Helpers -----------------
 
 def resource_path(relative_path: str) -> Path:
@@ -118,898 +135,39 @@ def configure_application_icon(app: QApplication | None) -> QIcon:
         app.setWindowIcon(icon)
     return icon
 
-def safe_file_part(s: str) -> str:
-    s = "" if s is None else str(s)
-    return re.sub(r'[:\\/\?\*\[\]<>|"]', "_", s).strip() or "Key"
-
-def join_output_name_parts(prefix: str, key_part: str, suffix: str) -> str:
-    parts = []
-    if prefix:
-        parts.append(prefix)
-    parts.append(key_part)
-    if suffix:
-        parts.append(suffix)
-    return " ".join(parts)
-
-def build_output_stem(prefix: str, key_value, suffix: str) -> str:
-    return join_output_name_parts(prefix, safe_file_part(key_value), suffix)
-
-def output_extension(output_file_type: str) -> str:
-    if output_file_type == OUTPUT_TYPE_PDF:
-        return ".pdf"
-    if output_file_type == OUTPUT_TYPE_EXCEL_AND_PDF:
-        return ".xlsx + PDF"
-    return ".xlsx"
-
-def output_requires_pdf(output_file_type: str) -> bool:
-    return output_file_type in {OUTPUT_TYPE_PDF, OUTPUT_TYPE_EXCEL_AND_PDF}
-
-def remove_intermediate_workbook_for_pdf(xlsx_path: Path, output_file_type: str):
-    if output_file_type != OUTPUT_TYPE_PDF:
-        return
-    if xlsx_path.with_suffix(".pdf").exists() and xlsx_path.exists():
-        xlsx_path.unlink()
-
-def set_print_titles_and_area(ws, header_rows: int, last_col_idx: int, last_data_row: int):
-    ws.print_title_rows = f"1:{header_rows}"
-    last_col_letter = get_column_letter(last_col_idx if last_col_idx > 0 else 1)
-    last_row = last_data_row if last_data_row >= (header_rows + 1) else (header_rows + 1)
-    ws.print_area = f"A1:{last_col_letter}{last_row}"
-
-def normalize_header(value) -> str:
-    value = "" if value is None else str(value)
-    return re.sub(r"[^a-z0-9]+", "", value.strip().lower())
-
-def resolve_header_label(columns, label):
-    exact_matches = [column for column in columns if column == label]
-    if len(exact_matches) == 1:
-        return exact_matches[0]
-    if len(exact_matches) > 1:
-        raise ValueError(f"Header kolom ambigu: {label}")
-
-    label_text = str(label)
-    display_matches = [column for column in columns if str(column) == label_text]
-    if len(display_matches) == 1:
-        return display_matches[0]
-    if len(display_matches) > 1:
-        raise ValueError(f"Header kolom ambigu: {label_text}")
-
-    return None
-
-def find_duplicate_headers(headers) -> list[str]:
-    seen = set()
-    duplicates = []
-    for header in headers:
-        header_text = str(header)
-        if header_text in seen and header_text not in duplicates:
-            duplicates.append(header_text)
-        seen.add(header_text)
-    return duplicates
-
-def auto_map_columns(template_headers, source_headers):
-    source_by_key = {}
-    for source in source_headers:
-        key = normalize_header(source)
-        if key and key not in source_by_key:
-            source_by_key[key] = source
-
-    return {
-        template: source_by_key.get(normalize_header(template))
-        for template in template_headers
-    }
-
-def validate_column_mapping(template_headers, mapping):
-    mapping = mapping or {}
-    return [
-        template
-        for template in template_headers
-        if not mapping.get(template)
-    ]
-
-def read_excel_headers(path: Path, sheet_name: str, header_rows: int) -> list[str]:
-    df = pd.read_excel(path, sheet_name=sheet_name, header=header_rows - 1, nrows=0)
-    return [str(col) for col in df.columns]
-
-
-def read_key_values(path: Path, sheet_name: str, key_col, source_header_rows: int) -> list[str]:
-    """Return the ordered, de-duplicated key values (as strings) for a column.
-
-    Order matches groupby(sort=False): first occurrence wins. NaN values are
-    rendered as the string "nan" to match how they appear in grouping/filenames.
-    """
-    df = pd.read_excel(path, sheet_name=sheet_name, header=source_header_rows - 1, dtype=object)
-    if isinstance(key_col, int):
-        if key_col < 1 or key_col > df.shape[1]:
-            raise ValueError("Index kolom kunci di luar jangkauan DataFrame.")
-        key_series = df.iloc[:, key_col - 1]
-    else:
-        resolved_key_col = resolve_header_label(df.columns, key_col)
-        if resolved_key_col is None:
-            raise ValueError(f"Header kolom kunci '{key_col}' tidak ditemukan.")
-        key_series = df[resolved_key_col]
-
-    seen = []
-    seen_set = set()
-    for value in key_series:
-        text = str(value)
-        if text not in seen_set:
-            seen_set.add(text)
-            seen.append(text)
-    return seen
-
-def read_template_header_cells(path: Path, header_rows: int) -> tuple[list[tuple[str, int]], int]:
-    wb = load_workbook(path, read_only=True, data_only=True)
-    try:
-        ws = wb.active
-        headers = []
-        max_col = min(ws.max_column or 1, 500)
-        for col_idx in range(1, max_col + 1):
-            value = ws.cell(row=header_rows, column=col_idx).value
-            if value is not None and str(value).strip() != "":
-                headers.append((str(value).strip(), col_idx))
-        first_col = headers[0][1] if headers else 1
-        return headers, first_col
-    finally:
-        wb.close()
-
-def read_template_headers(path: Path, header_rows: int) -> tuple[list[str], int]:
-    header_cells, first_col = read_template_header_cells(path, header_rows)
-    return [header for header, _ in header_cells], first_col
-
-def detect_excel_header_row(path: Path, sheet_name: str | None = None, max_rows: int = 20) -> int:
-    wb = load_workbook(path, read_only=True, data_only=True)
-    try:
-        ws = wb[sheet_name] if sheet_name else wb.active
-        best_row, best_score = 1, -1
-        scan_limit = min(max_rows, ws.max_row)
-        rows = list(ws.iter_rows(min_row=1, max_row=scan_limit, values_only=True))
-        for offset, row in enumerate(rows):
-            row_number = offset + 1
-            values = [str(value).strip() for value in row if value is not None and str(value).strip()]
-            if not values:
-                continue
-
-            text_count = sum(1 for value in values if re.search(r"[A-Za-z]", value))
-            numeric_count = len(values) - text_count
-            unique_count = len({normalize_header(value) or value.lower() for value in values})
-            next_values = []
-            if offset + 1 < len(rows):
-                next_values = [
-                    str(value).strip()
-                    for value in rows[offset + 1]
-                    if value is not None and str(value).strip()
-                ]
-
-            score = (len(values) * 4) + (text_count * 2) + unique_count
-            if next_values:
-                score += min(len(next_values), len(values))
-            if len(values) == 1:
-                score -= 4
-            if numeric_count > text_count:
-                score -= 3
-
-            if score > best_score:
-                best_row, best_score = row_number, score
-
-        return best_row
-    finally:
-        wb.close()
-
-def find_soffice(explicit_path: str | None = None) -> str | None:
-    """Cari soffice.exe dari explicit, env, PATH, atau lokasi umum."""
-    def _normalize(p):
-        if not p:
-            return None
-        p = str(Path(p))
-        if p.lower().endswith("soffice.exe") and Path(p).exists():
-            return p
-        prog = Path(p) / "soffice.exe"
-        if prog.exists():
-            return str(prog)
-        prog = Path(p) / "program" / "soffice.exe"
-        if prog.exists():
-            return str(prog)
-        return None
-
-    # explicit
-    s = _normalize(explicit_path)
-    if s: return s
-    # env
-    s = _normalize(os.environ.get("LIBREOFFICE_PATH"))
-    if s: return s
-    # PATH
-    s = shutil.which("soffice")
-    if s: return s
-    # lokasi umum
-    common = [
-        r"C:\Program Files\LibreOffice\program\soffice.exe",
-        r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
-        r"C:\PortableApps\LibreOfficePortable\App\libreoffice\program\soffice.exe",
-        r"D:\PortableApps\LibreOfficePortable\App\libreoffice\program\soffice.exe",
-    ]
-    for c in common:
-        if Path(c).exists():
-            return c
-    return None
-
-def export_pdf_via_lo(xlsx_path: Path, soffice_path: str | None = None):
-    exe = soffice_path or "soffice"
-    cmd = [exe, "--headless", "--convert-to", "pdf", "--outdir", str(xlsx_path.parent), str(xlsx_path)]
-    subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-def cleanup_excel_com():
-    """Clean up Excel COM objects and release resources"""
-    try:
-        # Try to release any existing COM objects
-        import gc
-        import pythoncom
-
-        # Force garbage collection
-        gc.collect()
-
-        # Uninitialize COM
-        try:
-            pythoncom.CoUninitialize()
-        except:
-            pass
-
-        # Re-initialize COM for next use
-        try:
-            pythoncom.CoInitialize()
-        except:
-            pass
-
-    except ImportError:
-        # pythoncom not available, try basic cleanup
-        import gc
-        gc.collect()
-    except:
-        pass
-
-def debug_excel_detection():
-    """Debug function to check Excel detection methods"""
-    results = []
-
-    results.append(f"XLWINGS_AVAILABLE: {XLWINGS_AVAILABLE}")
-
-    # Test Method 1: xlwings
-    if XLWINGS_AVAILABLE:
-        try:
-            import xlwings as xw
-            app = xw.App(visible=False, add_book=False)
-            if app is not None:
-                app.quit()
-                results.append("Method 1 (xlwings): SUCCESS")
-            else:
-                results.append("Method 1 (xlwings): FAILED - app is None")
-        except Exception as e:
-            results.append(f"Method 1 (xlwings): FAILED - {str(e)}")
-    else:
-        results.append("Method 1 (xlwings): SKIPPED - xlwings not available")
-
-    # Test Method 2: win32com.client.Dispatch
-    try:
-        import win32com.client
-        excel = win32com.client.Dispatch("Excel.Application")
-        excel.Visible = False
-        excel.Quit()
-        del excel
-        results.append("Method 2 (win32com Dispatch): SUCCESS")
-    except Exception as e:
-        results.append(f"Method 2 (win32com Dispatch): FAILED - {str(e)}")
-
-    # Test Method 3: win32com.client.gencache.EnsureDispatch
-    try:
-        import win32com.client
-        excel = win32com.client.gencache.EnsureDispatch("Excel.Application")
-        excel.Visible = False
-        excel.Quit()
-        del excel
-        results.append("Method 3 (win32com EnsureDispatch): SUCCESS")
-    except Exception as e:
-        results.append(f"Method 3 (win32com EnsureDispatch): FAILED - {str(e)}")
-
-    # Test Method 4: Registry check
-    try:
-        import winreg
-        found_keys = []
-        key_paths = [
-            r"SOFTWARE\Microsoft\Office\ClickToRun\Configuration",
-            r"SOFTWARE\Microsoft\Office\16.0\Excel\InstallRoot",
-            r"SOFTWARE\Microsoft\Office\15.0\Excel\InstallRoot",
-            r"SOFTWARE\Microsoft\Office\14.0\Excel\InstallRoot",
-            r"SOFTWARE\WOW6432Node\Microsoft\Office\16.0\Excel\InstallRoot",
-            r"SOFTWARE\WOW6432Node\Microsoft\Office\15.0\Excel\InstallRoot",
-            r"SOFTWARE\WOW6432Node\Microsoft\Office\14.0\Excel\InstallRoot",
-        ]
-
-        for key_path in key_paths:
-            try:
-                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path)
-                winreg.CloseKey(key)
-                found_keys.append(key_path)
-            except:
-                continue
-
-        if found_keys:
-            results.append(f"Method 4 (Registry): Found {len(found_keys)} keys: {found_keys}")
-        else:
-            results.append("Method 4 (Registry): No Excel keys found")
-
-    except ImportError:
-        results.append("Method 4 (Registry): SKIPPED - winreg not available")
-    except Exception as e:
-        results.append(f"Method 4 (Registry): FAILED - {str(e)}")
-
-    return results
-
-def check_excel_availability():
-    """Check if Microsoft Excel is available for COM automation"""
-    try:
-        # Method 1: Try xlwings first (most reliable for xlwings usage)
-        if XLWINGS_AVAILABLE:
-            try:
-                import xlwings as xw
-                app = xw.App(visible=False, add_book=False)
-                if app is not None:
-                    app.quit()
-                    return True
-            except Exception:
-                pass
-
-        # Method 2: Try win32com.client
-        try:
-            import win32com.client
-            excel = win32com.client.Dispatch("Excel.Application")
-            excel.Visible = False
-            excel.Quit()
-            del excel
-            return True
-        except Exception:
-            pass
-
-        # Method 3: Try alternative COM approach
-        try:
-            import win32com.client
-            excel = win32com.client.gencache.EnsureDispatch("Excel.Application")
-            excel.Visible = False
-            excel.Quit()
-            del excel
-            return True
-        except Exception:
-            pass
-
-        # Method 4: Check registry for Excel installation
-        try:
-            import winreg
-            key_paths = [
-                r"SOFTWARE\Microsoft\Office\ClickToRun\Configuration",
-                r"SOFTWARE\Microsoft\Office\16.0\Excel\InstallRoot",
-                r"SOFTWARE\Microsoft\Office\15.0\Excel\InstallRoot",
-                r"SOFTWARE\Microsoft\Office\14.0\Excel\InstallRoot",
-                r"SOFTWARE\WOW6432Node\Microsoft\Office\16.0\Excel\InstallRoot",
-                r"SOFTWARE\WOW6432Node\Microsoft\Office\15.0\Excel\InstallRoot",
-                r"SOFTWARE\WOW6432Node\Microsoft\Office\14.0\Excel\InstallRoot",
-            ]
-
-            for key_path in key_paths:
-                try:
-                    key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path)
-                    winreg.CloseKey(key)
-                    # Found Excel in registry, but still need to test COM
-                    try:
-                        import win32com.client
-                        excel = win32com.client.Dispatch("Excel.Application")
-                        excel.Visible = False
-                        excel.Quit()
-                        return True
-                    except:
-                        pass
-                except:
-                    continue
-        except ImportError:
-            pass  # winreg not available
-        except Exception:
-            pass
-
-        return False
-
-    except Exception:
-        return False
-    finally:
-        # Clean up after test
-        try:
-            cleanup_excel_com()
-        except:
-            pass
-
-def export_pdf_via_xlwings(xlsx_path: Path):
-    """Export Excel to PDF using xlwings (requires Excel installed on Windows)"""
-    if not XLWINGS_AVAILABLE:
-        raise RuntimeError("xlwings belum terpasang. Jalankan: pip install xlwings")
 
-    # Clean up COM objects only (safe cleanup)
-    cleanup_excel_com()
 
-    # Check if Excel is available before proceeding
-    if not check_excel_availability():
-        raise RuntimeError("Microsoft Excel tidak terinstall atau tidak dapat diakses. "
-                          "Gunakan PDF Engine 'libreoffice' atau 'none' sebagai alternatif.")
-
-    pdf_path = xlsx_path.with_suffix(".pdf")
-
-    # Use xlwings with invisible Excel application
-    app = None
-    wb = None
-    try:
-        # Create Excel application instance (invisible)
-        app = xw.App(visible=False, add_book=False)
-
-        # Verify app was created successfully
-        if app is None:
-            raise RuntimeError("Failed to create Excel application instance")
-
-        # Open the workbook
-        wb = app.books.open(str(xlsx_path))
-
-        if wb is None:
-            raise RuntimeError(f"Failed to open workbook: {xlsx_path}")
-
-        # Get the active worksheet
-        ws = wb.sheets.active
-
-        if ws is None:
-            raise RuntimeError("Failed to get active worksheet")
-
-        # Export to PDF with Excel's native formatting
-        # This preserves all Excel formatting, styles, colors, etc.
-        ws.to_pdf(str(pdf_path))
-
-        # Verify PDF was created
-        if not pdf_path.exists():
-            raise RuntimeError(f"PDF was not created: {pdf_path}")
-
-    except Exception as e:
-        # More detailed error reporting
-        error_details = str(e)
-        if "apps" in error_details.lower() or "nonetype" in error_details.lower():
-            error_details = ("Excel COM interface tidak dapat diakses. "
-                           "Pastikan Microsoft Excel terinstall dan tidak sedang digunakan aplikasi lain. "
-                           "Alternatif: gunakan PDF Engine 'libreoffice' atau 'none'.")
-        raise RuntimeError(f"Gagal export PDF via xlwings: {error_details}")
-    finally:
-        # Clean up: close workbook and quit Excel
-        if wb is not None:
-            try:
-                wb.close()
-            except:
-                pass
-        if app is not None:
-            try:
-                app.quit()
-            except:
-                pass
-
-        # Safe COM cleanup only after each PDF export
-        cleanup_excel_com()
-
-        # Give a moment for cleanup to complete
-        import time
-        time.sleep(0.5)
-
-
-# ----------------- Split Logic -----------------
-
-def split_excel_with_template(
-    source_path: Path, sheet_name: str, key_col, template_path: Path, out_dir: Path,
-    header_rows: int, pdf_engine: str = "xlwings", soffice_path: str | None = None,
-    prefix: str = "", suffix: str = "", status_cb=None, progress_cb=None,
-    template_mode: str = TEMPLATE_MODE_TEMPLATE_FILE, column_mapping: dict | None = None,
-    source_header_rows: int | None = None, template_header_rows: int | None = None,
-    output_file_type: str | None = None, selected_keys: set | None = None,
-    stop_requested=None, verbose: bool = False
-):
-    if status_cb is None: status_cb = lambda msg: None
-    if progress_cb is None: progress_cb = lambda t, c: None
-    if stop_requested is None: stop_requested = lambda: False
-    def debug(msg):
-        if verbose:
-            status_cb(msg)
-    source_header_rows = source_header_rows or header_rows
-    template_header_rows = template_header_rows or header_rows
-    if output_file_type is None:
-        output_file_type = (
-            OUTPUT_TYPE_EXCEL
-            if (pdf_engine or "none").lower() == "none"
-            else OUTPUT_TYPE_PDF
-        )
-    if output_file_type not in {OUTPUT_TYPE_EXCEL, OUTPUT_TYPE_PDF, OUTPUT_TYPE_EXCEL_AND_PDF}:
-        raise ValueError(f"Tipe output tidak didukung: {output_file_type}")
-    effective_pdf_engine = "none" if not output_requires_pdf(output_file_type) else (pdf_engine or "xlwings")
-    if output_requires_pdf(output_file_type) and effective_pdf_engine == "none":
-        effective_pdf_engine = "xlwings"
-
-    if template_mode not in {TEMPLATE_MODE_TEMPLATE_FILE, TEMPLATE_MODE_SOURCE_TEMPLATE}:
-        raise ValueError(f"Template mode tidak didukung: {template_mode}")
-    if not source_path.exists():
-        raise FileNotFoundError(f"Sumber tidak ditemukan: {source_path}")
-    if template_mode == TEMPLATE_MODE_TEMPLATE_FILE and not template_path.exists():
-        raise FileNotFoundError(f"Template tidak ditemukan: {template_path}")
-    out_dir.mkdir(parents=True, exist_ok=True)
-    split_results: list[SplitResult] = []
-
-    status_cb("Membaca sumber...")
-
-    # Diagnostic logging
-    try:
-        file_size = source_path.stat().st_size if source_path.exists() else 0
-        debug(f"Debug: File path: {source_path}")
-        debug(f"Debug: File exists: {source_path.exists()}")
-        debug(f"Debug: File size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)")
-        debug(f"Debug: Sheet name: '{sheet_name}'")
-        debug("Debug: Starting pd.read_excel...")
-
-        # Try reading with timeout and error handling
-        import time
-        start_time = time.time()
-
-        # First try to read just the header to test file accessibility
-        debug("Debug: Testing file accessibility...")
-        try:
-            df_test = pd.read_excel(source_path, sheet_name=sheet_name, nrows=5, dtype=object)
-            debug(f"Debug: Successfully read {len(df_test)} rows for testing")
-        except Exception as test_e:
-            debug(f"Debug: Test read failed: {str(test_e)}")
-            raise test_e
-
-        # Read with header at the correct row (source_header_rows is 1-indexed)
-        df = pd.read_excel(source_path, sheet_name=sheet_name, header=source_header_rows - 1, dtype=object)
-
-        elapsed = time.time() - start_time
-        debug(f"Debug: Successfully read {len(df)} rows in {elapsed:.2f} seconds")
-
-    except FileNotFoundError as e:
-        debug(f"Debug: File not found: {e}")
-        raise FileNotFoundError(f"File tidak ditemukan: {source_path}")
-    except PermissionError as e:
-        debug(f"Debug: Permission denied: {e}")
-        raise PermissionError(f"Tidak ada akses ke file: {source_path}")
-    except Exception as e:
-        debug(f"Debug: Error reading Excel: {type(e).__name__}: {str(e)}")
-        raise e
-
-    # Tentukan kolom kunci
-    if isinstance(key_col, int):
-        if key_col < 1 or key_col > df.shape[1]:
-            raise ValueError("Index kolom kunci di luar jangkauan DataFrame.")
-        key_series = df.iloc[:, key_col - 1]
-    else:
-        resolved_key_col = resolve_header_label(df.columns, key_col)
-        if resolved_key_col is None:
-            raise ValueError(f"Header kolom kunci '{key_col}' tidak ditemukan.")
-        key_series = df[resolved_key_col]
-
-    # Debug: Check for categorical data issues
-    debug(f"Debug: Key column '{key_col}' data type: {key_series.dtype}")
-    debug(f"Debug: Key column unique values: {len(key_series.unique())}")
-    debug(f"Debug: Key column has null values: {key_series.isnull().sum()}")
-
-    # Check for categorical columns in the entire DataFrame
-    categorical_cols = []
-    for col in df.columns:
-        if df[col].dtype.name == 'category':
-            categorical_cols.append(col)
-            debug(f"Debug: Found categorical column: {col}")
-
-    if categorical_cols:
-        debug(f"Debug: Converting {len(categorical_cols)} categorical columns to string...")
-        for col in categorical_cols:
-            try:
-                df[col] = df[col].astype(str)
-                debug(f"Debug: Converted {col} to string")
-            except Exception as conv_e:
-                debug(f"Debug: Failed to convert {col}: {conv_e}")
-
-    # Selaraskan urutan kolom ke header template.
-    templ_cols = None
-    templ_col_start = 1
-    template_column_indices = []
-    if template_mode == TEMPLATE_MODE_TEMPLATE_FILE:
-        template_header_cells, templ_col_start = read_template_header_cells(
-            template_path,
-            template_header_rows,
-        )
-        templ_cols = [header for header, _ in template_header_cells]
-        template_column_indices = [col_idx for _, col_idx in template_header_cells]
-        if not templ_cols:
-            raise ValueError("Header template tidak ditemukan untuk mapping kolom.")
-        duplicate_template_headers = find_duplicate_headers(templ_cols)
-        if duplicate_template_headers:
-            raise ValueError(
-                "Header template duplikat tidak didukung untuk mapping kolom: "
-                + ", ".join(duplicate_template_headers)
-            )
-
-        source_headers = [str(col) for col in df.columns]
-        effective_mapping = column_mapping or auto_map_columns(templ_cols, source_headers)
-        missing = validate_column_mapping(templ_cols, effective_mapping)
-        if missing:
-            raise ValueError("Mapping kolom template belum lengkap: " + ", ".join(missing))
-
-        mapped_series = []
-        for template_col in templ_cols:
-            source_col = effective_mapping[template_col]
-            resolved_source_col = resolve_header_label(df.columns, source_col)
-            if resolved_source_col is None:
-                raise ValueError(
-                    f"Kolom sumber untuk template '{template_col}' tidak ditemukan: {source_col}"
-                )
-            mapped_series.append(df[resolved_source_col].rename(template_col))
-        df = pd.concat(mapped_series, axis=1)
-        df.columns = templ_cols
-
-    # Debug: Check groupby operation
-    debug("Debug: Starting groupby operation...")
-    try:
-        groups = df.groupby(key_series, dropna=False, sort=False)
-        debug(f"Debug: Groupby successful, found {len(groups)} groups")
-    except Exception as groupby_e:
-        debug(f"Debug: Groupby error: {type(groupby_e).__name__}: {str(groupby_e)}")
-
-        # Try multiple approaches to fix the issue
-        if "categorical" in str(groupby_e).lower():
-            debug("Debug: Attempting to fix categorical issue...")
-
-            # Method 1: Try converting all categorical columns to object
-            try:
-                debug("Debug: Method 1 - Converting all categorical columns to object...")
-                df_no_cat = df.copy()
-                for col in df_no_cat.columns:
-                    if df_no_cat[col].dtype.name == 'category':
-                        df_no_cat[col] = df_no_cat[col].astype('object')
-                groups = df_no_cat.groupby(key_series, dropna=False, sort=False)
-                debug(f"Debug: Method 1 successful, found {len(groups)} groups")
-                # Update df to use the fixed version
-                df = df_no_cat
-            except Exception as method1_e:
-                debug(f"Debug: Method 1 failed: {method1_e}")
-
-                # Method 2: Try using string conversion for groupby
-                try:
-                    debug("Debug: Method 2 - Using string keys for groupby...")
-                    string_keys = key_series.astype(str)
-                    groups = df.groupby(string_keys, dropna=False, sort=False)
-                    debug(f"Debug: Method 2 successful, found {len(groups)} groups")
-                except Exception as method2_e:
-                    debug(f"Debug: Method 2 failed: {method2_e}")
-                    raise groupby_e
-        else:
-            raise groupby_e
+# ----------------- GUI -----------------
 
-    # Apply optional key filtering while preserving group order.
-    group_items = [
-        (key_val, group)
-        for key_val, group in groups
-        if selected_keys is None or str(key_val) in selected_keys
+def _format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def format_throughput(info) -> str:
+    """Footer text for a ``SplitThroughput`` snapshot."""
+    parts = [
+        f"{info.completed_rows:,} / {info.total_rows:,} rows",
+        f"{info.keys_per_second:.1f} keys/s",
+        f"{info.rows_per_second:,.0f} rows/s",
+        _format_size(info.bytes_written),
     ]
-    total, current = len(group_items), 0
-    if selected_keys is not None:
-        status_cb(f"Generating {total} of selected key(s).")
-    progress_cb(total, 0)
-
-    # Read the template/source workbook once and reload per key from memory
-    # to avoid repeated disk reads inside the loop.
-    template_bytes = None
-    source_bytes = None
-    if template_mode == TEMPLATE_MODE_TEMPLATE_FILE:
-        template_bytes = template_path.read_bytes()
-    else:
-        source_bytes = source_path.read_bytes()
-
-    for key_val, group in group_items:
-        if stop_requested():
-            status_cb("Dibatalkan.")
-            break
-        current += 1
-        status_cb(f"Proses [{current}/{total}] key={key_val}")
-        progress_cb(total, current)
-
-        if template_mode == TEMPLATE_MODE_SOURCE_TEMPLATE:
-            wb = load_workbook(io.BytesIO(source_bytes))
-            if sheet_name not in wb.sheetnames:
-                raise ValueError(f"Sheet sumber '{sheet_name}' tidak ditemukan.")
-
-            for sheet in list(wb.worksheets):
-                if sheet.title != sheet_name:
-                    wb.remove(sheet)
-
-            ws = wb[sheet_name]
-            start_row = source_header_rows + 1
-            keep_rows = {int(idx) + start_row for idx in group.index}
-            # Delete non-kept data rows in contiguous runs (bottom-up) so each
-            # delete_rows call removes a block instead of a single row.
-            run_end = None
-            for row_idx in range(ws.max_row, start_row - 1, -1):
-                if row_idx not in keep_rows:
-                    if run_end is None:
-                        run_end = row_idx
-                elif run_end is not None:
-                    ws.delete_rows(row_idx + 1, run_end - row_idx)
-                    run_end = None
-            if run_end is not None:
-                ws.delete_rows(start_row, run_end - start_row + 1)
-
-            set_print_titles_and_area(ws, source_header_rows, ws.max_column, ws.max_row)
-
-            out_name = build_output_stem(prefix, key_val, suffix)
-            xlsx_out = out_dir / f"{out_name}.xlsx"
-            wb.save(xlsx_out)
-
-            eng = (effective_pdf_engine or "none").lower()
-            if eng != "none":
-                if eng == "libreoffice":
-                    export_pdf_via_lo(xlsx_out, soffice_path=soffice_path)
-                elif eng == "xlwings":
-                    export_pdf_via_xlwings(xlsx_out)
-                remove_intermediate_workbook_for_pdf(xlsx_out, output_file_type)
-            pdf_out = xlsx_out.with_suffix(".pdf")
-            split_results.append(
-                SplitResult(
-                    key=str(key_val),
-                    excel_path=xlsx_out if xlsx_out.exists() else None,
-                    pdf_path=pdf_out if pdf_out.exists() else None,
-                    output_file_type=output_file_type,
-                )
-            )
-            continue
-
-        # 1) Tulis XLSX dari template
-        wb = load_workbook(io.BytesIO(template_bytes))
-        ws = wb.active
-        start_row = template_header_rows + 1
-
-        # Comprehensive cleanup to eliminate all Excel repair warnings
-        try:
-            # 1. Remove all named ranges (common cause of repair warnings)
-            if hasattr(wb, 'defined_names'):
-                wb.defined_names = {}
-
-            # 2. Remove external links
-            if hasattr(wb, '_external_links') and wb._external_links:
-                wb._external_links.clear()
-
-            # 3. Remove external link relationships
-            if hasattr(wb, '_external_link_rels'):
-                wb._external_link_rels.clear()
+    eta = info.eta_seconds
+    if eta is not None:
+        minutes, seconds = divmod(int(round(eta)), 60)
+        hours, minutes = divmod(minutes, 60)
+        parts.append(f"ETA {hours}:{minutes:02d}:{seconds:02d}" if hours else f"ETA {minutes}:{seconds:02d}")
+    return " · ".join(parts)
 
-            # 4. Remove all drawings completely (they often cause repair issues)
-            if hasattr(ws, '_drawings'):
-                ws._drawings = []
-
-            # 5. Clean up worksheet-level named ranges
-            if hasattr(ws, 'defined_names'):
-                ws.defined_names = []
-
-            # 6. Remove external link parts from the package
-            try:
-                from openpyxl.packaging.relationship import Relationship
-                if hasattr(wb, '_rels'):
-                    # Remove external link relationships
-                    rels_to_remove = []
-                    for rel in wb._rels:
-                        if ('externalLink' in str(rel.target) or
-                            'externalLinks' in str(rel.target) or
-                            'drawing' in str(rel.target).lower()):
-                            rels_to_remove.append(rel)
-                    for rel in rels_to_remove:
-                        wb._rels.remove(rel)
-            except:
-                pass
-
-            # 7. Clean up any hyperlinks that might reference external data
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.hyperlink:
-                        cell.hyperlink = None
-
-        except Exception as cleanup_e:
-            # If cleanup fails, continue anyway
-            pass
-
-        values = [
-            ["" if pd.isna(value) else value for value in row]
-            for row in group.itertuples(index=False, name=None)
-        ]
-
-        # Copy formatting from template row to data rows
-        # Use the first data row from template as formatting template
-        template_row = start_row  # This should be the first data row in template
-
-        # Capture the template-row style objects once per workbook. Reading a
-        # cell's style returns a StyleProxy, so copy once at capture time into
-        # real style objects; assigning those shared objects to many cells reuses
-        # one style instead of copying per cell.
-        style_src = {}
-        for col_idx in template_column_indices:
-            template_cell = ws.cell(row=template_row, column=col_idx)
-            if template_cell.has_style:
-                style_src[col_idx] = (
-                    template_cell.font.copy(),
-                    template_cell.fill.copy(),
-                    template_cell.border.copy(),
-                    template_cell.alignment.copy(),
-                    template_cell.number_format,
-                    template_cell.protection.copy(),
-                )
-
-        for r_off, row_vals in enumerate(values, start=0):
-            row_idx = start_row + r_off
-
-            for c_idx, v in zip(template_column_indices, row_vals):
-                ws.cell(row=row_idx, column=c_idx, value=v)
-
-            if r_off > 0:
-                try:
-                    for col_idx in template_column_indices:
-                        style = style_src.get(col_idx)
-                        if not style:
-                            continue
-                        current_cell = ws.cell(row=row_idx, column=col_idx)
-                        (
-                            current_cell.font,
-                            current_cell.fill,
-                            current_cell.border,
-                            current_cell.alignment,
-                            current_cell.number_format,
-                            current_cell.protection,
-                        ) = style
-
-                except Exception as format_e:
-                    # If formatting copy fails, continue without it
-                    pass
-
-        last_data_row = start_row + len(values) - 1
-        last_col = max(template_column_indices, default=templ_col_start)
-        set_print_titles_and_area(ws, template_header_rows, max(1, last_col), last_data_row)
-
-        # Build filename with prefix and suffix
-        out_name = build_output_stem(prefix, key_val, suffix)
-        xlsx_out = out_dir / f"{out_name}.xlsx"
-        wb.save(xlsx_out)
-
-        # 2) PDF (opsional)
-        eng = (effective_pdf_engine or "none").lower()
-        if eng != "none":
-            if eng == "libreoffice":
-                export_pdf_via_lo(xlsx_out, soffice_path=soffice_path)
-            elif eng == "xlwings":
-                export_pdf_via_xlwings(xlsx_out)
-            remove_intermediate_workbook_for_pdf(xlsx_out, output_file_type)
-        pdf_out = xlsx_out.with_suffix(".pdf")
-        split_results.append(
-            SplitResult(
-                key=str(key_val),
-                excel_path=xlsx_out if xlsx_out.exists() else None,
-                pdf_path=pdf_out if pdf_out.exists() else None,
-                output_file_type=output_file_type,
-            )
-        )
-
-    status_cb("Selesai.")
-    progress_cb(total, total)
-
-    # Final cleanup for Excel COM sessions
-    if (effective_pdf_engine or "none").lower() == "xlwings":
-        cleanup_excel_com()
-
-    return split_results
-
-
-# ----------------- GUI -----------------
 
 class SplitWorker(QThread):
     status = Signal(str)
+    warned = Signal(str)
     progress = Signal(int, int)
+    throughput = Signal(object)
     finished = Signal()
     error = Signal(str)
 
@@ -1020,46 +178,92 @@ class SplitWorker(QThread):
         self._cancel_requested = False
         self._last_status_emit = 0.0
         self._last_progress_emit = 0.0
+        self._throughput = None
+        self.warnings = []
 
     def cancel(self):
         self._cancel_requested = True
 
-    def emit_status(self, message):
-        now = time.monotonic()
-        important = not str(message).startswith("Proses [") or "Selesai" in str(message)
-        if important or now - self._last_status_emit >= 0.25:
-            self._last_status_emit = now
-            self.status.emit(str(message))
+    def emit_event(self, event):
+        if event.kind == EVENT_KEY_STARTED:
+            # Per-key lines are throttled; everything else is always shown.
+            now = time.monotonic()
+            if now - self._last_status_emit >= 0.25:
+                self._last_status_emit = now
+                self.status.emit(event.message)
+            return
+        if event.kind == EVENT_WARNING:
+            self.warnings.append(event.message)
+            self.warned.emit(event.message)
+            return
+        if event.message:
+            self.status.emit(event.message)
+
+    def store_throughput(self, info):
+        # Called just before the matching progress update, so it rides on
+        # the same throttle instead of adding a second signal per key.
+        self._throughput = info
 
     def emit_progress(self, total, current):
         now = time.monotonic()
         final = total <= 0 or current <= 0 or current >= total
+        if current <= 0:
+            self._throughput = None
         if final or now - self._last_progress_emit >= 0.05:
             self._last_progress_emit = now
             self.progress.emit(total, current)
+            if self._throughput is not None:
+                self.throughput.emit(self._throughput)
+
+    def split_kwargs(self):
+        return dict(split_kwargs_from_params(self.params), throughput_cb=self.store_throughput)
 
     def run(self):
         try:
             self.results = split_excel_with_template(
-                source_path=self.params['source_path'],
-                sheet_name=self.params['sheet_name'],
-                key_col=self.params['key_col'],
-                template_path=self.params['template_path'],
-                out_dir=self.params['out_dir'],
-                header_rows=self.params['header_rows'],
+                **self.split_kwargs(),
+                stop_requested=lambda: self._cancel_requested,
+                event_cb=self.emit_event,
+                progress_cb=self.emit_progress
+            )
+            self.finished.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class WatchSplitWorker(SplitWorker):
+    def _on_report(self, report):
+        if report.error is None:
+            self.results = report.results
+
+    def run(self):
+        try:
+            watch_split(
+                self.split_kwargs(),
+                poll_interval=self.params.get('watch_interval', WATCH_POLL_INTERVAL),
+                stop_requested=lambda: self._cancel_requested,
+                event_cb=self.emit_event,
+                progress_cb=self.emit_progress,
+                report_cb=self._on_report,
+            )
+            self.finished.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class ReconvertPdfWorker(SplitWorker):
+    def run(self):
+        try:
+            self.results = reconvert_folder_pdfs(
+                folder=self.params['out_dir'],
                 pdf_engine=self.params['pdf_engine'],
                 soffice_path=self.params['soffice_path'],
                 prefix=self.params['prefix'],
                 suffix=self.params['suffix'],
-                template_mode=self.params.get('template_mode', TEMPLATE_MODE_TEMPLATE_FILE),
-                column_mapping=self.params.get('column_mapping'),
-                source_header_rows=self.params.get('source_header_rows'),
-                template_header_rows=self.params.get('template_header_rows'),
-                output_file_type=self.params.get('output_file_type'),
-                selected_keys=self.params.get('selected_keys'),
-                verbose=self.params.get('verbose', False),
+                pdf_workers=(self.params.get('stage_workers') or {}).get('pdf', 1),
+                pdf_batch_size=self.params.get('pdf_batch_size', 1),
                 stop_requested=lambda: self._cancel_requested,
-                status_cb=self.emit_status,
+                event_cb=self.emit_event,
                 progress_cb=self.emit_progress
             )
             self.finished.emit()
@@ -1096,6 +300,434 @@ class MailMergeWorker(QThread):
             self.error.emit(str(e))
 
 
+DEFAULT_LOG_MAX_LINES = 5000
+LOG_LEVEL_FILTERS = {
+    "All": logging.DEBUG,
+    "Info": logging.INFO,
+    "Warnings": logging.WARNING,
+    "Errors": logging.ERROR,
+}
+LOG_LEVEL_COLORS = {
+    logging.WARNING: QColor("#d97706"),
+    logging.ERROR: QColor("#dc2626"),
+}
+
+
+def log_message_level(message: str) -> int:
+    return logging.DEBUG if message.startswith("Debug:") else logging.INFO
+
+
+class LogListModel(QAbstractListModel):
+    """The tail of the log shown in the Log panel.
+
+    Keeps at most ``max_lines`` ``(level, text)`` entries, dropping the oldest
+    as new ones arrive; the complete log goes to the session log file.
+    ``min_level`` hides lower levels without dropping them from the tail.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_LOG_MAX_LINES, parent=None):
+        super().__init__(parent)
+        self._lines = []
+        self._rows = []
+        self._max_lines = max_lines
+        self._min_level = logging.DEBUG
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        level, text = self._rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return text
+        if role == Qt.ForegroundRole:
+            return LOG_LEVEL_COLORS.get(level)
+        return None
+
+    def append(self, entries):
+        self._lines.extend(entries)
+        visible = [entry for entry in entries if entry[0] >= self._min_level]
+        if visible:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(visible) - 1)
+            self._rows.extend(visible)
+            self.endInsertRows()
+        self._trim()
+
+    def set_max_lines(self, max_lines: int):
+        self._max_lines = max_lines
+        self._trim()
+
+    def set_min_level(self, level: int):
+        self.beginResetModel()
+        self._min_level = level
+        self._rows = [entry for entry in self._lines if entry[0] >= level]
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self._lines = []
+        self._rows = []
+        self.endResetModel()
+
+    def line_count(self) -> int:
+        return len(self._lines)
+
+    def text(self) -> str:
+        return "\n".join(text for _, text in self._rows)
+
+    def _trim(self):
+        excess = len(self._lines) - self._max_lines
+        if excess <= 0:
+            return
+        # Shown rows are the buffered lines in order, so the dropped lines
+        # that pass the filter are exactly the first rows.
+        shown = sum(1 for level, _ in self._lines[:excess] if level >= self._min_level)
+        del self._lines[:excess]
+        if shown:
+            self.beginRemoveRows(QModelIndex(), 0, shown - 1)
+            del self._rows[:shown]
+            self.endRemoveRows()
+
+
+class SessionLog:
+    """Every log line of this session, in an anonymous temp file.
+
+    The file disappears when the app exits; ``save_to`` copies it out.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def write(self, entries):
+        self._file.writelines(
+            f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stamp))} "
+            f"{logging.getLevelName(level):<7} {text}\n"
+            for stamp, level, text in entries
+        )
+        self._file.flush()
+
+    def save_to(self, path: Path):
+        self._file.seek(0)
+        try:
+            with open(path, "w", encoding="utf-8") as out:
+                shutil.copyfileobj(self._file, out)
+        finally:
+            self._file.seek(0, os.SEEK_END)
+
+
+TASK_SHEETS = "sheets"
+TASK_HEADERS = "headers"
+TASK_SOURCE_HEADER_ROW = "source_header_row"
+TASK_KEYS = "keys"
+TASK_TEMPLATE_HEADER_ROW = "template_header_row"
+TASK_PANELS = {
+    "Source": (TASK_SHEETS, TASK_HEADERS, TASK_SOURCE_HEADER_ROW),
+    "Keys": (TASK_KEYS,),
+    "Template": (TASK_TEMPLATE_HEADER_ROW,),
+}
+# Threads are unparented so closing the window never destroys a running
+# parse; they stay referenced here until they have finished.
+_LIVE_TASKS = set()
+
+
+class BackgroundTask(QThread):
+    done = Signal(str, int, object, object)
+
+    def __init__(self, channel, generation, fn):
+        super().__init__()
+        self.channel = channel
+        self.generation = generation
+        self.fn = fn
+
+    def run(self):
+        try:
+            result = self.fn()
+        except Exception as e:
+            self.done.emit(self.channel, self.generation, None, e)
+            return
+        self.done.emit(self.channel, self.generation, result, None)
+
+
+class TaskRunner(QObject):
+    """Runs file parsing off the UI thread, one live request per channel.
+
+    A new request on a channel supersedes the previous one: a parse already
+    running finishes in the background and its result is dropped, and
+    requests made meanwhile collapse into the latest, which starts when the
+    running parse ends. ``cancel`` drops the live request the same way.
+    """
+
+    busyChanged = Signal(str, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._generation = 0
+        self._current = {}
+        self._running = {}
+        self._queued = {}
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def submit(self, channel: str, fn, on_done, on_error=None):
+        self._generation += 1
+        request = (self._generation, fn, on_done, on_error)
+        was_busy = channel in self._current
+        self._current[channel] = request
+        if channel in self._running:
+            self._queued[channel] = request
+        else:
+            self._start(channel, request)
+        if not was_busy:
+            self.busyChanged.emit(channel, True)
+
+    def cancel(self, channel: str):
+        self._queued.pop(channel, None)
+        if self._current.pop(channel, None) is not None:
+            self.busyChanged.emit(channel, False)
+
+    def is_busy(self, channel: str) -> bool:
+        return channel in self._current
+
+    def wait_until_idle(self, timeout: float = 30.0) -> bool:
+        """Process events until every live request has been delivered."""
+        deadline = time.monotonic() + timeout
+        while self._current and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.005)
+        return not self._current
+
+    def shutdown(self):
+        for channel in list(self._current):
+            self.cancel(channel)
+        for task in list(_LIVE_TASKS):
+            task.wait()
+
+    def _start(self, channel, request):
+        generation, fn, _, _ = request
+        task = BackgroundTask(channel, generation, fn)
+        task.done.connect(self._on_task_done)
+        _LIVE_TASKS.difference_update([live for live in _LIVE_TASKS if live.isFinished()])
+        _LIVE_TASKS.add(task)
+        self._running[channel] = task
+        task.start()
+
+    def _on_task_done(self, channel, generation, result, error):
+        self._running.pop(channel, None)
+        queued = self._queued.pop(channel, None)
+        if queued is not None:
+            self._start(channel, queued)
+        request = self._current.get(channel)
+        if request is None or request[0] != generation:
+            return
+        del self._current[channel]
+        self.busyChanged.emit(channel, False)
+        _, _, on_done, on_error = request
+        if error is None:
+            on_done(result)
+        elif on_error is not None:
+            on_error(error)
+
+
+KEY_MATCH_CONTAINS = "Contains"
+KEY_MATCH_REGEX = "Regex"
+KEY_MATCH_LIST = "Pasted list"
+KEY_MATCH_MODES = (KEY_MATCH_CONTAINS, KEY_MATCH_REGEX, KEY_MATCH_LIST)
+KEY_SORT_ORIGINAL = -1
+KEY_COLUMN_KEY = 0
+KEY_COLUMN_ROWS = 1
+
+
+def parse_key_list(text: str) -> list[str]:
+    """Split a pasted key list on newlines, tabs, commas and semicolons."""
+    return [part.strip() for part in re.split(r"[\r\n\t,;]+", text) if part.strip()]
+
+
+class KeyListModel(QAbstractTableModel):
+    """Checkable key table (key, row count) for the Keys panel.
+
+    Check states live in a bytearray next to the key list and the checked
+    count is kept up to date on every change, so toggling a key and the
+    summary label stay O(1) and Select/Clear All are a single fill. Rows are
+    a view over key positions: sorting reorders the positions once and the
+    search filter keeps the matching ones, so an extended "contains" search
+    only rescans the previous matches.
+    """
+
+    checkedCountChanged = Signal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keys = []
+        self._counts = []
+        self._folded = None
+        self._checked = bytearray()
+        self._checked_count = 0
+        self._sorted = range(0)
+        self._order = range(0)
+        self._sort_column = KEY_SORT_ORIGINAL
+        self._sort_order = Qt.AscendingOrder
+        self._pattern = ""
+        self._mode = KEY_MATCH_CONTAINS
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def index(self, row, column=KEY_COLUMN_KEY, parent=QModelIndex()):
+        return super().index(row, column, parent)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ("Key", "Rows")[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        position = self._order[index.row()]
+        if index.column() == KEY_COLUMN_ROWS:
+            if role == Qt.DisplayRole and self._counts:
+                return f"{self._counts[position]:,}"
+            if role == Qt.TextAlignmentRole:
+                return int(Qt.AlignRight | Qt.AlignVCenter)
+            return None
+        if role == Qt.DisplayRole:
+            return self._keys[position]
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self._checked[position] else Qt.Unchecked
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.column() == KEY_COLUMN_ROWS:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid() or index.column() != KEY_COLUMN_KEY:
+            return False
+        position = self._order[index.row()]
+        checked = 1 if Qt.CheckState(value) == Qt.Checked else 0
+        if self._checked[position] != checked:
+            self._checked[position] = checked
+            self._checked_count += 1 if checked else -1
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            self.checkedCountChanged.emit(self._checked_count, len(self._keys))
+        return True
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort_column, self._sort_order = column, order
+        self.beginResetModel()
+        self._sorted = self._sorted_positions()
+        self._order = self._match(self._pattern, self._mode, self._sorted)
+        self.endResetModel()
+
+    def set_keys(self, keys, checked: bool = True, counts=None):
+        """Replace the keys; ``counts`` holds each key's source row count."""
+        self.beginResetModel()
+        self._keys = list(keys)
+        self._counts = list(counts) if counts is not None else []
+        self._folded = None
+        self._checked = bytearray([1 if checked else 0]) * len(self._keys)
+        self._checked_count = len(self._keys) if checked else 0
+        self._sorted = self._sorted_positions()
+        self._order = self._match(self._pattern, self._mode, self._sorted)
+        self.endResetModel()
+        self.checkedCountChanged.emit(self._checked_count, len(self._keys))
+
+    def set_filter(self, pattern: str, mode: str = KEY_MATCH_CONTAINS) -> int:
+        """Show only the keys matching ``pattern``; returns the match count.
+
+        Raises ``re.error`` for an invalid regex and keeps the current rows.
+        """
+        candidates = self._sorted
+        if (
+            mode == KEY_MATCH_CONTAINS
+            and self._mode == KEY_MATCH_CONTAINS
+            and self._pattern
+            and self._pattern.casefold() in pattern.casefold()
+        ):
+            candidates = self._order
+        order = self._match(pattern, mode, candidates)
+        self.beginResetModel()
+        self._pattern, self._mode, self._order = pattern, mode, order
+        self.endResetModel()
+        return len(order)
+
+    def set_all_checked(self, checked: bool):
+        if not self._keys:
+            return
+        self._checked = bytearray([1 if checked else 0]) * len(self._keys)
+        self._checked_count = len(self._keys) if checked else 0
+        self._emit_checks_changed()
+
+    def check_matching(self) -> int:
+        """Check exactly the keys matching the filter and clear the rest."""
+        if not self._keys:
+            return 0
+        self._checked = bytearray(len(self._keys))
+        for position in self._order:
+            self._checked[position] = 1
+        self._checked_count = len(self._order)
+        self._emit_checks_changed()
+        return self._checked_count
+
+    def missing_keys(self, text: str) -> list:
+        """Keys of a pasted list that are not among the loaded keys."""
+        known = set(self._keys)
+        return [key for key in parse_key_list(text) if key not in known]
+
+    def keys(self) -> list:
+        return self._keys
+
+    def key_count(self) -> int:
+        return len(self._keys)
+
+    def checked_keys(self) -> list:
+        return [key for key, checked in zip(self._keys, self._checked) if checked]
+
+    def checked_count(self) -> int:
+        return self._checked_count
+
+    def _emit_checks_changed(self):
+        if self._order:
+            self.dataChanged.emit(self.index(0), self.index(len(self._order) - 1), [Qt.CheckStateRole])
+        self.checkedCountChanged.emit(self._checked_count, len(self._keys))
+
+    def _sorted_positions(self):
+        if self._sort_column == KEY_COLUMN_ROWS and self._counts:
+            values = self._counts
+        elif self._sort_column == KEY_COLUMN_KEY:
+            values = self._keys
+        else:
+            return range(len(self._keys))
+        return sorted(
+            range(len(self._keys)), key=values.__getitem__,
+            reverse=self._sort_order == Qt.DescendingOrder,
+        )
+
+    def _match(self, pattern: str, mode: str, candidates):
+        if not pattern.strip():
+            return candidates
+        keys = self._keys
+        if mode == KEY_MATCH_REGEX:
+            search = re.compile(pattern, re.IGNORECASE).search
+            return [position for position in candidates if search(keys[position])]
+        if mode == KEY_MATCH_LIST:
+            wanted = set(parse_key_list(pattern))
+            return [position for position in candidates if keys[position] in wanted]
+        if self._folded is None:
+            self._folded = [key.casefold() for key in keys]
+        folded, needle = self._folded, pattern.casefold()
+        return [position for position in candidates if needle in folded[position]]
+
+
 class SplitApp(QWidget):
     def __init__(self, settings=None):
         super().__init__()
@@ -1121,21 +753,41 @@ class SplitApp(QWidget):
         self.mapping_status_labels = {}
         self.last_mapping_missing = []
         self.field_action_buttons = []
-        self.key_checkboxes = []
+        self.key_model = KeyListModel(self)
+        self.task_runner = TaskRunner(self)
+        self.task_runner.busyChanged.connect(self._on_task_busy_changed)
+        self.panel_busy_widgets = {}
         self.current_split_results = []
         self.current_mail_jobs = []
         self.current_mail_warnings = []
         self.current_preview_index = 0
         self.mail_worker = None
+        self._mail_merge_card_built = False
         self.pending_log_messages = []
+        self.log_model = LogListModel(parent=self)
+        self.session_log = SessionLog()
 
         self._build_ui()
+        # Scrolling through sheets only reads the headers of the one it stops on.
+        self.sheet_change_timer = QTimer(self)
+        self.sheet_change_timer.setSingleShot(True)
+        self.sheet_change_timer.setInterval(250)
+        self.sheet_change_timer.timeout.connect(lambda: self.load_headers(silent=True))
         self.log_flush_timer = QTimer(self)
         self.log_flush_timer.setSingleShot(True)
         self.log_flush_timer.setInterval(100)
         self.log_flush_timer.timeout.connect(self.flush_pending_logs)
         self.load_settings()
         self._connect_settings_signals()
+        self._mail_merge_card_pending = True
+
+    def __getattr__(self, name):
+        # The Mail Merge card is built on first use; its widgets only exist
+        # after _ensure_mail_merge_card() has run.
+        if self.__dict__.get("_mail_merge_card_pending"):
+            self._ensure_mail_merge_card()
+            return getattr(self, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
     def _apply_dashboard_styles(self):
         palette = DASHBOARD_DARK_PALETTE if isDarkTheme() else DASHBOARD_LIGHT_PALETTE
@@ -1196,6 +848,18 @@ class SplitApp(QWidget):
             header.addWidget(icon_widget)
         header.addWidget(SubtitleLabel(title))
         header.addStretch()
+        if title in TASK_PANELS:
+            ring = IndeterminateProgressRing(start=False)
+            ring.setFixedSize(18, 18)
+            ring.setStrokeWidth(3)
+            cancel = ToolButton(FIF.CLOSE)
+            cancel.setFixedSize(24, 24)
+            cancel.setToolTip("Cancel loading")
+            cancel.clicked.connect(lambda *_: self.cancel_panel_tasks(title))
+            for widget in (ring, cancel):
+                widget.hide()
+                header.addWidget(widget)
+            self.panel_busy_widgets[title] = (ring, cancel)
         layout.addLayout(header)
         return card, layout
 
@@ -1250,7 +914,6 @@ class SplitApp(QWidget):
         self._build_mapping_card()
         self._build_output_card()
         self._build_log_card()
-        self._build_mail_merge_card()
 
         self.main_panel_layout.addStretch()
 
@@ -1352,18 +1015,54 @@ class SplitApp(QWidget):
         controls.addStretch()
         layout.addLayout(controls)
 
-        self.keys_scroll = ScrollArea()
-        self.keys_scroll.setObjectName("keysScrollArea")
-        self.keys_scroll.setWidgetResizable(True)
-        self.keys_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.keys_scroll.setMinimumHeight(90)
-        self.keys_scroll.setMaximumHeight(180)
-        self.keys_list_widget = QWidget()
-        self.keys_list_layout = QVBoxLayout(self.keys_list_widget)
-        self.keys_list_layout.setContentsMargins(4, 4, 4, 4)
-        self.keys_list_layout.setSpacing(4)
-        self.keys_scroll.setWidget(self.keys_list_widget)
-        layout.addWidget(self.keys_scroll)
+        search_row = QHBoxLayout()
+        search_row.setSpacing(10)
+        self.edit_key_search = self._fixed_width(SearchLineEdit(), SECONDARY_PATH_FIELD_WIDTH)
+        self.edit_key_search.setPlaceholderText("Search keys")
+        self.edit_key_search.textChanged.connect(lambda *_: self.key_search_timer.start())
+        self.edit_key_search.searchSignal.connect(lambda *_: self.apply_key_filter())
+        self.edit_key_search.clearSignal.connect(self.apply_key_filter)
+        self.cmb_key_match = self._fixed_width(ComboBox(), 140)
+        self.cmb_key_match.addItems(list(KEY_MATCH_MODES))
+        self.cmb_key_match.currentTextChanged.connect(lambda *_: self.apply_key_filter())
+        self.btn_select_matching_keys = PushButton("Select Matching")
+        self.btn_select_matching_keys.setToolTip("Check exactly the keys matching the search and clear the rest.")
+        self.btn_select_matching_keys.clicked.connect(self.select_matching_keys)
+        self.lbl_key_matches = CaptionLabel("")
+        search_row.addWidget(self.edit_key_search)
+        search_row.addWidget(self.cmb_key_match)
+        search_row.addWidget(self.btn_select_matching_keys)
+        search_row.addWidget(self.lbl_key_matches)
+        search_row.addStretch()
+        layout.addLayout(search_row)
+
+        # Searching re-filters every key, so wait for a pause in typing.
+        self.key_search_timer = QTimer(self)
+        self.key_search_timer.setSingleShot(True)
+        self.key_search_timer.setInterval(150)
+        self.key_search_timer.timeout.connect(self.apply_key_filter)
+
+        # A table with fixed row heights only lays out the visible rows; a
+        # list view walks every key on each layout, which takes seconds at 1M.
+        self.keys_view = TableView()
+        self.keys_view.setObjectName("keysTableView")
+        self.keys_view.verticalHeader().hide()
+        self.keys_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.keys_view.verticalHeader().setDefaultSectionSize(30)
+        self.keys_view.horizontalHeader().setSectionResizeMode(KEY_COLUMN_KEY, QHeaderView.Stretch)
+        self.keys_view.horizontalHeader().setSectionResizeMode(KEY_COLUMN_ROWS, QHeaderView.Fixed)
+        self.keys_view.horizontalHeader().resizeSection(KEY_COLUMN_ROWS, 110)
+        self.keys_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.keys_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.keys_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.keys_view.setMinimumHeight(90)
+        self.keys_view.setMaximumHeight(220)
+        self.keys_view.setModel(self.key_model)
+        # Header clicks sort by key or row count; no indicator keeps source order.
+        self.keys_view.horizontalHeader().setSortIndicator(KEY_SORT_ORIGINAL, Qt.AscendingOrder)
+        self.keys_view.setSortingEnabled(True)
+        self.key_model.checkedCountChanged.connect(lambda *_: self.update_key_summary())
+        layout.addWidget(self.keys_view)
 
         self.main_panel_layout.addWidget(self.keys_card)
 
@@ -1448,7 +1147,9 @@ class SplitApp(QWidget):
         self.cmb_output_type.setCurrentIndex(0)
         self.cmb_output_type.currentTextChanged.connect(self.on_output_type_changed)
         self.cmb_pdf_engine = self._fixed_width(ComboBox(), 160)
-        self.cmb_pdf_engine.addItems(["xlwings", "libreoffice"])
+        self.cmb_pdf_engine.addItems(["xlwings", "libreoffice", PDF_ENGINE_NATIVE])
+        if sys.platform != "win32":
+            self.cmb_pdf_engine.addItem(PDF_ENGINE_LO_POOL)
         self.cmb_pdf_engine.setCurrentIndex(0)
         self.cmb_pdf_engine.currentTextChanged.connect(self.on_pdf_engine_changed)
         self.pdf_engine_field_widget = self._labeled("PDF Engine", self.cmb_pdf_engine)
@@ -1471,11 +1172,34 @@ class SplitApp(QWidget):
         self.edit_lo_path.setPlaceholderText("soffice.exe")
         self.btn_browse_soffice = self._field_action_button(ToolButton(FIF.FOLDER))
         self.btn_browse_soffice.clicked.connect(self.browse_soffice)
+        self.spin_lo_batch_size = self._fixed_width(SpinBox(), SMALL_FIELD_WIDTH)
+        self.spin_lo_batch_size.setRange(1, 500)
+        self.spin_lo_batch_size.setValue(DEFAULT_LO_BATCH_SIZE)
+        self.spin_lo_batch_size.setToolTip("Workbooks converted per soffice process")
         self.lbl_filename_preview = CaptionLabel()
+        self.chk_incremental = CheckBox("Only rebuild changed keys")
+        self.chk_incremental.setToolTip(
+            f"Skip keys whose rows, template and options are unchanged since the last run ({SPLIT_MANIFEST_NAME})"
+        )
 
         options.addWidget(self._labeled("Prefix", self.edit_prefix), 0, 0)
         options.addWidget(self._labeled("Suffix", self.edit_suffix), 0, 1)
         options.addWidget(self._labeled("Preview", self.lbl_filename_preview), 0, 2)
+        self.chk_resume = CheckBox("Resume interrupted run")
+        self.chk_resume.setToolTip(
+            f"Skip keys recorded in {SPLIT_JOURNAL_NAME} by a cancelled or crashed run whose files are intact"
+        )
+        self.chk_journal = CheckBox("Write checkpoint journal")
+        self.chk_journal.setToolTip(
+            f"Record every finished key in {SPLIT_JOURNAL_NAME} so a cancelled or crashed run can be resumed"
+        )
+        incremental_row = QHBoxLayout()
+        incremental_row.setSpacing(12)
+        incremental_row.addWidget(self.chk_incremental)
+        incremental_row.addWidget(self.chk_journal)
+        incremental_row.addWidget(self.chk_resume)
+        incremental_row.addStretch()
+        options.addLayout(incremental_row, 1, 0, 1, 3)
         options.setColumnStretch(3, 1)
         layout.addLayout(options)
 
@@ -1485,8 +1209,37 @@ class SplitApp(QWidget):
         lo_row.setSpacing(8)
         lo_row.addWidget(self._labeled("LibreOffice", self.edit_lo_path))
         lo_row.addWidget(self.btn_browse_soffice, 0, Qt.AlignBottom)
+        self.lo_batch_size_field_widget = self._labeled("Batch Size", self.spin_lo_batch_size)
+        lo_row.addWidget(self.lo_batch_size_field_widget)
         lo_row.addStretch()
         layout.addWidget(self.lo_path_row_widget)
+
+        self.chk_combined_pdf = CheckBox("Combined PDF")
+        self.chk_combined_pdf.setToolTip(f"Also write {COMBINED_PDF_NAME} with one bookmark per key")
+        self.chk_combined_pdf.stateChanged.connect(self.on_combined_pdf_changed)
+        self.chk_keep_key_pdfs = CheckBox("Keep per-key PDFs")
+        self.chk_keep_key_pdfs.setChecked(True)
+        self.pdf_bundle_row_widget = QWidget()
+        bundle_row = QHBoxLayout(self.pdf_bundle_row_widget)
+        bundle_row.setContentsMargins(0, 0, 0, 0)
+        bundle_row.setSpacing(12)
+        bundle_row.addWidget(self.chk_combined_pdf)
+        bundle_row.addWidget(self.chk_keep_key_pdfs)
+        bundle_row.addStretch()
+        layout.addWidget(self.pdf_bundle_row_widget)
+
+        self.stage_worker_spins = {}
+        workers_row = QHBoxLayout()
+        workers_row.setSpacing(8)
+        for stage, label in STAGE_WORKER_FIELDS:
+            spin = self._fixed_width(SpinBox(), SMALL_FIELD_WIDTH)
+            spin.setRange(0, MAX_STAGE_WORKERS)
+            spin.setSpecialValueText("Auto")
+            spin.setToolTip(f"Parallel {stage} workers; Auto uses the engine default")
+            self.stage_worker_spins[stage] = spin
+            workers_row.addWidget(self._labeled(label, spin))
+        workers_row.addStretch()
+        layout.addLayout(workers_row)
         self.on_output_type_changed()
 
         self.main_panel_layout.addWidget(card)
@@ -1495,16 +1248,55 @@ class SplitApp(QWidget):
         card, layout = self._panel("Log")
         self.chk_verbose_logging = CheckBox("Verbose logging")
         self.chk_verbose_logging.setChecked(False)
+        # Not saved with the settings: profiling slows every run down, so it
+        # is switched on for the run a user was asked to capture.
+        self.chk_capture_profile = CheckBox("Capture profile")
+        self.chk_capture_profile.setChecked(False)
+        self.chk_capture_profile.setToolTip(
+            "Profile the next split and write _split_profile.prof and _split_profile.txt into the output folder"
+        )
         log_options = QHBoxLayout()
         log_options.setSpacing(10)
+        self.cmb_log_level = self._fixed_width(ComboBox(), SMALL_FIELD_WIDTH)
+        self.cmb_log_level.addItems(list(LOG_LEVEL_FILTERS))
+        self.cmb_log_level.currentTextChanged.connect(
+            lambda text: self.log_model.set_min_level(LOG_LEVEL_FILTERS[text])
+        )
+        self.spin_log_max_lines = self._fixed_width(SpinBox(), 150)
+        self.spin_log_max_lines.setRange(500, 200000)
+        self.spin_log_max_lines.setSingleStep(500)
+        self.spin_log_max_lines.setValue(DEFAULT_LOG_MAX_LINES)
+        self.spin_log_max_lines.setToolTip("Lines kept in the panel; Save Log writes the whole session")
+        self.spin_log_max_lines.valueChanged.connect(self.log_model.set_max_lines)
+        self.btn_save_log = PushButton(FIF.SAVE, "Save Log")
+        self.btn_save_log.clicked.connect(self.save_full_log)
         log_options.addWidget(self.chk_verbose_logging)
+        log_options.addWidget(self.chk_capture_profile)
         log_options.addStretch()
+        log_options.addWidget(CaptionLabel("Show"))
+        log_options.addWidget(self.cmb_log_level)
+        log_options.addWidget(CaptionLabel("Keep lines"))
+        log_options.addWidget(self.spin_log_max_lines)
+        log_options.addWidget(self.btn_save_log)
         layout.addLayout(log_options)
-        self.txt_log = TextEdit()
-        self.txt_log.setReadOnly(True)
-        self.txt_log.setMinimumHeight(130)
-        self.txt_log.setMaximumHeight(180)
-        layout.addWidget(self.txt_log)
+
+        # Same fixed-row-height table as the keys list: only visible lines
+        # are laid out, however long the tail is.
+        self.log_view = TableView()
+        self.log_view.setObjectName("logTableView")
+        self.log_view.verticalHeader().hide()
+        self.log_view.horizontalHeader().hide()
+        self.log_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.log_view.verticalHeader().setDefaultSectionSize(24)
+        self.log_view.horizontalHeader().setStretchLastSection(True)
+        self.log_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.log_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.log_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.log_view.setWordWrap(False)
+        self.log_view.setMinimumHeight(130)
+        self.log_view.setMaximumHeight(180)
+        self.log_view.setModel(self.log_model)
+        layout.addWidget(self.log_view)
         self.main_panel_layout.addWidget(card)
 
     def _build_mail_merge_card(self):
@@ -1674,7 +1466,16 @@ class SplitApp(QWidget):
         layout.addLayout(mail_actions)
 
         self.mail_merge_card.setVisible(False)
-        self.main_panel_layout.addWidget(self.mail_merge_card)
+        self.main_panel_layout.insertWidget(self.main_panel_layout.count() - 1, self.mail_merge_card)
+
+    def _ensure_mail_merge_card(self):
+        if self._mail_merge_card_built:
+            return
+        self._mail_merge_card_pending = False
+        self._mail_merge_card_built = True
+        self._build_mail_merge_card()
+        self._load_mail_merge_settings()
+        self._connect_mail_merge_signals()
 
     def update_mail_merge_entry_state(self):
         self.btn_mail_merge.setVisible(True)
@@ -1866,11 +1667,21 @@ class SplitApp(QWidget):
         self.btn_cancel_split.setFixedHeight(36)
         self.btn_cancel_split.clicked.connect(self.cancel_split)
         self.btn_cancel_split.setVisible(False)
+        self.btn_reconvert_pdf = PushButton(FIF.SYNC, "Reconvert PDFs")
+        self.btn_reconvert_pdf.setFixedHeight(36)
+        self.btn_reconvert_pdf.setToolTip("Convert workbooks in the output folder whose PDF is missing or older")
+        self.btn_reconvert_pdf.clicked.connect(self.on_reconvert_clicked)
+        self.btn_watch = PushButton(FIF.VIEW, "Watch")
+        self.btn_watch.setFixedHeight(36)
+        self.btn_watch.setToolTip("Re-split changed keys whenever the source or template file changes")
+        self.btn_watch.clicked.connect(self.on_watch_clicked)
         self.progress_bar = ProgressBar()
         self.progress_bar.setFixedWidth(240)
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(False)
         self.lbl_key_count = CaptionLabel("")
+        self.lbl_throughput = CaptionLabel("")
+        self.lbl_throughput.setVisible(False)
         self.btn_open_output = PushButton(FIF.FOLDER, "Open Output Folder")
         self.btn_open_output.setFixedHeight(36)
         self.btn_open_output.clicked.connect(self.open_output_folder)
@@ -1885,23 +1696,49 @@ class SplitApp(QWidget):
 
         layout.addWidget(self.btn_generate)
         layout.addWidget(self.btn_cancel_split)
+        layout.addWidget(self.btn_reconvert_pdf)
+        layout.addWidget(self.btn_watch)
         layout.addWidget(self.progress_bar)
         layout.addWidget(self.lbl_key_count)
+        layout.addWidget(self.lbl_throughput)
         layout.addWidget(self.btn_open_output)
         layout.addWidget(self.btn_mail_merge)
         layout.addWidget(self.btn_debug)
         layout.addStretch()
-    def log(self, msg):
-        self.pending_log_messages.append(str(msg))
+    def log(self, msg, level=None):
+        msg = str(msg)
+        self.pending_log_messages.append((time.time(), level or log_message_level(msg), msg))
         if hasattr(self, "log_flush_timer") and not self.log_flush_timer.isActive():
             self.log_flush_timer.start()
 
     def flush_pending_logs(self):
         if not self.pending_log_messages:
             return
-        messages = self.pending_log_messages
+        entries = self.pending_log_messages
         self.pending_log_messages = []
-        self.txt_log.append("\n".join(messages))
+        try:
+            self.session_log.write(entries)
+        except OSError:
+            pass
+        scroll_bar = self.log_view.verticalScrollBar()
+        follow = scroll_bar.value() >= scroll_bar.maximum()
+        self.log_model.append([(level, text) for _, level, text in entries])
+        if follow:
+            self.log_view.scrollToBottom()
+
+    def save_full_log(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save log", "excel-splitter.log", "Log files (*.log *.txt)")
+        if path:
+            self.write_full_log(Path(path))
+
+    def write_full_log(self, path: Path):
+        self.flush_pending_logs()
+        try:
+            self.session_log.save_to(path)
+        except OSError as e:
+            InfoBar.error("Log", f"Gagal menyimpan log: {e}", parent=self, duration=5000, position=InfoBarPosition.TOP)
+            return
+        InfoBar.success("Log", f"Log disimpan: {path}", parent=self, duration=3000, position=InfoBarPosition.TOP)
 
     def set_progress(self, total, current):
         if self.is_running:
@@ -1910,14 +1747,27 @@ class SplitApp(QWidget):
             self.progress_bar.setValue(0)
         else:
             self.progress_bar.setValue(int(100 * current / total))
+        if current <= 0:
+            self.lbl_throughput.setText("")
+
+    def set_throughput(self, info):
+        if self.is_running:
+            self.lbl_throughput.setVisible(True)
+        self.lbl_throughput.setText(format_throughput(info))
 
     def set_busy(self, busy):
         self.is_running = busy
         self.btn_generate.setEnabled(not busy)
         self.btn_generate.setText("Generating..." if busy else "Generate")
         self.btn_reset_settings.setEnabled(not busy)
+        self.btn_reconvert_pdf.setEnabled(not busy)
+        self.btn_watch.setEnabled(not busy)
         self.btn_cancel_split.setVisible(busy)
         self.progress_bar.setVisible(busy)
+        if busy:
+            self.lbl_throughput.setText("")
+        # The last run's throughput stays in the footer once it finishes.
+        self.lbl_throughput.setVisible(bool(self.lbl_throughput.text()))
         if not busy:
             self.progress_bar.setValue(0)
         self.update_workflow_status()
@@ -1953,8 +1803,22 @@ class SplitApp(QWidget):
         ]:
             combo.currentTextChanged.connect(self.save_settings)
         self.cmb_key.currentTextChanged.connect(self.update_filename_preview)
-        self.cmb_sheet.currentTextChanged.connect(lambda *_: self.load_headers(silent=True))
+        self.cmb_sheet.currentTextChanged.connect(lambda *_: self.sheet_change_timer.start())
+
+        self.spin_lo_batch_size.valueChanged.connect(self.save_settings)
+        for spin in self.stage_worker_spins.values():
+            spin.valueChanged.connect(self.save_settings)
+        self.spin_log_max_lines.valueChanged.connect(self.save_settings)
+        self.chk_combined_pdf.stateChanged.connect(lambda *_: self.save_settings())
+        self.chk_keep_key_pdfs.stateChanged.connect(lambda *_: self.save_settings())
+        self.chk_incremental.stateChanged.connect(lambda *_: self.save_settings())
+        self.chk_journal.stateChanged.connect(lambda *_: self.save_settings())
+        self.spin_source_header_rows.valueChanged.connect(self.save_settings)
+        self.spin_source_header_rows.valueChanged.connect(lambda *_: self.refresh_template_mapping(auto=True))
+        self.spin_template_header_rows.valueChanged.connect(self.save_settings)
+        self.spin_template_header_rows.valueChanged.connect(lambda *_: self.refresh_template_mapping(auto=True))
 
+    def _connect_mail_merge_signals(self):
         for edit in [self.edit_recipient_path, self.edit_mail_subject, self.edit_mail_html_template, self.edit_split_folder, self.edit_detect_prefix, self.edit_detect_suffix]:
             edit.editingFinished.connect(self.save_settings)
         self.edit_mail_body.textChanged.connect(self.save_settings)
@@ -1977,11 +1841,6 @@ class SplitApp(QWidget):
         self.spin_delay_minutes.valueChanged.connect(self.save_settings)
         self.spin_throttle_seconds.valueChanged.connect(self.save_settings)
 
-        self.spin_source_header_rows.valueChanged.connect(self.save_settings)
-        self.spin_source_header_rows.valueChanged.connect(lambda *_: self.refresh_template_mapping(auto=True))
-        self.spin_template_header_rows.valueChanged.connect(self.save_settings)
-        self.spin_template_header_rows.valueChanged.connect(lambda *_: self.refresh_template_mapping(auto=True))
-
     def save_settings(self):
         if self._loading_settings:
             return
@@ -2001,10 +1860,24 @@ class SplitApp(QWidget):
         self.settings.setValue("output_file_type", self.current_output_file_type())
         self.settings.setValue("pdf_engine", self.cmb_pdf_engine.currentText().strip().lower())
         self.settings.setValue("libreoffice_path", self.edit_lo_path.text().strip())
+        self.settings.setValue("libreoffice_batch_size", self.spin_lo_batch_size.value())
+        for stage, spin in self.stage_worker_spins.items():
+            self.settings.setValue(f"{stage}_workers", spin.value())
+        self.settings.setValue("log_max_lines", self.spin_log_max_lines.value())
+        self.settings.setValue("combined_pdf", self.chk_combined_pdf.isChecked())
+        self.settings.setValue("keep_key_pdfs", self.chk_keep_key_pdfs.isChecked())
+        self.settings.setValue("incremental_split", self.chk_incremental.isChecked())
+        self.settings.setValue("checkpoint_journal", self.chk_journal.isChecked())
         self.settings.setValue("prefix", self.edit_prefix.text().strip())
         self.settings.setValue("suffix", self.edit_suffix.text().strip())
         self.settings.setValue("verbose_logging", self.chk_verbose_logging.isChecked())
         self.settings.setValue("column_mapping", json.dumps(mapping))
+        if self._mail_merge_card_built:
+            self._save_mail_merge_settings()
+        self.settings.sync()
+        self.update_workflow_status()
+
+    def _save_mail_merge_settings(self):
         self.settings.setValue("mail_recipient_path", self.edit_recipient_path.text().strip())
         self.settings.setValue("mail_recipient_sheet", self.cmb_recipient_sheet.currentText().strip())
         self.settings.setValue("mail_recipient_header_row", self.spin_recipient_header_row.value())
@@ -2024,8 +1897,6 @@ class SplitApp(QWidget):
         self.settings.setValue("mail_split_folder", self.edit_split_folder.text().strip())
         self.settings.setValue("mail_detect_prefix", self.edit_detect_prefix.text().strip())
         self.settings.setValue("mail_detect_suffix", self.edit_detect_suffix.text().strip())
-        self.settings.sync()
-        self.update_workflow_status()
 
     def _settings_bool(self, key, default):
         value = self.settings.value(key, default)
@@ -2047,23 +1918,21 @@ class SplitApp(QWidget):
             )
             self.edit_outdir.setText(self.settings.value("output_dir", ""))
             self.edit_lo_path.setText(self.settings.value("libreoffice_path", ""))
+            self.spin_lo_batch_size.setValue(
+                int(self.settings.value("libreoffice_batch_size", DEFAULT_LO_BATCH_SIZE))
+            )
+            for stage, spin in self.stage_worker_spins.items():
+                spin.setValue(int(self.settings.value(f"{stage}_workers", 0)))
+            self.chk_combined_pdf.setChecked(self._settings_bool("combined_pdf", False))
+            self.chk_keep_key_pdfs.setChecked(self._settings_bool("keep_key_pdfs", True))
+            self.chk_incremental.setChecked(self._settings_bool("incremental_split", False))
+            self.chk_journal.setChecked(self._settings_bool("checkpoint_journal", False))
             self.edit_prefix.setText(self.settings.value("prefix", ""))
             self.edit_suffix.setText(self.settings.value("suffix", ""))
             self.chk_verbose_logging.setChecked(self._settings_bool("verbose_logging", False))
-            self.edit_recipient_path.setText(self.settings.value("mail_recipient_path", ""))
-            self.spin_recipient_header_row.setValue(int(self.settings.value("mail_recipient_header_row", 1)))
-            self.edit_mail_subject.setText(self.settings.value("mail_subject", ""))
-            self.edit_mail_body.setPlainText(self.settings.value("mail_body", ""))
-            self.edit_mail_html_template.setText(self.settings.value("mail_html_template", ""))
-            self.chk_attach_excel.setChecked(self._settings_bool("mail_attach_excel", True))
-            self.chk_attach_pdf.setChecked(self._settings_bool("mail_attach_pdf", False))
-            self.chk_delay_delivery.setChecked(self._settings_bool("mail_delay_delivery", True))
-            self.spin_delay_minutes.setValue(int(self.settings.value("mail_delay_minutes", 5)))
-            self.chk_throttle.setChecked(self._settings_bool("mail_throttle", True))
-            self.spin_throttle_seconds.setValue(int(self.settings.value("mail_throttle_seconds", 5)))
-            self.edit_split_folder.setText(self.settings.value("mail_split_folder", ""))
-            self.edit_detect_prefix.setText(self.settings.value("mail_detect_prefix", ""))
-            self.edit_detect_suffix.setText(self.settings.value("mail_detect_suffix", ""))
+            self.spin_log_max_lines.setValue(
+                int(self.settings.value("log_max_lines", DEFAULT_LOG_MAX_LINES))
+            )
 
             sheet = self.settings.value("sheet_name", "")
             if sheet:
@@ -2077,24 +1946,6 @@ class SplitApp(QWidget):
                 self.cmb_key.addItem(key)
                 self.cmb_key.setCurrentIndex(0)
 
-            mail_sheet = self.settings.value("mail_recipient_sheet", "")
-            if mail_sheet:
-                self.cmb_recipient_sheet.clear()
-                self.cmb_recipient_sheet.addItem(mail_sheet)
-                self.cmb_recipient_sheet.setCurrentIndex(0)
-
-            for setting_key, combo in [
-                ("mail_recipient_key_col", self.cmb_recipient_key),
-                ("mail_recipient_to_col", self.cmb_recipient_to),
-                ("mail_recipient_cc_col", self.cmb_recipient_cc),
-                ("mail_recipient_bcc_col", self.cmb_recipient_bcc),
-            ]:
-                value = self.settings.value(setting_key, "")
-                if value:
-                    combo.clear()
-                    combo.addItem(value)
-                    combo.setCurrentIndex(0)
-
             mode = self.settings.value("template_mode", TEMPLATE_MODE_TEMPLATE_FILE)
             mode_label = TEMPLATE_MODE_LABELS.get(mode, TEMPLATE_MODE_LABELS[TEMPLATE_MODE_TEMPLATE_FILE])
             mode_idx = self.cmb_template_mode.findText(mode_label)
@@ -2135,6 +1986,66 @@ class SplitApp(QWidget):
         self.update_workflow_status()
         self.update_filename_preview()
 
+    def _load_mail_merge_settings(self):
+        loading = self._loading_settings
+        self._loading_settings = True
+        try:
+            self.edit_recipient_path.setText(self.settings.value("mail_recipient_path", ""))
+            self.spin_recipient_header_row.setValue(int(self.settings.value("mail_recipient_header_row", 1)))
+            self.edit_mail_subject.setText(self.settings.value("mail_subject", ""))
+            self.edit_mail_body.setPlainText(self.settings.value("mail_body", ""))
+            self.edit_mail_html_template.setText(self.settings.value("mail_html_template", ""))
+            self.chk_attach_excel.setChecked(self._settings_bool("mail_attach_excel", True))
+            self.chk_attach_pdf.setChecked(self._settings_bool("mail_attach_pdf", False))
+            self.chk_delay_delivery.setChecked(self._settings_bool("mail_delay_delivery", True))
+            self.spin_delay_minutes.setValue(int(self.settings.value("mail_delay_minutes", 5)))
+            self.chk_throttle.setChecked(self._settings_bool("mail_throttle", True))
+            self.spin_throttle_seconds.setValue(int(self.settings.value("mail_throttle_seconds", 5)))
+            self.edit_split_folder.setText(self.settings.value("mail_split_folder", ""))
+            self.edit_detect_prefix.setText(self.settings.value("mail_detect_prefix", ""))
+            self.edit_detect_suffix.setText(self.settings.value("mail_detect_suffix", ""))
+
+            mail_sheet = self.settings.value("mail_recipient_sheet", "")
+            if mail_sheet:
+                self.cmb_recipient_sheet.clear()
+                self.cmb_recipient_sheet.addItem(mail_sheet)
+                self.cmb_recipient_sheet.setCurrentIndex(0)
+
+            for setting_key, combo in [
+                ("mail_recipient_key_col", self.cmb_recipient_key),
+                ("mail_recipient_to_col", self.cmb_recipient_to),
+                ("mail_recipient_cc_col", self.cmb_recipient_cc),
+                ("mail_recipient_bcc_col", self.cmb_recipient_bcc),
+            ]:
+                value = self.settings.value(setting_key, "")
+                if value:
+                    combo.clear()
+                    combo.addItem(value)
+                    combo.setCurrentIndex(0)
+        finally:
+            self._loading_settings = loading
+
+    def _reset_mail_merge_fields(self):
+        self.edit_recipient_path.clear()
+        self.edit_mail_subject.clear()
+        self.edit_mail_body.clear()
+        self.edit_mail_html_template.clear()
+        self.edit_split_folder.clear()
+        self.edit_detect_prefix.clear()
+        self.edit_detect_suffix.clear()
+        self.chk_attach_excel.setChecked(True)
+        self.chk_attach_pdf.setChecked(False)
+        self.chk_delay_delivery.setChecked(True)
+        self.chk_throttle.setChecked(True)
+        self.cmb_recipient_sheet.clear()
+        self.cmb_recipient_key.clear()
+        self.cmb_recipient_to.clear()
+        self.cmb_recipient_cc.clear()
+        self.cmb_recipient_bcc.clear()
+        self.spin_recipient_header_row.setValue(1)
+        self.spin_delay_minutes.setValue(5)
+        self.spin_throttle_seconds.setValue(5)
+
     def reset_settings(self):
         self.settings.clear()
         self.settings.sync()
@@ -2146,33 +2057,25 @@ class SplitApp(QWidget):
             self.edit_lo_path.clear()
             self.edit_prefix.clear()
             self.edit_suffix.clear()
-            self.edit_recipient_path.clear()
-            self.edit_mail_subject.clear()
-            self.edit_mail_body.clear()
-            self.edit_mail_html_template.clear()
-            self.edit_split_folder.clear()
-            self.edit_detect_prefix.clear()
-            self.edit_detect_suffix.clear()
-            self.chk_attach_excel.setChecked(True)
-            self.chk_attach_pdf.setChecked(False)
-            self.chk_delay_delivery.setChecked(True)
-            self.chk_throttle.setChecked(True)
             self.chk_verbose_logging.setChecked(False)
+            self.chk_capture_profile.setChecked(False)
             self.cmb_sheet.clear()
             self.cmb_key.clear()
-            self.cmb_recipient_sheet.clear()
-            self.cmb_recipient_key.clear()
-            self.cmb_recipient_to.clear()
-            self.cmb_recipient_cc.clear()
-            self.cmb_recipient_bcc.clear()
             self.cmb_template_mode.setCurrentIndex(0)
             self.cmb_output_type.setCurrentIndex(0)
             self.cmb_pdf_engine.setCurrentIndex(0)
             self.spin_source_header_rows.setValue(5)
             self.spin_template_header_rows.setValue(5)
-            self.spin_recipient_header_row.setValue(1)
-            self.spin_delay_minutes.setValue(5)
-            self.spin_throttle_seconds.setValue(5)
+            self.spin_lo_batch_size.setValue(DEFAULT_LO_BATCH_SIZE)
+            for spin in self.stage_worker_spins.values():
+                spin.setValue(0)
+            self.spin_log_max_lines.setValue(DEFAULT_LOG_MAX_LINES)
+            self.chk_combined_pdf.setChecked(False)
+            self.chk_keep_key_pdfs.setChecked(True)
+            self.chk_incremental.setChecked(False)
+            self.chk_journal.setChecked(False)
+            if self._mail_merge_card_built:
+                self._reset_mail_merge_fields()
             self.source_headers = []
             self.template_headers = []
             self.saved_column_mapping = {}
@@ -2217,20 +2120,30 @@ class SplitApp(QWidget):
         use_pdf = output_requires_pdf(self.current_output_file_type())
         self.pdf_engine_field_widget.setVisible(use_pdf)
         self.cmb_pdf_engine.setVisible(use_pdf)
+        self.pdf_bundle_row_widget.setVisible(use_pdf)
+        self.on_combined_pdf_changed()
         self.on_pdf_engine_changed()
         self.update_filename_preview()
         self.update_workflow_status()
 
+    def on_combined_pdf_changed(self, *_):
+        if not hasattr(self, "chk_keep_key_pdfs"):
+            return
+        self.chk_keep_key_pdfs.setEnabled(self.chk_combined_pdf.isChecked())
+
     def on_pdf_engine_changed(self, *_):
         if not hasattr(self, "lo_path_row_widget"):
             return
+        engine = self.cmb_pdf_engine.currentText().strip().lower()
         use_libreoffice = (
             output_requires_pdf(self.current_output_file_type())
-            and self.cmb_pdf_engine.currentText().strip().lower() == "libreoffice"
+            and engine in {"libreoffice", PDF_ENGINE_LO_POOL}
         )
         self.lo_path_row_widget.setVisible(use_libreoffice)
         self.edit_lo_path.setVisible(use_libreoffice)
         self.btn_browse_soffice.setVisible(use_libreoffice)
+        self.lo_batch_size_field_widget.setVisible(use_libreoffice and engine == "libreoffice")
+        self.spin_lo_batch_size.setVisible(use_libreoffice and engine == "libreoffice")
         self.update_filename_preview()
 
     def update_filename_preview(self, *_):
@@ -2323,7 +2236,8 @@ class SplitApp(QWidget):
             if combo.currentText().strip()
         }
 
-    def refresh_template_mapping(self, auto=True, notify_missing=False):
+    def refresh_template_mapping(self, auto=True, notify_missing=False, reload_source=True, reload_template=True):
+        """Re-render the mapping rows, re-reading only the header lists asked for."""
         if self.current_template_mode() != TEMPLATE_MODE_TEMPLATE_FILE:
             self.mapping_card.setVisible(False)
             return
@@ -2334,19 +2248,20 @@ class SplitApp(QWidget):
         template = self.edit_template.text().strip()
 
         try:
-            if src and sheet:
+            if reload_source and src and sheet:
                 self.source_headers = read_excel_headers(
                     Path(src),
                     sheet,
                     self.spin_source_header_rows.value(),
                 )
-            if template and Path(template).exists():
-                self.template_headers, self.template_col_start = read_template_headers(
-                    Path(template),
-                    self.spin_template_header_rows.value(),
-                )
-            else:
-                self.template_headers = []
+            if reload_template:
+                if template and Path(template).exists():
+                    self.template_headers, self.template_col_start = read_template_headers(
+                        Path(template),
+                        self.spin_template_header_rows.value(),
+                    )
+                else:
+                    self.template_headers = []
 
             if auto:
                 mapping = auto_map_columns(self.template_headers, self.source_headers)
@@ -2367,7 +2282,7 @@ class SplitApp(QWidget):
                     position=InfoBarPosition.TOP,
                 )
         except Exception as e:
-            self.log(f"Mapping error: {e}")
+            self.log(f"Mapping error: {e}", logging.ERROR)
             self.template_headers = []
             self.render_mapping_rows({})
 
@@ -2393,14 +2308,6 @@ class SplitApp(QWidget):
         missing = [name for name, ready in states.items() if not ready and name != "Run"]
         self.lbl_workflow_status.setText("Ready" if not missing else "Missing: " + ", ".join(missing))
 
-    def _clear_key_rows(self):
-        while self.keys_list_layout.count():
-            item = self.keys_list_layout.takeAt(0)
-            widget = item.widget()
-            if widget is not None:
-                widget.deleteLater()
-        self.key_checkboxes = []
-
     def load_keys(self):
         src = self.edit_source.text().strip()
         sheet = self.cmb_sheet.currentText().strip()
@@ -2416,37 +2323,56 @@ class SplitApp(QWidget):
             key_col = int(key_raw)
         except ValueError:
             key_col = key_raw
-        try:
-            values = read_key_values(
-                Path(src), sheet, key_col, self.spin_source_header_rows.value()
-            )
-        except Exception as e:
-            InfoBar.error("Keys", str(e), parent=self, duration=5000, position=InfoBarPosition.TOP)
-            return
+        header_rows = self.spin_source_header_rows.value()
+        self.task_runner.submit(
+            TASK_KEYS,
+            lambda: read_key_counts(Path(src), sheet, key_col, header_rows),
+            self._apply_key_counts,
+            self._task_error_handler("Keys"),
+        )
 
-        self._clear_key_rows()
-        for value in values:
-            checkbox = CheckBox(value)
-            checkbox.setChecked(True)
-            checkbox.stateChanged.connect(lambda *_: self.update_key_summary())
-            self.keys_list_layout.addWidget(checkbox)
-            self.key_checkboxes.append(checkbox)
-        self.update_key_summary()
-        self.log(f"Loaded {len(values)} key value(s).")
+    def _apply_key_counts(self, counts):
+        self.key_model.set_keys(counts.keys(), counts=counts.values())
+        self.update_key_match_summary()
+        self.log(f"Loaded {len(counts)} key value(s).")
 
     def select_all_keys(self):
-        for checkbox in self.key_checkboxes:
-            checkbox.setChecked(True)
-        self.update_key_summary()
+        self.key_model.set_all_checked(True)
 
     def clear_all_keys(self):
-        for checkbox in self.key_checkboxes:
-            checkbox.setChecked(False)
-        self.update_key_summary()
+        self.key_model.set_all_checked(False)
+
+    def apply_key_filter(self) -> bool:
+        self.key_search_timer.stop()
+        try:
+            self.key_model.set_filter(self.edit_key_search.text(), self.cmb_key_match.currentText())
+        except re.error as e:
+            self.lbl_key_matches.setText(f"Invalid regex: {e}")
+            return False
+        self.update_key_match_summary()
+        return True
+
+    def update_key_match_summary(self):
+        text = self.edit_key_search.text()
+        if not self.key_model.key_count() or not text.strip():
+            self.lbl_key_matches.setText("")
+            return
+        summary = f"{self.key_model.rowCount()} matching"
+        if self.cmb_key_match.currentText() == KEY_MATCH_LIST:
+            missing = self.key_model.missing_keys(text)
+            if missing:
+                summary += f" · {len(missing)} not found: " + ", ".join(missing[:5])
+                if len(missing) > 5:
+                    summary += ", …"
+        self.lbl_key_matches.setText(summary)
+
+    def select_matching_keys(self):
+        if self.key_model.key_count() and self.apply_key_filter():
+            self.key_model.check_matching()
 
     def update_key_summary(self):
-        total = len(self.key_checkboxes)
-        checked = sum(1 for checkbox in self.key_checkboxes if checkbox.isChecked())
+        total = self.key_model.key_count()
+        checked = self.key_model.checked_count()
         if total:
             self.lbl_keys_summary.setText(f"{checked} / {total} keys selected")
         else:
@@ -2455,12 +2381,10 @@ class SplitApp(QWidget):
             self.lbl_key_count.setText(f"{checked} / {total} keys" if total else "")
 
     def collect_selected_keys(self):
-        if not self.key_checkboxes:
-            return None
-        checked = [cb.text() for cb in self.key_checkboxes if cb.isChecked()]
-        if len(checked) == len(self.key_checkboxes):
+        total = self.key_model.key_count()
+        if not total or self.key_model.checked_count() == total:
             return None
-        return set(checked)
+        return set(self.key_model.checked_keys())
 
     def browse_source(self):
         f, _ = QFileDialog.getOpenFileName(
@@ -2480,8 +2404,7 @@ class SplitApp(QWidget):
         if f:
             self.edit_template.setText(f)
             self.log(f"Template: {f}")
-            self.detect_template_header(silent=True)
-            self.refresh_template_mapping(auto=True, notify_missing=True)
+            self.detect_template_header(silent=True, notify_missing=True)
             self.update_workflow_status()
 
     def browse_outdir(self):
@@ -2515,6 +2438,8 @@ class SplitApp(QWidget):
             InfoBar.warning("Perhatian", "Pilih recipient mapping Excel dulu.", parent=self, duration=3000, position=InfoBarPosition.TOP)
             return
         try:
+            import pandas as pd
+
             with pd.ExcelFile(path) as xls:
                 sheets = list(xls.sheet_names)
             self.cmb_recipient_sheet.clear()
@@ -2565,59 +2490,85 @@ class SplitApp(QWidget):
             if not silent:
                 InfoBar.warning("Perhatian", "Pilih source Excel dulu.", parent=self, duration=3000, position=InfoBarPosition.TOP)
             return
-        try:
-            with pd.ExcelFile(src) as xls:
-                sheets = list(xls.sheet_names)
-            was_blocked = self.cmb_sheet.blockSignals(True)
-            self.cmb_sheet.clear()
-            self.cmb_sheet.addItems(sheets)
-            if sheets:
-                self.cmb_sheet.setCurrentIndex(0)
-            self.cmb_sheet.blockSignals(was_blocked)
-            if sheets:
-                self.detect_source_header(silent=True)
-                if load_headers:
-                    self.load_headers(silent=True)
-            self.log(f"Sheets loaded: {', '.join(sheets)}")
-            self.save_settings()
-            self.update_workflow_status()
-        except Exception as e:
-            if not silent:
-                InfoBar.error("Error", str(e), parent=self, duration=5000, position=InfoBarPosition.TOP)
+        # Everything read from the previous workbook is stale now.
+        self.sheet_change_timer.stop()
+        for channel in (TASK_HEADERS, TASK_SOURCE_HEADER_ROW, TASK_KEYS):
+            self.task_runner.cancel(channel)
+        self.task_runner.submit(
+            TASK_SHEETS,
+            lambda: read_sheet_names(Path(src)),
+            lambda sheets: self._apply_sheets(sheets, load_headers),
+            self._task_error_handler("Error", silent),
+        )
 
-    def detect_source_header(self, silent=False):
+    def _apply_sheets(self, sheets, load_headers):
+        was_blocked = self.cmb_sheet.blockSignals(True)
+        self.cmb_sheet.clear()
+        self.cmb_sheet.addItems(sheets)
+        if sheets:
+            self.cmb_sheet.setCurrentIndex(0)
+        self.cmb_sheet.blockSignals(was_blocked)
+        if sheets:
+            self.detect_source_header(silent=True, load_headers=load_headers)
+        self.log(f"Sheets loaded: {', '.join(sheets)}")
+        self.save_settings()
+        self.update_workflow_status()
+
+    def detect_source_header(self, silent=False, load_headers=True):
         src = self.edit_source.text().strip()
         sheet = self.cmb_sheet.currentText().strip()
         if not src or not sheet:
             if not silent:
                 InfoBar.warning("Perhatian", "Pastikan source & sheet sudah dipilih.", parent=self, duration=3000, position=InfoBarPosition.TOP)
-            return None
-        try:
-            row = detect_excel_header_row(Path(src), sheet)
-            self.spin_source_header_rows.setValue(row)
-            self.log(f"Source header row detected: {row}")
-            return row
-        except Exception as e:
-            if not silent:
-                InfoBar.error("Error", f"Gagal detect source header: {e}", parent=self, duration=5000, position=InfoBarPosition.TOP)
-            return None
+            return
+        self.task_runner.submit(
+            TASK_SOURCE_HEADER_ROW,
+            lambda: detect_excel_header_row(Path(src), sheet),
+            lambda row: self._apply_source_header_row(row, load_headers),
+            self._task_error_handler("Error", silent, "Gagal detect source header: "),
+        )
 
-    def detect_template_header(self, silent=False):
+    def _apply_source_header_row(self, row, load_headers):
+        was_blocked = self.spin_source_header_rows.blockSignals(True)
+        self.spin_source_header_rows.setValue(row)
+        self.spin_source_header_rows.blockSignals(was_blocked)
+        self.log(f"Source header row detected: {row}")
+        self.save_settings()
+        if load_headers:
+            self.load_headers(silent=True)
+        else:
+            self.refresh_template_mapping(auto=True)
+
+    def detect_template_header(self, silent=False, notify_missing=False):
         template = self.edit_template.text().strip()
         if not template:
             if not silent:
                 InfoBar.warning("Perhatian", "Pilih template Excel dulu.", parent=self, duration=3000, position=InfoBarPosition.TOP)
-            return None
-        try:
+            return
+
+        def detect():
             row = detect_excel_header_row(Path(template))
-            self.spin_template_header_rows.setValue(row)
-            self.log(f"Template header row detected: {row}")
-            self.refresh_template_mapping(auto=True)
-            return row
-        except Exception as e:
-            if not silent:
-                InfoBar.error("Error", f"Gagal detect template header: {e}", parent=self, duration=5000, position=InfoBarPosition.TOP)
-            return None
+            return row, *read_template_headers(Path(template), row)
+
+        def show_error(error):
+            self._task_error_handler("Error", silent, "Gagal detect template header: ")(error)
+            self.refresh_template_mapping(auto=True, notify_missing=notify_missing)
+
+        self.task_runner.submit(
+            TASK_TEMPLATE_HEADER_ROW,
+            detect,
+            lambda result: self._apply_template_header_row(*result, notify_missing=notify_missing),
+            show_error,
+        )
+
+    def _apply_template_header_row(self, row, headers, col_start, notify_missing=False):
+        was_blocked = self.spin_template_header_rows.blockSignals(True)
+        self.spin_template_header_rows.setValue(row)
+        self.spin_template_header_rows.blockSignals(was_blocked)
+        self.template_headers, self.template_col_start = headers, col_start
+        self.log(f"Template header row detected: {row}")
+        self.save_settings()
+        self.refresh_template_mapping(auto=True, notify_missing=notify_missing, reload_source=False, reload_template=False)
 
     def load_headers(self, *_, silent=False):
         src = self.edit_source.text().strip()
@@ -2626,29 +2577,54 @@ class SplitApp(QWidget):
             if not silent:
                 InfoBar.warning("Perhatian", "Pastikan source & sheet sudah dipilih.", parent=self, duration=3000, position=InfoBarPosition.TOP)
             return
-        try:
-            previous_key = self.cmb_key.currentText().strip()
-            header_row_idx = self.spin_source_header_rows.value() - 1
-            df = pd.read_excel(src, sheet_name=sheet, header=header_row_idx, nrows=0)
-            headers = list(df.columns.astype(str))
-            self.source_headers = headers
-            index_vals = [str(i+1) for i in range(len(headers))]
-            values = [""] + headers + index_vals
-            was_blocked = self.cmb_key.blockSignals(True)
-            self.cmb_key.clear()
-            self.cmb_key.addItems(values)
-            key_to_select = previous_key if previous_key in values else ""
-            key_idx = self.cmb_key.findText(key_to_select)
-            self.cmb_key.setCurrentIndex(key_idx if key_idx >= 0 else 0)
-            self.cmb_key.blockSignals(was_blocked)
-            self.log(f"Headers loaded: {headers}")
-            self.refresh_template_mapping(auto=True)
-            self.update_workflow_status()
-            self.update_filename_preview()
-            self.save_settings()
-        except Exception as e:
+        self.sheet_change_timer.stop()
+        header_rows = self.spin_source_header_rows.value()
+        self.task_runner.submit(
+            TASK_HEADERS,
+            lambda: read_excel_headers(Path(src), sheet, header_rows),
+            self._apply_headers,
+            self._task_error_handler("Error", silent),
+        )
+
+    def _apply_headers(self, headers):
+        previous_key = self.cmb_key.currentText().strip()
+        self.source_headers = headers
+        index_vals = [str(i+1) for i in range(len(headers))]
+        values = [""] + headers + index_vals
+        was_blocked = self.cmb_key.blockSignals(True)
+        self.cmb_key.clear()
+        self.cmb_key.addItems(values)
+        key_to_select = previous_key if previous_key in values else ""
+        key_idx = self.cmb_key.findText(key_to_select)
+        self.cmb_key.setCurrentIndex(key_idx if key_idx >= 0 else 0)
+        self.cmb_key.blockSignals(was_blocked)
+        self.log(f"Headers loaded: {headers}")
+        self.refresh_template_mapping(auto=True, reload_source=False)
+        self.update_workflow_status()
+        self.update_filename_preview()
+        self.save_settings()
+
+    def _task_error_handler(self, title, silent=False, prefix=""):
+        def show_error(error):
             if not silent:
-                InfoBar.error("Error", str(e), parent=self, duration=5000, position=InfoBarPosition.TOP)
+                InfoBar.error(title, f"{prefix}{error}", parent=self, duration=5000, position=InfoBarPosition.TOP)
+        return show_error
+
+    def _on_task_busy_changed(self, channel, busy):
+        for panel, channels in TASK_PANELS.items():
+            if channel in channels and panel in self.panel_busy_widgets:
+                panel_busy = any(self.task_runner.is_busy(name) for name in channels)
+                ring, cancel = self.panel_busy_widgets[panel]
+                if panel_busy:
+                    ring.start()
+                else:
+                    ring.stop()
+                ring.setVisible(panel_busy)
+                cancel.setVisible(panel_busy)
+
+    def cancel_panel_tasks(self, panel):
+        for channel in TASK_PANELS[panel]:
+            self.task_runner.cancel(channel)
 
     def debug_excel(self):
         try:
@@ -2664,7 +2640,7 @@ class SplitApp(QWidget):
             else:
                 InfoBar.warning("Debug Excel", "Excel tidak dapat diakses. Lihat log.", parent=self, duration=5000, position=InfoBarPosition.TOP)
         except Exception as e:
-            self.log(f"Error saat debug: {str(e)}")
+            self.log(f"Error saat debug: {str(e)}", logging.ERROR)
             InfoBar.error("Debug Error", f"Gagal debug: {str(e)}", parent=self, duration=5000, position=InfoBarPosition.TOP)
 
     def open_output_folder(self):
@@ -2677,82 +2653,229 @@ class SplitApp(QWidget):
                 InfoBar.error("Error", f"Failed to open folder: {str(e)}", parent=self, duration=5000, position=InfoBarPosition.TOP)
         else:
             InfoBar.warning("Warning", "Output folder not set or doesn't exist", parent=self, duration=3000, position=InfoBarPosition.TOP)
+    def _collect_split_params(self):
+        """Validate the split form and return worker params, or None after showing why not."""
+        source_path = Path(self.edit_source.text().strip())
+        template_path = Path(self.edit_template.text().strip())
+        out_dir = Path(self.edit_outdir.text().strip())
+        sheet_name = self.cmb_sheet.currentText().strip()
+        key_raw = self.cmb_key.currentText().strip()
+        source_header_rows = self.spin_source_header_rows.value()
+        template_header_rows = self.spin_template_header_rows.value()
+        output_file_type = self.current_output_file_type()
+        pdf_engine = (
+            self.cmb_pdf_engine.currentText().strip().lower()
+            if output_requires_pdf(output_file_type)
+            else "none"
+        )
+        template_mode = self.current_template_mode()
+
+        if not source_path.exists():
+            InfoBar.error("Error", "Source Excel tidak ditemukan.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+            return None
+        if template_mode == TEMPLATE_MODE_TEMPLATE_FILE and not template_path.exists():
+            InfoBar.error("Error", "Template Excel tidak ditemukan.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+            return None
+        if not self.edit_outdir.text().strip():
+            InfoBar.error("Error", "Output folder belum dipilih.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+            return None
+        if not sheet_name:
+            InfoBar.error("Error", "Sheet belum dipilih.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+            return None
+        if not key_raw:
+            InfoBar.error("Error", "Key Column belum dipilih/diisi.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+            return None
+
+        try:
+            key_col = int(key_raw)
+        except ValueError:
+            key_col = key_raw
+
+        column_mapping = None
+        if template_mode == TEMPLATE_MODE_TEMPLATE_FILE:
+            self.refresh_template_mapping(auto=False)
+            if not self.template_headers:
+                InfoBar.error(
+                    "Mapping",
+                    "Header template tidak ditemukan. Periksa Header Rows atau file template.",
+                    parent=self,
+                    duration=8000,
+                    position=InfoBarPosition.TOP,
+                )
+                return None
+            column_mapping = self.collect_column_mapping()
+            missing = validate_column_mapping(self.template_headers, column_mapping)
+            if missing:
+                InfoBar.error(
+                    "Mapping",
+                    "Lengkapi mapping kolom: " + ", ".join(missing),
+                    parent=self,
+                    duration=8000,
+                    position=InfoBarPosition.TOP,
+                )
+                return None
+
+        if output_requires_pdf(output_file_type) and pdf_engine == "xlwings":
+            if not xlwings_available():
+                InfoBar.warning("xlwings", "xlwings belum terpasang. Gunakan LibreOffice atau output Excel.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+                return None
+            elif not check_excel_availability():
+                InfoBar.warning("Excel", "Microsoft Excel tidak dapat diakses via COM.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+                return None
+
+        soffice_path = None
+        if output_requires_pdf(output_file_type) and pdf_engine in {"libreoffice", PDF_ENGINE_LO_POOL}:
+            lo_explicit = self.edit_lo_path.text().strip()
+            soffice_path = find_soffice(lo_explicit)
+            if not soffice_path:
+                InfoBar.error("Error", "LibreOffice (soffice.exe) tidak ditemukan.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+                return None
+
+        return {
+            'source_path': source_path,
+            'sheet_name': sheet_name,
+            'key_col': key_col,
+            'template_path': template_path,
+            'out_dir': out_dir,
+            'header_rows': source_header_rows,
+            'source_header_rows': source_header_rows,
+            'template_header_rows': template_header_rows,
+            'output_file_type': output_file_type,
+            'pdf_engine': pdf_engine,
+            'soffice_path': soffice_path,
+            'pdf_batch_size': self.spin_lo_batch_size.value() if pdf_engine == "libreoffice" else 1,
+            'stage_workers': self.collect_stage_workers(),
+            'combined_pdf_path': (
+                out_dir / COMBINED_PDF_NAME
+                if output_requires_pdf(output_file_type) and self.chk_combined_pdf.isChecked()
+                else None
+            ),
+            'keep_key_pdfs': self.chk_keep_key_pdfs.isChecked(),
+            'incremental': self.chk_incremental.isChecked(),
+            'resume': self.chk_resume.isChecked(),
+            'write_journal': self.chk_journal.isChecked(),
+            'prefix': self.edit_prefix.text().strip(),
+            'suffix': self.edit_suffix.text().strip(),
+            'template_mode': template_mode,
+            'column_mapping': column_mapping,
+            'selected_keys': self.collect_selected_keys(),
+            'verbose': self.chk_verbose_logging.isChecked(),
+            'capture_profile': self.chk_capture_profile.isChecked(),
+        }
+
+    def collect_stage_workers(self):
+        """Worker counts the user set; stages left on Auto keep the engine default."""
+        workers = {stage: spin.value() for stage, spin in self.stage_worker_spins.items() if spin.value() > 0}
+        return workers or None
+
+    def _start_split_worker(self, worker):
+        self.worker = worker
+        self.worker.status.connect(self.log)
+        self.worker.warned.connect(lambda message: self.log(message, logging.WARNING))
+        self.worker.progress.connect(self.set_progress)
+        self.worker.throughput.connect(self.set_throughput)
+        self.worker.finished.connect(self._on_worker_finished)
+        self.worker.error.connect(self._on_worker_error)
+        self.worker.start()
+
     def on_run_clicked(self):
         if self.is_running:
             return
         try:
-            source_path = Path(self.edit_source.text().strip())
-            template_path = Path(self.edit_template.text().strip())
-            out_dir = Path(self.edit_outdir.text().strip())
-            sheet_name = self.cmb_sheet.currentText().strip()
-            key_raw = self.cmb_key.currentText().strip()
-            source_header_rows = self.spin_source_header_rows.value()
-            template_header_rows = self.spin_template_header_rows.value()
-            output_file_type = self.current_output_file_type()
-            pdf_engine = (
-                self.cmb_pdf_engine.currentText().strip().lower()
-                if output_requires_pdf(output_file_type)
-                else "none"
-            )
-            template_mode = self.current_template_mode()
-
-            if not source_path.exists():
-                InfoBar.error("Error", "Source Excel tidak ditemukan.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+            params = self._collect_split_params()
+            if params is None:
                 return
-            if template_mode == TEMPLATE_MODE_TEMPLATE_FILE and not template_path.exists():
-                InfoBar.error("Error", "Template Excel tidak ditemukan.", parent=self, duration=5000, position=InfoBarPosition.TOP)
-                return
-            if not self.edit_outdir.text().strip():
-                InfoBar.error("Error", "Output folder belum dipilih.", parent=self, duration=5000, position=InfoBarPosition.TOP)
-                return
-            if not sheet_name:
-                InfoBar.error("Error", "Sheet belum dipilih.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+            journal_path = params['out_dir'] / SPLIT_JOURNAL_NAME
+            if params['write_journal'] and not params['resume'] and journal_path.exists():
+                choice = self._ask_unfinished_journal(journal_path)
+                if choice is None:
+                    return
+                if choice == "resume":
+                    params['resume'] = True
+                else:
+                    journal_path.unlink()
+                    self.log(f"Journal run sebelumnya dihapus: {journal_path}")
+
+            self.set_busy(True)
+            self.btn_cancel_split.setEnabled(True)
+            self.save_settings()
+            self.log("Mulai generate...")
+
+            if params['pdf_engine'] == "xlwings":
+                self.log("Membersihkan Excel COM sessions...")
+                cleanup_excel_com()
+
+            selected_keys = params['selected_keys']
+            if selected_keys is not None:
+                self.log(f"Generating only {len(selected_keys)} selected key(s).")
+
+            self._start_split_worker(SplitWorker(params))
+
+        except Exception as e:
+            InfoBar.error("Error", str(e), parent=self, duration=5000, position=InfoBarPosition.TOP)
+            self.set_busy(False)
+
+    def _ask_unfinished_journal(self, journal_path: Path):
+        """Return "resume", "restart" or None when the user closes the dialog."""
+        box = MessageBox(
+            "Unfinished run",
+            f"{journal_path.name} records a run that did not finish. "
+            "Resume it, or start over and discard the journal?",
+            self,
+        )
+        box.yesButton.setText("Resume")
+        box.cancelButton.setText("Start over")
+        restart = []
+        box.cancelSignal.connect(lambda: restart.append(True))
+        if box.exec():
+            return "resume"
+        # Closing the dialog (Esc) keeps the journal and does not start a run.
+        return "restart" if restart else None
+
+    def on_watch_clicked(self):
+        if self.is_running:
+            return
+        try:
+            params = self._collect_split_params()
+            if params is None:
                 return
-            if not key_raw:
-                InfoBar.error("Error", "Key Column belum dipilih/diisi.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+            if params['combined_pdf_path'] is not None and not params['keep_key_pdfs']:
+                InfoBar.error("Watch", "Watch membutuhkan PDF per key bila PDF gabungan aktif.", parent=self, duration=5000, position=InfoBarPosition.TOP)
                 return
+            params['incremental'] = True
+            params['resume'] = False
+            params['write_journal'] = False
 
-            try:
-                key_col = int(key_raw)
-            except ValueError:
-                key_col = key_raw
-
-            column_mapping = None
-            if template_mode == TEMPLATE_MODE_TEMPLATE_FILE:
-                self.refresh_template_mapping(auto=False)
-                if not self.template_headers:
-                    InfoBar.error(
-                        "Mapping",
-                        "Header template tidak ditemukan. Periksa Header Rows atau file template.",
-                        parent=self,
-                        duration=8000,
-                        position=InfoBarPosition.TOP,
-                    )
-                    return
-                column_mapping = self.collect_column_mapping()
-                missing = validate_column_mapping(self.template_headers, column_mapping)
-                if missing:
-                    InfoBar.error(
-                        "Mapping",
-                        "Lengkapi mapping kolom: " + ", ".join(missing),
-                        parent=self,
-                        duration=8000,
-                        position=InfoBarPosition.TOP,
-                    )
-                    return
+            self.set_busy(True)
+            self.btn_cancel_split.setEnabled(True)
+            self.save_settings()
+            self.log("Mulai watch. Tekan Cancel untuk berhenti.")
+            self._start_split_worker(WatchSplitWorker(params))
 
-            if output_requires_pdf(output_file_type) and pdf_engine == "xlwings":
-                if not XLWINGS_AVAILABLE:
-                    InfoBar.warning("xlwings", "xlwings belum terpasang. Gunakan LibreOffice atau output Excel.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+        except Exception as e:
+            InfoBar.error("Error", str(e), parent=self, duration=5000, position=InfoBarPosition.TOP)
+            self.set_busy(False)
+
+    def on_reconvert_clicked(self):
+        if self.is_running:
+            return
+        try:
+            out_dir = Path(self.edit_outdir.text().strip())
+            pdf_engine = self.cmb_pdf_engine.currentText().strip().lower()
+            if not self.edit_outdir.text().strip() or not out_dir.is_dir():
+                InfoBar.error("Error", "Output folder tidak ditemukan.", parent=self, duration=5000, position=InfoBarPosition.TOP)
+                return
+            if pdf_engine == "xlwings":
+                if not xlwings_available():
+                    InfoBar.warning("xlwings", "xlwings belum terpasang. Gunakan LibreOffice.", parent=self, duration=5000, position=InfoBarPosition.TOP)
                     return
                 elif not check_excel_availability():
                     InfoBar.warning("Excel", "Microsoft Excel tidak dapat diakses via COM.", parent=self, duration=5000, position=InfoBarPosition.TOP)
                     return
 
             soffice_path = None
-            if output_requires_pdf(output_file_type) and pdf_engine == "libreoffice":
-                lo_explicit = self.edit_lo_path.text().strip()
-                soffice_path = find_soffice(lo_explicit)
+            if pdf_engine in {"libreoffice", PDF_ENGINE_LO_POOL}:
+                soffice_path = find_soffice(self.edit_lo_path.text().strip())
                 if not soffice_path:
                     InfoBar.error("Error", "LibreOffice (soffice.exe) tidak ditemukan.", parent=self, duration=5000, position=InfoBarPosition.TOP)
                     return
@@ -2760,49 +2883,35 @@ class SplitApp(QWidget):
             self.set_busy(True)
             self.btn_cancel_split.setEnabled(True)
             self.save_settings()
-            self.log("Mulai generate...")
+            self.log(f"Mulai konversi ulang PDF di {out_dir}...")
 
             if pdf_engine == "xlwings":
                 self.log("Membersihkan Excel COM sessions...")
                 cleanup_excel_com()
 
             params = {
-                'source_path': source_path,
-                'sheet_name': sheet_name,
-                'key_col': key_col,
-                'template_path': template_path,
                 'out_dir': out_dir,
-                'header_rows': source_header_rows,
-                'source_header_rows': source_header_rows,
-                'template_header_rows': template_header_rows,
-                'output_file_type': output_file_type,
                 'pdf_engine': pdf_engine,
                 'soffice_path': soffice_path,
+                'pdf_batch_size': self.spin_lo_batch_size.value() if pdf_engine == "libreoffice" else 1,
+                'stage_workers': self.collect_stage_workers(),
                 'prefix': self.edit_prefix.text().strip(),
                 'suffix': self.edit_suffix.text().strip(),
-                'template_mode': template_mode,
-                'column_mapping': column_mapping,
-                'selected_keys': self.collect_selected_keys(),
-                'verbose': self.chk_verbose_logging.isChecked(),
             }
 
-            selected_keys = params['selected_keys']
-            if selected_keys is not None:
-                self.log(f"Generating only {len(selected_keys)} selected key(s).")
-
-            self.worker = SplitWorker(params)
-            self.worker.status.connect(self.log)
-            self.worker.progress.connect(self.set_progress)
-            self.worker.finished.connect(self._on_worker_finished)
-            self.worker.error.connect(self._on_worker_error)
-            self.worker.start()
+            self._start_split_worker(ReconvertPdfWorker(params))
 
         except Exception as e:
             InfoBar.error("Error", str(e), parent=self, duration=5000, position=InfoBarPosition.TOP)
             self.set_busy(False)
 
     def _on_worker_finished(self):
-        cancelled = bool(self.worker is not None and getattr(self.worker, "_cancel_requested", False))
+        # Cancel is how a watch is stopped, not an interrupted run.
+        cancelled = bool(
+            self.worker is not None
+            and getattr(self.worker, "_cancel_requested", False)
+            and not isinstance(self.worker, WatchSplitWorker)
+        )
         self.set_busy(False)
         self.current_split_results = list(getattr(self.worker, "results", []))
         self.load_current_output_for_mail_merge()
@@ -2821,13 +2930,20 @@ class SplitApp(QWidget):
                 f"Proses dihentikan. {len(self.current_split_results)} file dibuat.",
                 parent=self, duration=5000, position=InfoBarPosition.TOP,
             )
+        elif getattr(self.worker, "warnings", None):
+            self.log("Selesai.")
+            InfoBar.warning(
+                "Selesai",
+                f"Proses selesai dengan {len(self.worker.warnings)} peringatan; lihat log.",
+                parent=self, duration=5000, position=InfoBarPosition.TOP,
+            )
         else:
             self.log("Selesai.")
             InfoBar.success("Selesai", "Proses selesai.", parent=self, duration=5000, position=InfoBarPosition.TOP)
 
     def _on_worker_error(self, error_msg):
         self.set_busy(False)
-        self.log(f"Error: {error_msg}")
+        self.log(f"Error: {error_msg}", logging.ERROR)
         self.flush_pending_logs()
         InfoBar.error("Error", error_msg, parent=self, duration=8000, position=InfoBarPosition.TOP)
 
@@ -0,0 +1,515 @@
+import re
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import NamedTuple
+
+
+class PdfBundleError(ValueError):
+    pass
+
+
+class PdfRef(NamedTuple):
+    num: int
+    gen: int = 0
+
+
+class PdfName(str):
+    pass
+
+
+class PdfRaw(bytes):
+    """A token copied verbatim: strings, reals, booleans and null."""
+
+
+@dataclass
+class PdfStream:
+    attrs: dict
+    data: bytes
+
+
+_WHITESPACE = b"\x00\t\n\x0c\r "
+_REF_PATTERN = re.compile(rb"(\d+)\s+(\d+)\s+R(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])")
+_OBJ_HEADER = re.compile(rb"(\d+)\s+(\d+)\s+obj\b")
+_TOKEN_END = re.compile(rb"[\x00\t\n\x0c\r ()<>\[\]{}/%]")
+_XREF_ENTRY = re.compile(rb"\s*(\d+)\s+(\d+)\s+([nf])")
+
+
+def _skip_whitespace(data: bytes, pos: int) -> int:
+    length = len(data)
+    while pos < length:
+        char = data[pos]
+        if char in _WHITESPACE:
+            pos += 1
+        elif char == 0x25:  # % comment
+            end = data.find(b"\n", pos)
+            pos = length if end == -1 else end + 1
+        else:
+            break
+    return pos
+
+
+def _token_end(data: bytes, pos: int) -> int:
+    match = _TOKEN_END.search(data, pos)
+    return match.start() if match else len(data)
+
+
+def _parse_literal_string(data: bytes, pos: int) -> int:
+    depth = 0
+    while pos < len(data):
+        char = data[pos]
+        if char == 0x5C:  # backslash escape
+            pos += 2
+            continue
+        if char == 0x28:
+            depth += 1
+        elif char == 0x29:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    raise PdfBundleError("Unterminated string in PDF.")
+
+
+def parse_object(data: bytes, pos: int):
+    """Parse one PDF object starting at ``pos``; returns ``(obj, end)``."""
+    pos = _skip_whitespace(data, pos)
+    if pos >= len(data):
+        raise PdfBundleError("Unexpected end of PDF data.")
+    char = data[pos]
+    if data.startswith(b"<<", pos):
+        pos += 2
+        result = {}
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if data.startswith(b">>", pos):
+                return result, pos + 2
+            key, pos = parse_object(data, pos)
+            if not isinstance(key, PdfName):
+                raise PdfBundleError("Dictionary key is not a name.")
+            value, pos = parse_object(data, pos)
+            result[str(key)] = value
+    if char == 0x5B:  # [
+        pos += 1
+        items = []
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if data.startswith(b"]", pos):
+                return items, pos + 1
+            item, pos = parse_object(data, pos)
+            items.append(item)
+    if char == 0x2F:  # /
+        end = _token_end(data, pos + 1)
+        return PdfName(data[pos + 1:end].decode("latin-1")), end
+    if char == 0x28:  # (
+        end = _parse_literal_string(data, pos)
+        return PdfRaw(data[pos:end]), end
+    if char == 0x3C:  # <hex>
+        end = data.find(b">", pos)
+        if end == -1:
+            raise PdfBundleError("Unterminated hex string in PDF.")
+        return PdfRaw(data[pos:end + 1]), end + 1
+    if char in b"0123456789":
+        ref = _REF_PATTERN.match(data, pos)
+        if ref:
+            return PdfRef(int(ref.group(1)), int(ref.group(2))), ref.end()
+    end = _token_end(data, pos)
+    if end == pos:
+        raise PdfBundleError(f"Unexpected character in PDF at offset {pos}.")
+    token = data[pos:end]
+    if re.fullmatch(rb"[+-]?\d+", token):
+        return int(token), end
+    return PdfRaw(token), end
+
+
+def serialize_object(obj, renumber=None) -> bytes:
+    if isinstance(obj, PdfRef):
+        num, gen = renumber(obj) if renumber else obj
+        return b"%d %d R" % (num, gen)
+    if isinstance(obj, PdfName):
+        return b"/" + obj.encode("latin-1")
+    if isinstance(obj, PdfRaw):
+        return bytes(obj)
+    if isinstance(obj, bool):
+        return b"true" if obj else b"false"
+    if isinstance(obj, int):
+        return b"%d" % obj
+    if obj is None:
+        return b"null"
+    if isinstance(obj, dict):
+        return b"<<" + b"".join(
+            b"/" + key.encode("latin-1") + b" " + serialize_object(value, renumber) + b"\n"
+            for key, value in obj.items()
+        ) + b">>"
+    if isinstance(obj, list):
+        return b"[" + b" ".join(serialize_object(item, renumber) for item in obj) + b"]"
+    raise TypeError(f"Cannot serialize {type(obj).__name__} as a PDF object.")
+
+
+def encode_text_string(text: str) -> PdfRaw:
+    try:
+        raw = text.encode("latin-1")
+    except UnicodeEncodeError:
+        return PdfRaw(b"<" + ("\ufeff" + text).encode("utf-16-be").hex().encode() + b">")
+    return PdfRaw(b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")")
+
+
+def _png_unpredict(data: bytes, columns: int) -> bytes:
+    rows = []
+    previous = bytearray(columns)
+    for start in range(0, len(data), columns + 1):
+        kind, row = data[start], bytearray(data[start + 1:start + 1 + columns])
+        for i in range(len(row)):
+            left = row[i - 1] if i else 0
+            up = previous[i]
+            upper_left = previous[i - 1] if i else 0
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + (left + up) // 2) & 0xFF
+            elif kind == 4:
+                p = left + up - upper_left
+                pa, pb, pc = abs(p - left), abs(p - up), abs(p - upper_left)
+                row[i] = (row[i] + (left if pa <= pb and pa <= pc else up if pb <= pc else upper_left)) & 0xFF
+        rows.append(bytes(row))
+        previous = row
+    return b"".join(rows)
+
+
+class PdfSource:
+    """Random-access reader for one (unencrypted) PDF file."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offsets = {}
+        self.compressed = {}
+        self._objstm_cache = {}
+        try:
+            self.trailer = self._read_xref()
+        except (PdfBundleError, ValueError, IndexError, zlib.error):
+            self.trailer = self._scan_objects()
+        if "Encrypt" in self.trailer:
+            raise PdfBundleError("Encrypted PDFs cannot be bundled.")
+
+    @classmethod
+    def open(cls, path: Path) -> "PdfSource":
+        return cls(Path(path).read_bytes())
+
+    def _read_xref(self) -> dict:
+        start = self.data.rfind(b"startxref")
+        if start == -1:
+            raise PdfBundleError("startxref not found.")
+        offset, _ = parse_object(self.data, start + len(b"startxref"))
+        trailer = None
+        seen = set()
+        while isinstance(offset, int) and offset not in seen:
+            seen.add(offset)
+            pos = _skip_whitespace(self.data, offset)
+            if self.data.startswith(b"xref", pos):
+                section = self._read_xref_table(pos + 4)
+            else:
+                section = self._read_xref_stream(pos)
+            if trailer is None:
+                trailer = section
+            if isinstance(section.get("XRefStm"), int):
+                self._read_xref_stream(section["XRefStm"])
+            offset = section.get("Prev")
+        if not trailer or "Root" not in trailer:
+            raise PdfBundleError("PDF trailer has no Root.")
+        return trailer
+
+    def _read_xref_table(self, pos: int) -> dict:
+        while True:
+            pos = _skip_whitespace(self.data, pos)
+            if self.data.startswith(b"trailer", pos):
+                trailer, _ = parse_object(self.data, pos + len(b"trailer"))
+                return trailer
+            first, pos = parse_object(self.data, pos)
+            count, pos = parse_object(self.data, pos)
+            for index in range(count):
+                entry = _XREF_ENTRY.match(self.data, pos)
+                if not entry:
+                    raise PdfBundleError("Malformed xref entry.")
+                num = first + index
+                if entry.group(3) == b"n" and num not in self.offsets and num not in self.compressed:
+                    self.offsets[num] = int(entry.group(1))
+                pos = entry.end()
+
+    def _read_xref_stream(self, pos: int) -> dict:
+        _, stream = self._parse_indirect(pos)
+        if not isinstance(stream, PdfStream):
+            raise PdfBundleError("xref offset does not point to an xref stream.")
+        attrs = stream.attrs
+        data = self.decode_stream(stream)
+        widths = attrs["W"]
+        row_size = sum(widths)
+        index = attrs.get("Index", [0, attrs["Size"]])
+        row = 0
+        for first, count in zip(index[0::2], index[1::2]):
+            for num in range(first, first + count):
+                fields = []
+                cursor = row * row_size
+                for width in widths:
+                    fields.append(int.from_bytes(data[cursor:cursor + width], "big") if width else None)
+                    cursor += width
+                row += 1
+                kind = 1 if fields[0] is None else fields[0]
+                if num in self.offsets or num in self.compressed:
+                    continue
+                if kind == 1:
+                    self.offsets[num] = fields[1]
+                elif kind == 2:
+                    self.compressed[num] = (fields[1], fields[2] or 0)
+        return attrs
+
+    def _scan_objects(self) -> dict:
+        # Damaged or missing xref: find every "N G obj" header instead.
+        self.offsets.clear()
+        self.compressed.clear()
+        for match in _OBJ_HEADER.finditer(self.data):
+            self.offsets[int(match.group(1))] = match.start()
+        trailer = {}
+        for match in re.finditer(rb"trailer", self.data):
+            try:
+                candidate, _ = parse_object(self.data, match.end())
+            except PdfBundleError:
+                continue
+            if isinstance(candidate, dict):
+                trailer.update(candidate)
+        if "Root" not in trailer:
+            for num in self.offsets:
+                try:
+                    obj = self.get(num)
+                except PdfBundleError:
+                    continue
+                if isinstance(obj, dict) and obj.get("Type") == "Catalog":
+                    trailer["Root"] = PdfRef(num)
+                    break
+        if "Root" not in trailer:
+            raise PdfBundleError("PDF has no readable document catalog.")
+        return trailer
+
+    def _parse_indirect(self, pos: int):
+        header = _OBJ_HEADER.match(self.data, _skip_whitespace(self.data, pos))
+        if not header:
+            raise PdfBundleError(f"No object header at offset {pos}.")
+        obj, end = parse_object(self.data, header.end())
+        after = _skip_whitespace(self.data, end)
+        if isinstance(obj, dict) and self.data.startswith(b"stream", after):
+            start = after + len(b"stream")
+            if self.data.startswith(b"\r\n", start):
+                start += 2
+            elif self.data[start:start + 1] in (b"\n", b"\r"):
+                start += 1
+            length = obj.get("Length")
+            if isinstance(length, PdfRef):
+                length = self.get(length.num)
+            stop = start + length if isinstance(length, int) else -1
+            if stop < start or not self.data.startswith(b"endstream", _skip_whitespace(self.data, stop)):
+                stop = self.data.find(b"endstream", start)
+                if stop == -1:
+                    raise PdfBundleError("Unterminated stream in PDF.")
+                stop = len(self.data[start:stop].rstrip(b"\r\n")) + start
+            obj = PdfStream(obj, self.data[start:stop])
+        return int(header.group(1)), obj
+
+    def decode_stream(self, stream: PdfStream) -> bytes:
+        filters = stream.attrs.get("Filter")
+        filters = [] if filters is None else filters if isinstance(filters, list) else [filters]
+        data = stream.data
+        for name in filters:
+            if name != "FlateDecode":
+                raise PdfBundleError(f"Unsupported stream filter: {name}")
+            data = zlib.decompress(data)
+        params = stream.attrs.get("DecodeParms")
+        if isinstance(params, list):
+            params = params[0] if params else None
+        if isinstance(params, dict) and params.get("Predictor", 1) >= 10:
+            data = _png_unpredict(data, params.get("Columns", 1))
+        return data
+
+    def get(self, num: int):
+        if num in self.offsets:
+            _, obj = self._parse_indirect(self.offsets[num])
+            return obj
+        if num in self.compressed:
+            stream_num, index = self.compressed[num]
+            objects = self._objstm_cache.get(stream_num)
+            if objects is None:
+                objects = self._read_object_stream(stream_num)
+                self._objstm_cache = {stream_num: objects}
+            return objects.get(num)
+        return None
+
+    def _read_object_stream(self, stream_num: int) -> dict:
+        stream = self.get(stream_num)
+        if not isinstance(stream, PdfStream):
+            raise PdfBundleError("Object stream is missing.")
+        data = self.decode_stream(stream)
+        first = stream.attrs["First"]
+        header = data[:first].split()
+        objects = {}
+        for i in range(0, len(header) - 1, 2):
+            obj, _ = parse_object(data, first + int(header[i + 1]))
+            objects[int(header[i])] = obj
+        return objects
+
+    def resolve(self, obj):
+        return self.get(obj.num) if isinstance(obj, PdfRef) else obj
+
+    def pages(self):
+        """Yield ``(page_ref, page_dict, inherited_attrs, tree_node_nums)`` in order."""
+        catalog = self.resolve(self.trailer["Root"])
+        root = catalog.get("Pages") if isinstance(catalog, dict) else None
+        if not isinstance(root, PdfRef):
+            raise PdfBundleError("PDF catalog has no page tree.")
+        tree_nodes = set()
+        stack = [(root, {})]
+        while stack:
+            ref, inherited = stack.pop()
+            if ref.num in tree_nodes:
+                continue
+            node = self.resolve(ref)
+            if not isinstance(node, dict):
+                continue
+            if node.get("Type") == "Pages" or "Kids" in node:
+                tree_nodes.add(ref.num)
+                inherited = dict(inherited)
+                for key in ("Resources", "MediaBox", "CropBox", "Rotate"):
+                    if key in node:
+                        inherited[key] = node[key]
+                kids = self.resolve(node.get("Kids")) or []
+                stack.extend((kid, inherited) for kid in reversed(kids) if isinstance(kid, PdfRef))
+            else:
+                yield ref, node, inherited, tree_nodes
+
+
+class PdfBundleWriter:
+    """Appends whole PDFs to one output file with an outline entry per part.
+
+    Each part's objects are written to disk as soon as it is added; only the
+    page and outline references are kept in memory, so earlier parts are
+    never re-read.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._file.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets = {}
+        self._next_num = 1
+        self._catalog = self._allocate()
+        self._pages_root = self._allocate()
+        self._kids = []
+        self._outline = []
+
+    @property
+    def page_count(self) -> int:
+        return len(self._kids)
+
+    def _allocate(self) -> PdfRef:
+        ref = PdfRef(self._next_num)
+        self._next_num += 1
+        return ref
+
+    def _write(self, ref: PdfRef, obj, renumber=None):
+        self._offsets[ref.num] = self._file.tell()
+        if isinstance(obj, PdfStream):
+            attrs = dict(obj.attrs)
+            attrs["Length"] = len(obj.data)
+            body = serialize_object(attrs, renumber) + b"\nstream\n" + obj.data + b"\nendstream"
+        else:
+            body = serialize_object(obj, renumber)
+        self._file.write(b"%d 0 obj\n" % ref.num + body + b"\nendobj\n")
+
+    def add(self, pdf_path: Path, title: str) -> int:
+        """Append every page of ``pdf_path``; returns the number of pages added."""
+        source = PdfSource.open(pdf_path)
+        pages = list(source.pages())
+        if not pages:
+            return 0
+        tree_nodes = pages[0][3]
+        mapping = {}
+        pending = []
+
+        def renumber(ref: PdfRef) -> PdfRef:
+            if ref.num in tree_nodes:
+                return self._pages_root
+            if ref.num not in mapping:
+                mapping[ref.num] = self._allocate()
+                pending.append(ref.num)
+            return mapping[ref.num]
+
+        page_refs = [renumber(ref) for ref, _, _, _ in pages]
+        pending.clear()
+        for (ref, page, inherited, _), new_ref in zip(pages, page_refs):
+            page = {key: value for key, value in page.items() if key != "Parent"}
+            for key, value in inherited.items():
+                page.setdefault(key, value)
+            page["Parent"] = self._pages_root
+            self._write(new_ref, page, renumber)
+        while pending:
+            num = pending.pop()
+            self._write(mapping[num], source.get(num), renumber)
+        self._kids.extend(page_refs)
+        self._outline.append((title, page_refs[0]))
+        return len(page_refs)
+
+    def close(self):
+        if self._file is None:
+            return
+        self._write(self._pages_root, {
+            "Type": PdfName("Pages"), "Kids": self._kids, "Count": len(self._kids),
+        })
+        catalog = {"Type": PdfName("Catalog"), "Pages": self._pages_root}
+        if self._outline:
+            outlines = self._allocate()
+            items = [self._allocate() for _ in self._outline]
+            for index, ((title, page), item) in enumerate(zip(self._outline, items)):
+                entry = {
+                    "Title": encode_text_string(title),
+                    "Parent": outlines,
+                    "Dest": [page, PdfName("Fit")],
+                }
+                if index > 0:
+                    entry["Prev"] = items[index - 1]
+                if index + 1 < len(items):
+                    entry["Next"] = items[index + 1]
+                self._write(item, entry)
+            self._write(outlines, {
+                "Type": PdfName("Outlines"), "First": items[0], "Last": items[-1], "Count": len(items),
+            })
+            catalog["Outlines"] = outlines
+            catalog["PageMode"] = PdfName("UseOutlines")
+        self._write(self._catalog, catalog)
+
+        xref = self._file.tell()
+        size = self._next_num
+        lines = [b"xref\n0 %d\n0000000000 65535 f \n" % size]
+        for num in range(1, size):
+            offset = self._offsets.get(num)
+            lines.append(b"%010d 00000 n \n" % offset if offset is not None else b"0000000000 65535 f \n")
+        self._file.write(b"".join(lines))
+        self._file.write(b"trailer\n" + serialize_object({"Size": size, "Root": self._catalog}))
+        self._file.write(b"\nstartxref\n%d\n%%%%EOF\n" % xref)
+        self._file.close()
+        self._file = None
+
+    def abort(self):
+        """Close and delete a partially written bundle."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
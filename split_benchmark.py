@@ -0,0 +1,403 @@
+"""Synthetic-workload benchmarks for the split engine.
+
+Generates source and template workbooks for a grid of workloads (rows x
+columns x key count x key skew x style density), splits each one in both
+template modes and every output type that does not need Microsoft Excel, and
+writes the timings to a JSON file::
+
+    python -m split_benchmark run --preset quick
+    python -m split_benchmark run --rows 1000,20000 --keys 10,500 --skew 0,1.2 --out before.json
+    python -m split_benchmark compare before.json after.json
+
+Each result records the best wall time over ``--repeat`` runs, the setup time
+until partitioning finished, the phase and per-stage timings of the engine's
+run report, the peak traced memory of a separate run (``tracemalloc``;
+skipped with ``--no-memory``), and the size of the outputs. LibreOffice
+outputs are skipped when LibreOffice is not installed.
+"""
+
+import argparse
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+import importlib.util
+from itertools import product
+import json
+import os
+from pathlib import Path
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from split_engine import (
+    find_soffice,
+    OUTPUT_TYPE_EXCEL,
+    OUTPUT_TYPE_EXCEL_AND_PDF,
+    OUTPUT_TYPE_PDF,
+    PDF_ENGINE_LO_POOL,
+    PDF_ENGINE_NATIVE,
+    split_excel_with_template,
+    TEMPLATE_MODE_SOURCE_TEMPLATE,
+    TEMPLATE_MODE_TEMPLATE_FILE,
+)
+
+RESULTS_VERSION = 1
+SHEET_NAME = "Data"
+KEY_HEADER = "Key"
+DEFAULT_RESULTS_DIR = Path("benchmark-results")
+
+# name -> (output_file_type, pdf_engine)
+BENCHMARK_OUTPUTS = {
+    "excel": (OUTPUT_TYPE_EXCEL, "none"),
+    "pdf-native": (OUTPUT_TYPE_PDF, PDF_ENGINE_NATIVE),
+    "excel-pdf-native": (OUTPUT_TYPE_EXCEL_AND_PDF, PDF_ENGINE_NATIVE),
+    "pdf-libreoffice": (OUTPUT_TYPE_PDF, "libreoffice"),
+    "pdf-libreoffice-pool": (OUTPUT_TYPE_PDF, PDF_ENGINE_LO_POOL),
+}
+TEMPLATE_MODES = (TEMPLATE_MODE_TEMPLATE_FILE, TEMPLATE_MODE_SOURCE_TEMPLATE)
+
+PRESETS = {
+    "quick": {"rows": [500], "columns": [8], "keys": [20], "skew": [0.0, 1.5], "style_density": [0.3]},
+    "full": {
+        "rows": [1000, 10000, 50000], "columns": [8, 30], "keys": [10, 200, 2000],
+        "skew": [0.0, 1.2], "style_density": [0.0, 0.3],
+    },
+}
+
+
+@dataclass(frozen=True)
+class BenchmarkWorkload:
+    rows: int = 1000
+    columns: int = 8
+    keys: int = 20
+    # Zipf exponent of the key frequencies: 0 gives every key the same number
+    # of rows, larger values pile the rows onto the first few keys.
+    skew: float = 0.0
+    # Share of data cells (and template data-row cells) that carry styles.
+    style_density: float = 0.0
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.rows < 1 or self.columns < 2 or self.keys < 1:
+            raise ValueError("A workload needs at least 1 row, 2 columns and 1 key")
+        if self.keys > self.rows:
+            raise ValueError(f"Cannot spread {self.rows} rows over {self.keys} keys")
+        if not 0 <= self.style_density <= 1:
+            raise ValueError("style_density must be between 0 and 1")
+
+    @property
+    def name(self) -> str:
+        return f"r{self.rows}-c{self.columns}-k{self.keys}-s{self.skew:g}-d{self.style_density:g}"
+
+    def key_row_counts(self) -> list[int]:
+        """Rows per key, largest first; every key gets at least one row."""
+        weights = [1 / (rank ** self.skew) for rank in range(1, self.keys + 1)]
+        spare = self.rows - self.keys
+        counts = [1 + int(spare * weight / sum(weights)) for weight in weights]
+        counts[0] += self.rows - sum(counts)
+        return counts
+
+    def headers(self) -> list[str]:
+        return [KEY_HEADER] + [f"Field {index}" for index in range(2, self.columns + 1)]
+
+
+def _cell_styles():
+    from openpyxl.styles import Border, Font, PatternFill, Side
+
+    thin = Side(style="thin", color="FF808080")
+    return [
+        {"font": Font(bold=True, color="FF1F4E79")},
+        {"fill": PatternFill("solid", start_color="FFFFF2CC")},
+        {"border": Border(left=thin, right=thin, top=thin, bottom=thin)},
+        {"number_format": "#,##0.00"},
+    ]
+
+
+def _apply_style(cell, style: dict):
+    for name, value in style.items():
+        setattr(cell, name, value)
+
+
+def _field_value(rng: random.Random, column: int, row: int):
+    kind = column % 4
+    if kind == 0:
+        return f"Item {rng.randrange(100000)}"
+    if kind == 1:
+        return rng.randrange(1, 10000)
+    if kind == 2:
+        return round(rng.uniform(0, 100000), 2)
+    return date(2024, 1, 1) + timedelta(days=row % 365)
+
+
+def write_source_workbook(path: Path, workload: BenchmarkWorkload) -> Path:
+    """Write the synthetic source sheet: one header row, then shuffled key rows."""
+    from openpyxl import Workbook
+
+    rng = random.Random(workload.seed)
+    keys = []
+    for index, count in enumerate(workload.key_row_counts(), start=1):
+        keys.extend([f"K{index:05d}"] * count)
+    rng.shuffle(keys)
+    styles = _cell_styles()
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = SHEET_NAME
+    ws.append(workload.headers())
+    for cell in ws[1]:
+        _apply_style(cell, styles[0])
+    for row, key in enumerate(keys, start=2):
+        ws.append([key] + [_field_value(rng, column, row) for column in range(2, workload.columns + 1)])
+        if workload.style_density:
+            for cell in ws[row]:
+                if rng.random() < workload.style_density:
+                    _apply_style(cell, rng.choice(styles))
+    wb.save(path)
+    return path
+
+
+def write_template_workbook(path: Path, workload: BenchmarkWorkload) -> Path:
+    """Write a template with the source headers and a styled first data row."""
+    from openpyxl import Workbook
+
+    rng = random.Random(workload.seed + 1)
+    styles = _cell_styles()
+    wb = Workbook()
+    ws = wb.active
+    ws.title = SHEET_NAME
+    ws.append(workload.headers())
+    for cell in ws[1]:
+        _apply_style(cell, styles[0])
+    for column in range(1, workload.columns + 1):
+        cell = ws.cell(row=2, column=column)
+        if rng.random() < workload.style_density:
+            _apply_style(cell, rng.choice(styles))
+    wb.save(path)
+    return path
+
+
+def output_available(output: str) -> str | None:
+    """Return why ``output`` cannot run here, or None when it can."""
+    _, engine = BENCHMARK_OUTPUTS[output]
+    if engine in {"libreoffice", PDF_ENGINE_LO_POOL} and find_soffice() is None:
+        return "LibreOffice not found"
+    if engine == PDF_ENGINE_LO_POOL:
+        if importlib.util.find_spec("uno") is None:
+            return "Python module 'uno' not available"
+    return None
+
+
+def _output_size(out_dir: Path) -> tuple[int, int]:
+    files = [path for path in out_dir.iterdir() if path.is_file() and path.suffix in {".xlsx", ".pdf"}]
+    return len(files), sum(path.stat().st_size for path in files)
+
+
+def _split_once(workload, source, template, template_mode, output, out_dir) -> dict:
+    output_file_type, pdf_engine = BENCHMARK_OUTPUTS[output]
+    shutil.rmtree(out_dir, ignore_errors=True)
+    marks = {}
+    reports = []
+
+    def progress(total, done):
+        marks.setdefault("setup", time.perf_counter())
+
+    started = time.perf_counter()
+    results = split_excel_with_template(
+        source_path=source, sheet_name=SHEET_NAME, key_col=KEY_HEADER, template_path=template,
+        out_dir=out_dir, header_rows=1, pdf_engine=pdf_engine, template_mode=template_mode,
+        output_file_type=output_file_type, progress_cb=progress, report_cb=reports.append,
+    )
+    seconds = time.perf_counter() - started
+    return {
+        "seconds": seconds,
+        "setup_seconds": marks.get("setup", started + seconds) - started,
+        "keys": len(results),
+        "phases": reports[0]["phases"],
+        "stages": reports[0]["stages"],
+    }
+
+
+def run_case(workload: BenchmarkWorkload, source: Path, template: Path, template_mode: str, output: str,
+             work_dir: Path, repeat: int = 1, memory: bool = True) -> dict:
+    """Benchmark one workload/mode/output combination."""
+    output_file_type, pdf_engine = BENCHMARK_OUTPUTS[output]
+    result = {
+        "workload": workload.name, "params": asdict(workload), "template_mode": template_mode,
+        "output": output, "output_file_type": output_file_type, "pdf_engine": pdf_engine,
+    }
+    skipped = output_available(output)
+    if skipped:
+        return {**result, "skipped": skipped}
+    out_dir = work_dir / "out"
+    runs = [_split_once(workload, source, template, template_mode, output, out_dir) for _ in range(max(1, repeat))]
+    best = min(runs, key=lambda run: run["seconds"])
+    files, size = _output_size(out_dir)
+    result.update(
+        seconds=best["seconds"], runs=[run["seconds"] for run in runs],
+        median_seconds=statistics.median(run["seconds"] for run in runs),
+        setup_seconds=best["setup_seconds"], keys=best["keys"], phases=best["phases"], stages=best["stages"],
+        output_files=files, output_bytes=size, peak_memory_mb=None,
+    )
+    if memory:
+        # A separate run: tracemalloc slows allocation-heavy code down.
+        tracemalloc.start()
+        try:
+            _split_once(workload, source, template, template_mode, output, out_dir)
+            result["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        finally:
+            tracemalloc.stop()
+    shutil.rmtree(out_dir, ignore_errors=True)
+    return result
+
+
+def expand_workloads(grid: dict, seed: int = 0) -> list[BenchmarkWorkload]:
+    names = ("rows", "columns", "keys", "skew", "style_density")
+    workloads = []
+    for values in product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        if params["keys"] > params["rows"]:
+            continue
+        workloads.append(BenchmarkWorkload(**params, seed=seed))
+    return workloads
+
+
+def environment_info() -> dict:
+    info = {
+        "python": platform.python_version(), "platform": platform.platform(),
+        "machine": platform.machine(), "cpu_count": os.cpu_count(),
+    }
+    for module in ("pandas", "openpyxl"):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            info[module] = None
+    return info
+
+
+def run_benchmarks(workloads, template_modes=TEMPLATE_MODES, outputs=tuple(BENCHMARK_OUTPUTS),
+                   repeat: int = 1, memory: bool = True, work_dir: Path | None = None, report_cb=None) -> dict:
+    """Run every combination and return the results document."""
+    if report_cb is None: report_cb = lambda result: None
+    started_at = datetime.now().astimezone()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="split-bench-", dir=work_dir) as tmp:
+        tmp_path = Path(tmp)
+        for workload in workloads:
+            case_dir = tmp_path / workload.name
+            case_dir.mkdir()
+            generated = time.perf_counter()
+            source = write_source_workbook(case_dir / "source.xlsx", workload)
+            template = write_template_workbook(case_dir / "template.xlsx", workload)
+            generate_seconds = time.perf_counter() - generated
+            for template_mode, output in product(template_modes, outputs):
+                result = run_case(workload, source, template, template_mode, output, case_dir, repeat, memory)
+                result["generate_seconds"] = generate_seconds
+                results.append(result)
+                report_cb(result)
+    return {
+        "version": RESULTS_VERSION, "created_at": started_at.isoformat(timespec="seconds"),
+        "environment": environment_info(), "repeat": repeat, "results": results,
+    }
+
+
+def describe_result(result: dict) -> str:
+    label = f"{result['workload']} {result['template_mode']} {result['output']}"
+    if result.get("skipped"):
+        return f"{label}: skipped ({result['skipped']})"
+    memory = f", peak {result['peak_memory_mb']:.1f} MB" if result.get("peak_memory_mb") is not None else ""
+    return (
+        f"{label}: {result['seconds']:.2f}s (setup {result['setup_seconds']:.2f}s), "
+        f"{result['keys']} keys, {result['output_bytes'] / 1024:.0f} KB{memory}"
+    )
+
+
+def compare_results(baseline: dict, current: dict) -> list[str]:
+    """One line per case present in both documents: time and memory change."""
+    def case_id(result):
+        return result["workload"], result["template_mode"], result["output"]
+
+    before = {case_id(result): result for result in baseline["results"] if not result.get("skipped")}
+    lines = []
+    for result in current["results"]:
+        old = before.get(case_id(result))
+        if old is None or result.get("skipped"):
+            continue
+        change = (result["seconds"] - old["seconds"]) / old["seconds"] * 100 if old["seconds"] else 0.0
+        line = f"{' '.join(case_id(result))}: {old['seconds']:.2f}s -> {result['seconds']:.2f}s ({change:+.1f}%)"
+        if old.get("peak_memory_mb") is not None and result.get("peak_memory_mb") is not None:
+            line += f", peak {old['peak_memory_mb']:.1f} -> {result['peak_memory_mb']:.1f} MB"
+        lines.append(line)
+    return lines
+
+
+def _number_list(kind):
+    return lambda text: [kind(part) for part in text.split(",") if part.strip()]
+
+
+def _name_list(choices):
+    def parse(text):
+        names = [part.strip() for part in text.split(",") if part.strip()]
+        unknown = [name for name in names if name not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (choose from {', '.join(choices)})")
+        return names
+    return parse
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m split_benchmark", description="Split engine benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the benchmark grid and write a JSON results file")
+    run.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    run.add_argument("--rows", type=_number_list(int))
+    run.add_argument("--columns", type=_number_list(int))
+    run.add_argument("--keys", type=_number_list(int))
+    run.add_argument("--skew", type=_number_list(float))
+    run.add_argument("--style-density", type=_number_list(float))
+    run.add_argument("--modes", type=_name_list(TEMPLATE_MODES), default=list(TEMPLATE_MODES))
+    run.add_argument("--outputs", type=_name_list(tuple(BENCHMARK_OUTPUTS)), default=list(BENCHMARK_OUTPUTS))
+    run.add_argument("--repeat", type=int, default=1, help="timed runs per case; the best one is reported")
+    run.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--out", type=Path, help="results file (default: benchmark-results/split-<time>.json)")
+    run.add_argument("--work-dir", type=Path, help="folder for generated workbooks (default: system temp)")
+    compare = commands.add_parser("compare", help="compare two results files")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("current", type=Path)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "compare":
+        baseline, current = (json.loads(path.read_text(encoding="utf-8")) for path in (args.baseline, args.current))
+        lines = compare_results(baseline, current)
+        print("\n".join(lines) if lines else "No cases in common.")
+        return 0
+
+    grid = dict(PRESETS[args.preset])
+    for name in grid:
+        if getattr(args, name) is not None:
+            grid[name] = getattr(args, name)
+    try:
+        workloads = expand_workloads(grid, seed=args.seed)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    out_path = args.out or DEFAULT_RESULTS_DIR / f"split-{datetime.now():%Y%m%d-%H%M%S}.json"
+    document = run_benchmarks(
+        workloads, args.modes, args.outputs, repeat=args.repeat, memory=not args.no_memory,
+        work_dir=args.work_dir, report_cb=lambda result: print(describe_result(result), file=sys.stderr),
+    )
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(document, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Results: {out_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
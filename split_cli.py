@@ -0,0 +1,551 @@
+"""Headless command line for the splitter.
+
+Runs the same engine as the GUI without importing Qt, for scheduled jobs::
+
+    python -m split_cli split --settings split.json
+    python -m split_cli split --source data.xlsx --sheet Data --key Dept \\
+        --template-mode source_template --out out --output-type pdf --pdf-engine native
+    python -m split_cli watch --settings split.json
+    python -m split_cli batch monthly_jobs.json
+    python -m split_cli reconvert --out out --pdf-engine libreoffice
+    python -m split_cli mail-merge --settings split.json --json
+
+A settings file is a JSON object using the GUI's setting names
+(``source_path``, ``sheet_name``, ``key_col``, ``output_dir``, ``mail_subject``
+...). Command line options override values from the file.
+"""
+
+import argparse
+import json
+import signal
+import sys
+from pathlib import Path
+
+from mail_merge import COMBINED_PDF_NAME
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_CANCELLED = 130
+
+
+class CliError(Exception):
+    pass
+
+
+def load_settings_file(path: Path | None) -> dict:
+    if path is None:
+        return {}
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except OSError as e:
+        raise CliError(f"Cannot read settings file {path}: {e}")
+    except ValueError as e:
+        raise CliError(f"Settings file {path} is not valid JSON: {e}")
+    if not isinstance(data, dict):
+        raise CliError(f"Settings file {path} must contain a JSON object")
+    return data
+
+
+def _settings_bool(value, default: bool) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _settings_int(settings: dict, key: str, default: int) -> int:
+    value = settings.get(key)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise CliError(f"Setting {key} must be a number, got {value!r}")
+
+
+def _settings_float(settings: dict, key: str) -> float | None:
+    value = settings.get(key)
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise CliError(f"Setting {key} must be a number, got {value!r}")
+
+
+def _column_mapping(value) -> dict | None:
+    if value in (None, ""):
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            raise CliError("Setting column_mapping must be a JSON object")
+    if not isinstance(value, dict):
+        raise CliError("Setting column_mapping must be a JSON object")
+    return value or None
+
+
+def _parse_key_col(value):
+    value = "" if value is None else str(value).strip()
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _stage_workers(settings: dict) -> dict | None:
+    """``<stage>_workers`` settings as ``stage_workers``; 0 or unset keeps the default."""
+    workers = {
+        stage: _settings_int(settings, f"{stage}_workers", 0) for stage in ("render", "serialize", "pdf")
+    }
+    return {stage: count for stage, count in workers.items() if count > 0} or None
+
+
+def merge_cli_options(settings: dict, args: argparse.Namespace) -> dict:
+    """Overlay command line options onto GUI-style settings."""
+    merged = dict(settings)
+    overrides = {
+        "source_path": args.source,
+        "sheet_name": args.sheet,
+        "key_col": args.key,
+        "template_mode": args.template_mode,
+        "template_path": args.template,
+        "source_header_rows": args.source_header_rows,
+        "template_header_rows": args.template_header_rows,
+        "output_dir": args.out,
+        "output_file_type": args.output_type,
+        "pdf_engine": args.pdf_engine,
+        "libreoffice_path": args.soffice,
+        "libreoffice_batch_size": args.lo_batch_size,
+        "render_workers": args.render_workers,
+        "serialize_workers": args.serialize_workers,
+        "pdf_workers": args.pdf_workers,
+        "combined_pdf": args.combined_pdf,
+        "keep_key_pdfs": args.keep_key_pdfs,
+        "incremental_split": args.incremental,
+        "prefix": args.prefix,
+        "suffix": args.suffix,
+        "verbose_logging": args.verbose,
+        "track_memory": args.track_memory,
+        "memory_budget_mb": args.memory_budget_mb,
+        "capture_profile": args.profile,
+        "event_log": args.events,
+    }
+    if args.map:
+        mapping = dict(_column_mapping(merged.get("column_mapping")) or {})
+        for item in args.map:
+            template_col, sep, source_col = item.partition("=")
+            if not sep:
+                raise CliError(f"--map expects TEMPLATE=SOURCE, got {item!r}")
+            mapping[template_col.strip()] = source_col.strip()
+        overrides["column_mapping"] = mapping
+    merged.update({key: value for key, value in overrides.items() if value is not None})
+    return merged
+
+
+def split_params_from_settings(settings: dict, engine) -> dict:
+    """Translate GUI settings into ``split_excel_with_template`` keyword arguments.
+
+    Mirrors what the GUI's Generate button passes to ``SplitWorker``.
+    """
+    for key in ("source_path", "sheet_name", "key_col", "output_dir"):
+        if not str(settings.get(key) or "").strip():
+            raise CliError(f"Missing setting {key}")
+    template_mode = settings.get("template_mode") or engine.TEMPLATE_MODE_TEMPLATE_FILE
+    if template_mode not in engine.TEMPLATE_MODE_LABELS:
+        raise CliError(f"Unknown template_mode {template_mode!r}")
+    if template_mode == engine.TEMPLATE_MODE_TEMPLATE_FILE and not settings.get("template_path"):
+        raise CliError("Missing setting template_path")
+    output_file_type = settings.get("output_file_type") or engine.OUTPUT_TYPE_EXCEL
+    if output_file_type not in engine.OUTPUT_TYPE_LABELS:
+        raise CliError(f"Unknown output_file_type {output_file_type!r}")
+    requires_pdf = engine.output_requires_pdf(output_file_type)
+    pdf_engine = str(settings.get("pdf_engine") or "xlwings").strip().lower() if requires_pdf else "none"
+
+    soffice_path = None
+    if pdf_engine in {"libreoffice", engine.PDF_ENGINE_LO_POOL}:
+        soffice_path = engine.find_soffice(str(settings.get("libreoffice_path") or "").strip())
+        if not soffice_path:
+            raise CliError("LibreOffice (soffice) not found; set libreoffice_path or --soffice")
+    elif pdf_engine == "xlwings" and not engine.xlwings_available():
+        raise CliError("xlwings is not installed; choose --pdf-engine libreoffice or native")
+
+    legacy_header_rows = _settings_int(settings, "header_rows", 5)
+    source_header_rows = _settings_int(settings, "source_header_rows", legacy_header_rows)
+    out_dir = Path(str(settings["output_dir"]).strip())
+    combined = requires_pdf and _settings_bool(settings.get("combined_pdf"), False)
+    return {
+        "source_path": Path(str(settings["source_path"]).strip()),
+        "sheet_name": str(settings["sheet_name"]).strip(),
+        "key_col": _parse_key_col(settings["key_col"]),
+        "template_path": Path(str(settings.get("template_path") or settings["source_path"]).strip()),
+        "out_dir": out_dir,
+        "header_rows": source_header_rows,
+        "source_header_rows": source_header_rows,
+        "template_header_rows": _settings_int(settings, "template_header_rows", legacy_header_rows),
+        "output_file_type": output_file_type,
+        "pdf_engine": pdf_engine,
+        "soffice_path": soffice_path,
+        "pdf_batch_size": (
+            _settings_int(settings, "libreoffice_batch_size", engine.DEFAULT_LO_BATCH_SIZE)
+            if pdf_engine == "libreoffice" else 1
+        ),
+        "stage_workers": _stage_workers(settings),
+        "combined_pdf_path": out_dir / COMBINED_PDF_NAME if combined else None,
+        "keep_key_pdfs": _settings_bool(settings.get("keep_key_pdfs"), True),
+        "incremental": _settings_bool(settings.get("incremental_split"), False),
+        "prefix": str(settings.get("prefix") or "").strip(),
+        "suffix": str(settings.get("suffix") or "").strip(),
+        "template_mode": template_mode,
+        "column_mapping": _column_mapping(settings.get("column_mapping")),
+        "verbose": _settings_bool(settings.get("verbose_logging"), False),
+        "track_memory": _settings_bool(settings.get("track_memory"), False),
+        "memory_budget_mb": _settings_float(settings, "memory_budget_mb"),
+        "capture_profile": _settings_bool(settings.get("capture_profile"), False),
+        "event_log_path": Path(settings["event_log"]) if settings.get("event_log") else None,
+    }
+
+
+class _Console:
+    """Prints engine status lines and turns Ctrl+C into a graceful cancel."""
+
+    def __init__(self, quiet: bool = False):
+        self.quiet = quiet
+        self.cancelled = False
+
+    def status(self, message):
+        if not self.quiet:
+            print(message, file=sys.stderr, flush=True)
+
+    def stop_requested(self) -> bool:
+        return self.cancelled
+
+    def install_interrupt_handler(self):
+        """Install the Ctrl+C handler and return the previous one."""
+        def handler(signum, frame):
+            if self.cancelled:
+                raise KeyboardInterrupt
+            self.cancelled = True
+            self.status("Cancelling... press Ctrl+C again to abort immediately.")
+
+        return signal.signal(signal.SIGINT, handler)
+
+
+def _result_dicts(results) -> list[dict]:
+    return [
+        {
+            "key": result.key,
+            "excel_path": str(result.excel_path) if result.excel_path else None,
+            "pdf_path": str(result.pdf_path) if result.pdf_path else None,
+            "output_file_type": result.output_file_type,
+        }
+        for result in results
+    ]
+
+
+def _print_json(payload):
+    json.dump(payload, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+
+def cmd_split(args, console: _Console) -> int:
+    import split_engine
+
+    params = split_params_from_settings(merge_cli_options(load_settings_file(args.settings), args), split_engine)
+    if args.keys:
+        params["selected_keys"] = {key.strip() for key in args.keys.split(",") if key.strip()}
+    results = split_engine.split_excel_with_template(
+        **params, resume=args.resume, write_journal=args.journal,
+        status_cb=console.status, stop_requested=console.stop_requested,
+    )
+    if args.json:
+        _print_json(_result_dicts(results))
+    return EXIT_CANCELLED if console.cancelled else EXIT_OK
+
+
+def cmd_watch(args, console: _Console) -> int:
+    import split_engine
+
+    params = split_params_from_settings(merge_cli_options(load_settings_file(args.settings), args), split_engine)
+
+    def report(run):
+        if args.json:
+            _print_json({
+                "changed": run.changed, "rebuilt": run.rebuilt, "removed": run.removed,
+                "unchanged": run.unchanged, "error": run.error, "seconds": round(run.seconds, 3),
+            })
+            sys.stdout.flush()
+
+    split_engine.watch_split(
+        params, poll_interval=args.interval, settle_seconds=args.settle,
+        status_cb=console.status, report_cb=report, stop_requested=console.stop_requested,
+    )
+    return EXIT_OK
+
+
+def cmd_batch(args, console: _Console) -> int:
+    import split_engine
+
+    try:
+        jobs = split_engine.load_split_batch_spec(args.spec)
+    except OSError as e:
+        raise CliError(f"Cannot read job spec {args.spec}: {e}")
+    except ValueError as e:
+        raise CliError(f"Invalid job spec {args.spec}: {e}")
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(",") if name.strip()}
+        unknown = wanted - {job.name for job in jobs}
+        if unknown:
+            raise CliError("Unknown job(s): " + ", ".join(sorted(unknown)))
+        jobs = [job for job in jobs if job.name in wanted]
+
+    def batch_progress(total, finished):
+        if finished:
+            console.status(f"Batch: {finished}/{total} jobs done.")
+
+    outcomes = split_engine.run_split_batch(
+        jobs, status_cb=console.status, progress_cb=batch_progress,
+        stop_requested=console.stop_requested,
+    )
+    if args.json:
+        _print_json([
+            {
+                "name": outcome.name, "error": outcome.error, "cancelled": outcome.cancelled,
+                "seconds": round(outcome.seconds, 3), "results": _result_dicts(outcome.results),
+            }
+            for outcome in outcomes
+        ])
+    if console.cancelled:
+        return EXIT_CANCELLED
+    return EXIT_FAILED if any(outcome.error is not None for outcome in outcomes) else EXIT_OK
+
+
+def cmd_reconvert(args, console: _Console) -> int:
+    import split_engine
+
+    settings = merge_cli_options(load_settings_file(args.settings), args)
+    if not str(settings.get("output_dir") or "").strip():
+        raise CliError("Missing setting output_dir")
+    pdf_engine = str(settings.get("pdf_engine") or "libreoffice").strip().lower()
+    soffice_path = None
+    if pdf_engine in {"libreoffice", split_engine.PDF_ENGINE_LO_POOL}:
+        soffice_path = split_engine.find_soffice(str(settings.get("libreoffice_path") or "").strip())
+        if not soffice_path:
+            raise CliError("LibreOffice (soffice) not found; set libreoffice_path or --soffice")
+    results = split_engine.reconvert_folder_pdfs(
+        Path(str(settings["output_dir"]).strip()), pdf_engine=pdf_engine, soffice_path=soffice_path,
+        prefix=str(settings.get("prefix") or "").strip(), suffix=str(settings.get("suffix") or "").strip(),
+        pdf_workers=(_stage_workers(settings) or {}).get("pdf", 1),
+        pdf_batch_size=(
+            _settings_int(settings, "libreoffice_batch_size", split_engine.DEFAULT_LO_BATCH_SIZE)
+            if pdf_engine == "libreoffice" else 1
+        ),
+        status_cb=console.status, stop_requested=console.stop_requested,
+    )
+    if args.json:
+        _print_json(_result_dicts(results))
+    return EXIT_CANCELLED if console.cancelled else EXIT_OK
+
+
+def cmd_mail_merge(args, console: _Console) -> int:
+    import mail_merge
+
+    settings = load_settings_file(args.settings)
+    overrides = {
+        "mail_split_folder": args.folder,
+        "mail_detect_prefix": args.prefix,
+        "mail_detect_suffix": args.suffix,
+        "mail_recipient_path": args.recipients,
+        "mail_recipient_sheet": args.recipient_sheet,
+        "mail_recipient_header_row": args.recipient_header_row,
+        "mail_recipient_key_col": args.recipient_key,
+        "mail_recipient_to_col": args.recipient_to,
+        "mail_recipient_cc_col": args.recipient_cc,
+        "mail_recipient_bcc_col": args.recipient_bcc,
+        "mail_subject": args.subject,
+        "mail_body": args.body,
+        "mail_html_template": args.html_template,
+        "mail_attach_excel": args.attach_excel,
+        "mail_attach_pdf": args.attach_pdf,
+    }
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    folder = str(settings.get("mail_split_folder") or settings.get("output_dir") or "").strip()
+    recipient_path = str(settings.get("mail_recipient_path") or "").strip()
+    if not folder:
+        raise CliError("Missing setting mail_split_folder (or output_dir)")
+    if not recipient_path:
+        raise CliError("Missing setting mail_recipient_path")
+
+    split_results = mail_merge.discover_split_results_from_folder(
+        Path(folder),
+        str(settings.get("mail_detect_prefix", settings.get("prefix")) or "").strip(),
+        str(settings.get("mail_detect_suffix", settings.get("suffix")) or "").strip(),
+    )
+    recipients = mail_merge.load_recipient_rows(
+        Path(recipient_path),
+        str(settings.get("mail_recipient_sheet") or "").strip() or 0,
+        _settings_int(settings, "mail_recipient_header_row", 1),
+        {
+            "key": str(settings.get("mail_recipient_key_col") or "").strip(),
+            "to": str(settings.get("mail_recipient_to_col") or "").strip(),
+            "cc": str(settings.get("mail_recipient_cc_col") or "").strip(),
+            "bcc": str(settings.get("mail_recipient_bcc_col") or "").strip(),
+        },
+    )
+    html_path = str(settings.get("mail_html_template") or "").strip()
+    body = str(settings.get("mail_body") or "")
+    is_html = bool(html_path) and Path(html_path).exists()
+    if is_html:
+        body = Path(html_path).read_text(encoding="utf-8")
+    template = mail_merge.EmailTemplate(
+        subject=str(settings.get("mail_subject") or "").strip(), body=body, is_html=is_html,
+        template_path=Path(html_path) if html_path else None,
+    )
+    attachments = mail_merge.AttachmentSelection(
+        attach_excel=_settings_bool(settings.get("mail_attach_excel"), True),
+        attach_pdf=_settings_bool(settings.get("mail_attach_pdf"), False),
+    )
+    jobs, warnings = mail_merge.build_email_jobs(split_results, recipients, template, attachments)
+    for warning in warnings:
+        console.status(f"Warning: {warning}")
+    ready = sum(1 for job in jobs if job.is_valid)
+    console.status(f"{ready} of {len(jobs)} emails ready.")
+    for job in jobs:
+        for error in job.validation_errors:
+            console.status(f"Error: {job.key}: {error}")
+    if args.json:
+        _print_json([
+            {
+                "key": job.key, "to": job.to, "cc": job.cc, "bcc": job.bcc,
+                "subject": job.subject, "is_html": job.is_html,
+                "attachments": [str(path) for path in job.attachments],
+                "errors": job.validation_errors, "warnings": job.validation_warnings,
+            }
+            for job in jobs
+        ])
+    if not mail_merge.all_jobs_valid(jobs):
+        return EXIT_FAILED
+    if args.send:
+        timing = mail_merge.SendTimingOptions(
+            delay_delivery_enabled=_settings_bool(settings.get("mail_delay_delivery"), True),
+            delay_delivery_minutes=_settings_int(settings, "mail_delay_minutes", 5),
+            throttle_enabled=_settings_bool(settings.get("mail_throttle"), True),
+            throttle_seconds=_settings_int(settings, "mail_throttle_seconds", 5),
+        )
+        sent = mail_merge.send_jobs(
+            jobs, mail_merge.OutlookMailProvider(), timing,
+            status_cb=console.status, stop_requested=console.stop_requested,
+        )
+        console.status(f"{sum(1 for result in sent if result.status == 'sent')} emails sent.")
+    return EXIT_CANCELLED if console.cancelled else EXIT_OK
+
+
+def _add_split_options(parser: argparse.ArgumentParser):
+    parser.add_argument("--settings", type=Path, help="JSON file with GUI setting names")
+    parser.add_argument("--source", help="source workbook (source_path)")
+    parser.add_argument("--sheet", help="source sheet (sheet_name)")
+    parser.add_argument("--key", help="key column header or 1-based index (key_col)")
+    parser.add_argument("--template-mode", choices=["template_file", "source_template"])
+    parser.add_argument("--template", help="template workbook (template_path)")
+    parser.add_argument("--source-header-rows", type=int)
+    parser.add_argument("--template-header-rows", type=int)
+    parser.add_argument("--out", help="output folder (output_dir)")
+    parser.add_argument("--output-type", choices=["excel", "pdf", "excel_and_pdf"])
+    parser.add_argument("--pdf-engine", help="xlwings, libreoffice, libreoffice-pool or native")
+    parser.add_argument("--soffice", help="path to soffice (libreoffice_path)")
+    parser.add_argument("--lo-batch-size", type=int, help="workbooks per soffice process")
+    parser.add_argument("--render-workers", type=int, help="parallel workbook renders")
+    parser.add_argument("--serialize-workers", type=int, help="parallel workbook saves")
+    parser.add_argument("--pdf-workers", type=int, help="parallel PDF conversions")
+    parser.add_argument("--combined-pdf", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--keep-key-pdfs", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--incremental", action=argparse.BooleanOptionalAction, default=None,
+                        help="rebuild only keys whose rows, template or options changed")
+    parser.add_argument("--prefix")
+    parser.add_argument("--suffix")
+    parser.add_argument("--map", action="append", metavar="TEMPLATE=SOURCE",
+                        help="column mapping entry; repeatable")
+    parser.add_argument("--verbose", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--track-memory", action=argparse.BooleanOptionalAction, default=None,
+                        help="trace memory per phase and per key into the run report")
+    parser.add_argument("--memory-budget-mb", type=float, help="warn as process memory nears this many MB")
+    parser.add_argument("--profile", action=argparse.BooleanOptionalAction, default=None,
+                        help="write a cProfile profile and summary into the output folder")
+    parser.add_argument("--events", metavar="FILE", help="append the run's events to FILE as JSON lines")
+    parser.add_argument("--json", action="store_true", help="print results as JSON on stdout")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m split_cli", description="Excel Splitter without the GUI.")
+    parser.add_argument("--quiet", action="store_true", help="do not print progress messages")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    split = commands.add_parser("split", help="split the source workbook per key")
+    _add_split_options(split)
+    split.add_argument("--keys", help="comma-separated subset of keys to generate")
+    split.add_argument("--journal", action="store_true", help="checkpoint finished keys so the run can be resumed")
+    split.add_argument("--resume", action="store_true", help="continue an interrupted run from its journal")
+    split.set_defaults(handler=cmd_split)
+
+    watch = commands.add_parser("watch", help="re-split changed keys whenever the source changes")
+    _add_split_options(watch)
+    watch.add_argument("--interval", type=float, default=2.0, help="seconds between polls")
+    watch.add_argument("--settle", type=float, default=2.0, help="seconds the files must stay unchanged")
+    watch.set_defaults(handler=cmd_watch)
+
+    batch = commands.add_parser("batch", help="run many split jobs from a job spec, reading each source once")
+    batch.add_argument("spec", type=Path, help="JSON job spec (defaults + jobs of SplitWorker params)")
+    batch.add_argument("--only", help="comma-separated job names to run")
+    batch.add_argument("--json", action="store_true", help="print per-job results as JSON on stdout")
+    batch.set_defaults(handler=cmd_batch)
+
+    reconvert = commands.add_parser("reconvert", help="convert missing or stale PDFs in an output folder")
+    _add_split_options(reconvert)
+    reconvert.set_defaults(handler=cmd_reconvert)
+
+    mail = commands.add_parser("mail-merge", help="build (and optionally send) the mail merge")
+    mail.add_argument("--settings", type=Path, help="JSON file with GUI setting names")
+    mail.add_argument("--folder", help="split output folder (mail_split_folder)")
+    mail.add_argument("--prefix", help="file name prefix used to detect keys")
+    mail.add_argument("--suffix", help="file name suffix used to detect keys")
+    mail.add_argument("--recipients", help="recipient workbook (mail_recipient_path)")
+    mail.add_argument("--recipient-sheet")
+    mail.add_argument("--recipient-header-row", type=int)
+    mail.add_argument("--recipient-key")
+    mail.add_argument("--recipient-to")
+    mail.add_argument("--recipient-cc")
+    mail.add_argument("--recipient-bcc")
+    mail.add_argument("--subject")
+    mail.add_argument("--body")
+    mail.add_argument("--html-template")
+    mail.add_argument("--attach-excel", action=argparse.BooleanOptionalAction, default=None)
+    mail.add_argument("--attach-pdf", action=argparse.BooleanOptionalAction, default=None)
+    mail.add_argument("--send", action="store_true", help="send through Outlook once every job is valid")
+    mail.add_argument("--json", action="store_true", help="print the jobs as JSON on stdout")
+    mail.set_defaults(handler=cmd_mail_merge)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    console = _Console(quiet=args.quiet)
+    previous_handler = console.install_interrupt_handler()
+    try:
+        return args.handler(args, console)
+    except CliError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    except KeyboardInterrupt:
+        print("Aborted.", file=sys.stderr)
+        return EXIT_CANCELLED
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3883 @@
+# split_engine.py
+# Engine split Excel per nilai unik tanpa dependensi GUI: dipakai oleh
+# main.py (GUI), split_cli.py (command line), split_service.py (HTTP) dan test.
+
+import os
+import re
+import io
+import cProfile
+import pstats
+import shutil
+import socket
+import subprocess
+import sys
+import hashlib
+import json
+import queue
+import tempfile
+import threading
+import time
+import tracemalloc
+import unicodedata
+import zlib
+from contextlib import contextmanager, ExitStack, nullcontext
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time as dt_time
+from pathlib import Path
+
+# pandas dan openpyxl diimpor di dalam fungsi yang memakainya: keduanya butuh
+# ratusan milidetik untuk dimuat, dan jendela GUI / --help CLI tidak perlu
+# menunggu itu sebelum ada file yang dibaca.
+
+from mail_merge import discover_split_results_from_folder, SplitResult
+from pdf_bundle import PdfBundleError, PdfBundleWriter
+
+TEMPLATE_MODE_TEMPLATE_FILE = "template_file"
+TEMPLATE_MODE_SOURCE_TEMPLATE = "source_template"
+TEMPLATE_MODE_LABELS = {
+    TEMPLATE_MODE_TEMPLATE_FILE: "Use Template File",
+    TEMPLATE_MODE_SOURCE_TEMPLATE: "Use Source as Template",
+}
+TEMPLATE_MODE_BY_LABEL = {label: key for key, label in TEMPLATE_MODE_LABELS.items()}
+OUTPUT_TYPE_EXCEL = "excel"
+OUTPUT_TYPE_PDF = "pdf"
+OUTPUT_TYPE_EXCEL_AND_PDF = "excel_and_pdf"
+OUTPUT_TYPE_LABELS = {
+    OUTPUT_TYPE_EXCEL: "Excel",
+    OUTPUT_TYPE_PDF: "PDF",
+    OUTPUT_TYPE_EXCEL_AND_PDF: "Excel + PDF",
+}
+OUTPUT_TYPE_BY_LABEL = {label: key for key, label in OUTPUT_TYPE_LABELS.items()}
+
+# ==== (Opsional) xlwings untuk PDF via Excel COM ====
+# Dicek saat pertama dibutuhkan; di Windows import xlwings ikut memuat pywin32.
+_xlwings_available = None
+
+def xlwings_available() -> bool:
+    global _xlwings_available
+    if _xlwings_available is None:
+        try:
+            import xlwings  # noqa: F401
+            _xlwings_available = True
+        except Exception:
+            _xlwings_available = False
+    return _xlwings_available
+
+
+# ----------------- Helpers -----------------
+
+def safe_file_part(s: str) -> str:
+    s = "" if s is None else str(s)
+    return re.sub(r'[:\\/\?\*\[\]<>|"]', "_", s).strip() or "Key"
+
+def join_output_name_parts(prefix: str, key_part: str, suffix: str) -> str:
+    parts = []
+    if prefix:
+        parts.append(prefix)
+    parts.append(key_part)
+    if suffix:
+        parts.append(suffix)
+    return " ".join(parts)
+
+def build_output_stem(prefix: str, key_value, suffix: str) -> str:
+    return join_output_name_parts(prefix, safe_file_part(key_value), suffix)
+
+def output_extension(output_file_type: str) -> str:
+    if output_file_type == OUTPUT_TYPE_PDF:
+        return ".pdf"
+    if output_file_type == OUTPUT_TYPE_EXCEL_AND_PDF:
+        return ".xlsx + PDF"
+    return ".xlsx"
+
+def output_requires_pdf(output_file_type: str) -> bool:
+    return output_file_type in {OUTPUT_TYPE_PDF, OUTPUT_TYPE_EXCEL_AND_PDF}
+
+def remove_intermediate_workbook_for_pdf(xlsx_path: Path, output_file_type: str):
+    if output_file_type != OUTPUT_TYPE_PDF:
+        return
+    if xlsx_path.with_suffix(".pdf").exists() and xlsx_path.exists():
+        xlsx_path.unlink()
+
+def set_print_titles_and_area(ws, header_rows: int, last_col_idx: int, last_data_row: int):
+    from openpyxl.utils import get_column_letter
+
+    ws.print_title_rows = f"1:{header_rows}"
+    last_col_letter = get_column_letter(last_col_idx if last_col_idx > 0 else 1)
+    last_row = last_data_row if last_data_row >= (header_rows + 1) else (header_rows + 1)
+    ws.print_area = f"A1:{last_col_letter}{last_row}"
+
+def normalize_header(value) -> str:
+    value = "" if value is None else str(value)
+    return re.sub(r"[^a-z0-9]+", "", value.strip().lower())
+
+def resolve_header_label(columns, label):
+    exact_matches = [column for column in columns if column == label]
+    if len(exact_matches) == 1:
+        return exact_matches[0]
+    if len(exact_matches) > 1:
+        raise ValueError(f"Header kolom ambigu: {label}")
+
+    label_text = str(label)
+    display_matches = [column for column in columns if str(column) == label_text]
+    if len(display_matches) == 1:
+        return display_matches[0]
+    if len(display_matches) > 1:
+        raise ValueError(f"Header kolom ambigu: {label_text}")
+
+    return None
+
+def find_duplicate_headers(headers) -> list[str]:
+    seen = set()
+    duplicates = []
+    for header in headers:
+        header_text = str(header)
+        if header_text in seen and header_text not in duplicates:
+            duplicates.append(header_text)
+        seen.add(header_text)
+    return duplicates
+
+def auto_map_columns(template_headers, source_headers):
+    source_by_key = {}
+    for source in source_headers:
+        key = normalize_header(source)
+        if key and key not in source_by_key:
+            source_by_key[key] = source
+
+    return {
+        template: source_by_key.get(normalize_header(template))
+        for template in template_headers
+    }
+
+def validate_column_mapping(template_headers, mapping):
+    mapping = mapping or {}
+    return [
+        template
+        for template in template_headers
+        if not mapping.get(template)
+    ]
+
+def read_sheet_names(path: Path) -> list[str]:
+    import pandas as pd
+
+    with pd.ExcelFile(path) as xls:
+        return list(xls.sheet_names)
+
+
+def read_excel_headers(path: Path, sheet_name: str, header_rows: int) -> list[str]:
+    import pandas as pd
+
+    df = pd.read_excel(path, sheet_name=sheet_name, header=header_rows - 1, nrows=0)
+    return [str(col) for col in df.columns]
+
+
+def read_key_counts(path: Path, sheet_name: str, key_col, source_header_rows: int) -> dict[str, int]:
+    """Return the row count of every key value (as strings), in first-occurrence order.
+
+    Order matches groupby(sort=False): first occurrence wins. NaN values are
+    rendered as the string "nan" to match how they appear in grouping/filenames.
+    """
+    import pandas as pd
+
+    df = pd.read_excel(path, sheet_name=sheet_name, header=source_header_rows - 1, dtype=object)
+    if isinstance(key_col, int):
+        if key_col < 1 or key_col > df.shape[1]:
+            raise ValueError("Index kolom kunci di luar jangkauan DataFrame.")
+        key_series = df.iloc[:, key_col - 1]
+    else:
+        resolved_key_col = resolve_header_label(df.columns, key_col)
+        if resolved_key_col is None:
+            raise ValueError(f"Header kolom kunci '{key_col}' tidak ditemukan.")
+        key_series = df[resolved_key_col]
+
+    counts = {}
+    for value in key_series:
+        text = str(value)
+        counts[text] = counts.get(text, 0) + 1
+    return counts
+
+def read_key_values(path: Path, sheet_name: str, key_col, source_header_rows: int) -> list[str]:
+    """Return the ordered, de-duplicated key values (as strings) for a column."""
+    return list(read_key_counts(path, sheet_name, key_col, source_header_rows))
+
+def read_template_header_cells(path: Path, header_rows: int) -> tuple[list[tuple[str, int]], int]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        headers = []
+        max_col = min(ws.max_column or 1, 500)
+        for col_idx in range(1, max_col + 1):
+            value = ws.cell(row=header_rows, column=col_idx).value
+            if value is not None and str(value).strip() != "":
+                headers.append((str(value).strip(), col_idx))
+        first_col = headers[0][1] if headers else 1
+        return headers, first_col
+    finally:
+        wb.close()
+
+def read_template_headers(path: Path, header_rows: int) -> tuple[list[str], int]:
+    header_cells, first_col = read_template_header_cells(path, header_rows)
+    return [header for header, _ in header_cells], first_col
+
+def detect_excel_header_row(path: Path, sheet_name: str | None = None, max_rows: int = 20) -> int:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.active
+        best_row, best_score = 1, -1
+        scan_limit = min(max_rows, ws.max_row)
+        rows = list(ws.iter_rows(min_row=1, max_row=scan_limit, values_only=True))
+        for offset, row in enumerate(rows):
+            row_number = offset + 1
+            values = [str(value).strip() for value in row if value is not None and str(value).strip()]
+            if not values:
+                continue
+
+            text_count = sum(1 for value in values if re.search(r"[A-Za-z]", value))
+            numeric_count = len(values) - text_count
+            unique_count = len({normalize_header(value) or value.lower() for value in values})
+            next_values = []
+            if offset + 1 < len(rows):
+                next_values = [
+                    str(value).strip()
+                    for value in rows[offset + 1]
+                    if value is not None and str(value).strip()
+                ]
+
+            score = (len(values) * 4) + (text_count * 2) + unique_count
+            if next_values:
+                score += min(len(next_values), len(values))
+            if len(values) == 1:
+                score -= 4
+            if numeric_count > text_count:
+                score -= 3
+
+            if score > best_score:
+                best_row, best_score = row_number, score
+
+        return best_row
+    finally:
+        wb.close()
+
+def find_soffice(explicit_path: str | None = None) -> str | None:
+    """Cari soffice.exe dari explicit, env, PATH, atau lokasi umum."""
+    def _normalize(p):
+        if not p:
+            return None
+        p = str(Path(p))
+        if p.lower().endswith("soffice.exe") and Path(p).exists():
+            return p
+        prog = Path(p) / "soffice.exe"
+        if prog.exists():
+            return str(prog)
+        prog = Path(p) / "program" / "soffice.exe"
+        if prog.exists():
+            return str(prog)
+        return None
+
+    # explicit
+    s = _normalize(explicit_path)
+    if s: return s
+    # env
+    s = _normalize(os.environ.get("LIBREOFFICE_PATH"))
+    if s: return s
+    # PATH
+    s = shutil.which("soffice")
+    if s: return s
+    # lokasi umum
+    common = [
+        r"C:\Program Files\LibreOffice\program\soffice.exe",
+        r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
+        r"C:\PortableApps\LibreOfficePortable\App\libreoffice\program\soffice.exe",
+        r"D:\PortableApps\LibreOfficePortable\App\libreoffice\program\soffice.exe",
+    ]
+    for c in common:
+        if Path(c).exists():
+            return c
+    return None
+
+CANCEL_CHECK_ROWS = 1000
+CANCEL_POLL_SECONDS = 0.2
+_cancel_context = threading.local()
+
+
+class SplitCancelled(Exception):
+    """Raised inside a split stage when the run is cancelled mid-key."""
+
+
+class CancelScope:
+    """Per-run cancellation shared by every split stage.
+
+    The first positive ``stop_requested()`` answer is latched so every stage
+    agrees afterwards. Blocking helpers such as ``run_conversion_command`` find
+    the scope bound to their thread and poll it while they wait.
+    """
+
+    def __init__(self, stop_requested=None):
+        self._stop_requested = stop_requested or (lambda: False)
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def is_cancelled(self) -> bool:
+        if not self._event.is_set() and self._stop_requested():
+            self._event.set()
+        return self._event.is_set()
+
+    def check(self):
+        if self.is_cancelled():
+            raise SplitCancelled()
+
+    @contextmanager
+    def bound(self):
+        previous = getattr(_cancel_context, "scope", None)
+        _cancel_context.scope = self
+        try:
+            yield self
+        finally:
+            _cancel_context.scope = previous
+
+
+def current_cancel_scope() -> CancelScope | None:
+    return getattr(_cancel_context, "scope", None)
+
+
+def run_conversion_command(cmd: list[str], timeout: float | None = None):
+    """Run an office conversion command, killing it if the bound scope is cancelled."""
+    scope = current_cancel_scope()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    started = time.monotonic()
+    try:
+        while True:
+            try:
+                stdout, stderr = proc.communicate(timeout=CANCEL_POLL_SECONDS)
+                break
+            except subprocess.TimeoutExpired:
+                if scope is not None and scope.is_cancelled():
+                    raise SplitCancelled()
+                if timeout is not None and time.monotonic() - started > timeout:
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+    except BaseException:
+        proc.kill()
+        proc.communicate()
+        raise
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+    return stdout, stderr
+
+def export_pdf_via_lo(xlsx_path: Path, soffice_path: str | None = None, profile_dir: Path | None = None):
+    exe = soffice_path or "soffice"
+    cmd = [exe, "--headless"]
+    if profile_dir is not None:
+        cmd.append(f"-env:UserInstallation={Path(profile_dir).resolve().as_uri()}")
+    cmd += ["--convert-to", "pdf", "--outdir", str(xlsx_path.parent), str(xlsx_path)]
+    run_conversion_command(cmd)
+
+
+def conversion_error_message(error: BaseException) -> str:
+    """Short reason for a failed conversion; soffice's stderr when it has one."""
+    if isinstance(error, subprocess.CalledProcessError):
+        stderr = (error.stderr or b"").decode(errors="replace").strip()
+        return stderr or f"soffice keluar dengan kode {error.returncode}"
+    return str(error)
+
+
+DEFAULT_LO_BATCH_SIZE = 20
+
+
+@dataclass(frozen=True)
+class PdfConversionResult:
+    source: Path
+    pdf_path: Path | None = None
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.pdf_path is not None
+
+
+def export_pdfs_via_lo_batch(
+    xlsx_paths, soffice_path: str | None = None, batch_size: int = DEFAULT_LO_BATCH_SIZE,
+    profile_dir: Path | None = None, status_cb=None,
+) -> list[PdfConversionResult]:
+    """Convert many workbooks with one soffice process per batch.
+
+    PDFs are matched back to their workbook by name. When a batch fails, the
+    files it did convert are kept and the rest are retried together; if a
+    batch converts nothing, its files are retried one by one so a single
+    broken workbook cannot fail its neighbours. Returns one result per input,
+    in input order.
+    """
+    if status_cb is None: status_cb = lambda msg: None
+    exe = soffice_path or "soffice"
+    results: dict[Path, PdfConversionResult] = {}
+
+    def convert(batch: list[Path]):
+        by_dir: dict[Path, list[Path]] = {}
+        for path in batch:
+            by_dir.setdefault(path.parent, []).append(path)
+        before = {
+            path: path.with_suffix(".pdf").stat().st_mtime_ns if path.with_suffix(".pdf").exists() else None
+            for path in batch
+        }
+        error = ""
+        for outdir, paths in by_dir.items():
+            cmd = [exe, "--headless"]
+            if profile_dir is not None:
+                cmd.append(f"-env:UserInstallation={Path(profile_dir).resolve().as_uri()}")
+            cmd += ["--convert-to", "pdf", "--outdir", str(outdir)] + [str(path) for path in paths]
+            try:
+                run_conversion_command(cmd)
+            except (subprocess.CalledProcessError, OSError) as e:
+                error = conversion_error_message(e)
+
+        missing = []
+        for path in batch:
+            pdf_path = path.with_suffix(".pdf")
+            if pdf_path.exists() and pdf_path.stat().st_mtime_ns != before[path]:
+                results[path] = PdfConversionResult(source=path, pdf_path=pdf_path)
+            else:
+                missing.append(path)
+        if not missing:
+            return
+        if len(batch) == 1:
+            results[batch[0]] = PdfConversionResult(source=batch[0], message=error or "PDF tidak dibuat.")
+        elif len(missing) < len(batch):
+            status_cb(f"Batch PDF: {len(missing)} file belum terkonversi, mencoba ulang...")
+            convert(missing)
+        else:
+            status_cb(f"Batch PDF gagal untuk {len(batch)} file, konversi satu per satu...")
+            for path in missing:
+                convert([path])
+
+    paths = [Path(path) for path in xlsx_paths]
+    size = max(1, int(batch_size))
+    for start in range(0, len(paths), size):
+        convert(paths[start:start + size])
+    return [results[path] for path in paths]
+
+
+PDF_ENGINE_LO_POOL = "libreoffice-pool"
+DEFAULT_LO_POOL_SIZE = max(1, min(4, os.cpu_count() or 1))
+DEFAULT_LO_JOB_TIMEOUT = 300.0
+LO_SERVER_STARTUP_TIMEOUT = 60.0
+
+
+def _free_local_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LibreOfficeServer:
+    """One long-lived headless soffice instance reachable over a UNO socket.
+
+    Requires the ``uno`` Python bridge that ships with LibreOffice (the
+    ``python3-uno`` package on most Linux distributions).
+    """
+
+    def __init__(self, soffice_path: str | None = None, profile_dir: Path | None = None,
+                 startup_timeout: float = LO_SERVER_STARTUP_TIMEOUT):
+        self.soffice_path = soffice_path or "soffice"
+        self.profile_dir = Path(profile_dir or tempfile.mkdtemp(prefix="excelsplitter-lo-"))
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.desktop = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        try:
+            import uno
+        except ImportError:
+            raise RuntimeError(
+                "Modul Python 'uno' tidak tersedia. Pasang python3-uno atau gunakan PDF Engine 'libreoffice'."
+            )
+        port = _free_local_port()
+        connection = f"socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        cmd = [
+            self.soffice_path, "--headless", "--invisible", "--nologo", "--norestore",
+            "--nodefault", "--nolockcheck",
+            f"-env:UserInstallation={self.profile_dir.resolve().as_uri()}",
+            f"--accept={connection}",
+        ]
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            if not self.alive:
+                raise RuntimeError("LibreOffice server berhenti saat dijalankan.")
+            try:
+                context = resolver.resolve(f"uno:{connection}")
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    self.kill()
+                    raise RuntimeError("LibreOffice server tidak merespons saat dijalankan.")
+                time.sleep(0.25)
+        self.desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def convert(self, xlsx_path: Path, pdf_path: Path):
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def prop(name, value):
+            item = PropertyValue()
+            item.Name, item.Value = name, value
+            return item
+
+        document = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(Path(xlsx_path).resolve())), "_blank", 0, (prop("Hidden", True),)
+        )
+        if document is None:
+            raise RuntimeError(f"LibreOffice tidak dapat membuka {Path(xlsx_path).name}")
+        try:
+            document.storeToURL(
+                uno.systemPathToFileUrl(str(Path(pdf_path).resolve())),
+                (prop("FilterName", "calc_pdf_Export"),),
+            )
+        finally:
+            document.close(True)
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def stop(self):
+        if self.desktop is not None and self.alive:
+            try:
+                self.desktop.terminate()
+                self.process.wait(timeout=10)
+            except Exception:
+                pass
+        self.desktop = None
+        self.kill()
+
+
+class LibreOfficePool:
+    """Pool of long-lived LibreOffice servers converting workbooks in parallel.
+
+    Each instance gets its own user-profile directory. A job that exceeds
+    ``job_timeout`` or whose cancel scope is cancelled kills its instance;
+    dead instances are restarted before they are handed out again, except
+    after a cancel, when they are left for ``close()``.
+    """
+
+    def __init__(self, size: int = DEFAULT_LO_POOL_SIZE, soffice_path: str | None = None,
+                 job_timeout: float | None = DEFAULT_LO_JOB_TIMEOUT, server_factory=None):
+        self.size = max(1, int(size))
+        self.job_timeout = job_timeout
+        self.restarts = 0
+        self._root = Path(tempfile.mkdtemp(prefix="excelsplitter-lo-pool-"))
+        self._factory = server_factory or (lambda profile: LibreOfficeServer(soffice_path, profile))
+        self._servers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+
+    def start(self):
+        try:
+            for index in range(self.size):
+                server = self._factory(self._root / f"instance-{index}")
+                self._servers.append(server)
+                server.start()
+                self._idle.put(server)
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def close(self):
+        for server in self._servers:
+            try:
+                server.stop()
+            except Exception:
+                pass
+        self._servers = []
+        shutil.rmtree(self._root, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _restart(self, server):
+        server.stop()
+        server.start()
+        with self._lock:
+            self.restarts += 1
+
+    def convert(self, xlsx_path: Path) -> Path:
+        xlsx_path = Path(xlsx_path)
+        pdf_path = xlsx_path.with_suffix(".pdf")
+        scope = current_cancel_scope()
+        server = self._idle.get()
+        cancelled = False
+        try:
+            if not server.alive:
+                if scope is not None and scope.is_cancelled():
+                    raise SplitCancelled()
+                self._restart(server)
+            self._run_job(server, xlsx_path, pdf_path)
+            return pdf_path
+        except SplitCancelled:
+            cancelled = True
+            raise
+        finally:
+            # A cancelled run is shutting down: leave the killed server for
+            # close() rather than booting a fresh LibreOffice nobody will use.
+            cancelled = cancelled or (scope is not None and scope.is_cancelled())
+            if not server.alive and not cancelled:
+                try:
+                    self._restart(server)
+                except Exception:
+                    # Left dead; the next job retries the restart.
+                    pass
+            self._idle.put(server)
+
+    def _run_job(self, server, xlsx_path: Path, pdf_path: Path):
+        scope = current_cancel_scope()
+        done = threading.Event()
+        reason = {}
+
+        def watch():
+            started = time.monotonic()
+            while not done.wait(CANCEL_POLL_SECONDS):
+                if scope is not None and scope.is_cancelled():
+                    reason["why"] = "cancelled"
+                elif self.job_timeout and time.monotonic() - started > self.job_timeout:
+                    reason["why"] = "timeout"
+                else:
+                    continue
+                server.kill()
+                return
+
+        watcher = threading.Thread(target=watch, name="lo-pool-watchdog", daemon=True)
+        watcher.start()
+        try:
+            server.convert(xlsx_path, pdf_path)
+        except Exception as e:
+            if reason.get("why") == "cancelled":
+                raise SplitCancelled()
+            if reason.get("why") == "timeout":
+                raise TimeoutError(f"Konversi PDF melebihi {self.job_timeout:g} detik: {xlsx_path.name}")
+            raise RuntimeError(f"LibreOffice server gagal mengonversi {xlsx_path.name}: {e}")
+        finally:
+            done.set()
+            watcher.join()
+        if reason.get("why") == "cancelled":
+            raise SplitCancelled()
+
+def cleanup_excel_com():
+    """Clean up Excel COM objects and release resources"""
+    try:
+        # Try to release any existing COM objects
+        import gc
+        import pythoncom
+
+        # Force garbage collection
+        gc.collect()
+
+        # Uninitialize COM
+        try:
+            pythoncom.CoUninitialize()
+        except:
+            pass
+
+        # Re-initialize COM for next use
+        try:
+            pythoncom.CoInitialize()
+        except:
+            pass
+
+    except ImportError:
+        # pythoncom not available, try basic cleanup
+        import gc
+        gc.collect()
+    except:
+        pass
+
+def debug_excel_detection():
+    """Debug function to check Excel detection methods"""
+    results = []
+
+    results.append(f"XLWINGS_AVAILABLE: {xlwings_available()}")
+
+    # Test Method 1: xlwings
+    if xlwings_available():
+        try:
+            import xlwings as xw
+            app = xw.App(visible=False, add_book=False)
+            if app is not None:
+                app.quit()
+                results.append("Method 1 (xlwings): SUCCESS")
+            else:
+                results.append("Method 1 (xlwings): FAILED - app is None")
+        except Exception as e:
+            results.append(f"Method 1 (xlwings): FAILED - {str(e)}")
+    else:
+        results.append("Method 1 (xlwings): SKIPPED - xlwings not available")
+
+    # Test Method 2: win32com.client.Dispatch
+    try:
+        import win32com.client
+        excel = win32com.client.Dispatch("Excel.Application")
+        excel.Visible = False
+        excel.Quit()
+        del excel
+        results.append("Method 2 (win32com Dispatch): SUCCESS")
+    except Exception as e:
+        results.append(f"Method 2 (win32com Dispatch): FAILED - {str(e)}")
+
+    # Test Method 3: win32com.client.gencache.EnsureDispatch
+    try:
+        import win32com.client
+        excel = win32com.client.gencache.EnsureDispatch("Excel.Application")
+        excel.Visible = False
+        excel.Quit()
+        del excel
+        results.append("Method 3 (win32com EnsureDispatch): SUCCESS")
+    except Exception as e:
+        results.append(f"Method 3 (win32com EnsureDispatch): FAILED - {str(e)}")
+
+    # Test Method 4: Registry check
+    try:
+        import winreg
+        found_keys = []
+        key_paths = [
+            r"SOFTWARE\Microsoft\Office\ClickToRun\Configuration",
+            r"SOFTWARE\Microsoft\Office\16.0\Excel\InstallRoot",
+            r"SOFTWARE\Microsoft\Office\15.0\Excel\InstallRoot",
+            r"SOFTWARE\Microsoft\Office\14.0\Excel\InstallRoot",
+            r"SOFTWARE\WOW6432Node\Microsoft\Office\16.0\Excel\InstallRoot",
+            r"SOFTWARE\WOW6432Node\Microsoft\Office\15.0\Excel\InstallRoot",
+            r"SOFTWARE\WOW6432Node\Microsoft\Office\14.0\Excel\InstallRoot",
+        ]
+
+        for key_path in key_paths:
+            try:
+                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path)
+                winreg.CloseKey(key)
+                found_keys.append(key_path)
+            except:
+                continue
+
+        if found_keys:
+            results.append(f"Method 4 (Registry): Found {len(found_keys)} keys: {found_keys}")
+        else:
+            results.append("Method 4 (Registry): No Excel keys found")
+
+    except ImportError:
+        results.append("Method 4 (Registry): SKIPPED - winreg not available")
+    except Exception as e:
+        results.append(f"Method 4 (Registry): FAILED - {str(e)}")
+
+    return results
+
+def check_excel_availability():
+    """Check if Microsoft Excel is available for COM automation"""
+    try:
+        # Method 1: Try xlwings first (most reliable for xlwings usage)
+        if xlwings_available():
+            try:
+                import xlwings as xw
+                app = xw.App(visible=False, add_book=False)
+                if app is not None:
+                    app.quit()
+                    return True
+            except Exception:
+                pass
+
+        # Method 2: Try win32com.client
+        try:
+            import win32com.client
+            excel = win32com.client.Dispatch("Excel.Application")
+            excel.Visible = False
+            excel.Quit()
+            del excel
+            return True
+        except Exception:
+            pass
+
+        # Method 3: Try alternative COM approach
+        try:
+            import win32com.client
+            excel = win32com.client.gencache.EnsureDispatch("Excel.Application")
+            excel.Visible = False
+            excel.Quit()
+            del excel
+            return True
+        except Exception:
+            pass
+
+        # Method 4: Check registry for Excel installation
+        try:
+            import winreg
+            key_paths = [
+                r"SOFTWARE\Microsoft\Office\ClickToRun\Configuration",
+                r"SOFTWARE\Microsoft\Office\16.0\Excel\InstallRoot",
+                r"SOFTWARE\Microsoft\Office\15.0\Excel\InstallRoot",
+                r"SOFTWARE\Microsoft\Office\14.0\Excel\InstallRoot",
+                r"SOFTWARE\WOW6432Node\Microsoft\Office\16.0\Excel\InstallRoot",
+                r"SOFTWARE\WOW6432Node\Microsoft\Office\15.0\Excel\InstallRoot",
+                r"SOFTWARE\WOW6432Node\Microsoft\Office\14.0\Excel\InstallRoot",
+            ]
+
+            for key_path in key_paths:
+                try:
+                    key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path)
+                    winreg.CloseKey(key)
+                    # Found Excel in registry, but still need to test COM
+                    try:
+                        import win32com.client
+                        excel = win32com.client.Dispatch("Excel.Application")
+                        excel.Visible = False
+                        excel.Quit()
+                        return True
+                    except:
+                        pass
+                except:
+                    continue
+        except ImportError:
+            pass  # winreg not available
+        except Exception:
+            pass
+
+        return False
+
+    except Exception:
+        return False
+    finally:
+        # Clean up after test
+        try:
+            cleanup_excel_com()
+        except:
+            pass
+
+def export_pdf_via_xlwings(xlsx_path: Path):
+    """Export Excel to PDF using xlwings (requires Excel installed on Windows)"""
+    if not xlwings_available():
+        raise RuntimeError("xlwings belum terpasang. Jalankan: pip install xlwings")
+    import xlwings as xw
+
+    # Clean up COM objects only (safe cleanup)
+    cleanup_excel_com()
+
+    # Check if Excel is available before proceeding
+    if not check_excel_availability():
+        raise RuntimeError("Microsoft Excel tidak terinstall atau tidak dapat diakses. "
+                          "Gunakan PDF Engine 'libreoffice' atau 'none' sebagai alternatif.")
+
+    pdf_path = xlsx_path.with_suffix(".pdf")
+
+    # Use xlwings with invisible Excel application
+    app = None
+    wb = None
+    try:
+        # Create Excel application instance (invisible)
+        app = xw.App(visible=False, add_book=False)
+
+        # Verify app was created successfully
+        if app is None:
+            raise RuntimeError("Failed to create Excel application instance")
+
+        # Open the workbook
+        wb = app.books.open(str(xlsx_path))
+
+        if wb is None:
+            raise RuntimeError(f"Failed to open workbook: {xlsx_path}")
+
+        # Get the active worksheet
+        ws = wb.sheets.active
+
+        if ws is None:
+            raise RuntimeError("Failed to get active worksheet")
+
+        # Export to PDF with Excel's native formatting
+        # This preserves all Excel formatting, styles, colors, etc.
+        ws.to_pdf(str(pdf_path))
+
+        # Verify PDF was created
+        if not pdf_path.exists():
+            raise RuntimeError(f"PDF was not created: {pdf_path}")
+
+    except Exception as e:
+        # More detailed error reporting
+        error_details = str(e)
+        if "apps" in error_details.lower() or "nonetype" in error_details.lower():
+            error_details = ("Excel COM interface tidak dapat diakses. "
+                           "Pastikan Microsoft Excel terinstall dan tidak sedang digunakan aplikasi lain. "
+                           "Alternatif: gunakan PDF Engine 'libreoffice' atau 'none'.")
+        raise RuntimeError(f"Gagal export PDF via xlwings: {error_details}")
+    finally:
+        # Clean up: close workbook and quit Excel
+        if wb is not None:
+            try:
+                wb.close()
+            except:
+                pass
+        if app is not None:
+            try:
+                app.quit()
+            except:
+                pass
+
+        # Safe COM cleanup only after each PDF export
+        cleanup_excel_com()
+
+        # Give a moment for cleanup to complete
+        import time
+        time.sleep(0.5)
+
+
+# ----------------- Native PDF -----------------
+
+PDF_ENGINE_NATIVE = "native"
+NATIVE_PAPER_SIZES = {1: (612.0, 792.0), 5: (612.0, 1008.0), 9: (595.28, 841.89)}
+NATIVE_CELL_PADDING = 2.0
+_NATIVE_FONT_FAMILIES = {
+    "helvetica": ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique"),
+    "times": ("Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic"),
+    "courier": ("Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique"),
+}
+_NATIVE_BORDER_WIDTHS = {"hair": 0.25, "thin": 0.5, "medium": 1.0, "thick": 1.5, "double": 1.5}
+_DATE_FORMAT_TOKENS = re.compile(r'yyyy|yy|mmmm|mmm|mm|m|dddd|ddd|dd|d|hh|h|ss|s|am/pm|"[^"]*"|\\.|.', re.I)
+
+
+def _excel_date_pattern(number_format: str) -> str:
+    """Translate an Excel date/time format into a strftime pattern."""
+    tokens = _DATE_FORMAT_TOKENS.findall(re.sub(r"\[[^\]]*\]", "", number_format.split(";")[0]))
+    twelve_hour = any(token.lower() == "am/pm" for token in tokens)
+    parts = []
+    for i, token in enumerate(tokens):
+        low = token.lower()
+        if low in {"mm", "m"}:
+            # "m" after an hour or before seconds means minutes.
+            prev = next((t.lower() for t in reversed(tokens[:i]) if t.strip(" :.")), "")
+            nxt = next((t.lower() for t in tokens[i + 1:] if t.strip(" :.")), "")
+            minutes = prev.startswith("h") or nxt.startswith("s")
+            parts.append("%M" if minutes else "%m")
+        elif low in {"hh", "h"}:
+            parts.append("%I" if twelve_hour else "%H")
+        else:
+            mapping = {
+                "yyyy": "%Y", "yy": "%y", "mmmm": "%B", "mmm": "%b", "dddd": "%A", "ddd": "%a",
+                "dd": "%d", "d": "%d", "ss": "%S", "s": "%S", "am/pm": "%p",
+            }
+            if low in mapping:
+                parts.append(mapping[low])
+            elif token.startswith('"'):
+                parts.append(token[1:-1].replace("%", "%%"))
+            elif token.startswith("\\"):
+                parts.append(token[1:].replace("%", "%%"))
+            else:
+                parts.append(token.replace("%", "%%"))
+    return "".join(parts)
+
+
+def _format_number(value: float, number_format: str) -> str:
+    sections = number_format.split(";")
+    section = sections[0]
+    if value < 0 and len(sections) > 1:
+        section, value = sections[1], -value
+    elif value == 0 and len(sections) > 2:
+        section = sections[2]
+    section = re.sub(r"\[[^\]]*\]|_.|\*.", "", section)
+    section = re.sub(r'"([^"]*)"|\\(.)', lambda m: m.group(1) if m.group(1) is not None else m.group(2), section)
+    value *= 100 ** section.count("%")
+    core = re.search(r"[#0?][#0?,]*(\.[#0?]*)?(E[+-]0+)?", section, re.I)
+    if core is None:
+        return section
+    pattern = core.group(0)
+    decimals = len(core.group(1)) - 1 if core.group(1) else 0
+    if core.group(2):
+        text = f"{value:.{decimals}E}"
+    elif "," in pattern.split(".")[0]:
+        text = f"{value:,.{decimals}f}"
+    else:
+        text = f"{value:.{decimals}f}"
+    return section[:core.start()] + text + section[core.end():]
+
+
+def format_cell_text(value, number_format: str | None = "General") -> str:
+    """Render a cell value the way Excel displays it for common number formats."""
+    if value is None:
+        return ""
+    number_format = number_format or "General"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (datetime, date, dt_time)):
+        from openpyxl.styles.numbers import is_date_format
+
+        if number_format != "General" and is_date_format(number_format):
+            return value.strftime(_excel_date_pattern(number_format))
+        if isinstance(value, datetime) and value.time() == dt_time(0):
+            return value.strftime("%Y-%m-%d")
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, (int, float)):
+        if number_format in {"General", "@"}:
+            if isinstance(value, float) and value.is_integer():
+                return str(int(value))
+            return f"{value:.10g}" if isinstance(value, float) else str(value)
+        return _format_number(value, number_format)
+    return str(value)
+
+
+# Advance widths (1/1000 em) of printable ASCII for the standard PDF fonts.
+# Oblique/italic faces reuse the upright metrics; Courier is fixed-pitch.
+_PDF_ASCII_WIDTHS = {
+    "Helvetica": (
+        "278 278 355 556 556 889 667 191 333 333 389 584 278 333 278 278 556 556 556 556 556 556 556 556 "
+        "556 556 278 278 584 584 584 556 1015 667 667 722 722 667 611 778 722 278 500 667 556 833 722 778 "
+        "667 778 722 667 611 722 667 944 667 667 611 278 278 278 469 556 333 556 556 500 556 556 278 556 "
+        "556 222 222 500 222 833 556 556 556 556 333 500 278 556 500 722 500 500 500 334 260 334 584"
+    ),
+    "Helvetica-Bold": (
+        "278 333 474 556 556 889 722 238 333 333 389 584 278 333 278 278 556 556 556 556 556 556 556 556 "
+        "556 556 333 333 584 584 584 611 975 722 722 722 722 667 611 778 722 278 556 722 611 833 722 778 "
+        "667 778 722 667 611 722 667 944 667 667 611 333 278 333 584 556 333 556 611 556 611 556 333 611 "
+        "611 278 278 556 278 889 611 611 611 611 389 556 333 611 556 778 556 556 500 389 280 389 584"
+    ),
+    "Times-Roman": (
+        "250 333 408 500 500 833 778 180 333 333 500 564 250 333 250 278 500 500 500 500 500 500 500 500 "
+        "500 500 278 278 564 564 564 444 921 722 667 667 722 611 556 722 722 333 389 722 611 889 722 722 "
+        "556 722 667 556 611 722 722 944 722 722 611 333 278 333 469 500 333 444 500 444 500 444 333 500 "
+        "500 278 278 500 278 778 500 500 500 500 333 389 278 500 500 722 500 500 444 480 200 480 541"
+    ),
+    "Times-Bold": (
+        "250 333 555 500 500 1000 833 278 333 333 500 570 250 333 250 278 500 500 500 500 500 500 500 500 "
+        "500 500 333 333 570 570 570 500 930 722 667 722 722 667 611 778 778 389 500 778 667 944 722 778 "
+        "611 778 722 556 667 722 722 1000 722 722 667 333 278 333 581 500 333 500 556 444 556 444 333 500 "
+        "556 278 333 556 278 833 556 500 556 556 444 389 333 556 500 722 500 500 444 394 220 394 520"
+    ),
+}
+_PDF_ASCII_WIDTHS = {name: tuple(int(w) for w in widths.split()) for name, widths in _PDF_ASCII_WIDTHS.items()}
+_PDF_METRIC_ALIASES = {
+    "Helvetica-Oblique": "Helvetica", "Helvetica-BoldOblique": "Helvetica-Bold",
+    "Times-Italic": "Times-Roman", "Times-BoldItalic": "Times-Bold",
+}
+
+
+def pdf_text_width(text: str, font_name: str, size: float) -> float:
+    """Width in points of ``text`` set in one of the standard PDF fonts."""
+    if font_name.startswith("Courier"):
+        return len(text) * 0.6 * size
+    widths = _PDF_ASCII_WIDTHS[_PDF_METRIC_ALIASES.get(font_name, font_name)]
+    total = 0
+    for char in text:
+        code = ord(char)
+        if code > 126:
+            # Accented letters are about as wide as their base letter.
+            code = ord((unicodedata.normalize("NFKD", char) or "?")[0])
+        total += widths[code - 32] if 32 <= code <= 126 else widths[ord("n") - 32]
+    return total * size / 1000
+
+
+def wrap_pdf_text(text: str, font_name: str, size: float, width: float) -> list[str]:
+    """Greedy word wrap of ``text`` to ``width`` points; explicit newlines are kept."""
+    lines = []
+    for paragraph in text.splitlines() or [""]:
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if line and pdf_text_width(candidate, font_name, size) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def _pdf_string(text: str) -> str:
+    encoded = text.encode("cp1252", errors="replace").decode("latin-1")
+    return "(" + encoded.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+class PdfCanvas:
+    """Minimal PDF 1.4 writer using the 14 standard fonts (no embedding).
+
+    Coordinates are PDF points with the origin at the bottom-left of the
+    page. Content streams are Flate-compressed.
+    """
+
+    def __init__(self, path: Path, page_size: tuple[float, float]):
+        self.path = Path(path)
+        self.page_size = page_size
+        self.fonts = {}
+        self.pages = []
+        self.ops = []
+
+    def _fmt(self, *numbers) -> str:
+        return " ".join(f"{n:.3f}".rstrip("0").rstrip(".") or "0" for n in numbers)
+
+    def save_state(self):
+        self.ops.append("q")
+
+    def restore_state(self):
+        self.ops.append("Q")
+
+    def transform(self, scale: float, dx: float, dy: float):
+        self.ops.append(f"{self._fmt(scale, 0, 0, scale, dx, dy)} cm")
+
+    def set_fill_color(self, rgb):
+        self.ops.append(f"{self._fmt(*rgb)} rg")
+
+    def set_stroke_color(self, rgb):
+        self.ops.append(f"{self._fmt(*rgb)} RG")
+
+    def fill_rect(self, x: float, y: float, width: float, height: float):
+        self.ops.append(f"{self._fmt(x, y, width, height)} re f")
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, width: float):
+        self.ops.append(f"{self._fmt(width)} w {self._fmt(x1, y1)} m {self._fmt(x2, y2)} l S")
+
+    def text(self, x: float, y: float, text: str, font_name: str, size: float):
+        font_id = self.fonts.setdefault(font_name, f"F{len(self.fonts) + 1}")
+        self.ops.append(f"BT /{font_id} {self._fmt(size)} Tf {self._fmt(x, y)} Td {_pdf_string(text)} Tj ET")
+
+    def show_page(self):
+        self.pages.append(zlib.compress("\n".join(self.ops).encode("latin-1")))
+        self.ops = []
+
+    def save(self):
+        if self.ops or not self.pages:
+            self.show_page()
+        objects = []
+
+        def add(body: bytes) -> int:
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(b"")
+        pages_id = add(b"")
+        font_refs = " ".join(
+            f"/{font_id} {add(f'<< /Type /Font /Subtype /Type1 /BaseFont /{name} /Encoding /WinAnsiEncoding >>'.encode())} 0 R"
+            for name, font_id in self.fonts.items()
+        )
+        width, height = self.page_size
+        kids = []
+        for stream in self.pages:
+            content = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            kids.append(add(
+                f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {self._fmt(width, height)}] "
+                f"/Resources << /Font << {font_refs} >> >> /Contents {content} 0 R >>".encode()
+            ))
+        objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode()
+        objects[pages_id - 1] = (
+            f"<< /Type /Pages /Kids [{' '.join(f'{kid} 0 R' for kid in kids)}] /Count {len(kids)} >>".encode()
+        )
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+        self.path.write_bytes(bytes(out))
+
+
+def _native_font_name(font) -> str:
+    name = (getattr(font, "name", None) or "").lower()
+    if any(part in name for part in ("courier", "consol", "mono")):
+        family = _NATIVE_FONT_FAMILIES["courier"]
+    elif "times" in name or ("serif" in name and "sans" not in name):
+        family = _NATIVE_FONT_FAMILIES["times"]
+    else:
+        family = _NATIVE_FONT_FAMILIES["helvetica"]
+    return family[(2 if getattr(font, "i", False) else 0) + (1 if getattr(font, "b", False) else 0)]
+
+
+def _native_color(color):
+    rgb = getattr(color, "rgb", None) if getattr(color, "type", None) == "rgb" else None
+    if not isinstance(rgb, str) or len(rgb) < 6:
+        return None
+    rgb = rgb[-6:]
+    return tuple(int(rgb[i:i + 2], 16) / 255 for i in (0, 2, 4))
+
+
+@dataclass(frozen=True)
+class _NativeCellStyle:
+    """The parts of a cell style the native PDF writer draws."""
+
+    font_name: str
+    size: float
+    color: tuple | None
+    fill: tuple | None
+    # (line width, rgb) or None for the top, bottom, left and right edges.
+    borders: tuple
+    horizontal: str | None
+    vertical: str | None
+    wrap: bool
+    number_format: str
+
+
+def _native_cell_style(cell) -> _NativeCellStyle:
+    font = cell.font
+    fill = cell.fill
+    border = cell.border
+    alignment = cell.alignment
+    return _NativeCellStyle(
+        font_name=_native_font_name(font),
+        size=float(font.sz or 11),
+        color=_native_color(font.color),
+        fill=_native_color(fill.fgColor) if fill.fill_type == "solid" else None,
+        borders=tuple(
+            None if side is None or not side.style
+            else (_NATIVE_BORDER_WIDTHS.get(side.style, 0.5), _native_color(side.color) or (0, 0, 0))
+            for side in (border.top, border.bottom, border.left, border.right)
+        ),
+        horizontal=alignment.horizontal,
+        vertical=alignment.vertical,
+        wrap=bool(alignment.wrap_text),
+        number_format=cell.number_format or "General",
+    )
+
+
+class _NativeStyles:
+    """Converts each distinct cell style of a workbook once."""
+
+    def __init__(self):
+        self._styles = {}
+
+    def __call__(self, cell) -> _NativeCellStyle:
+        # Unstyled cells have no style array.
+        key = tuple(cell._style) if cell._style is not None else ()
+        style = self._styles.get(key)
+        if style is None:
+            style = self._styles[key] = _native_cell_style(cell)
+        return style
+
+
+def _native_print_layout(ws):
+    from openpyxl.utils import range_boundaries
+
+    area = ws.print_area
+    if area:
+        area = area.split(",")[0].split("!")[-1].replace("$", "")
+        min_col, min_row, max_col, max_row = range_boundaries(area)
+    else:
+        min_col, min_row, max_col, max_row = 1, 1, max(1, ws.max_column), max(1, ws.max_row)
+    title_rows = []
+    match = re.match(r"\$?(\d+):\$?(\d+)", ws.print_title_rows or "")
+    if match:
+        title_rows = list(range(int(match.group(1)), int(match.group(2)) + 1))
+    return min_col, min_row, max_col, max_row, title_rows
+
+
+class _NativePage:
+    """Column geometry, merges and page setup of a sheet for the native writer."""
+
+    def __init__(self, ws, min_col: int, max_col: int, merged_ranges):
+        from openpyxl.utils import column_index_from_string
+
+        self.columns = list(range(min_col, max_col + 1))
+        default_width = ws.sheet_format.defaultColWidth or (ws.sheet_format.baseColWidth or 8) + 0.43
+        col_chars = {}
+        for dim in ws.column_dimensions.values():
+            width = 0 if dim.hidden else (dim.width if dim.customWidth else None)
+            if width is None:
+                continue
+            first = dim.min or column_index_from_string(dim.index)
+            for idx in range(first, (dim.max or first) + 1):
+                col_chars[idx] = width
+        self.col_widths = {}
+        self.col_left = {}
+        x = 0.0
+        for idx in self.columns:
+            chars = col_chars.get(idx, default_width)
+            self.col_widths[idx] = (chars * 7 + 5) * 0.75 if chars else 0.0
+            self.col_left[idx] = x
+            x += self.col_widths[idx]
+        table_width = x or 1.0
+
+        self.merged = {}
+        self.covered = set()
+        for rng in merged_ranges:
+            self.merged[(rng.min_row, rng.min_col)] = (rng.max_row, rng.max_col)
+            for r in range(rng.min_row, rng.max_row + 1):
+                for c in range(rng.min_col, rng.max_col + 1):
+                    if (r, c) != (rng.min_row, rng.min_col):
+                        self.covered.add((r, c))
+
+        self.default_height = ws.sheet_format.defaultRowHeight or 15.0
+        page_w, page_h = NATIVE_PAPER_SIZES.get(int(ws.page_setup.paperSize or 9), NATIVE_PAPER_SIZES[9])
+        if ws.page_setup.orientation == "landscape":
+            page_w, page_h = page_h, page_w
+        self.page_size = (page_w, page_h)
+        margins = ws.page_margins
+        self.left, right = (margins.left or 0.7) * 72, (margins.right or 0.7) * 72
+        self.top, bottom = (margins.top or 0.75) * 72, (margins.bottom or 0.75) * 72
+        self.scale = min(1.0, (page_w - self.left - right) / table_width)
+        self.usable_height = (page_h - self.top - bottom) / self.scale
+
+    def visible_columns(self, row_idx: int) -> list[int]:
+        if not self.covered:
+            return self.columns
+        return [col_idx for col_idx in self.columns if (row_idx, col_idx) not in self.covered]
+
+    def lay_out_row(self, row_idx: int, cells, height=None, hidden: bool = False):
+        """Return ``(height, entries)`` for one row of ``(col_idx, value, style)`` cells."""
+        entries = []
+        row_height = self.default_height
+        for col_idx, value, style in cells:
+            text = format_cell_text(value, style.number_format)
+            span_row, span_col = self.merged.get((row_idx, col_idx), (row_idx, col_idx))
+            span_col = min(span_col, self.columns[-1])
+            width = self.col_left[span_col] + self.col_widths[span_col] - self.col_left[col_idx]
+            lines = [text] if text else []
+            if text and style.wrap:
+                lines = wrap_pdf_text(text, style.font_name, style.size, max(1.0, width - 2 * NATIVE_CELL_PADDING))
+            if text:
+                row_height = max(row_height, style.size * 1.25 * len(lines) + 2)
+            entries.append((style, value, col_idx, width, span_row, lines))
+        if hidden:
+            row_height = 0.0
+        elif height is not None:
+            row_height = float(height)
+        return row_height, entries
+
+    def write(self, pdf_path: Path, row_layout, titles, body, cancel_scope: CancelScope | None = None) -> Path:
+        """Paginate ``body`` under the repeated ``titles`` rows and write the PDF."""
+        title_height = sum(row_layout(r)[0] for r in titles)
+        pages = []
+        current, used = [], title_height
+        for scanned, row_idx in enumerate(body, start=1):
+            if cancel_scope is not None and scanned % CANCEL_CHECK_ROWS == 0:
+                cancel_scope.check()
+            height = row_layout(row_idx)[0]
+            if current and used + height > self.usable_height:
+                pages.append(current)
+                current, used = [], title_height
+            current.append(row_idx)
+            used += height
+        pages.append(current)
+
+        pdf_path = Path(pdf_path)
+        page_w, page_h = self.page_size
+        pdf = PdfCanvas(pdf_path, self.page_size)
+        for page_rows in pages:
+            pdf.save_state()
+            # Sheet coordinates: origin at the top-left margin, y grows upwards.
+            pdf.transform(self.scale, self.left, page_h - self.top)
+            row_top = {}
+            y = 0.0
+            for row_idx in titles + page_rows:
+                row_top[row_idx] = y
+                y -= row_layout(row_idx)[0]
+            borders = []
+            for row_idx in titles + page_rows:
+                height, cells = row_layout(row_idx)
+                if not height:
+                    continue
+                for style, value, col_idx, width, span_row, lines in cells:
+                    if not width:
+                        continue
+                    span_rows = [r for r in range(row_idx, span_row + 1) if r in row_top]
+                    cell_height = sum(row_layout(r)[0] for r in span_rows)
+                    x0, y_top = self.col_left[col_idx], row_top[row_idx]
+                    y0 = y_top - cell_height
+                    if style.fill:
+                        pdf.set_fill_color(style.fill)
+                        pdf.fill_rect(x0, y0, width, cell_height)
+                    borders.append((style.borders, x0, y0, width, cell_height))
+                    if lines:
+                        _draw_native_text(pdf, style, value, lines, x0, y0, width, cell_height)
+            for sides, x0, y0, width, cell_height in borders:
+                for side, coords in zip(sides, (
+                    (x0, y0 + cell_height, x0 + width, y0 + cell_height),
+                    (x0, y0, x0 + width, y0),
+                    (x0, y0, x0, y0 + cell_height),
+                    (x0 + width, y0, x0 + width, y0 + cell_height),
+                )):
+                    if side is None:
+                        continue
+                    line_width, color = side
+                    pdf.set_stroke_color(color)
+                    pdf.line(*coords, width=line_width)
+            pdf.restore_state()
+            pdf.show_page()
+        pdf.save()
+        return pdf_path
+
+
+def export_pdf_native(workbook, pdf_path: Path, cancel_scope: CancelScope | None = None) -> Path:
+    """Render the active sheet of an in-memory workbook straight to PDF.
+
+    Honours the print area, repeated title rows, column widths, row heights,
+    fonts, fills, borders, alignment, merged cells and number formats. The
+    table is scaled down to fit the page width; charts and images are not
+    drawn.
+    """
+    ws = workbook.active
+    min_col, min_row, max_col, max_row, title_rows = _native_print_layout(ws)
+    page = _NativePage(ws, min_col, max_col, ws.merged_cells.ranges)
+    styles = _NativeStyles()
+    layouts = {}
+
+    def row_layout(row_idx):
+        if row_idx not in layouts:
+            cells = []
+            for col_idx in page.visible_columns(row_idx):
+                cell = ws.cell(row=row_idx, column=col_idx)
+                cells.append((col_idx, cell.value, styles(cell)))
+            dim = ws.row_dimensions[row_idx] if row_idx in ws.row_dimensions else None
+            layouts[row_idx] = page.lay_out_row(
+                row_idx, cells, dim.height if dim is not None else None, dim is not None and dim.hidden,
+            )
+        return layouts[row_idx]
+
+    titles = [r for r in title_rows if r <= max_row]
+    title_set = set(titles)
+    body = [r for r in range(min_row, max_row + 1) if r not in title_set]
+    return page.write(pdf_path, row_layout, titles, body, cancel_scope)
+
+
+class NativePdfLayout:
+    """A split's sheet layout compiled once per run for the native PDF engine.
+
+    Holds the page setup, column widths, the laid-out header rows and the
+    style of the data cells, so ``render`` draws a key's PDF straight from
+    its grouped DataFrame rows instead of building a workbook for it.
+    """
+
+    def __init__(self, ws, header_rows: int, last_col: int, merged_ranges):
+        from openpyxl.cell.cell import Cell
+
+        self.header_rows = header_rows
+        self.page = _NativePage(ws, 1, max(1, last_col), merged_ranges)
+        self.titles = list(range(1, header_rows + 1))
+        self._styles = _NativeStyles()
+        self._default_style = self._styles(Cell(ws))
+        self._header_layouts = {row_idx: self._sheet_row(ws, row_idx) for row_idx in self.titles}
+
+    def _sheet_row(self, ws, row_idx: int):
+        cells = []
+        for col_idx in self.page.visible_columns(row_idx):
+            cell = ws._cells.get((row_idx, col_idx))
+            if cell is None:
+                cells.append((col_idx, None, self._default_style))
+            else:
+                cells.append((col_idx, cell.value, self._styles(cell)))
+        dim = ws.row_dimensions[row_idx] if row_idx in ws.row_dimensions else None
+        return self.page.lay_out_row(
+            row_idx, cells, dim.height if dim is not None else None, dim is not None and dim.hidden,
+        )
+
+    def _data_row(self, row_idx: int, position: int, values):
+        raise NotImplementedError
+
+    def render(self, group, pdf_path: Path, cancel_scope: CancelScope | None = None) -> Path:
+        """Write the PDF of one key from its rows of the split's DataFrame."""
+        import pandas as pd
+
+        layouts = dict(self._header_layouts)
+        body = []
+        start_row = self.header_rows + 1
+        rows = zip(group.index, group.itertuples(index=False, name=None))
+        for offset, (position, row) in enumerate(rows):
+            if cancel_scope is not None and (offset + 1) % CANCEL_CHECK_ROWS == 0:
+                cancel_scope.check()
+            values = ["" if pd.isna(value) else value for value in row]
+            layouts[start_row + offset] = self._data_row(start_row + offset, int(position), values)
+            body.append(start_row + offset)
+        return self.page.write(pdf_path, layouts.__getitem__, self.titles, body, cancel_scope)
+
+
+class TemplateFilePdfLayout(NativePdfLayout):
+    """Native PDF layout of the outputs ``render_template_file_workbook`` builds."""
+
+    def __init__(self, template_bytes: bytes, template_header_rows: int, template_column_indices: list[int]):
+        from openpyxl import load_workbook
+
+        ws = load_workbook(io.BytesIO(template_bytes)).active
+        super().__init__(ws, template_header_rows, max(template_column_indices, default=1), ws.merged_cells.ranges)
+        start_row = template_header_rows + 1
+        self._cells = ws._cells
+        self._value_positions = {col_idx: position for position, col_idx in enumerate(template_column_indices)}
+        # Mapped cells take the template data row's style when it has one,
+        # as the workbook renderer copies it down.
+        self._style_row = {}
+        for col_idx in template_column_indices:
+            cell = self._cells.get((start_row, col_idx))
+            if cell is not None and cell.has_style:
+                self._style_row[col_idx] = self._styles(cell)
+        self._row_dims = {
+            row_idx: (dim.height, dim.hidden) for row_idx, dim in ws.row_dimensions.items() if row_idx >= start_row
+        }
+
+    def _data_row(self, row_idx: int, position: int, values):
+        cells = []
+        for col_idx in self.page.visible_columns(row_idx):
+            cell = self._cells.get((row_idx, col_idx))
+            style = self._default_style if cell is None else self._styles(cell)
+            value_position = self._value_positions.get(col_idx)
+            if value_position is None:
+                value = None if cell is None else cell.value
+            else:
+                value = values[value_position]
+                style = self._style_row.get(col_idx, style)
+            cells.append((col_idx, value, style))
+        height, hidden = self._row_dims.get(row_idx, (None, False))
+        return self.page.lay_out_row(row_idx, cells, height, hidden)
+
+
+class SourceSheetPdfLayout(NativePdfLayout):
+    """Native PDF layout of the outputs ``render_source_template_workbook`` builds.
+
+    Data rows keep their own source row's styles and height; merges are only
+    drawn within the header rows.
+    """
+
+    def __init__(self, source_bytes: bytes, sheet_name: str, source_header_rows: int):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(io.BytesIO(source_bytes))
+        if sheet_name not in wb.sheetnames:
+            raise ValueError(f"Sheet sumber '{sheet_name}' tidak ditemukan.")
+        ws = wb[sheet_name]
+        header_merges = [rng for rng in ws.merged_cells.ranges if rng.max_row <= source_header_rows]
+        super().__init__(ws, source_header_rows, ws.max_column, header_merges)
+        columns = self.page.columns
+        styled_rows = {}
+        for (row_idx, col_idx), cell in ws._cells.items():
+            if row_idx > source_header_rows and col_idx <= columns[-1]:
+                styled_rows.setdefault(row_idx - source_header_rows - 1, {})[col_idx] = self._styles(cell)
+        # Keyed by DataFrame row position; rows styled alike share one tuple.
+        shared = {}
+        self._row_styles = {}
+        for position, styled in styled_rows.items():
+            row = tuple(styled.get(col_idx, self._default_style) for col_idx in columns)
+            self._row_styles[position] = shared.setdefault(row, row)
+        self._plain_row = tuple(self._default_style for _ in columns)
+        self._row_dims = {
+            row_idx - source_header_rows - 1: (dim.height, dim.hidden)
+            for row_idx, dim in ws.row_dimensions.items() if row_idx > source_header_rows
+        }
+
+    def _data_row(self, row_idx: int, position: int, values):
+        count = len(values)
+        cells = [
+            (col_idx, values[i] if i < count else None, style)
+            for i, (col_idx, style) in enumerate(zip(self.page.columns, self._row_styles.get(position, self._plain_row)))
+        ]
+        height, hidden = self._row_dims.get(position, (None, False))
+        return self.page.lay_out_row(row_idx, cells, height, hidden)
+
+
+def _draw_native_text(pdf, style, value, lines, x0, y0, width, height):
+    horizontal = style.horizontal or (
+        "right" if isinstance(value, (int, float, datetime, date)) and not isinstance(value, bool) else "left"
+    )
+    inner = max(0.0, width - 2 * NATIVE_CELL_PADDING)
+    font_name, size = style.font_name, style.size
+    if len(lines) == 1 and pdf_text_width(lines[0], font_name, size) > inner:
+        text = lines[0]
+        if isinstance(value, (int, float, date, dt_time)) and not isinstance(value, bool):
+            # Excel shows #### for numbers and dates that do not fit.
+            lines = ["#" * max(1, int(inner // max(1.0, pdf_text_width("#", font_name, size))))]
+        else:
+            lo, hi = 0, len(text)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if pdf_text_width(text[:mid], font_name, size) <= inner:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            lines = [text[:lo]]
+    leading = size * 1.25
+    block = leading * len(lines)
+    vertical = style.vertical or "bottom"
+    if vertical == "top":
+        baseline = y0 + height - NATIVE_CELL_PADDING - size
+    elif vertical == "center":
+        baseline = y0 + (height + block) / 2 - size
+    else:
+        baseline = y0 + NATIVE_CELL_PADDING + block - leading + size * 0.25
+    pdf.set_fill_color(style.color or (0, 0, 0))
+    for line in lines:
+        if horizontal in {"center", "centerContinuous"}:
+            x = x0 + (width - pdf_text_width(line, font_name, size)) / 2
+        elif horizontal == "right":
+            x = x0 + width - NATIVE_CELL_PADDING - pdf_text_width(line, font_name, size)
+        else:
+            x = x0 + NATIVE_CELL_PADDING
+        pdf.text(x, baseline, line, font_name, size)
+        baseline -= leading
+
+
+class LibreOfficeThreadProfiles:
+    """Per-thread LibreOffice user profiles for concurrent soffice processes."""
+
+    def __init__(self, enabled: bool):
+        # Concurrent soffice processes must not share a user profile.
+        self.root = Path(tempfile.mkdtemp(prefix="excelsplitter-lo-")) if enabled else None
+        self._local = threading.local()
+
+    def path(self) -> Path | None:
+        if self.root is None:
+            return None
+        if not hasattr(self._local, "path"):
+            self._local.path = self.root / threading.current_thread().name
+        return self._local.path
+
+    def cleanup(self):
+        if self.root is not None:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+def export_pdf_with_engine(
+    xlsx_path: Path, pdf_engine: str, soffice_path: str | None = None,
+    profile_dir: Path | None = None, lo_pool: "LibreOfficePool | None" = None,
+):
+    """Convert one saved workbook to a sibling PDF with the given engine."""
+    if pdf_engine == PDF_ENGINE_NATIVE:
+        from openpyxl import load_workbook
+
+        export_pdf_native(
+            load_workbook(xlsx_path), xlsx_path.with_suffix(".pdf"), cancel_scope=current_cancel_scope(),
+        )
+    elif pdf_engine == PDF_ENGINE_LO_POOL:
+        lo_pool.convert(xlsx_path)
+    elif pdf_engine == "libreoffice":
+        if profile_dir is None:
+            export_pdf_via_lo(xlsx_path, soffice_path=soffice_path)
+        else:
+            export_pdf_via_lo(xlsx_path, soffice_path=soffice_path, profile_dir=profile_dir)
+    elif pdf_engine == "xlwings":
+        export_pdf_via_xlwings(xlsx_path)
+    else:
+        raise ValueError(f"PDF engine tidak didukung: {pdf_engine}")
+
+
+# ----------------- Pipeline -----------------
+
+DEFAULT_STAGE_WORKERS = {"render": 1, "serialize": 1, "pdf": 1}
+DEFAULT_PIPELINE_QUEUE_SIZE = 2
+_PIPELINE_END = object()
+
+
+TIMING_PERCENTILES = (50, 90, 95)
+
+
+def timing_percentiles(samples) -> dict[str, float]:
+    """Nearest-rank percentiles and maximum of ``samples`` (seconds)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    result = {
+        f"p{percent}": ordered[max(0, -(-percent * len(ordered) // 100) - 1)]
+        for percent in TIMING_PERCENTILES
+    }
+    result["max"] = ordered[-1]
+    return result
+
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int = 1
+    items: int = 0
+    busy_seconds: float = 0.0
+    # Seconds per item; a batched call is split evenly over its items.
+    durations: list[float] = field(default_factory=list, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, seconds: float, count: int = 1):
+        with self._lock:
+            self.items += count
+            self.busy_seconds += seconds
+            if count > 0:
+                self.durations.extend([seconds / count] * count)
+
+    @property
+    def items_per_second(self) -> float:
+        if self.busy_seconds <= 0:
+            return 0.0
+        return self.items * self.workers / self.busy_seconds
+
+    def percentiles(self) -> dict[str, float]:
+        with self._lock:
+            return timing_percentiles(self.durations)
+
+    def to_dict(self) -> dict:
+        return {
+            "workers": self.workers, "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 6),
+            "items_per_second": round(self.items_per_second, 3),
+            **{name: round(value, 6) for name, value in self.percentiles().items()},
+        }
+
+    def summary(self) -> str:
+        percentiles = self.percentiles()
+        spread = "".join(
+            f", {name} {value * 1000:.0f} ms" for name, value in percentiles.items() if name in {"p50", "p95", "max"}
+        )
+        return (
+            f"Stage {self.name}: {self.items} key(s), {self.busy_seconds:.2f}s busy, "
+            f"{self.items_per_second:.1f} key/s ({self.workers} worker(s)){spread}"
+        )
+
+
+class SplitRunTimings:
+    """Wall time of a split run's one-off phases (source read, partition, template compile)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        labels = {"source_read": "baca sumber", "partition": "partisi", "template_compile": "template"}
+        parts = [f"{labels.get(name, name)} {seconds:.2f}s" for name, seconds in self.phases.items()]
+        return "Waktu: " + ", ".join(parts + [f"total {self.elapsed:.2f}s"])
+
+
+@dataclass
+class SplitThroughput:
+    """Progress snapshot passed to ``throughput_cb`` after every finished key.
+
+    Rates only count keys that were actually generated (reused keys finish
+    instantly), and the ETA divides the rows of the keys still pending by
+    the row rate so one large key left at the end is not under-estimated.
+    """
+
+    total_keys: int
+    completed_keys: int
+    total_rows: int
+    completed_rows: int
+    bytes_written: int
+    elapsed: float
+    generated_keys: int = 0
+    generated_rows: int = 0
+
+    @property
+    def keys_per_second(self) -> float:
+        return self.generated_keys / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.generated_rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> float | None:
+        remaining = max(0, self.total_rows - self.completed_rows)
+        if remaining == 0:
+            return 0.0
+        rate = self.rows_per_second
+        return remaining / rate if rate > 0 else None
+
+
+# ----------------- Events -----------------
+
+EVENT_RUN_STARTED = "run_started"
+EVENT_KEY_STARTED = "key_started"
+EVENT_KEY_FINISHED = "key_finished"
+EVENT_WARNING = "warning"
+EVENT_LOG = "log"
+EVENT_CANCELLED = "cancelled"
+EVENT_FINISHED = "finished"
+EVENT_FAILED = "failed"
+
+
+@dataclass(slots=True)
+class SplitEvent:
+    """One typed event of a split run; ``message`` is its log line, if any."""
+
+    kind: str
+    message: str = ""
+    key: str | None = None
+    data: dict = field(default_factory=dict)
+    time: float = 0.0
+
+    def to_dict(self) -> dict:
+        record = {"time": round(self.time, 6), "kind": self.kind}
+        if self.key is not None:
+            record["key"] = self.key
+        if self.message:
+            record["message"] = self.message
+        record.update(self.data)
+        return record
+
+
+class SplitEventStream:
+    """Fans a run's events out to ``event_cb`` and their messages to ``status_cb``.
+
+    An event is only built when someone takes events, so a run that just
+    logs pays one ``status_cb`` call per message, as before.
+    """
+
+    def __init__(self, event_cb=None, status_cb=None):
+        self.event_cb = event_cb
+        self.status_cb = status_cb
+
+    @property
+    def wants_events(self) -> bool:
+        return self.event_cb is not None
+
+    def emit(self, kind: str, message: str = "", key=None, **data):
+        if self.event_cb is not None:
+            self.event_cb(SplitEvent(kind, message, None if key is None else str(key), data, time.time()))
+        if message and self.status_cb is not None:
+            self.status_cb(message)
+
+    def log(self, message: str):
+        self.emit(EVENT_LOG, message)
+
+    def warning(self, message: str, key=None, **data):
+        self.emit(EVENT_WARNING, message, key, **data)
+
+
+class SplitEventLog:
+    """Appends events to a JSON-lines file; usable as ``event_cb``."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self._file.close()
+        return False
+
+    def __call__(self, event: SplitEvent):
+        line = json.dumps(event.to_dict(), ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+
+def chain_event_callbacks(*callbacks):
+    callbacks = [callback for callback in callbacks if callback is not None]
+    if len(callbacks) <= 1:
+        return callbacks[0] if callbacks else None
+
+    def event_cb(event):
+        for callback in callbacks:
+            callback(event)
+    return event_cb
+
+
+def resolve_stage_workers(stage_workers: dict | None) -> dict[str, int]:
+    workers = dict(DEFAULT_STAGE_WORKERS)
+    for name, count in (stage_workers or {}).items():
+        if name not in workers:
+            raise ValueError(f"Stage pipeline tidak dikenal: {name}")
+        workers[name] = max(1, int(count))
+    return workers
+
+
+def run_pipeline(
+    items, stages, queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE, producer_name: str = "partition",
+    profiler: "SplitProfiler | None" = None,
+):
+    """Run ``items`` through ``stages`` connected by bounded queues.
+
+    ``stages`` is a list of ``(name, fn, workers)`` or ``(name, fn, workers,
+    batch_size)``. Each ``fn`` receives the previous stage's output and returns
+    the next item, or ``None`` to drop it. A batched stage collects up to
+    ``batch_size`` items (fewer at the end of the stream), and its ``fn``
+    receives that list and returns a list of outputs. The producer iterates ``items`` in the calling thread and blocks while the
+    first queue is full, so no more than ``queue_size`` items wait between any
+    two stages. Returns ``(outputs, stats)``; the first stage error is re-raised
+    once every thread has stopped. With a ``profiler`` the stage threads are
+    profiled too.
+    """
+    stages = [tuple(stage) + (1,) * (4 - len(stage)) for stage in stages]
+    if profiler is not None:
+        for name, fn, _, _ in stages:
+            profiler.add_stage(name, fn)
+    abort = threading.Event()
+    errors = []
+    outputs = []
+    queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in stages]
+    stats = [StageStats(producer_name)] + [StageStats(name, workers) for name, _, workers, _ in stages]
+    remaining = [workers for _, _, workers, _ in stages]
+    remaining_lock = threading.Lock()
+
+    def put(q, item):
+        while not abort.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q):
+        while not abort.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _PIPELINE_END
+
+    def fail(exc):
+        errors.append(exc)
+        abort.set()
+
+    def work(index):
+        _, fn, _, batch_size = stages[index]
+        in_q = queues[index]
+        out_q = queues[index + 1] if index + 1 < len(stages) else None
+
+        def emit(result):
+            if result is None:
+                return True
+            if out_q is None:
+                outputs.append(result)
+                return True
+            return put(out_q, result)
+
+        try:
+            ended = False
+            while not ended:
+                item = get(in_q)
+                if item is _PIPELINE_END:
+                    break
+                if batch_size <= 1:
+                    started = time.perf_counter()
+                    result = fn(item)
+                    stats[index + 1].record(time.perf_counter() - started)
+                    if not emit(result):
+                        break
+                    continue
+                batch = [item]
+                while len(batch) < batch_size:
+                    item = get(in_q)
+                    if item is _PIPELINE_END:
+                        ended = True
+                        break
+                    batch.append(item)
+                started = time.perf_counter()
+                results = fn(batch) or []
+                stats[index + 1].record(time.perf_counter() - started, count=len(batch))
+                if not all(emit(result) for result in results):
+                    break
+        except BaseException as exc:
+            fail(exc)
+        finally:
+            with remaining_lock:
+                remaining[index] -= 1
+                last_worker = remaining[index] == 0
+            if last_worker and out_q is not None:
+                for _ in range(stages[index + 1][2]):
+                    put(out_q, _PIPELINE_END)
+
+    def run_worker(index):
+        if profiler is None:
+            return work(index)
+        with profiler.thread():
+            work(index)
+
+    threads = [
+        threading.Thread(target=run_worker, args=(index,), name=f"split-{name}-{n}", daemon=True)
+        for index, (name, _, workers, _) in enumerate(stages)
+        for n in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        iterator = iter(items)
+        while not abort.is_set():
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            stats[0].record(time.perf_counter() - started)
+            if not put(queues[0], item):
+                break
+    except BaseException as exc:
+        fail(exc)
+    finally:
+        for _ in range(stages[0][2]):
+            put(queues[0], _PIPELINE_END)
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+    return outputs, stats
+
+
+def remove_partial_outputs(xlsx_path: Path | None):
+    """Delete the workbook/PDF of a key that did not finish."""
+    if xlsx_path is None:
+        return
+    for path in (xlsx_path, xlsx_path.with_suffix(".pdf")):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@dataclass(eq=False)
+class _KeyTask:
+    position: int
+    key: object
+    rows: int = 0
+    group: object = None
+    workbook: object = None
+    xlsx_path: Path | None = None
+    reused: bool = False
+    started: float = 0.0
+    stage_seconds: dict = field(default_factory=dict)
+
+
+# ----------------- Incremental manifest -----------------
+
+SPLIT_MANIFEST_NAME = "_split_manifest.json"
+SPLIT_MANIFEST_VERSION = 1
+
+
+def load_split_manifest(out_dir: Path) -> dict:
+    """Return the per-key entries recorded in ``out_dir``, or {} if there are none."""
+    try:
+        data = json.loads((Path(out_dir) / SPLIT_MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != SPLIT_MANIFEST_VERSION:
+        return {}
+    keys = data.get("keys")
+    return keys if isinstance(keys, dict) else {}
+
+
+def write_split_manifest(out_dir: Path, entries: dict):
+    path = Path(out_dir) / SPLIT_MANIFEST_NAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    payload = {"version": SPLIT_MANIFEST_VERSION, "keys": entries}
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+# ----------------- Run report -----------------
+
+SPLIT_REPORT_NAME = "_split_report.json"
+SPLIT_REPORT_VERSION = 1
+
+
+def write_split_report(out_dir: Path, report: dict) -> Path:
+    """Write a run's timing report next to its outputs."""
+    path = Path(out_dir) / SPLIT_REPORT_NAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+# ----------------- Memory accounting -----------------
+
+MEMORY_SAMPLE_SECONDS = 0.2
+MEMORY_WARN_FRACTION = 0.8
+MEMORY_TOP_KEYS = 5
+MEMORY_TOP_PACKAGES = 6
+_MB = 1024 * 1024
+
+
+def process_rss_bytes() -> int | None:
+    """Current resident set size of this process, or None when it cannot be read."""
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            get_info = ctypes.windll.psapi.GetProcessMemoryInfo
+            get_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+            if get_info(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except (AttributeError, OSError):
+            pass
+        return None
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (ImportError, OSError):
+        return None
+    # Only the peak is available here (kilobytes, bytes on macOS).
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _allocation_package(filename: str) -> str:
+    parts = Path(filename).parts
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts and parts.index(marker) + 1 < len(parts):
+            return parts[parts.index(marker) + 1].split(".")[0]
+    if filename.startswith("<frozen importlib"):
+        return "imports"
+    if filename.startswith("<") or filename.startswith(sys.base_prefix):
+        return "stdlib"
+    return Path(filename).stem
+
+
+class SplitMemoryMonitor:
+    """Samples process RSS in the background and warns as it nears ``budget_mb``.
+
+    With ``trace`` the run also goes through tracemalloc: each phase records
+    its traced peak and a snapshot of everything allocated when it ends,
+    grouped by package (pandas/numpy vs openpyxl ...), and every rendered key
+    records the memory its workbook holds. Per-key numbers are approximate while other
+    stages allocate in parallel.
+    """
+
+    def __init__(self, trace: bool = False, budget_mb: float | None = None, status_cb=None,
+                 interval: float = MEMORY_SAMPLE_SECONDS):
+        self.trace = trace
+        self.budget_mb = budget_mb
+        self.status_cb = status_cb or (lambda msg: None)
+        self.interval = interval
+        self.peak_rss = None
+        self.phases: dict[str, dict] = {}
+        self.keys: list[tuple[int, str, int]] = []
+        self._warned = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="split-memory", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> int | None:
+        rss = process_rss_bytes()
+        if rss is None:
+            return None
+        with self._lock:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        if self.budget_mb:
+            used_mb = rss / _MB
+            if used_mb >= self.budget_mb and "over" not in self._warned:
+                self._warned.update({"near", "over"})
+                self.status_cb(f"Peringatan memori: {used_mb:.0f} MB, melewati batas {self.budget_mb:g} MB.")
+            elif used_mb >= self.budget_mb * MEMORY_WARN_FRACTION and "near" not in self._warned:
+                self._warned.add("near")
+                self.status_cb(
+                    f"Peringatan memori: {used_mb:.0f} MB dipakai, mendekati batas {self.budget_mb:g} MB."
+                )
+        return rss
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.trace:
+            yield
+            self.sample()
+            return
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            by_package = {}
+            for stat in tracemalloc.take_snapshot().statistics("filename"):
+                package = _allocation_package(stat.traceback[0].filename)
+                by_package[package] = by_package.get(package, 0) + stat.size
+            top = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:MEMORY_TOP_PACKAGES]
+            rss = self.sample()
+            self.phases[name] = {
+                "traced_peak_mb": round((peak - before) / _MB, 3),
+                "retained_mb": round((current - before) / _MB, 3),
+                "rss_mb": round(rss / _MB, 3) if rss is not None else None,
+                "allocated_by_package_mb": {package: round(size / _MB, 3) for package, size in top},
+            }
+
+    def measure_key(self, key, rows: int, fn):
+        """Run ``fn`` (one key's render) and record the memory it leaves allocated."""
+        if not self.trace:
+            return fn()
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        with self._lock:
+            self.keys.append((retained, str(key), rows))
+        return result
+
+    def largest_keys(self) -> list[dict]:
+        with self._lock:
+            ordered = sorted(self.keys, reverse=True)[:MEMORY_TOP_KEYS]
+        return [{"key": key, "rows": rows, "mb": round(size / _MB, 3)} for size, key, rows in ordered]
+
+    def to_dict(self) -> dict:
+        return {
+            "peak_rss_mb": round(self.peak_rss / _MB, 3) if self.peak_rss is not None else None,
+            "budget_mb": self.budget_mb,
+            "budget_warned": bool(self._warned),
+            "traced": self.trace,
+            "phases": self.phases,
+            "largest_keys": self.largest_keys(),
+        }
+
+    def summary(self) -> str:
+        parts = [f"puncak RSS {self.peak_rss / _MB:.0f} MB" if self.peak_rss is not None else "RSS tidak tersedia"]
+        labels = {"source_read": "baca sumber", "partition": "partisi", "template_compile": "template"}
+        for name, phase in self.phases.items():
+            parts.append(f"{labels.get(name, name)} +{phase['traced_peak_mb']:.1f} MB")
+        largest = ", ".join(f"{item['key']} ({item['mb']:.1f} MB)" for item in self.largest_keys())
+        if largest:
+            parts.append(f"key terbesar: {largest}")
+        return "Memori: " + "; ".join(parts)
+
+
+# ----------------- Profiling -----------------
+
+SPLIT_PROFILE_NAME = "_split_profile.prof"
+SPLIT_PROFILE_SUMMARY_NAME = "_split_profile.txt"
+PROFILE_TOP_FUNCTIONS = 30
+
+
+class SplitProfiler:
+    """Deterministic (cProfile) profile of a split run, pipeline threads included.
+
+    Before Python 3.12 cProfile only sees the thread that enabled it, so each
+    pipeline thread gets its own profile; from 3.12 the calling thread's
+    profile sees every thread and a second one cannot be enabled. Time is
+    attributed to a stage through the cumulative time of its function.
+    """
+
+    def __init__(self, top: int = PROFILE_TOP_FUNCTIONS):
+        self.top = top
+        self._profiles: list[cProfile.Profile] = []
+        self._stage_funcs: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def begin(self):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: the profile already running covers this thread.
+            return
+        with self._lock:
+            self._profiles.append(profile)
+        self._local.profile = profile
+
+    def end(self):
+        profile = getattr(self._local, "profile", None)
+        if profile is not None:
+            profile.disable()
+            self._local.profile = None
+
+    @contextmanager
+    def thread(self):
+        self.begin()
+        try:
+            yield
+        finally:
+            self.end()
+
+    def add_stage(self, name: str, fn):
+        code = getattr(fn, "__code__", None)
+        if code is not None:
+            self._stage_funcs[name] = (code.co_filename, code.co_firstlineno, code.co_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        # A failed run leaves the calling thread's profile running.
+        self.end()
+        return False
+
+    def stats(self, stream=None) -> pstats.Stats:
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            raise ValueError("Tidak ada profil yang direkam.")
+        return pstats.Stats(*profiles, stream=stream)
+
+    def stage_times(self) -> dict[str, float]:
+        """Cumulative seconds spent in each stage's function, over all its threads."""
+        entries = self.stats().stats
+        return {
+            name: round(entries[func][3], 6) if func in entries else 0.0
+            for name, func in self._stage_funcs.items()
+        }
+
+    def write(self, out_dir: Path, phases: dict[str, float] | None = None) -> tuple[Path, Path]:
+        """Write the merged profile and a text summary; returns both paths."""
+        prof_path = Path(out_dir) / SPLIT_PROFILE_NAME
+        self.stats().dump_stats(prof_path)
+
+        text = io.StringIO()
+        text.write("Split profile (cProfile)\n\nTime per stage:\n")
+        for name, seconds in (phases or {}).items():
+            text.write(f"  {name:<18} {seconds:9.3f}s\n")
+        for name, seconds in self.stage_times().items():
+            text.write(f"  {name:<18} {seconds:9.3f}s  (all threads)\n")
+        for order, title in (("cumulative", "cumulative time"), ("tottime", "own time")):
+            text.write(f"\nTop {self.top} functions by {title}:\n")
+            self.stats(stream=text).sort_stats(order).print_stats(self.top)
+        summary_path = Path(out_dir) / SPLIT_PROFILE_SUMMARY_NAME
+        summary_path.write_text(text.getvalue(), encoding="utf-8")
+        return prof_path, summary_path
+
+
+def split_options_digest(options: dict, template_bytes: bytes | None = None) -> bytes:
+    """Digest of everything besides the key's rows that shapes its output."""
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+    if template_bytes is not None:
+        digest.update(template_bytes)
+    return digest.digest()
+
+
+def source_template_layout_digest(source_bytes: bytes, sheet_name: str, source_header_rows: int) -> bytes:
+    """Digest of what a source-template output copies from the sheet besides its data rows.
+
+    Covers the header/title rows (values, styles, heights), merges, column
+    widths and the page/print setup; the data rows are hashed per key.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.xml.functions import tostring
+
+    wb = load_workbook(io.BytesIO(source_bytes))
+    if sheet_name not in wb.sheetnames:
+        return b""
+    ws = wb[sheet_name]
+    digest = hashlib.sha256()
+
+    def add(*values):
+        # Style and print objects go in as XML; some of their reprs embed ids.
+        for value in values:
+            if hasattr(value, "to_tree"):
+                value = tostring(value.to_tree())
+            digest.update(repr(value).encode("utf-8"))
+
+    for row in ws.iter_rows(min_row=1, max_row=source_header_rows):
+        for cell in row:
+            add(
+                cell.coordinate, cell.value, cell.font, cell.fill, cell.border,
+                cell.alignment, cell.number_format, cell.protection,
+            )
+    for row_idx in range(1, source_header_rows + 1):
+        if row_idx in ws.row_dimensions:
+            dimension = ws.row_dimensions[row_idx]
+            add("row", row_idx, dimension.height, dimension.hidden)
+    add("merged", sorted(str(cell_range) for cell_range in ws.merged_cells.ranges))
+    for letter, dimension in sorted(ws.column_dimensions.items()):
+        add("column", letter, dimension.width, dimension.hidden, dimension.min, dimension.max)
+    add(
+        "print", ws.page_setup, ws.print_options, ws.page_margins, ws.HeaderFooter,
+        ws.sheet_properties.pageSetUpPr, ws.freeze_panes,
+    )
+    return digest.digest()
+
+
+def split_row_hashes(df):
+    import pandas as pd
+
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def split_key_digests(df, groups, options_digest: bytes, row_hashes=None) -> dict:
+    """Map ``str(key)`` to a hash of that key's rows and the options digest."""
+    if row_hashes is None:
+        row_hashes = split_row_hashes(df)
+    digests = {}
+    for key_val, indices in groups.indices.items():
+        digest = hashlib.sha256(options_digest)
+        digest.update(row_hashes[indices].tobytes())
+        digests[str(key_val)] = digest.hexdigest()
+    return digests
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_entry_intact(out_dir: Path, entry, digest: str, verify_checksums: bool = False) -> bool:
+    """Whether ``entry`` matches ``digest`` and its recorded files are still on disk.
+
+    With ``verify_checksums`` each file is also re-hashed against the
+    checksum recorded when the key completed.
+    """
+    if not isinstance(entry, dict) or entry.get("hash") != digest:
+        return False
+    files = entry.get("files") or []
+    if not files or not all((Path(out_dir) / name).is_file() for name in files):
+        return False
+    if verify_checksums:
+        checksums = entry.get("sha256") or {}
+        return all(
+            name in checksums and file_sha256(Path(out_dir) / name) == checksums[name]
+            for name in files
+        )
+    return True
+
+
+SPLIT_JOURNAL_NAME = "_split_journal.jsonl"
+
+
+class SplitJournal:
+    """Append-only checkpoint log of the keys a split run has completed.
+
+    One JSON line per key is flushed and fsynced as soon as the key's
+    outputs are written, so a crashed or killed run can be resumed from the
+    last completed key. Entries use the manifest format plus ``key``.
+    """
+
+    def __init__(self, out_dir: Path, resume: bool = False):
+        self.path = Path(out_dir) / SPLIT_JOURNAL_NAME
+        torn = resume and self.path.exists() and not self.path.read_bytes().endswith(b"\n")
+        self._handle = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if torn and self.path.stat().st_size:
+            self._handle.write("\n")
+
+    @staticmethod
+    def load(path: Path) -> dict:
+        entries = {}
+        try:
+            lines = Path(path).read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return entries
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-write.
+                continue
+            if isinstance(record, dict) and "key" in record:
+                entries[str(record.pop("key"))] = record
+        return entries
+
+    def append(self, key, entry: dict):
+        self._handle.write(json.dumps({"key": str(key), **entry}, ensure_ascii=False) + "\n")
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self, discard: bool = False):
+        if not self._handle.closed:
+            self._handle.close()
+        if discard:
+            self.path.unlink(missing_ok=True)
+
+
+def _clean_template_workbook(wb, ws):
+    # Comprehensive cleanup to eliminate all Excel repair warnings
+    try:
+        # 1. Remove all named ranges (common cause of repair warnings)
+        if hasattr(wb, 'defined_names'):
+            wb.defined_names = {}
+
+        # 2. Remove external links
+        if hasattr(wb, '_external_links') and wb._external_links:
+            wb._external_links.clear()
+
+        # 3. Remove external link relationships
+        if hasattr(wb, '_external_link_rels'):
+            wb._external_link_rels.clear()
+
+        # 4. Remove all drawings completely (they often cause repair issues)
+        if hasattr(ws, '_drawings'):
+            ws._drawings = []
+
+        # 5. Clean up worksheet-level named ranges
+        if hasattr(ws, 'defined_names'):
+            ws.defined_names = []
+
+        # 6. Remove external link parts from the package
+        try:
+            from openpyxl.packaging.relationship import Relationship
+            if hasattr(wb, '_rels'):
+                # Remove external link relationships
+                rels_to_remove = []
+                for rel in wb._rels:
+                    if ('externalLink' in str(rel.target) or
+                        'externalLinks' in str(rel.target) or
+                        'drawing' in str(rel.target).lower()):
+                        rels_to_remove.append(rel)
+                for rel in rels_to_remove:
+                    wb._rels.remove(rel)
+        except:
+            pass
+
+        # 7. Clean up any hyperlinks that might reference external data
+        for row in ws.iter_rows():
+            for cell in row:
+                if cell.hyperlink:
+                    cell.hyperlink = None
+
+    except Exception as cleanup_e:
+        # If cleanup fails, continue anyway
+        pass
+
+
+def render_source_template_workbook(
+    source_bytes: bytes, sheet_name: str, source_header_rows: int, group_index,
+    cancel_scope: CancelScope | None = None,
+):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(source_bytes))
+    if sheet_name not in wb.sheetnames:
+        raise ValueError(f"Sheet sumber '{sheet_name}' tidak ditemukan.")
+
+    for sheet in list(wb.worksheets):
+        if sheet.title != sheet_name:
+            wb.remove(sheet)
+
+    ws = wb[sheet_name]
+    start_row = source_header_rows + 1
+    keep_rows = {int(idx) + start_row for idx in group_index}
+    # Delete non-kept data rows in contiguous runs (bottom-up) so each
+    # delete_rows call removes a block instead of a single row.
+    run_end = None
+    for scanned, row_idx in enumerate(range(ws.max_row, start_row - 1, -1), start=1):
+        if cancel_scope is not None and scanned % CANCEL_CHECK_ROWS == 0:
+            cancel_scope.check()
+        if row_idx not in keep_rows:
+            if run_end is None:
+                run_end = row_idx
+        elif run_end is not None:
+            ws.delete_rows(row_idx + 1, run_end - row_idx)
+            run_end = None
+    if run_end is not None:
+        ws.delete_rows(start_row, run_end - start_row + 1)
+
+    set_print_titles_and_area(ws, source_header_rows, ws.max_column, ws.max_row)
+    return wb
+
+
+def render_template_file_workbook(
+    template_bytes: bytes, group, template_header_rows: int,
+    template_column_indices: list[int], templ_col_start: int,
+    cancel_scope: CancelScope | None = None,
+):
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(template_bytes))
+    ws = wb.active
+    start_row = template_header_rows + 1
+    _clean_template_workbook(wb, ws)
+
+    values = [
+        ["" if pd.isna(value) else value for value in row]
+        for row in group.itertuples(index=False, name=None)
+    ]
+
+    # Copy formatting from template row to data rows
+    # Use the first data row from template as formatting template
+    template_row = start_row  # This should be the first data row in template
+
+    # Capture the template-row style objects once per workbook. Reading a
+    # cell's style returns a StyleProxy, so copy once at capture time into
+    # real style objects; assigning those shared objects to many cells reuses
+    # one style instead of copying per cell.
+    style_src = {}
+    for col_idx in template_column_indices:
+        template_cell = ws.cell(row=template_row, column=col_idx)
+        if template_cell.has_style:
+            style_src[col_idx] = (
+                template_cell.font.copy(),
+                template_cell.fill.copy(),
+                template_cell.border.copy(),
+                template_cell.alignment.copy(),
+                template_cell.number_format,
+                template_cell.protection.copy(),
+            )
+
+    for r_off, row_vals in enumerate(values, start=0):
+        row_idx = start_row + r_off
+        if cancel_scope is not None and (r_off + 1) % CANCEL_CHECK_ROWS == 0:
+            cancel_scope.check()
+
+        for c_idx, v in zip(template_column_indices, row_vals):
+            ws.cell(row=row_idx, column=c_idx, value=v)
+
+        if r_off > 0:
+            try:
+                for col_idx in template_column_indices:
+                    style = style_src.get(col_idx)
+                    if not style:
+                        continue
+                    current_cell = ws.cell(row=row_idx, column=col_idx)
+                    (
+                        current_cell.font,
+                        current_cell.fill,
+                        current_cell.border,
+                        current_cell.alignment,
+                        current_cell.number_format,
+                        current_cell.protection,
+                    ) = style
+
+            except Exception as format_e:
+                # If formatting copy fails, continue without it
+                pass
+
+    last_data_row = start_row + len(values) - 1
+    last_col = max(template_column_indices, default=templ_col_start)
+    set_print_titles_and_area(ws, template_header_rows, max(1, last_col), last_data_row)
+    return wb
+
+
+# ----------------- Source cache -----------------
+
+class SplitSourceCache:
+    """Parsed inputs shared by split runs in one process.
+
+    Holds raw file bytes, source DataFrames, template header cells, mapped
+    frames, key partitions and row hashes, keyed on the file's path, size
+    and mtime so an edited file is read again. Cached frames are never
+    modified by a run.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def file_key(path: Path) -> tuple:
+        path = Path(path).resolve()
+        stat = path.stat()
+        return str(path), stat.st_size, stat.st_mtime_ns
+
+    def load(self, key: tuple, loader):
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                return self._entries[key]
+        value = loader()
+        with self._lock:
+            self.misses += 1
+            return self._entries.setdefault(key, value)
+
+    def discard(self, path: Path):
+        """Drop every entry derived from ``path``."""
+        resolved = str(Path(path).resolve())
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == resolved]:
+                del self._entries[key]
+
+
+# ----------------- Split Logic -----------------
+
+def split_excel_with_template(
+    *args, track_memory: bool = False, memory_budget_mb: float | None = None,
+    capture_profile: bool = False, event_cb=None, event_log_path: Path | None = None, **kwargs,
+):
+    """Split the source sheet into one output per key; see ``_split_excel_with_template``.
+
+    ``track_memory`` traces allocations per phase and per rendered key, and
+    ``memory_budget_mb`` warns in the log as the process RSS nears the
+    budget; either one adds a ``memory`` section to the run report.
+    ``capture_profile`` runs the split under cProfile and writes
+    ``_split_profile.prof`` and ``_split_profile.txt`` next to the outputs.
+    ``throughput_cb`` receives a ``SplitThroughput`` after every finished key.
+    ``event_cb`` receives every ``SplitEvent`` of the run and
+    ``event_log_path`` appends them to a JSON-lines file; ``status_cb`` still
+    gets the message of each event that has one.
+    ``write_journal`` checkpoints every finished key to ``_split_journal.jsonl``
+    so a crashed run can be resumed; ``resume`` continues that journal. A run
+    asked to write a journal refuses to start over an unfinished one.
+    """
+    with ExitStack() as stack:
+        if event_log_path is not None:
+            event_cb = chain_event_callbacks(event_cb, stack.enter_context(SplitEventLog(event_log_path)))
+        events = SplitEventStream(event_cb=event_cb, status_cb=kwargs.pop("status_cb", None))
+        if track_memory or memory_budget_mb:
+            kwargs["memory"] = stack.enter_context(SplitMemoryMonitor(
+                trace=track_memory, budget_mb=memory_budget_mb, status_cb=events.warning,
+            ))
+        if capture_profile:
+            kwargs["profiler"] = stack.enter_context(SplitProfiler())
+        try:
+            return _split_excel_with_template(*args, events=events, **kwargs)
+        except Exception as e:
+            events.emit(EVENT_FAILED, error=str(e), error_type=type(e).__name__)
+            raise
+
+
+def _split_excel_with_template(
+    source_path: Path, sheet_name: str, key_col, template_path: Path, out_dir: Path,
+    header_rows: int, pdf_engine: str = "xlwings", soffice_path: str | None = None,
+    prefix: str = "", suffix: str = "", status_cb=None, progress_cb=None,
+    template_mode: str = TEMPLATE_MODE_TEMPLATE_FILE, column_mapping: dict | None = None,
+    source_header_rows: int | None = None, template_header_rows: int | None = None,
+    output_file_type: str | None = None, selected_keys: set | None = None,
+    stop_requested=None, verbose: bool = False, stage_workers: dict | None = None,
+    pipeline_queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE, pdf_batch_size: int = 1,
+    combined_pdf_path: Path | None = None, keep_key_pdfs: bool = True,
+    incremental: bool = False, resume: bool = False, write_journal: bool = False,
+    source_cache: SplitSourceCache | None = None, report_cb=None, throughput_cb=None,
+    memory: SplitMemoryMonitor | None = None, profiler: SplitProfiler | None = None,
+    events: SplitEventStream | None = None,
+):
+    import pandas as pd
+
+    if events is None: events = SplitEventStream(status_cb=status_cb)
+    # Plain log lines are "log" events; typed ones go through ``events``.
+    status_cb = events.log
+    if progress_cb is None: progress_cb = lambda t, c: None
+    if stop_requested is None: stop_requested = lambda: False
+    if memory is not None:
+        memory.status_cb = events.warning
+    memory_phase = memory.phase if memory is not None else lambda name: nullcontext()
+    if profiler is not None:
+        profiler.begin()
+    def debug(msg):
+        if verbose:
+            status_cb(msg)
+    source_header_rows = source_header_rows or header_rows
+    template_header_rows = template_header_rows or header_rows
+    if output_file_type is None:
+        output_file_type = (
+            OUTPUT_TYPE_EXCEL
+            if (pdf_engine or "none").lower() == "none"
+            else OUTPUT_TYPE_PDF
+        )
+    if output_file_type not in {OUTPUT_TYPE_EXCEL, OUTPUT_TYPE_PDF, OUTPUT_TYPE_EXCEL_AND_PDF}:
+        raise ValueError(f"Tipe output tidak didukung: {output_file_type}")
+    effective_pdf_engine = "none" if not output_requires_pdf(output_file_type) else (pdf_engine or "xlwings")
+    if output_requires_pdf(output_file_type) and effective_pdf_engine == "none":
+        effective_pdf_engine = "xlwings"
+
+    if template_mode not in {TEMPLATE_MODE_TEMPLATE_FILE, TEMPLATE_MODE_SOURCE_TEMPLATE}:
+        raise ValueError(f"Template mode tidak didukung: {template_mode}")
+    if combined_pdf_path is not None and not output_requires_pdf(output_file_type):
+        raise ValueError("PDF gabungan membutuhkan tipe output PDF.")
+    if (incremental or resume) and combined_pdf_path is not None and not keep_key_pdfs:
+        raise ValueError("Split inkremental/lanjutan dengan PDF gabungan membutuhkan PDF per key.")
+    if not source_path.exists():
+        raise FileNotFoundError(f"Sumber tidak ditemukan: {source_path}")
+    if template_mode == TEMPLATE_MODE_TEMPLATE_FILE and not template_path.exists():
+        raise FileNotFoundError(f"Template tidak ditemukan: {template_path}")
+    journal_path = out_dir / SPLIT_JOURNAL_NAME
+    if write_journal and not resume and journal_path.exists():
+        # An unfinished journal is only ever continued or removed by the user.
+        raise ValueError(
+            f"Journal run sebelumnya belum selesai: {journal_path}. "
+            "Aktifkan Resume untuk melanjutkan atau hapus journal tersebut."
+        )
+    out_dir.mkdir(parents=True, exist_ok=True)
+    split_results: list[SplitResult] = []
+    # Once a manifest exists every run keeps it current, so an incremental
+    # run never trusts outputs that a full run rewrote behind its back.
+    track_manifest = incremental or (out_dir / SPLIT_MANIFEST_NAME).exists()
+    use_journal = resume or write_journal
+    # Row hashes, key digests and output checksums only feed the manifest and
+    # the journal; a plain run skips them.
+    track_digests = track_manifest or use_journal
+
+    timings = SplitRunTimings()
+    events.emit(
+        EVENT_RUN_STARTED, source=str(source_path), out_dir=str(out_dir), template_mode=template_mode,
+        output_file_type=output_file_type, pdf_engine=effective_pdf_engine,
+        incremental=incremental, resume=resume, journal=use_journal,
+    )
+    status_cb("Membaca sumber...")
+    cache = source_cache if source_cache is not None else SplitSourceCache()
+    source_file = cache.file_key(source_path)
+
+    def read_source():
+        # Diagnostic logging
+        try:
+            file_size = source_path.stat().st_size if source_path.exists() else 0
+            debug(f"Debug: File path: {source_path}")
+            debug(f"Debug: File exists: {source_path.exists()}")
+            debug(f"Debug: File size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)")
+            debug(f"Debug: Sheet name: '{sheet_name}'")
+            debug("Debug: Starting pd.read_excel...")
+
+            # Try reading with timeout and error handling
+            start_time = time.time()
+
+            # First try to read just the header to test file accessibility
+            debug("Debug: Testing file accessibility...")
+            try:
+                df_test = pd.read_excel(source_path, sheet_name=sheet_name, nrows=5, dtype=object)
+                debug(f"Debug: Successfully read {len(df_test)} rows for testing")
+            except Exception as test_e:
+                debug(f"Debug: Test read failed: {str(test_e)}")
+                raise test_e
+
+            # Read with header at the correct row (source_header_rows is 1-indexed)
+            df = pd.read_excel(source_path, sheet_name=sheet_name, header=source_header_rows - 1, dtype=object)
+
+            elapsed = time.time() - start_time
+            debug(f"Debug: Successfully read {len(df)} rows in {elapsed:.2f} seconds")
+            return df
+
+        except FileNotFoundError as e:
+            debug(f"Debug: File not found: {e}")
+            raise FileNotFoundError(f"File tidak ditemukan: {source_path}")
+        except PermissionError as e:
+            debug(f"Debug: Permission denied: {e}")
+            raise PermissionError(f"Tidak ada akses ke file: {source_path}")
+        except Exception as e:
+            debug(f"Debug: Error reading Excel: {type(e).__name__}: {str(e)}")
+            raise e
+
+    frame_key = source_file + ("frame", sheet_name, source_header_rows)
+    misses = cache.misses
+    with timings.phase("source_read"), memory_phase("source_read"):
+        df = cache.load(frame_key, read_source)
+    if cache.misses == misses:
+        debug(f"Debug: Sumber sudah dibaca sebelumnya; {len(df)} baris dipakai ulang.")
+
+    # Tentukan kolom kunci
+    if isinstance(key_col, int):
+        if key_col < 1 or key_col > df.shape[1]:
+            raise ValueError("Index kolom kunci di luar jangkauan DataFrame.")
+        key_series = df.iloc[:, key_col - 1]
+    else:
+        resolved_key_col = resolve_header_label(df.columns, key_col)
+        if resolved_key_col is None:
+            raise ValueError(f"Header kolom kunci '{key_col}' tidak ditemukan.")
+        key_series = df[resolved_key_col]
+
+    # Debug: Check for categorical data issues
+    debug(f"Debug: Key column '{key_col}' data type: {key_series.dtype}")
+    debug(f"Debug: Key column unique values: {len(key_series.unique())}")
+    debug(f"Debug: Key column has null values: {key_series.isnull().sum()}")
+
+    # Check for categorical columns in the entire DataFrame
+    categorical_cols = []
+    for col in df.columns:
+        if df[col].dtype.name == 'category':
+            categorical_cols.append(col)
+            debug(f"Debug: Found categorical column: {col}")
+
+    if categorical_cols:
+        debug(f"Debug: Converting {len(categorical_cols)} categorical columns to string...")
+        # Convert a copy; the cached frame may be shared with other runs.
+        df = df.copy()
+        for col in categorical_cols:
+            try:
+                df[col] = df[col].astype(str)
+                debug(f"Debug: Converted {col} to string")
+            except Exception as conv_e:
+                debug(f"Debug: Failed to convert {col}: {conv_e}")
+
+    # Selaraskan urutan kolom ke header template.
+    templ_cols = None
+    templ_col_start = 1
+    template_column_indices = []
+    # Read the template/source workbook once and reload per key from memory
+    # to avoid repeated disk reads inside the loop.
+    template_bytes = None
+    source_bytes = None
+    layout_digest = None
+    # The native engine draws each key's PDF from its grouped rows with the
+    # sheet layout compiled here, instead of from a per-key workbook.
+    native_layout = None
+    native_pdf = effective_pdf_engine.lower() == PDF_ENGINE_NATIVE
+    with timings.phase("template_compile"), memory_phase("template_compile"):
+        if template_mode == TEMPLATE_MODE_TEMPLATE_FILE:
+            template_file = cache.file_key(template_path)
+            template_header_cells, templ_col_start = cache.load(
+                template_file + ("header_cells", template_header_rows),
+                lambda: read_template_header_cells(template_path, template_header_rows),
+            )
+            templ_cols = [header for header, _ in template_header_cells]
+            template_column_indices = [col_idx for _, col_idx in template_header_cells]
+            if not templ_cols:
+                raise ValueError("Header template tidak ditemukan untuk mapping kolom.")
+            duplicate_template_headers = find_duplicate_headers(templ_cols)
+            if duplicate_template_headers:
+                raise ValueError(
+                    "Header template duplikat tidak didukung untuk mapping kolom: "
+                    + ", ".join(duplicate_template_headers)
+                )
+
+            source_headers = [str(col) for col in df.columns]
+            effective_mapping = column_mapping or auto_map_columns(templ_cols, source_headers)
+            missing = validate_column_mapping(templ_cols, effective_mapping)
+            if missing:
+                raise ValueError("Mapping kolom template belum lengkap: " + ", ".join(missing))
+
+            mapped_columns = []
+            for template_col in templ_cols:
+                source_col = effective_mapping[template_col]
+                resolved_source_col = resolve_header_label(df.columns, source_col)
+                if resolved_source_col is None:
+                    raise ValueError(
+                        f"Kolom sumber untuk template '{template_col}' tidak ditemukan: {source_col}"
+                    )
+                mapped_columns.append(resolved_source_col)
+
+            def map_columns():
+                mapped = pd.concat(
+                    [df[source_col].rename(template_col) for template_col, source_col in zip(templ_cols, mapped_columns)],
+                    axis=1,
+                )
+                mapped.columns = templ_cols
+                return mapped
+
+            frame_key += ("mapped", tuple(templ_cols), tuple(repr(col) for col in mapped_columns))
+            df = cache.load(frame_key, map_columns)
+            template_bytes = cache.load(template_file + ("bytes",), template_path.read_bytes)
+            if native_pdf:
+                native_layout = cache.load(
+                    template_file + ("native_layout", template_header_rows, tuple(template_column_indices)),
+                    lambda: TemplateFilePdfLayout(template_bytes, template_header_rows, template_column_indices),
+                )
+        else:
+            source_bytes = cache.load(source_file + ("bytes",), source_path.read_bytes)
+            if track_digests:
+                # The header/title rows and sheet layout are copied into every
+                # output, so they belong in each key's digest like a template.
+                layout_digest = cache.load(
+                    source_file + ("layout_digest", sheet_name, source_header_rows),
+                    lambda: source_template_layout_digest(source_bytes, sheet_name, source_header_rows),
+                )
+            if native_pdf:
+                native_layout = cache.load(
+                    source_file + ("native_layout", sheet_name, source_header_rows),
+                    lambda: SourceSheetPdfLayout(source_bytes, sheet_name, source_header_rows),
+                )
+
+    # Partition once per frame and key column; batch jobs over the same
+    # source reuse the groups.
+    def partition_frame():
+        df_grouped = df
+        debug("Debug: Starting groupby operation...")
+        try:
+            groups = df.groupby(key_series, dropna=False, sort=False)
+            debug(f"Debug: Groupby successful, found {len(groups)} groups")
+        except Exception as groupby_e:
+            debug(f"Debug: Groupby error: {type(groupby_e).__name__}: {str(groupby_e)}")
+
+            # Try multiple approaches to fix the issue
+            if "categorical" in str(groupby_e).lower():
+                debug("Debug: Attempting to fix categorical issue...")
+
+                # Method 1: Try converting all categorical columns to object
+                try:
+                    debug("Debug: Method 1 - Converting all categorical columns to object...")
+                    df_no_cat = df.copy()
+                    for col in df_no_cat.columns:
+                        if df_no_cat[col].dtype.name == 'category':
+                            df_no_cat[col] = df_no_cat[col].astype('object')
+                    groups = df_no_cat.groupby(key_series, dropna=False, sort=False)
+                    debug(f"Debug: Method 1 successful, found {len(groups)} groups")
+                    # Update df to use the fixed version
+                    df_grouped = df_no_cat
+                except Exception as method1_e:
+                    debug(f"Debug: Method 1 failed: {method1_e}")
+
+                    # Method 2: Try using string conversion for groupby
+                    try:
+                        debug("Debug: Method 2 - Using string keys for groupby...")
+                        string_keys = key_series.astype(str)
+                        groups = df.groupby(string_keys, dropna=False, sort=False)
+                        debug(f"Debug: Method 2 successful, found {len(groups)} groups")
+                    except Exception as method2_e:
+                        debug(f"Debug: Method 2 failed: {method2_e}")
+                        raise groupby_e
+            else:
+                raise groupby_e
+        return df_grouped, groups
+
+    with timings.phase("partition"), memory_phase("partition"):
+        df, groups = cache.load(frame_key + ("groups", repr(key_col)), partition_frame)
+
+    # Apply optional key filtering while preserving group order. Only the key
+    # labels are listed up front; group frames are produced lazily by the
+    # partition stage so the bounded queues cap how many are held at once.
+    selected_rows = [
+        len(indices) for key_val, indices in groups.indices.items()
+        if selected_keys is None or str(key_val) in selected_keys
+    ]
+    total = len(selected_rows)
+    total_rows = sum(selected_rows)
+    if selected_keys is not None:
+        status_cb(f"Generating {total} of selected key(s).")
+    progress_cb(total, 0)
+
+    eng = (effective_pdf_engine or "none").lower()
+    workers = resolve_stage_workers(stage_workers)
+    if eng == "xlwings":
+        # Excel COM automation is driven from a single thread.
+        workers["pdf"] = 1
+    elif eng == PDF_ENGINE_LO_POOL and "pdf" not in (stage_workers or {}):
+        # One PDF worker per pooled LibreOffice instance.
+        workers["pdf"] = DEFAULT_LO_POOL_SIZE
+
+    previous_entries = load_split_manifest(out_dir) if track_manifest else {}
+    key_digests = {}
+    if track_digests:
+        options_digest = split_options_digest({
+            "template_mode": template_mode, "sheet_name": sheet_name, "key_col": key_col,
+            "source_header_rows": source_header_rows, "template_header_rows": template_header_rows,
+            "columns": [str(col) for col in df.columns], "output_file_type": output_file_type,
+            "pdf_engine": eng, "prefix": prefix, "suffix": suffix,
+        }, template_bytes if template_bytes is not None else layout_digest)
+        with timings.phase("partition"):
+            row_hashes = cache.load(frame_key + ("row_hashes",), lambda: split_row_hashes(df))
+            key_digests = split_key_digests(df, groups, options_digest, row_hashes=row_hashes)
+    resumed_entries = {}
+    if resume:
+        resumed_entries = SplitJournal.load(journal_path)
+        if not resumed_entries:
+            status_cb("Tidak ada journal untuk dilanjutkan; semua key diproses.")
+    elif journal_path.exists():
+        status_cb("Journal run sebelumnya tidak diubah; aktifkan Resume untuk melanjutkan.")
+    manifest_entries = {key: entry for key, entry in previous_entries.items() if key in key_digests}
+    manifest_entries.update((key, entry) for key, entry in resumed_entries.items() if key in key_digests)
+    removed_keys = [key for key in previous_entries if key not in key_digests] if incremental else []
+    for key in removed_keys:
+        entry = previous_entries[key]
+        for name in (entry.get("files") or []) if isinstance(entry, dict) else []:
+            (out_dir / Path(name).name).unlink(missing_ok=True)
+    reused_count = 0
+
+    cancel_scope = CancelScope(stop_requested)
+    # Tasks leave this set only once their manifest entry is written; whatever
+    # is left after a cancelled or failed run has its partial files removed.
+    unfinished_tasks = set()
+    unfinished_lock = threading.Lock()
+
+    def partition():
+        nonlocal reused_count
+        position = 0
+        for key_val, group in groups:
+            if selected_keys is not None and str(key_val) not in selected_keys:
+                continue
+            if cancel_scope.is_cancelled():
+                return
+            position += 1
+            out_name = build_output_stem(prefix, key_val, suffix)
+            digest = key_digests.get(str(key_val))
+            with unfinished_lock:
+                entry = manifest_entries.get(str(key_val))
+            if (
+                resume and manifest_entry_intact(
+                    out_dir, resumed_entries.get(str(key_val)), digest, verify_checksums=True,
+                )
+            ) or (incremental and manifest_entry_intact(out_dir, entry, digest)):
+                # Finished or unchanged key: passes through untouched so it is
+                # still counted, listed and bundled in order.
+                reused_count += 1
+                yield _KeyTask(
+                    position=position, key=key_val, rows=len(group),
+                    xlsx_path=out_dir / f"{out_name}.xlsx", reused=True,
+                )
+                continue
+            if isinstance(entry, dict):
+                with unfinished_lock:
+                    manifest_entries.pop(str(key_val), None)
+                for name in entry.get("files") or []:
+                    if Path(name).stem != out_name:
+                        (out_dir / Path(name).name).unlink(missing_ok=True)
+            events.emit(
+                EVENT_KEY_STARTED, f"Proses [{position}/{total}] key={key_val}", key_val,
+                position=position, total=total, rows=len(group),
+            )
+            task = _KeyTask(
+                position=position, key=key_val, rows=len(group), group=group, started=time.perf_counter(),
+            )
+            with unfinished_lock:
+                unfinished_tasks.add(task)
+            yield task
+
+    def render_workbook(task):
+        if template_mode == TEMPLATE_MODE_SOURCE_TEMPLATE:
+            return render_source_template_workbook(
+                source_bytes, sheet_name, source_header_rows, task.group.index,
+                cancel_scope=cancel_scope,
+            )
+        # 1) Tulis XLSX dari template
+        return render_template_file_workbook(
+            template_bytes, task.group, template_header_rows,
+            template_column_indices, templ_col_start,
+            cancel_scope=cancel_scope,
+        )
+
+    def render(task):
+        if task.reused or (native_pdf and output_file_type == OUTPUT_TYPE_PDF):
+            # PDF-only native output needs no workbook; the pdf stage draws
+            # the key from its rows.
+            return task
+        started = time.perf_counter()
+        if memory is not None:
+            task.workbook = memory.measure_key(task.key, len(task.group), lambda: render_workbook(task))
+        else:
+            task.workbook = render_workbook(task)
+        if not native_pdf:
+            task.group = None
+        task.stage_seconds["render"] = time.perf_counter() - started
+        return task
+
+    def serialize(task):
+        if task.reused:
+            return task
+        started = time.perf_counter()
+        # Build filename with prefix and suffix
+        out_name = build_output_stem(prefix, task.key, suffix)
+        task.xlsx_path = out_dir / f"{out_name}.xlsx"
+        if combined_pdf_path is not None and task.xlsx_path.with_suffix(".pdf") == Path(combined_pdf_path):
+            raise ValueError(f"Nama file key={task.key} bentrok dengan PDF gabungan: {combined_pdf_path}")
+        if task.workbook is not None:
+            task.workbook.save(task.xlsx_path)
+            task.workbook = None
+        task.stage_seconds["serialize"] = time.perf_counter() - started
+        return task
+
+    pdf_profiles = LibreOfficeThreadProfiles(eng == "libreoffice" and workers["pdf"] > 1)
+    lo_pool = None
+    pdf_failures = []
+
+    def convert_pdf(task):
+        if task.reused:
+            return task
+        started = time.perf_counter()
+        try:
+            return convert_task_pdf(task)
+        finally:
+            task.stage_seconds["pdf"] = time.perf_counter() - started
+
+    def convert_task_pdf(task):
+        # 2) PDF (opsional)
+        with cancel_scope.bound():
+            if eng == PDF_ENGINE_NATIVE:
+                native_layout.render(task.group, task.xlsx_path.with_suffix(".pdf"), cancel_scope=cancel_scope)
+                task.group = None
+            else:
+                # A key that fails to convert is reported and skipped, as in
+                # convert_pdf_batch, instead of stopping the run.
+                try:
+                    export_pdf_with_engine(
+                        task.xlsx_path, eng, soffice_path=soffice_path,
+                        profile_dir=pdf_profiles.path(), lo_pool=lo_pool,
+                    )
+                except (RuntimeError, TimeoutError, OSError, subprocess.SubprocessError) as e:
+                    pdf_failures.append(task.key)
+                    events.warning(f"PDF gagal key={task.key}: {conversion_error_message(e)}", task.key)
+                    return task
+        remove_intermediate_workbook_for_pdf(task.xlsx_path, output_file_type)
+        return task
+
+    def convert_pdf_batch(tasks):
+        pending = [task for task in tasks if not task.reused]
+        if not pending:
+            return tasks
+        started = time.perf_counter()
+        with cancel_scope.bound():
+            conversions = export_pdfs_via_lo_batch(
+                [task.xlsx_path for task in pending], soffice_path=soffice_path,
+                batch_size=len(pending), profile_dir=pdf_profiles.path(), status_cb=status_cb,
+            )
+        # One soffice call converts the whole batch; each key gets its share.
+        share = (time.perf_counter() - started) / len(pending)
+        for task, conversion in zip(pending, conversions):
+            task.stage_seconds["pdf"] = share
+            if conversion.ok:
+                debug(f"Debug: PDF OK key={task.key}: {conversion.pdf_path.name}")
+                remove_intermediate_workbook_for_pdf(task.xlsx_path, output_file_type)
+            else:
+                pdf_failures.append(task.key)
+                events.warning(f"PDF gagal key={task.key}: {conversion.message}", task.key)
+        return tasks
+
+    completed_results = []
+    bundle = None
+    # Keys reach the manifest stage in completion order; the bundle holds
+    # finished PDFs back until every earlier key has been appended.
+    bundle_waiting = {}
+    bundle_next = 1
+
+    def append_to_bundle(position, key, pdf_out):
+        nonlocal bundle_next
+        bundle_waiting[position] = (key, pdf_out)
+        while bundle_next in bundle_waiting:
+            flush_bundle_entry(*bundle_waiting.pop(bundle_next))
+            bundle_next += 1
+
+    def flush_bundle_entry(key, pdf_out):
+        if pdf_out is None:
+            return
+        try:
+            bundle.add(pdf_out, str(key))
+        except (OSError, PdfBundleError) as e:
+            events.warning(f"PDF gabungan: key={key} dilewati: {e}", key)
+            return
+        if not keep_key_pdfs:
+            pdf_out.unlink(missing_ok=True)
+
+    def manifest(task):
+        pdf_out = task.xlsx_path.with_suffix(".pdf")
+        if not pdf_out.exists():
+            pdf_out = None
+        result = SplitResult(
+            key=str(task.key),
+            excel_path=task.xlsx_path if task.xlsx_path.exists() else None,
+            pdf_path=pdf_out if bundle is None or keep_key_pdfs else None,
+            output_file_type=output_file_type,
+        )
+        written = 0
+        if (throughput_cb is not None or events.wants_events) and not task.reused:
+            # Sized before the bundle may remove the key's own PDF.
+            written = sum(path.stat().st_size for path in (result.excel_path, pdf_out) if path is not None)
+            throughput.bytes_written += written
+        if bundle is not None:
+            append_to_bundle(task.position, task.key, pdf_out)
+        if not task.reused and track_digests:
+            expected = []
+            if output_file_type != OUTPUT_TYPE_PDF:
+                expected.append(task.xlsx_path)
+            if output_requires_pdf(output_file_type) and (bundle is None or keep_key_pdfs):
+                expected.append(task.xlsx_path.with_suffix(".pdf"))
+            # Keys missing an output (e.g. a failed PDF) are rebuilt next time.
+            if expected and all(path.exists() for path in expected):
+                entry = {"hash": key_digests[str(task.key)], "files": [path.name for path in expected]}
+                if journal is not None:
+                    # Checksums are what a resumed run verifies the files against.
+                    entry["sha256"] = {path.name: file_sha256(path) for path in expected}
+                    try:
+                        journal.append(task.key, entry)
+                    except OSError as e:
+                        events.warning(f"Journal gagal ditulis key={task.key}: {e}", task.key)
+                with unfinished_lock:
+                    manifest_entries[str(task.key)] = entry
+        with unfinished_lock:
+            unfinished_tasks.discard(task)
+            completed_results.append((task.position, result))
+            completed = len(completed_results)
+        if events.wants_events:
+            events.emit(
+                EVENT_KEY_FINISHED, key=task.key, position=task.position, total=total, rows=task.rows,
+                reused=task.reused, bytes=written,
+                seconds=round(time.perf_counter() - task.started, 6) if task.started else 0.0,
+                stages={name: round(seconds, 6) for name, seconds in task.stage_seconds.items()},
+                files=[path.name for path in (result.excel_path, result.pdf_path) if path is not None],
+            )
+        if throughput_cb is not None:
+            throughput.completed_keys = completed
+            throughput.completed_rows += task.rows
+            if not task.reused:
+                throughput.generated_keys += 1
+                throughput.generated_rows += task.rows
+            throughput.elapsed = time.perf_counter() - pipeline_started
+            throughput_cb(replace(throughput))
+        progress_cb(total, completed)
+        return None
+
+    stages = [("render", render, workers["render"]), ("serialize", serialize, workers["serialize"])]
+    if eng == "libreoffice" and pdf_batch_size > 1:
+        stages.append(("pdf", convert_pdf_batch, workers["pdf"], pdf_batch_size))
+    elif eng != "none":
+        stages.append(("pdf", convert_pdf, workers["pdf"]))
+    stages.append(("manifest", manifest, 1))
+
+    stage_stats = []
+    bundle_ok = False
+    journal = None
+    run_completed = False
+    throughput = SplitThroughput(
+        total_keys=total, completed_keys=0, total_rows=total_rows, completed_rows=0,
+        bytes_written=0, elapsed=0.0,
+    )
+    pipeline_started = time.perf_counter()
+    try:
+        if use_journal:
+            journal = SplitJournal(out_dir, resume=resume)
+        if combined_pdf_path is not None:
+            bundle = PdfBundleWriter(combined_pdf_path)
+        if eng == PDF_ENGINE_LO_POOL:
+            status_cb(f"Menjalankan {workers['pdf']} LibreOffice server...")
+            lo_pool = LibreOfficePool(workers["pdf"], soffice_path=soffice_path).start()
+        _, stage_stats = run_pipeline(partition(), stages, queue_size=pipeline_queue_size, profiler=profiler)
+        bundle_ok = True
+        run_completed = not cancel_scope.cancelled
+    except SplitCancelled:
+        bundle_ok = True
+    finally:
+        if bundle is not None:
+            if bundle_ok:
+                # After a cancel, keys behind a missing one are still appended.
+                for position in sorted(bundle_waiting):
+                    flush_bundle_entry(*bundle_waiting.pop(position))
+                bundle.close()
+                status_cb(f"PDF gabungan: {combined_pdf_path} ({bundle.page_count} halaman)")
+            else:
+                bundle.abort()
+        for task in unfinished_tasks:
+            remove_partial_outputs(task.xlsx_path)
+        if track_manifest:
+            try:
+                write_split_manifest(out_dir, manifest_entries)
+            except OSError as e:
+                events.warning(f"Manifest gagal ditulis: {e}")
+        if journal is not None:
+            # Kept after a cancel, failure or crash so the run can be resumed.
+            journal.close(discard=run_completed)
+        pdf_profiles.cleanup()
+        if lo_pool is not None:
+            if lo_pool.restarts:
+                events.warning(f"LibreOffice server dijalankan ulang {lo_pool.restarts} kali.")
+            lo_pool.close()
+    split_results.extend(result for _, result in sorted(completed_results, key=lambda item: item[0]))
+
+    if incremental:
+        status_cb(
+            f"Inkremental: {len(split_results) - reused_count} key dibuat ulang, "
+            f"{reused_count} tidak berubah, {len(removed_keys)} key lama dihapus."
+        )
+    elif resume:
+        status_cb(f"Melanjutkan: {reused_count} key sudah selesai, {len(split_results) - reused_count} key diproses.")
+    if cancel_scope.cancelled:
+        events.emit(EVENT_CANCELLED, "Dibatalkan.", completed=len(split_results), total=total)
+    if pdf_failures:
+        events.warning(
+            f"PDF gagal untuk {len(pdf_failures)} key: " + ", ".join(str(key) for key in pdf_failures),
+            keys=[str(key) for key in pdf_failures],
+        )
+    for stats in stage_stats:
+        status_cb(stats.summary())
+    status_cb(timings.summary())
+    report = {
+        "version": SPLIT_REPORT_VERSION,
+        "finished_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "seconds": round(timings.elapsed, 6),
+        "cancelled": cancel_scope.cancelled,
+        "rows": len(df),
+        "keys": {"total": total, "generated": len(split_results) - reused_count, "reused": reused_count},
+        "pdf_failures": [str(key) for key in pdf_failures],
+        "options": {
+            "template_mode": template_mode, "output_file_type": output_file_type,
+            "pdf_engine": eng, "workers": workers,
+        },
+        "phases": {name: round(seconds, 6) for name, seconds in timings.phases.items()},
+        "stages": {stats.name: stats.to_dict() for stats in stage_stats},
+    }
+    if memory is not None:
+        memory.sample()
+        status_cb(memory.summary())
+        report["memory"] = memory.to_dict()
+    if profiler is not None:
+        profiler.end()
+        try:
+            prof_path, summary_path = profiler.write(out_dir, timings.phases)
+        except (OSError, ValueError) as e:
+            events.warning(f"Profil gagal ditulis: {e}")
+        else:
+            status_cb(f"Profil: {summary_path.name} dan {prof_path.name} ditulis ke folder output.")
+            report["profile"] = {
+                "files": [prof_path.name, summary_path.name],
+                "stages": profiler.stage_times(),
+            }
+    try:
+        write_split_report(out_dir, report)
+    except OSError as e:
+        events.warning(f"Laporan run gagal ditulis: {e}")
+    if report_cb is not None:
+        report_cb(report)
+    events.emit(EVENT_FINISHED, "Selesai.", report=report)
+    progress_cb(total, total)
+
+    # Final cleanup for Excel COM sessions
+    if (effective_pdf_engine or "none").lower() == "xlwings":
+        cleanup_excel_com()
+
+    return split_results
+
+
+def reconvert_folder_pdfs(
+    folder: Path, pdf_engine: str = "libreoffice", soffice_path: str | None = None,
+    prefix: str = "", suffix: str = "", recurse: bool = False, pdf_workers: int = 1,
+    pdf_batch_size: int = 1, pipeline_queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE,
+    status_cb=None, progress_cb=None, stop_requested=None, event_cb=None,
+) -> list[SplitResult]:
+    """Convert the workbooks of an existing output folder whose PDF is missing or stale.
+
+    Keys are discovered like Mail Merge does; a PDF at least as new as its
+    workbook is left alone and no workbook is regenerated. ``event_cb``
+    receives the same kind of ``SplitEvent`` stream as a split run.
+    """
+    events = SplitEventStream(event_cb=event_cb, status_cb=status_cb)
+    status_cb = events.log
+    if progress_cb is None: progress_cb = lambda t, c: None
+    if stop_requested is None: stop_requested = lambda: False
+    eng = (pdf_engine or "none").lower()
+    if eng == "none":
+        raise ValueError("Pilih PDF engine untuk konversi ulang.")
+    folder = Path(folder)
+    if not folder.is_dir():
+        raise FileNotFoundError(f"Folder tidak ditemukan: {folder}")
+
+    discovered = discover_split_results_from_folder(folder, prefix, suffix, recurse)
+    pending = []
+    for position, result in enumerate(discovered):
+        if result.excel_path is None:
+            continue
+        pdf_path = result.excel_path.with_suffix(".pdf")
+        if pdf_path.exists() and pdf_path.stat().st_mtime_ns >= result.excel_path.stat().st_mtime_ns:
+            continue
+        pending.append(_KeyTask(position=position, key=result.key, xlsx_path=result.excel_path))
+    total = len(pending)
+    events.emit(EVENT_RUN_STARTED, out_dir=str(folder), pdf_engine=eng, total=total)
+    status_cb(f"{total} dari {len(discovered)} key perlu dikonversi ke PDF.")
+    progress_cb(total, 0)
+
+    workers = 1 if eng == "xlwings" else max(1, int(pdf_workers))
+    if eng == PDF_ENGINE_LO_POOL and pdf_workers <= 1:
+        workers = DEFAULT_LO_POOL_SIZE
+    cancel_scope = CancelScope(stop_requested)
+    pdf_profiles = LibreOfficeThreadProfiles(eng == "libreoffice" and workers > 1)
+    lo_pool = None
+    failures = []
+    converted = []
+
+    def produce():
+        for index, task in enumerate(pending, start=1):
+            if cancel_scope.is_cancelled():
+                return
+            events.emit(
+                EVENT_KEY_STARTED, f"Proses [{index}/{total}] key={task.key}", task.key,
+                position=index, total=total,
+            )
+            task.started = time.perf_counter()
+            yield task
+
+    def convert(task):
+        try:
+            with cancel_scope.bound():
+                export_pdf_with_engine(
+                    task.xlsx_path, eng, soffice_path=soffice_path,
+                    profile_dir=pdf_profiles.path(), lo_pool=lo_pool,
+                )
+        except SplitCancelled:
+            task.xlsx_path.with_suffix(".pdf").unlink(missing_ok=True)
+            raise
+        except Exception as e:
+            failures.append(task.key)
+            events.warning(f"PDF gagal key={task.key}: {conversion_error_message(e)}", task.key)
+        return task
+
+    def convert_batch(tasks):
+        started_ns = time.time_ns()
+        try:
+            with cancel_scope.bound():
+                conversions = export_pdfs_via_lo_batch(
+                    [task.xlsx_path for task in tasks], soffice_path=soffice_path,
+                    batch_size=len(tasks), profile_dir=pdf_profiles.path(), status_cb=status_cb,
+                )
+        except SplitCancelled:
+            # Any PDF written by the killed batch may be truncated.
+            for task in tasks:
+                pdf_path = task.xlsx_path.with_suffix(".pdf")
+                if pdf_path.exists() and pdf_path.stat().st_mtime_ns >= started_ns:
+                    pdf_path.unlink(missing_ok=True)
+            raise
+        for task, conversion in zip(tasks, conversions):
+            if not conversion.ok:
+                failures.append(task.key)
+                events.warning(f"PDF gagal key={task.key}: {conversion.message}", task.key)
+        return tasks
+
+    def record(task):
+        converted.append(task)
+        if events.wants_events:
+            # A failed key may still have its old, stale PDF.
+            pdf_path = task.xlsx_path.with_suffix(".pdf")
+            fresh = pdf_path.exists() and pdf_path.stat().st_mtime_ns >= task.xlsx_path.stat().st_mtime_ns
+            events.emit(
+                EVENT_KEY_FINISHED, key=task.key, position=len(converted), total=total,
+                seconds=round(time.perf_counter() - task.started, 6) if task.started else 0.0,
+                files=[pdf_path.name] if fresh else [],
+            )
+        progress_cb(total, len(converted))
+        return None
+
+    if eng == "libreoffice" and pdf_batch_size > 1:
+        stages = [("pdf", convert_batch, workers, pdf_batch_size)]
+    else:
+        stages = [("pdf", convert, workers)]
+    stages.append(("manifest", record, 1))
+
+    stage_stats = []
+    try:
+        if eng == PDF_ENGINE_LO_POOL and pending:
+            status_cb(f"Menjalankan {workers} LibreOffice server...")
+            lo_pool = LibreOfficePool(workers, soffice_path=soffice_path).start()
+        _, stage_stats = run_pipeline(produce(), stages, queue_size=pipeline_queue_size, producer_name="scan")
+    except SplitCancelled:
+        pass
+    finally:
+        pdf_profiles.cleanup()
+        if lo_pool is not None:
+            lo_pool.close()
+
+    results = []
+    for result in discovered:
+        if result.excel_path is not None:
+            pdf_path = result.excel_path.with_suffix(".pdf")
+            if pdf_path.exists():
+                result = replace(result, pdf_path=pdf_path, output_file_type=OUTPUT_TYPE_EXCEL_AND_PDF)
+        results.append(result)
+
+    if cancel_scope.cancelled:
+        events.emit(EVENT_CANCELLED, "Dibatalkan.", completed=len(converted), total=total)
+    if failures:
+        events.warning(
+            f"PDF gagal untuk {len(failures)} key: " + ", ".join(str(key) for key in failures),
+            keys=[str(key) for key in failures],
+        )
+    for stats in stage_stats:
+        status_cb(stats.summary())
+    events.emit(EVENT_FINISHED, "Selesai.", converted=len(converted) - len(failures), failed=len(failures))
+    progress_cb(total, total)
+    if eng == "xlwings":
+        cleanup_excel_com()
+    return results
+
+
+
+# ----------------- Watch mode -----------------
+
+WATCH_POLL_INTERVAL = 2.0
+WATCH_SETTLE_SECONDS = 2.0
+
+
+@dataclass
+class WatchRunReport:
+    changed: list[str]
+    rebuilt: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    results: list[SplitResult] = field(default_factory=list)
+    error: str | None = None
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        changed = ", ".join(self.changed)
+        if self.error is not None:
+            return f"Watch: {changed} berubah; split gagal: {self.error}"
+        keys = ", ".join(self.rebuilt[:10]) + (" ..." if len(self.rebuilt) > 10 else "")
+        return (
+            f"Watch: {changed} berubah; {len(self.rebuilt)} key diperbarui"
+            + (f" ({keys})" if keys else "")
+            + f", {len(self.removed)} dihapus, {self.unchanged} tetap ({self.seconds:.1f}s)."
+        )
+
+
+def _file_signature(path: Path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def watch_split(
+    split_kwargs: dict, poll_interval: float = WATCH_POLL_INTERVAL,
+    settle_seconds: float = WATCH_SETTLE_SECONDS, run_on_start: bool = True,
+    status_cb=None, progress_cb=None, report_cb=None, stop_requested=None, event_cb=None,
+) -> int:
+    """Re-run an incremental split whenever the source or template changes.
+
+    Idle polling only stats the watched files. A change is acted on once the
+    files have stopped changing for ``settle_seconds`` (so a half-copied
+    workbook is not read) and their content hash differs from the last
+    successful run. Returns the number of runs once ``stop_requested``.
+    Watch messages and every run's events go to ``event_cb`` as well.
+    """
+    split_status_cb = status_cb
+    status_cb = SplitEventStream(event_cb=event_cb, status_cb=status_cb).log
+    if progress_cb is None: progress_cb = lambda t, c: None
+    if report_cb is None: report_cb = lambda report: None
+    if stop_requested is None: stop_requested = lambda: False
+    kwargs = dict(split_kwargs, incremental=True)
+    out_dir = Path(kwargs["out_dir"])
+    paths = [Path(kwargs["source_path"])]
+    if kwargs.get("template_mode", TEMPLATE_MODE_TEMPLATE_FILE) == TEMPLATE_MODE_TEMPLATE_FILE:
+        paths.append(Path(kwargs["template_path"]))
+
+    def wait(seconds):
+        deadline = time.monotonic() + seconds
+        while not stop_requested():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(0.2, remaining))
+        return False
+
+    def poll_changes():
+        changed = False
+        for path in paths:
+            signature = _file_signature(path)
+            if signature != signatures[path]:
+                signatures[path] = signature
+                changed = True
+        return changed
+
+    signatures = {path: _file_signature(path) for path in paths}
+    contents = {}
+    runs = 0
+    triggered = run_on_start
+    status_cb(f"Watch: memantau {', '.join(path.name for path in paths)} setiap {poll_interval:g} detik.")
+    while not stop_requested():
+        if not triggered:
+            if not wait(poll_interval):
+                break
+            if not poll_changes():
+                continue
+            # Debounce: wait until the files stop changing.
+            while True:
+                if not wait(settle_seconds):
+                    return runs
+                if not poll_changes():
+                    break
+        triggered = False
+        if any(signatures[path] is None for path in paths):
+            status_cb("Watch: file belum tersedia, menunggu perubahan berikutnya.")
+            continue
+        try:
+            digests = {path: file_sha256(path) for path in paths}
+        except OSError as e:
+            status_cb(f"Watch: file belum bisa dibaca: {e}")
+            continue
+        changed = [path for path in paths if contents.get(path) != digests[path]]
+        if not changed:
+            status_cb("Watch: tidak ada perubahan isi.")
+            continue
+
+        report = WatchRunReport(changed=[path.name for path in changed])
+        before = load_split_manifest(out_dir)
+        started = time.monotonic()
+        try:
+            report.results = split_excel_with_template(
+                **kwargs, status_cb=split_status_cb, event_cb=event_cb,
+                progress_cb=progress_cb, stop_requested=stop_requested,
+            )
+        except Exception as e:
+            # The next change of the files triggers another attempt.
+            report.error = str(e)
+        else:
+            contents.update(digests)
+            after = load_split_manifest(out_dir)
+            report.rebuilt = [key for key, entry in after.items() if before.get(key) != entry]
+            report.removed = [key for key in before if key not in after]
+            report.unchanged = len(after) - len(report.rebuilt)
+        report.seconds = time.monotonic() - started
+        runs += 1
+        status_cb(report.summary())
+        report_cb(report)
+    return runs
+
+
+# ----------------- Batch jobs -----------------
+
+# Job parameters holding paths; relative ones are resolved against the spec.
+BATCH_PATH_PARAMS = ("source_path", "template_path", "out_dir", "combined_pdf_path")
+
+
+def split_kwargs_from_params(params: dict) -> dict:
+    """Translate ``SplitWorker.params``-style dicts into ``split_excel_with_template`` arguments."""
+    source_path = Path(params['source_path'])
+    selected_keys = params.get('selected_keys')
+    combined_pdf_path = params.get('combined_pdf_path')
+    return dict(
+        source_path=source_path,
+        sheet_name=params['sheet_name'],
+        key_col=params['key_col'],
+        template_path=Path(params.get('template_path') or source_path),
+        out_dir=Path(params['out_dir']),
+        header_rows=params.get('header_rows') or params.get('source_header_rows') or 5,
+        pdf_engine=params.get('pdf_engine', "xlwings"),
+        soffice_path=params.get('soffice_path'),
+        prefix=params.get('prefix', ""),
+        suffix=params.get('suffix', ""),
+        template_mode=params.get('template_mode', TEMPLATE_MODE_TEMPLATE_FILE),
+        column_mapping=params.get('column_mapping'),
+        source_header_rows=params.get('source_header_rows'),
+        template_header_rows=params.get('template_header_rows'),
+        output_file_type=params.get('output_file_type'),
+        selected_keys=set(selected_keys) if selected_keys is not None else None,
+        verbose=params.get('verbose', False),
+        stage_workers=params.get('stage_workers'),
+        pdf_batch_size=params.get('pdf_batch_size', 1),
+        combined_pdf_path=Path(combined_pdf_path) if combined_pdf_path else None,
+        keep_key_pdfs=params.get('keep_key_pdfs', True),
+        incremental=params.get('incremental', False),
+        resume=params.get('resume', False),
+        write_journal=params.get('write_journal', False),
+        track_memory=params.get('track_memory', False),
+        memory_budget_mb=params.get('memory_budget_mb'),
+        capture_profile=params.get('capture_profile', False),
+        event_log_path=Path(params['event_log_path']) if params.get('event_log_path') else None,
+    )
+
+
+@dataclass
+class SplitBatchJob:
+    name: str
+    params: dict
+
+
+@dataclass
+class SplitBatchJobResult:
+    name: str
+    results: list[SplitResult] = field(default_factory=list)
+    error: str | None = None
+    cancelled: bool = False
+    seconds: float = 0.0
+
+
+def load_split_batch_spec(path: Path) -> list[SplitBatchJob]:
+    """Read a batch spec: ``{"defaults": {...}, "jobs": [{...}, ...]}`` or a bare job list.
+
+    Each job is a ``SplitWorker.params``-style dict layered over ``defaults``
+    and named by its ``name`` entry; relative paths are resolved against the
+    spec's folder.
+    """
+    path = Path(path)
+    spec = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+    if not isinstance(spec, dict) or not isinstance(spec.get("jobs"), list):
+        raise ValueError("Spec batch harus berisi daftar 'jobs'.")
+    defaults = spec.get("defaults") or {}
+    jobs = []
+    names = set()
+    for index, raw in enumerate(spec["jobs"], start=1):
+        if not isinstance(raw, dict):
+            raise ValueError(f"Job #{index} harus berupa object.")
+        params = {**defaults, **raw}
+        name = str(params.pop("name", "") or f"job-{index}")
+        if name in names:
+            raise ValueError(f"Nama job duplikat: {name}")
+        names.add(name)
+        for key in ("source_path", "sheet_name", "key_col", "out_dir"):
+            if params.get(key) in (None, ""):
+                raise ValueError(f"Job '{name}': parameter {key} belum diisi.")
+        for key in BATCH_PATH_PARAMS:
+            if params.get(key):
+                value = Path(params[key])
+                params[key] = value if value.is_absolute() else path.parent / value
+        jobs.append(SplitBatchJob(name=name, params=params))
+    return jobs
+
+
+def run_split_batch(
+    jobs: list[SplitBatchJob], status_cb=None, progress_cb=None, job_progress_cb=None,
+    stop_requested=None,
+) -> list[SplitBatchJobResult]:
+    """Run many split configurations in one process, reading each source once.
+
+    Jobs are grouped by source file (in first-seen order) and share one
+    SplitSourceCache, so a source is parsed and partitioned once per sheet,
+    header row and key column, and each template is read once. A failing job
+    is reported and the batch moves on. ``progress_cb(total_jobs, finished)``
+    tracks the batch, ``job_progress_cb(name, total_keys, done_keys)`` each job.
+    """
+    if status_cb is None: status_cb = lambda msg: None
+    if progress_cb is None: progress_cb = lambda t, c: None
+    if job_progress_cb is None: job_progress_cb = lambda name, t, c: None
+    if stop_requested is None: stop_requested = lambda: False
+    by_source = {}
+    for job in jobs:
+        by_source.setdefault(str(Path(job.params["source_path"]).resolve()), []).append(job)
+
+    cache = SplitSourceCache()
+    outcomes = {}
+    progress_cb(len(jobs), 0)
+    for source, source_jobs in by_source.items():
+        status_cb(f"Batch: {Path(source).name} dipakai {len(source_jobs)} job.")
+        for job in source_jobs:
+            if stop_requested():
+                break
+            outcome = SplitBatchJobResult(name=job.name)
+            started = time.monotonic()
+            try:
+                outcome.results = split_excel_with_template(
+                    **split_kwargs_from_params(job.params), source_cache=cache,
+                    status_cb=lambda msg, name=job.name: status_cb(f"[{name}] {msg}"),
+                    progress_cb=lambda total, done, name=job.name: job_progress_cb(name, total, done),
+                    stop_requested=stop_requested,
+                )
+            except Exception as e:
+                outcome.error = str(e)
+                status_cb(f"[{job.name}] Gagal: {e}")
+            outcome.cancelled = stop_requested()
+            outcome.seconds = time.monotonic() - started
+            outcomes[job.name] = outcome
+            progress_cb(len(jobs), len(outcomes))
+        # Frames of a finished source are not needed by later groups.
+        cache.discard(source)
+        if stop_requested():
+            status_cb("Batch dibatalkan.")
+            break
+
+    failed = sum(1 for outcome in outcomes.values() if outcome.error is not None)
+    status_cb(
+        f"Batch selesai: {len(outcomes) - failed} job berhasil, {failed} gagal, "
+        f"{len(jobs) - len(outcomes)} tidak dijalankan; {cache.misses} input dibaca/dihitung, "
+        f"{cache.hits} dipakai ulang."
+    )
+    return [outcomes[job.name] for job in jobs if job.name in outcomes]
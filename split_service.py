@@ -0,0 +1,554 @@
+"""Local HTTP job queue around the split engine.
+
+Lets several people on one machine run splits without the desktop app::
+
+    python -m split_service --port 8765 --workers 2
+
+Endpoints (JSON in and out, bound to 127.0.0.1 by default):
+
+    POST /jobs                  submit {"params": {...}, "limits": {...}}
+    GET  /jobs                  list jobs
+    GET  /jobs/<id>             state, progress, cancellation and recent messages
+    POST /jobs/<id>/cancel      cancel a queued or running job
+    GET  /jobs/<id>/manifest    results and output manifest of a finished job
+
+Every request needs ``Authorization: Bearer <token>``, with the token from
+the ``token`` file in the state folder, and POSTs must be
+``Content-Type: application/json``. Together these keep web pages open in a
+browser on the same machine from submitting jobs.
+
+``params`` is the dict ``SplitWorker`` uses (``source_path``, ``sheet_name``,
+``key_col``, ``out_dir``, ``template_mode`` ...); ``incremental`` and
+``write_journal`` default to true so every run leaves a manifest and can be
+resumed. With ``--allow-root`` every path in
+``params`` must lie under one of those folders. The LibreOffice executable is
+service configuration (``--soffice-path``); ``soffice_path`` in ``params`` is
+ignored. The queue is saved to
+``queue.json`` in the state folder after every change; on restart queued jobs
+wait again and jobs that were running start over with ``resume``, so keys
+already in their journal are not rebuilt.
+"""
+
+import argparse
+from collections import deque
+from dataclasses import asdict, dataclass, field
+import hmac
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+from pathlib import Path
+import queue
+import secrets
+import sys
+import threading
+import time
+import uuid
+
+from split_engine import (
+    DEFAULT_LO_POOL_SIZE,
+    load_split_manifest,
+    PDF_ENGINE_LO_POOL,
+    resolve_stage_workers,
+    split_excel_with_template,
+    split_kwargs_from_params,
+)
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+DEFAULT_STATE_DIR = Path.home() / ".excel-splitter-service"
+QUEUE_FILE_NAME = "queue.json"
+TOKEN_FILE_NAME = "token"
+REQUIRED_PARAMS = ("source_path", "sheet_name", "key_col", "out_dir")
+PATH_PARAMS = ("source_path", "template_path", "out_dir", "combined_pdf_path", "event_log_path")
+NAME_PARAMS = ("prefix", "suffix")
+# Only the service decides which executable it launches.
+SERVICE_ONLY_PARAMS = ("soffice_path",)
+JOB_MESSAGES_KEPT = 20
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = {DONE, FAILED, CANCELLED}
+
+
+class JobError(Exception):
+    """A request the queue refuses; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class JobLimits:
+    """Per-job resource limits; ``None`` means unlimited."""
+
+    max_seconds: float | None = None
+    max_keys: int | None = None
+    max_source_mb: float | None = None
+    max_stage_workers: int | None = None
+
+    def tightened(self, requested: dict | None) -> "JobLimits":
+        """Apply a client's limits, which may only be stricter than these."""
+        limits = JobLimits(**asdict(self))
+        for name, value in (requested or {}).items():
+            if name not in JobLimits.__dataclass_fields__:
+                raise JobError(f"Unknown limit {name!r}")
+            if value is None:
+                continue
+            try:
+                value = float(value) if name in {"max_seconds", "max_source_mb"} else int(value)
+            except (TypeError, ValueError):
+                raise JobError(f"Limit {name} must be a number")
+            if value <= 0:
+                raise JobError(f"Limit {name} must be positive")
+            current = getattr(limits, name)
+            setattr(limits, name, value if current is None else min(current, value))
+        return limits
+
+
+@dataclass
+class ServiceJob:
+    id: str
+    params: dict
+    limits: JobLimits
+    state: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    total: int = 0
+    done: int = 0
+    cancel_requested: bool = False
+    resumed: bool = False
+    error: str | None = None
+    results: list[dict] = field(default_factory=list)
+    messages: deque = field(default_factory=lambda: deque(maxlen=JOB_MESSAGES_KEPT))
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id, "state": self.state, "cancel_requested": self.cancel_requested,
+            "progress": {"total": self.total, "done": self.done},
+            "submitted_at": self.submitted_at, "started_at": self.started_at,
+            "finished_at": self.finished_at, "resumed": self.resumed, "error": self.error,
+        }
+
+    def detail(self) -> dict:
+        return {
+            **self.summary(), "params": self.params, "limits": asdict(self.limits),
+            "messages": list(self.messages), "result_count": len(self.results),
+        }
+
+    def to_record(self) -> dict:
+        return {**self.detail(), "results": self.results}
+
+    @classmethod
+    def from_record(cls, record: dict) -> "ServiceJob":
+        job = cls(id=record["id"], params=record["params"], limits=JobLimits(**record.get("limits") or {}))
+        for name in ("state", "submitted_at", "started_at", "finished_at", "cancel_requested",
+                     "resumed", "error", "results"):
+            if name in record:
+                setattr(job, name, record[name])
+        job.total = (record.get("progress") or {}).get("total", 0)
+        job.done = (record.get("progress") or {}).get("done", 0)
+        job.messages.extend(record.get("messages") or [])
+        return job
+
+
+def _json_safe(params: dict) -> dict:
+    # Sets (selected_keys) and Paths are stored as JSON lists and strings.
+    return json.loads(json.dumps(params, default=lambda value: sorted(value) if isinstance(value, set) else str(value)))
+
+
+def service_token(state_dir: Path) -> str:
+    """Return the service's access token, creating it (readable by the owner only) on first use."""
+    path = Path(state_dir) / TOKEN_FILE_NAME
+    try:
+        token = path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        token = ""
+    if not token:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        token = secrets.token_urlsafe(32)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(token + "\n")
+    return token
+
+
+def _strip_service_params(params: dict) -> dict:
+    return {name: value for name, value in params.items() if name not in SERVICE_ONLY_PARAMS}
+
+
+def _result_dicts(results) -> list[dict]:
+    return [
+        {
+            "key": result.key,
+            "excel_path": str(result.excel_path) if result.excel_path else None,
+            "pdf_path": str(result.pdf_path) if result.pdf_path else None,
+            "output_file_type": result.output_file_type,
+        }
+        for result in results
+    ]
+
+
+class JobQueue:
+    """Persisted FIFO of split jobs run by a bounded pool of worker threads."""
+
+    def __init__(self, state_dir: Path = DEFAULT_STATE_DIR, workers: int = DEFAULT_WORKERS,
+                 limits: JobLimits | None = None, allowed_roots=None, soffice_path: str | None = None):
+        self.state_dir = Path(state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.state_dir / QUEUE_FILE_NAME
+        self.workers = max(1, int(workers))
+        self.limits = limits or JobLimits()
+        self.allowed_roots = [Path(root).resolve() for root in allowed_roots or ()]
+        self.soffice_path = soffice_path
+        self._jobs: dict[str, ServiceJob] = {}
+        self._lock = threading.Lock()
+        # Worker threads save concurrently; they share one temporary file.
+        self._save_lock = threading.Lock()
+        self._pending: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._load()
+
+    # ---- persistence ----
+
+    def _load(self):
+        try:
+            records = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            raise JobError(f"Cannot read job queue {self.path}: {e}", status=500)
+        for record in sorted(records, key=lambda item: item.get("submitted_at", 0)):
+            job = ServiceJob.from_record(record)
+            job.params = _strip_service_params(job.params)
+            if job.state == RUNNING:
+                # Interrupted by a restart: run again, continuing from the journal.
+                job.state = QUEUED
+                job.resumed = True
+                job.params["resume"] = True
+            self._jobs[job.id] = job
+            if job.state == QUEUED:
+                self._pending.put(job.id)
+
+    def _save(self):
+        with self._save_lock:
+            with self._lock:
+                records = [job.to_record() for job in self._jobs.values()]
+            tmp_path = self.path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(records, ensure_ascii=False, indent=1), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+
+    # ---- client operations ----
+
+    def submit(self, params, limits: dict | None = None) -> ServiceJob:
+        if not isinstance(params, dict):
+            raise JobError("params must be a JSON object")
+        missing = [name for name in REQUIRED_PARAMS if params.get(name) in (None, "")]
+        if missing:
+            raise JobError("Missing params: " + ", ".join(missing))
+        params = _strip_service_params(_json_safe(params))
+        self._check_paths(params)
+        # Incremental runs write _split_manifest.json, which /manifest serves.
+        params.setdefault("incremental", True)
+        params.setdefault("write_journal", True)
+        try:
+            split_kwargs_from_params(params)
+            resolve_stage_workers(params.get("stage_workers"))
+        except (TypeError, ValueError) as e:
+            raise JobError(f"Invalid params: {e}")
+        job = ServiceJob(id=uuid.uuid4().hex[:12], params=params, limits=self.limits.tightened(limits))
+        with self._lock:
+            self._jobs[job.id] = job
+        self._save()
+        self._pending.put(job.id)
+        return job
+
+    def _check_paths(self, params: dict):
+        for name in NAME_PARAMS:
+            value = str(params.get(name) or "")
+            if "/" in value or "\\" in value:
+                raise JobError(f"{name} must not contain path separators")
+        if not self.allowed_roots:
+            return
+        for name in PATH_PARAMS:
+            if not params.get(name):
+                continue
+            path = Path(params[name]).resolve()
+            if not any(path.is_relative_to(root) for root in self.allowed_roots):
+                raise JobError(f"{name} is outside the allowed folders", status=403)
+
+    def get(self, job_id: str) -> ServiceJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobError(f"No job {job_id}", status=404)
+        return job
+
+    def detail(self, job_id: str) -> dict:
+        job = self.get(job_id)
+        with self._lock:
+            return job.detail()
+
+    def jobs(self) -> list[ServiceJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> ServiceJob:
+        job = self.get(job_id)
+        with self._lock:
+            if job.state in FINISHED_STATES:
+                return job
+            job.cancel_requested = True
+            if job.state == QUEUED:
+                job.state = CANCELLED
+                job.finished_at = time.time()
+        self._save()
+        return job
+
+    def manifest(self, job_id: str) -> dict:
+        job = self.get(job_id)
+        if job.state not in FINISHED_STATES:
+            raise JobError(f"Job {job_id} is {job.state}", status=409)
+        out_dir = Path(job.params["out_dir"])
+        return {
+            "id": job.id, "state": job.state, "out_dir": str(out_dir),
+            "results": job.results, "files": load_split_manifest(out_dir),
+        }
+
+    # ---- workers ----
+
+    def start(self) -> "JobQueue":
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"split-job-{index + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float | None = 30):
+        """Stop the workers; running jobs are interrupted and re-queued for the next start."""
+        self._stopping.set()
+        for _ in self._threads:
+            self._pending.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self):
+        while not self._stopping.is_set():
+            job_id = self._pending.get()
+            if job_id is None:
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.state != QUEUED:
+                    continue
+                job.state = RUNNING
+                job.started_at = time.time()
+            self._save()
+            self._run(job)
+            self._save()
+
+    def _run(self, job: ServiceJob):
+        limits = job.limits
+        deadline = time.monotonic() + limits.max_seconds if limits.max_seconds else None
+        limit_error = []
+
+        # Messages and progress are read by _save and GET /jobs/<id> on other
+        # threads, so they change under the same lock those readers hold.
+        def status(message):
+            with self._lock:
+                job.messages.append(str(message))
+
+        def progress(total, done):
+            with self._lock:
+                job.total, job.done = total, done
+            if limits.max_keys is not None and total > limits.max_keys and not limit_error:
+                limit_error.append(f"Job has {total} keys, over the limit of {limits.max_keys}")
+
+        def stop_requested():
+            if deadline is not None and time.monotonic() > deadline and not limit_error:
+                limit_error.append(f"Job exceeded its time limit of {limits.max_seconds:g}s")
+            return job.cancel_requested or bool(limit_error) or self._stopping.is_set()
+
+        try:
+            kwargs = self._limited_kwargs(job)
+            results = split_excel_with_template(
+                **kwargs, status_cb=status, progress_cb=progress, stop_requested=stop_requested,
+            )
+        except Exception as e:
+            with self._lock:
+                job.state = FAILED
+                job.error = limit_error[0] if limit_error else str(e)
+                job.finished_at = time.time()
+            return
+        with self._lock:
+            job.results = _result_dicts(results)
+            if limit_error:
+                job.state, job.error = FAILED, limit_error[0]
+            elif job.cancel_requested:
+                job.state = CANCELLED
+            elif self._stopping.is_set():
+                # Shut down mid-run: picked up again, from the journal, next start.
+                job.state = QUEUED
+                job.resumed = True
+                job.params["resume"] = True
+                return
+            else:
+                job.state = DONE
+            job.finished_at = time.time()
+
+    def _limited_kwargs(self, job: ServiceJob) -> dict:
+        kwargs = split_kwargs_from_params(job.params)
+        kwargs["soffice_path"] = self.soffice_path
+        limits = job.limits
+        if limits.max_source_mb is not None:
+            size_mb = Path(kwargs["source_path"]).stat().st_size / (1024 * 1024)
+            if size_mb > limits.max_source_mb:
+                raise JobError(f"Source is {size_mb:.1f} MB, over the limit of {limits.max_source_mb:g} MB")
+        if limits.max_stage_workers is not None:
+            requested = dict(kwargs.get("stage_workers") or {})
+            if (kwargs.get("pdf_engine") or "").lower() == PDF_ENGINE_LO_POOL:
+                requested.setdefault("pdf", DEFAULT_LO_POOL_SIZE)
+            kwargs["stage_workers"] = {
+                name: min(count, limits.max_stage_workers)
+                for name, count in resolve_stage_workers(requested).items()
+            }
+        return kwargs
+
+
+def make_handler(jobs: JobQueue, token: str, quiet: bool = False):
+    class SplitServiceHandler(BaseHTTPRequestHandler):
+        server_version = "ExcelSplitterService/1"
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+        def _send(self, status: int, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _check_token(self):
+            scheme, _, given = (self.headers.get("Authorization") or "").partition(" ")
+            if scheme.lower() != "bearer" or not hmac.compare_digest(given.strip(), token):
+                raise JobError("Missing or wrong service token", status=401)
+
+        def _read_json(self):
+            # A browser may send text/plain or form posts cross-site without
+            # asking first; requiring JSON forces a preflight we never answer.
+            content_type = (self.headers.get("Content-Type") or "").split(";", 1)[0].strip().lower()
+            if content_type != "application/json":
+                raise JobError("Content-Type must be application/json", status=415)
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                return json.loads(self.rfile.read(length) or b"{}")
+            except ValueError as e:
+                raise JobError(f"Request body is not valid JSON: {e}")
+
+        def _route(self, method: str):
+            self._check_token()
+            parts = [part for part in self.path.split("?", 1)[0].split("/") if part]
+            if parts[:1] != ["jobs"] or len(parts) > 3:
+                raise JobError("Not found", status=404)
+            body = self._read_json() if method == "POST" else None
+            if len(parts) == 1:
+                if method == "GET":
+                    return 200, [job.summary() for job in jobs.jobs()]
+                if not isinstance(body, dict):
+                    raise JobError("Request body must be a JSON object")
+                return 201, jobs.submit(body.get("params"), body.get("limits")).summary()
+            job_id = parts[1]
+            if len(parts) == 2 and method == "GET":
+                return 200, jobs.detail(job_id)
+            if len(parts) == 3 and parts[2] == "cancel" and method == "POST":
+                return 200, jobs.cancel(job_id).summary()
+            if len(parts) == 3 and parts[2] == "manifest" and method == "GET":
+                return 200, jobs.manifest(job_id)
+            raise JobError("Not found", status=404)
+
+        def _handle(self, method: str):
+            try:
+                status, payload = self._route(method)
+            except JobError as e:
+                status, payload = e.status, {"error": str(e)}
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+            self._send(status, payload)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+    return SplitServiceHandler
+
+
+def serve(jobs: JobQueue, host: str = "127.0.0.1", port: int = DEFAULT_PORT, quiet: bool = False,
+          token: str | None = None) -> ThreadingHTTPServer:
+    """Create the HTTP server; call ``serve_forever()`` on it (``port=0`` picks a free port).
+
+    ``token`` defaults to the one in the queue's state folder.
+    """
+    token = token or service_token(jobs.state_dir)
+    return ThreadingHTTPServer((host, port), make_handler(jobs, token, quiet=quiet))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m split_service", description="Local HTTP job queue for Excel Splitter.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="jobs run at the same time")
+    parser.add_argument("--state-dir", type=Path, default=DEFAULT_STATE_DIR, help="folder holding queue.json")
+    parser.add_argument("--max-seconds", type=float, help="time limit per job")
+    parser.add_argument("--max-keys", type=int, help="key limit per job")
+    parser.add_argument("--max-source-mb", type=float, help="source workbook size limit")
+    parser.add_argument("--max-stage-workers", type=int, help="threads per pipeline stage of one job")
+    parser.add_argument("--allow-root", action="append", type=Path, default=[], metavar="DIR",
+                        help="only accept job paths under DIR (repeatable)")
+    parser.add_argument("--soffice-path", help="LibreOffice executable used for PDF jobs")
+    parser.add_argument("--quiet", action="store_true", help="do not log requests")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    limits = JobLimits(
+        max_seconds=args.max_seconds, max_keys=args.max_keys,
+        max_source_mb=args.max_source_mb, max_stage_workers=args.max_stage_workers,
+    )
+    try:
+        jobs = JobQueue(
+            args.state_dir, workers=args.workers, limits=limits,
+            allowed_roots=args.allow_root, soffice_path=args.soffice_path,
+        )
+    except JobError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    server = serve(jobs, args.host, args.port, quiet=args.quiet)
+    pending = sum(1 for job in jobs.jobs() if job.state == QUEUED)
+    print(f"Serving on http://{args.host}:{server.server_port} ({args.workers} workers, {pending} queued)", file=sys.stderr)
+    print(f"Access token: {args.state_dir / TOKEN_FILE_NAME}", file=sys.stderr)
+    jobs.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        jobs.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
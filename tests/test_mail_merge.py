@@ -371,6 +371,16 @@ class MailMergeCoreTests(unittest.TestCase):
             self.assertEqual(results[0].pdf_path, pdf_path)
             self.assertEqual(results[0].output_file_type, "pdf")
 
+    def test_discover_split_results_ignores_combined_pdf(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            (folder / "12345.pdf").write_bytes(b"%PDF-1.4\n")
+            (folder / mail_merge.COMBINED_PDF_NAME).write_bytes(b"%PDF-1.4\n")
+
+            results = mail_merge.discover_split_results_from_folder(folder, prefix="", suffix="")
+
+            self.assertEqual([result.key for result in results], ["12345"])
+
     def test_discover_split_results_ignores_temp_files(self):
         with tempfile.TemporaryDirectory() as tmp:
             folder = Path(tmp)
@@ -0,0 +1,393 @@
+from pathlib import Path
+import tempfile
+import unittest
+import zlib
+
+import pdf_bundle
+
+
+def make_pdf(path: Path, page_texts: list[str]) -> Path:
+    """Write a small classic-xref PDF with one text page per entry."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        content = zlib.compress(b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % text.encode())
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /Contents %d 0 R >>" % len(objects))
+        kids.append(len(objects))
+    # MediaBox and Resources are inherited from the page tree root.
+    objects[1] = (
+        b"<< /Type /Pages /Kids [%s] /Count %d /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> >>"
+        % (b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+    )
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+    return path
+
+
+def make_object_stream_pdf(path: Path, text: str) -> Path:
+    """Write a PDF 1.5 file whose dictionaries live in an object stream."""
+    content = b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % text.encode()
+    packed = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> >> >> >>",
+    ]
+    header, body = [], b""
+    for number, obj in zip((1, 2, 3), packed):
+        header.append(b"%d %d" % (number, len(body)))
+        body += obj + b"\n"
+    header = b" ".join(header) + b"\n"
+    objstm = zlib.compress(header + body)
+
+    out = bytearray(b"%PDF-1.5\n")
+    offsets = {}
+    offsets[4] = len(out)
+    out += b"4 0 obj\n<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream\nendobj\n"
+    offsets[5] = len(out)
+    out += (
+        b"5 0 obj\n<< /Type /ObjStm /N 3 /First %d /Length %d /Filter /FlateDecode >>\nstream\n"
+        % (len(header), len(objstm)) + objstm + b"\nendstream\nendobj\n"
+    )
+    rows = [bytes([0, 0, 0, 0])]
+    rows += [bytes([2, 0, 5, index]) for index in range(3)]
+    rows += [bytes([1]) + offsets[4].to_bytes(2, "big") + b"\x00", bytes([1]) + offsets[5].to_bytes(2, "big") + b"\x00"]
+    xref_offset = len(out)
+    rows.append(bytes([1]) + xref_offset.to_bytes(2, "big") + b"\x00")
+    xref_data = zlib.compress(b"".join(rows))
+    out += (
+        b"6 0 obj\n<< /Type /XRef /Size 7 /W [1 2 1] /Root 1 0 R /Length %d /Filter /FlateDecode >>\nstream\n"
+        % len(xref_data) + xref_data + b"\nendstream\nendobj\n"
+    )
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_offset
+    path.write_bytes(bytes(out))
+    return path
+
+
+def _subsections(nums):
+    """Group sorted object numbers into ``(first, [nums])`` runs."""
+    groups = []
+    for num in nums:
+        if groups and num == groups[-1][1][-1] + 1:
+            groups[-1][1].append(num)
+        else:
+            groups.append((num, [num]))
+    return groups
+
+
+def _xref_stream(num: int, entries: dict, size: int, extra: bytes) -> bytes:
+    """An xref stream object with PNG Up prediction, as Office and pdfTeX write them."""
+    rows, index, previous = b"", [], bytes(7)
+    for first, group in _subsections(sorted(entries)):
+        index += [first, len(group)]
+        for entry in group:
+            kind, field2, field3 = entries[entry]
+            row = bytes([kind]) + field2.to_bytes(4, "big") + field3.to_bytes(2, "big")
+            rows += b"\x02" + bytes((a - b) % 256 for a, b in zip(row, previous))
+            previous = row
+    data = zlib.compress(rows)
+    return (
+        b"%d 0 obj\n<< /Type /XRef /Size %d /Index [%s] /W [1 4 2] /DecodeParms << /Columns 7 /Predictor 12 >> "
+        b"%s /Length %d /Filter /FlateDecode >>\nstream\n"
+        % (num, size, b" ".join(b"%d" % value for value in index), extra, len(data))
+        + data + b"\nendstream\nendobj\n"
+    )
+
+
+def append_revision(out: bytearray, objects: dict, size: int, trailer: bytes, packed=None,
+                    xref: str = "table", prev: int | None = None) -> int:
+    """Append ``objects`` and one xref section for them to ``out``; returns its offset.
+
+    Called again on the same buffer with ``prev`` it writes an incremental
+    update. ``packed`` is ``(stream_num, {num: body})`` kept in an object
+    stream. ``xref`` is ``"table"``, ``"stream"`` or ``"hybrid"`` (a table
+    plus an ``/XRefStm`` for the packed objects, as Office writes).
+    """
+    entries = {0: (0, 0, 65535)}
+    for num, body in sorted(objects.items()):
+        entries[num] = (1, len(out), 0)
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    if packed:
+        stream_num, members = packed
+        header, data = [], b""
+        for index, (num, body) in enumerate(sorted(members.items())):
+            header.append(b"%d %d" % (num, len(data)))
+            data += body + b"\n"
+            entries[num] = (2, stream_num, index)
+        header = b" ".join(header) + b"\n"
+        data = zlib.compress(header + data)
+        entries[stream_num] = (1, len(out), 0)
+        out += (
+            b"%d 0 obj\n<< /Type /ObjStm /N %d /First %d /Length %d /Filter /FlateDecode >>\nstream\n"
+            % (stream_num, len(members), len(header), len(data)) + data + b"\nendstream\nendobj\n"
+        )
+    if prev is not None:
+        trailer += b" /Prev %d" % prev
+    if xref == "stream":
+        section = len(out)
+        entries[size] = (1, section, 0)
+        out += _xref_stream(size, entries, size + 1, trailer)
+    else:
+        if xref == "hybrid":
+            compressed = {num: entry for num, entry in entries.items() if entry[0] == 2}
+            trailer += b" /XRefStm %d" % len(out)
+            entries[size] = (1, len(out), 0)
+            out += _xref_stream(size, compressed, size + 1, b"")
+            size += 1
+        section = len(out)
+        out += b"xref\n"
+        for first, group in _subsections(sorted(entries)):
+            out += b"%d %d\n" % (first, len(group))
+            for num in group:
+                kind, offset, gen = entries[num]
+                # Packed objects are free in a hybrid file's table.
+                out += b"%010d %05d %s\r\n" % (offset if kind == 1 else 0, gen if kind != 2 else 0,
+                                                 b"n" if kind == 1 else b"f")
+        out += b"trailer\n<< /Size %d %s >>\n" % (size, trailer)
+    out += b"startxref\n%d\n%%%%EOF\n" % section
+    return section
+
+
+def make_libreoffice_style_pdf(path: Path, texts: list[str]) -> Path:
+    """Mirror LibreOffice's output: indirect stream lengths written after the
+    stream, a nested page tree, shared indirect resources, link annotations,
+    real-number boxes, an /Info dictionary and a hex /ID."""
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R /OpenAction [10 0 R /XYZ null null 0] /Lang (en-US) >>",
+        2: b"<< /Type /Pages /Kids [3 0 R] /Count %d >>" % len(texts),
+        4: b"<< /Type /Font /Subtype /TrueType /BaseFont /BAAAAA+LiberationSans /FirstChar 0 /LastChar 40 >>",
+        5: b"<< /Font << /F1 4 0 R >> /ProcSet [/PDF /Text] >>",
+        6: b"<< /Creator <FEFF00430061006C0063> /Producer <FEFF004C0069006200720065004F00660066006900630065> "
+           b"/CreationDate (D:20240105101500+07'00') >>",
+    }
+    pages = []
+    for index, text in enumerate(texts):
+        page, content, length = 10 + index * 4, 11 + index * 4, 12 + index * 4
+        pages.append(page)
+        data = zlib.compress(b"q 0.1 0 0 0.1 0 0 cm BT /F1 120 Tf 720 7200 Td (%s) Tj ET Q" % text.encode())
+        objects[content] = b"<< /Length %d 0 R /Filter /FlateDecode >>\nstream\n" % length + data + b"\nendstream"
+        objects[length] = b"%d" % len(data)
+        annots = b""
+        if index + 1 < len(texts):
+            link = 13 + index * 4
+            objects[link] = (
+                b"<< /Type /Annot /Subtype /Link /Border [0 0 0] /Rect [56.7 770.1 200.3 790.4] "
+                b"/Dest [%d 0 R /XYZ 56.7 841.89 0] >>" % (page + 4)
+            )
+            annots = b" /Annots [%d 0 R]" % link
+        objects[page] = b"<< /Type /Page /Parent 3 0 R /Resources 5 0 R /Contents %d 0 R%s >>" % (content, annots)
+    objects[3] = (
+        b"<< /Type /Pages /Parent 2 0 R /MediaBox [0 0 595.304 841.89] /Kids [%s] /Count %d >>"
+        % (b" ".join(b"%d 0 R" % page for page in pages), len(pages))
+    )
+    out = bytearray(b"%PDF-1.6\n%\xc3\xa4\xc3\xbc\xc3\xb6\xc3\x9f\n")
+    size = max(objects) + 1
+    append_revision(out, objects, size, b"/Root 1 0 R /Info 6 0 R /ID [ <8D1D5B6A2B1E1F7E> <8D1D5B6A2B1E1F7E> ] "
+                                        b"/DocChecksum /5C1A2F33E8D7A0F0")
+    path.write_bytes(bytes(out))
+    return path
+
+
+def make_office_style_pdf(path: Path, texts: list[str]) -> Path:
+    """Mirror Excel's "Save as PDF" (what xlwings drives): dictionaries packed in
+    an object stream, a hybrid xref table with /XRefStm, uncompressed content
+    split over a /Contents array, and structure-tree keys on every page."""
+    packed = {
+        1: b"<</Type/Catalog/Pages 2 0 R/Lang(en-US)/StructTreeRoot 3 0 R/MarkInfo<</Marked true>>>>",
+        3: b"<</Type/StructTreeRoot/ParentTree 4 0 R>>",
+        4: b"<</Nums[]>>",
+        5: b"<</Type/Font/Subtype/TrueType/Name/F1/BaseFont/Calibri/Encoding/WinAnsiEncoding>>",
+    }
+    objects = {}
+    pages = []
+    for index, text in enumerate(texts):
+        page, setup, body = 20 + index * 3, 21 + index * 3, 22 + index * 3
+        pages.append(page)
+        packed[page] = (
+            b"<</Type/Page/Parent 2 0 R/Resources<</Font<</F1 5 0 R>>/ProcSet[/PDF/Text]>>"
+            b"/MediaBox[ 0 0 841.92 595.32]/Contents[ %d 0 R %d 0 R]/Group<</Type/Group/S/Transparency/CS/DeviceRGB>>"
+            b"/Tabs/S/StructParents %d>>" % (setup, body, index)
+        )
+        for num, data in ((setup, b"q 0.75 0 0 0.75 0 0 cm"), (body, b"BT /F1 11 Tf 48 700 Td (%s) Tj ET Q" % text.encode())):
+            objects[num] = b"<</Length %d>>\r\nstream\r\n" % len(data) + data + b"\r\nendstream"
+    packed[2] = b"<</Type/Pages/Count %d/Kids[ %s] >>" % (len(pages), b" ".join(b"%d 0 R" % page for page in pages))
+    out = bytearray(b"%PDF-1.7\r\n%\xb5\xb5\xb5\xb5\r\n")
+    size = max([*objects, *packed]) + 2
+    append_revision(out, objects, size, b"/Root 1 0 R /ID[<2B551D2AFE52654494F9720283CFF1C4><2B551D2AFE52654494F9720283CFF1C4>]",
+                    packed=(size - 1, packed), xref="hybrid")
+    path.write_bytes(bytes(out))
+    return path
+
+def page_texts(source: pdf_bundle.PdfSource) -> list[bytes]:
+    texts = []
+    for _, page, _, _ in source.pages():
+        contents = source.resolve(page["Contents"])
+        streams = contents if isinstance(contents, list) else [contents]
+        texts.append(b"\n".join(source.decode_stream(source.resolve(stream)) for stream in streams))
+    return texts
+
+
+def startxref(data: bytes) -> int:
+    return int(data[data.rfind(b"startxref") + len(b"startxref"):].split()[0])
+
+
+def outline_titles(source: pdf_bundle.PdfSource) -> list[bytes]:
+    catalog = source.resolve(source.trailer["Root"])
+    item = source.resolve(source.resolve(catalog["Outlines"])["First"])
+    titles = []
+    while item is not None:
+        titles.append(bytes(item["Title"]))
+        item = source.resolve(item["Next"]) if "Next" in item else None
+    return titles
+
+
+class PdfBundleTests(unittest.TestCase):
+    def test_bundle_appends_pages_with_one_bookmark_per_part(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            first = make_pdf(tmp_path / "a.pdf", ["A1", "A2"])
+            second = make_pdf(tmp_path / "b.pdf", ["B1"])
+            bundle_path = tmp_path / "bundle.pdf"
+
+            with pdf_bundle.PdfBundleWriter(bundle_path) as writer:
+                self.assertEqual(writer.add(first, "Key A"), 2)
+                self.assertEqual(writer.add(second, "Key (B)"), 1)
+
+            source = pdf_bundle.PdfSource.open(bundle_path)
+            texts = page_texts(source)
+            self.assertEqual(len(texts), 3)
+            self.assertIn(b"(A1)", texts[0])
+            self.assertIn(b"(B1)", texts[2])
+            self.assertEqual(outline_titles(source), [b"(Key A)", b"(Key \\(B\\))"])
+
+            pages = list(source.pages())
+            self.assertEqual(pages[2][1]["MediaBox"], [0, 0, 595, 842])
+            self.assertIn("Resources", pages[2][1])
+
+    def test_bookmark_titles_outside_latin1_use_utf16(self):
+        title = pdf_bundle.encode_text_string("Kantor ✓")
+        self.assertTrue(title.startswith(b"<feff"))
+
+    def test_reads_xref_and_object_streams(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            packed = make_object_stream_pdf(tmp_path / "packed.pdf", "Packed")
+            bundle_path = tmp_path / "bundle.pdf"
+
+            with pdf_bundle.PdfBundleWriter(bundle_path) as writer:
+                writer.add(packed, "Packed")
+
+            texts = page_texts(pdf_bundle.PdfSource.open(bundle_path))
+            self.assertEqual(len(texts), 1)
+            self.assertIn(b"(Packed)", texts[0])
+
+    def test_libreoffice_style_pdf_keeps_links_and_inherited_boxes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            first = make_pdf(tmp_path / "a.pdf", ["A1"])
+            calc = make_libreoffice_style_pdf(tmp_path / "calc.pdf", ["L1", "L2", "L3"])
+            bundle_path = tmp_path / "bundle.pdf"
+
+            with pdf_bundle.PdfBundleWriter(bundle_path) as writer:
+                writer.add(first, "A")
+                self.assertEqual(writer.add(calc, "Calc"), 3)
+
+            source = pdf_bundle.PdfSource.open(bundle_path)
+            texts = page_texts(source)
+            self.assertEqual(len(texts), 4)
+            for text, expected in zip(texts[1:], (b"(L1)", b"(L2)", b"(L3)")):
+                self.assertIn(expected, text)
+            pages = list(source.pages())
+            self.assertEqual(pages[1][1]["MediaBox"], [0, 0, b"595.304", b"841.89"])
+            link = source.resolve(pages[1][1]["Annots"][0])
+            self.assertEqual(link["Dest"][0], pages[2][0])
+            self.assertEqual(outline_titles(source), [b"(A)", b"(Calc)"])
+
+    def test_office_style_hybrid_xref_pdf(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            excel = make_office_style_pdf(tmp_path / "excel.pdf", ["X1", "X2"])
+            bundle_path = tmp_path / "bundle.pdf"
+
+            with pdf_bundle.PdfBundleWriter(bundle_path) as writer:
+                self.assertEqual(writer.add(excel, "Excel"), 2)
+
+            source = pdf_bundle.PdfSource.open(bundle_path)
+            texts = page_texts(source)
+            self.assertEqual(len(texts), 2)
+            self.assertIn(b"0.75 0 0 0.75 0 0 cm", texts[1])
+            self.assertIn(b"(X2)", texts[1])
+            self.assertEqual(list(source.pages())[0][1]["MediaBox"], [0, 0, b"841.92", b"595.32"])
+
+    def test_incremental_update_replaces_and_adds_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            path = make_pdf(tmp_path / "a.pdf", ["A1", "A2"])
+            out = bytearray(path.read_bytes())
+            revised = zlib.compress(b"BT /F1 12 Tf 72 720 Td (A2 revised) Tj ET")
+            added = zlib.compress(b"BT /F1 12 Tf 72 720 Td (A3) Tj ET")
+            append_revision(out, {
+                2: b"<< /Type /Pages /Kids [5 0 R 7 0 R 9 0 R] /Count 3 /MediaBox [0 0 595 842] "
+                   b"/Resources << /Font << /F1 3 0 R >> >> >>",
+                6: b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(revised) + revised + b"\nendstream",
+                8: b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(added) + added + b"\nendstream",
+                9: b"<< /Type /Page /Parent 2 0 R /Contents 8 0 R >>",
+            }, 10, b"/Root 1 0 R", prev=startxref(out))
+            path.write_bytes(bytes(out))
+            bundle_path = tmp_path / "bundle.pdf"
+
+            with pdf_bundle.PdfBundleWriter(bundle_path) as writer:
+                self.assertEqual(writer.add(path, "A"), 3)
+
+            texts = page_texts(pdf_bundle.PdfSource.open(bundle_path))
+            self.assertIn(b"(A2 revised)", texts[1])
+            self.assertIn(b"(A3)", texts[2])
+
+    def test_incremental_update_overrides_object_stream_entry(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            path = make_object_stream_pdf(tmp_path / "packed.pdf", "Packed")
+            out = bytearray(path.read_bytes())
+            content = b"BT /F1 12 Tf 72 720 Td (Updated) Tj ET"
+            append_revision(out, {
+                # Page 3 lived in the object stream; the update stores it plainly.
+                3: b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 7 0 R "
+                   b"/Resources << /Font << /F1 << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> >> >> >>",
+                7: b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+            }, 8, b"/Root 1 0 R", xref="stream", prev=startxref(out))
+            path.write_bytes(bytes(out))
+
+            texts = page_texts(pdf_bundle.PdfSource.open(path))
+            self.assertEqual(len(texts), 1)
+            self.assertIn(b"(Updated)", texts[0])
+
+    def test_damaged_xref_falls_back_to_object_scan(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = make_pdf(Path(tmp) / "a.pdf", ["A1"])
+            data = path.read_bytes()
+            path.write_bytes(data[:data.rfind(b"startxref")] + b"startxref\n999999\n%%EOF\n")
+
+            self.assertEqual(len(page_texts(pdf_bundle.PdfSource.open(path))), 1)
+
+    def test_error_inside_context_removes_partial_bundle(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bundle_path = Path(tmp) / "bundle.pdf"
+            with self.assertRaises(RuntimeError):
+                with pdf_bundle.PdfBundleWriter(bundle_path):
+                    raise RuntimeError("boom")
+
+            self.assertFalse(bundle_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
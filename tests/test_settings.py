@@ -47,6 +47,11 @@ class SettingsTests(unittest.TestCase):
             )
             first.cmb_pdf_engine.setCurrentIndex(first.cmb_pdf_engine.findText("libreoffice"))
             first.chk_verbose_logging.setChecked(True)
+            first.spin_lo_batch_size.setValue(7)
+            first.spin_log_max_lines.setValue(20000)
+            first.chk_combined_pdf.setChecked(True)
+            first.chk_keep_key_pdfs.setChecked(False)
+            first.chk_incremental.setChecked(True)
             first.source_headers = ["Name"]
             first.template_headers = ["Worker"]
             first.render_mapping_rows({"Worker": "Name"})
@@ -65,6 +70,11 @@ class SettingsTests(unittest.TestCase):
             self.assertEqual(second.cmb_template_mode.currentText(), "Use Source as Template")
             self.assertEqual(second.cmb_pdf_engine.currentText(), "libreoffice")
             self.assertTrue(second.chk_verbose_logging.isChecked())
+            self.assertEqual(second.spin_lo_batch_size.value(), 7)
+            self.assertEqual(second.spin_log_max_lines.value(), 20000)
+            self.assertTrue(second.chk_combined_pdf.isChecked())
+            self.assertFalse(second.chk_keep_key_pdfs.isChecked())
+            self.assertTrue(second.chk_incremental.isChecked())
             self.assertEqual(second.saved_column_mapping, {"Worker": "Name"})
 
     def test_ini_toolbar_buttons_are_replaced_by_reset_settings(self):
@@ -0,0 +1,70 @@
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from openpyxl import load_workbook
+
+import split_benchmark
+
+
+class SplitBenchmarkTests(unittest.TestCase):
+    def test_workload_generator_honours_rows_keys_skew_and_styles(self):
+        uniform = split_benchmark.BenchmarkWorkload(rows=100, columns=5, keys=10)
+        skewed = split_benchmark.BenchmarkWorkload(rows=100, columns=5, keys=10, skew=2.0, style_density=1.0)
+
+        self.assertEqual(uniform.key_row_counts(), [10] * 10)
+        self.assertEqual(sum(skewed.key_row_counts()), 100)
+        self.assertGreater(skewed.key_row_counts()[0], 5 * skewed.key_row_counts()[-1])
+        self.assertEqual(min(skewed.key_row_counts()), 1)
+        with self.assertRaises(ValueError):
+            split_benchmark.BenchmarkWorkload(rows=5, keys=10)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = split_benchmark.write_source_workbook(Path(tmp) / "source.xlsx", skewed)
+            ws = load_workbook(path)[split_benchmark.SHEET_NAME]
+            self.assertEqual(ws.max_row, 101)
+            self.assertEqual([cell.value for cell in ws[1]], skewed.headers())
+            self.assertEqual(len({ws.cell(row=row, column=1).value for row in range(2, 102)}), 10)
+            self.assertTrue(all(cell.has_style for cell in ws[2]))
+
+    def test_run_writes_comparable_results_with_stage_timings(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "results.json"
+            stderr = StringIO()
+            with redirect_stderr(stderr):
+                code = split_benchmark.main([
+                    "run", "--rows", "24", "--columns", "4", "--keys", "3", "--skew", "0", "--style-density", "0.5",
+                    "--outputs", "excel,pdf-native,pdf-libreoffice-pool", "--work-dir", tmp, "--out", str(out),
+                ])
+            self.assertEqual(code, 0, stderr.getvalue())
+
+            document = json.loads(out.read_text(encoding="utf-8"))
+            self.assertEqual(document["version"], split_benchmark.RESULTS_VERSION)
+            self.assertIn("cpu_count", document["environment"])
+            ran = [result for result in document["results"] if not result.get("skipped")]
+            self.assertEqual(
+                {(result["template_mode"], result["output"]) for result in ran},
+                {(mode, output) for mode in split_benchmark.TEMPLATE_MODES for output in ("excel", "pdf-native")},
+            )
+            for result in ran:
+                self.assertEqual(result["keys"], 3)
+                self.assertEqual(result["output_files"], 3)
+                self.assertGreater(result["output_bytes"], 0)
+                self.assertGreater(result["peak_memory_mb"], 0)
+                self.assertLessEqual(result["setup_seconds"], result["seconds"])
+                self.assertEqual(result["stages"]["render"]["items"], 3)
+                self.assertIn("source_read", result["phases"])
+            self.assertEqual(len(document["results"]), 6)
+
+            stdout = StringIO()
+            with redirect_stdout(stdout):
+                split_benchmark.main(["compare", str(out), str(out)])
+            self.assertEqual(len(stdout.getvalue().splitlines()), len(ran))
+            self.assertIn("(+0.0%)", stdout.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+import json
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from openpyxl import Workbook
+
+import mail_merge
+import split_cli
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def write_source(path: Path, rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws.append(["Dept", "Name", "Email"])
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def run_cli(*argv):
+    stdout, stderr = StringIO(), StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        code = split_cli.main(list(argv))
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
+class SplitCliTests(unittest.TestCase):
+    def test_split_from_settings_file_with_overrides(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            write_source(source, [["A", "Alice", "a@example.com"], ["B", "Bob", "b@example.com"]])
+            settings = tmp_path / "split.json"
+            settings.write_text(json.dumps({
+                "source_path": str(source),
+                "sheet_name": "Data",
+                "key_col": "Dept",
+                "template_mode": "source_template",
+                "source_header_rows": 1,
+                "output_dir": str(tmp_path / "ignored"),
+                "output_file_type": "excel",
+                "prefix": "Report",
+            }))
+
+            events = tmp_path / "events.jsonl"
+            code, stdout, stderr = run_cli(
+                "split", "--settings", str(settings), "--out", str(tmp_path / "out"), "--json",
+                "--events", str(events),
+            )
+
+            self.assertEqual(code, split_cli.EXIT_OK, stderr)
+            results = json.loads(stdout)
+            self.assertEqual([result["key"] for result in results], ["A", "B"])
+            self.assertTrue((tmp_path / "out" / "Report A.xlsx").exists())
+            self.assertFalse((tmp_path / "ignored").exists())
+            self.assertIn("Selesai.", stderr)
+            kinds = [json.loads(line)["kind"] for line in events.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual((kinds[0], kinds[-1]), ("run_started", "finished"))
+            self.assertEqual(kinds.count("key_finished"), 2)
+
+    def test_gui_settings_translate_to_split_params(self):
+        import split_engine
+
+        params = split_cli.split_params_from_settings({
+            "source_path": "data.xlsx",
+            "sheet_name": "Data",
+            "key_col": "3",
+            "template_path": "template.xlsx",
+            "header_rows": "4",
+            "template_header_rows": 2,
+            "output_dir": "out",
+            "output_file_type": "pdf",
+            "pdf_engine": "native",
+            "combined_pdf": "true",
+            "column_mapping": json.dumps({"Worker": "Name"}),
+            "incremental_split": True,
+            "memory_budget_mb": "8000",
+            "render_workers": "2",
+            "serialize_workers": 0,
+            "pdf_workers": 3,
+        }, split_engine)
+
+        self.assertEqual(params["key_col"], 3)
+        self.assertEqual(params["source_header_rows"], 4)
+        self.assertEqual(params["template_header_rows"], 2)
+        self.assertEqual(params["template_mode"], split_engine.TEMPLATE_MODE_TEMPLATE_FILE)
+        self.assertEqual(params["combined_pdf_path"], Path("out") / mail_merge.COMBINED_PDF_NAME)
+        self.assertEqual(params["column_mapping"], {"Worker": "Name"})
+        self.assertTrue(params["incremental"])
+        self.assertEqual(params["memory_budget_mb"], 8000.0)
+        self.assertFalse(params["track_memory"])
+        self.assertEqual(params["stage_workers"], {"render": 2, "pdf": 3})
+
+    def test_missing_setting_is_reported_without_traceback(self):
+        code, _, stderr = run_cli("split", "--sheet", "Data")
+
+        self.assertEqual(code, split_cli.EXIT_FAILED)
+        self.assertIn("error: Missing setting source_path", stderr)
+
+    def test_mail_merge_builds_jobs_as_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            out_dir = tmp_path / "out"
+            out_dir.mkdir()
+            Workbook().save(out_dir / "A.xlsx")
+            recipients = tmp_path / "recipients.xlsx"
+            write_source(recipients, [["A", "Alice", "a@example.com"]])
+
+            code, stdout, stderr = run_cli(
+                "mail-merge", "--folder", str(out_dir), "--recipients", str(recipients),
+                "--recipient-sheet", "Data", "--recipient-key", "Dept", "--recipient-to", "Email",
+                "--subject", "Report {key}", "--body", "Hi {Name}", "--json",
+            )
+
+            self.assertEqual(code, split_cli.EXIT_OK, stderr)
+            jobs = json.loads(stdout)
+            self.assertEqual(jobs[0]["to"], ["a@example.com"])
+            self.assertEqual(jobs[0]["subject"], "Report A")
+            self.assertEqual(jobs[0]["attachments"], [str(out_dir / "A.xlsx")])
+
+    def test_batch_runs_spec_jobs_and_fails_when_a_job_fails(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            write_source(tmp_path / "source.xlsx", [["A", "Alice", "a@example.com"], ["B", "Bob", "b@example.com"]])
+            spec = tmp_path / "jobs.json"
+            spec.write_text(json.dumps({
+                "defaults": {"source_path": "source.xlsx", "sheet_name": "Data", "header_rows": 1,
+                             "template_mode": "source_template", "pdf_engine": "none"},
+                "jobs": [
+                    {"name": "dept", "key_col": "Dept", "out_dir": "dept"},
+                    {"name": "name", "key_col": "Name", "out_dir": "name"},
+                    {"name": "broken", "key_col": "Nope", "out_dir": "broken"},
+                ],
+            }))
+
+            code, stdout, stderr = run_cli("batch", str(spec), "--only", "dept,name", "--json")
+            self.assertEqual(code, split_cli.EXIT_OK, stderr)
+            outcomes = json.loads(stdout)
+            self.assertEqual([outcome["name"] for outcome in outcomes], ["dept", "name"])
+            self.assertEqual([result["key"] for result in outcomes[1]["results"]], ["Alice", "Bob"])
+            self.assertTrue((tmp_path / "dept" / "A.xlsx").exists())
+            self.assertIn("Batch: 2/2 jobs done.", stderr)
+
+            code, _, stderr = run_cli("batch", str(spec))
+            self.assertEqual(code, split_cli.EXIT_FAILED)
+            self.assertIn("[broken] Gagal:", stderr)
+
+    def test_module_entry_point_never_imports_gui_stack(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            write_source(source, [["A", "Alice", "a@example.com"]])
+            script = (
+                "import sys, split_cli\n"
+                "code = split_cli.main(sys.argv[1:])\n"
+                "gui = sorted(name for name in ('PySide6', 'qfluentwidgets', 'main') if name in sys.modules)\n"
+                "print(','.join(gui))\n"
+                "sys.exit(code)\n"
+            )
+            completed = subprocess.run(
+                [sys.executable, "-c", script, "--quiet", "split", "--source", str(source),
+                 "--sheet", "Data", "--key", "Dept", "--template-mode", "source_template",
+                 "--source-header-rows", "1", "--out", str(tmp_path / "out")],
+                cwd=ROOT, capture_output=True, text=True, timeout=120,
+            )
+
+            self.assertEqual(completed.returncode, 0, completed.stderr)
+            self.assertEqual(completed.stdout.strip(), "")
+            self.assertTrue((tmp_path / "out" / "A.xlsx").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
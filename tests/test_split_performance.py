@@ -0,0 +1,188 @@
+"""Performance regression tests against the baselines in perf_baselines.json.
+
+SPLIT_PERF selects the workloads: ``off`` (default, so local runs stay fast
+and free of timing noise), ``quick`` (for CI) or ``full`` (quick plus the
+larger nightly workloads). Each case
+splits a synthetic workload per template mode and output type and compares
+call counts from a profiled run and best-of timings, normalized by a fixed
+pure-Python calibration loop, against the checked-in baseline.
+SPLIT_PERF_UPDATE=1 rewrites the baselines of the selected mode instead.
+"""
+
+import json
+import os
+import platform
+import pstats
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import split_benchmark
+import split_engine
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINES_PATH = Path(__file__).with_name("perf_baselines.json")
+BASELINES_VERSION = 1
+
+PERF_MODE = os.environ.get("SPLIT_PERF", "off").strip().lower()
+UPDATE_BASELINES = os.environ.get("SPLIT_PERF_UPDATE", "").strip() not in ("", "0")
+# Call counts are deterministic for a given library version, so a few
+# percent is already a real change; the sub-second quick timings swing by
+# half on a busy machine, so only a doubling fails.
+CALLS_TOLERANCE = float(os.environ.get("SPLIT_PERF_CALLS_TOLERANCE", 0.05))
+TIME_TOLERANCE = float(os.environ.get("SPLIT_PERF_TIME_TOLERANCE", 1.0))
+TIMED_RUNS = 3
+
+PERF_WORKLOADS = {
+    "quick": [split_benchmark.BenchmarkWorkload(rows=120, columns=6, keys=8, skew=1.2, style_density=0.3)],
+    "full": [
+        split_benchmark.BenchmarkWorkload(rows=1500, columns=12, keys=40, skew=0.0, style_density=0.3),
+        split_benchmark.BenchmarkWorkload(rows=1500, columns=12, keys=40, skew=1.5, style_density=0.3),
+    ],
+}
+PERF_OUTPUTS = ("excel", "pdf-native", "excel-pdf-native")
+LIBRARY_MODULES = ("pandas", "openpyxl")
+
+
+def calibration_seconds(repeat: int = 3) -> float:
+    """Best time of a fixed pure-Python loop, the unit timings are divided by."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        values = [(index * 7919) % 10007 for index in range(200_000)]
+        sorted(str(value) for value in values)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def library_versions() -> dict:
+    versions = {"python": platform.python_version()}
+    for module in LIBRARY_MODULES:
+        versions[module] = __import__(module).__version__
+    return versions
+
+
+def profile_call_counts(prof_path: Path) -> tuple[int, int]:
+    """Return ``(calls into this repository's modules, all calls)`` of a profile."""
+    stats = pstats.Stats(str(prof_path))
+    own = sum(
+        entry[1] for (filename, _, _), entry in stats.stats.items()
+        if Path(filename).parent == ROOT
+    )
+    return own, stats.total_calls
+
+
+def load_baselines() -> dict:
+    if not BASELINES_PATH.exists():
+        return {"version": BASELINES_VERSION, "environment": {}, "cases": {}}
+    return json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+
+
+def selected_presets() -> list[str]:
+    return {"quick": ["quick"], "full": ["quick", "full"]}.get(PERF_MODE, [])
+
+
+@unittest.skipIf(not selected_presets(), f"performance tests disabled (SPLIT_PERF={PERF_MODE})")
+class SplitPerformanceTests(unittest.TestCase):
+    measurements = {}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.baselines = load_baselines()
+        cls.work_dir = Path(tempfile.mkdtemp(prefix="split-perf-"))
+        # Warm imports and lazily built engine state before anything is timed.
+        warmup = split_benchmark.BenchmarkWorkload(rows=20, columns=4, keys=2)
+        source = split_benchmark.write_source_workbook(cls.work_dir / "warmup.xlsx", warmup)
+        cls.split(source, source, split_engine.TEMPLATE_MODE_SOURCE_TEMPLATE, "pdf-native", cls.work_dir / "warmup")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.work_dir, ignore_errors=True)
+        if UPDATE_BASELINES and cls.measurements:
+            baselines = cls.baselines
+            baselines["version"] = BASELINES_VERSION
+            for preset in selected_presets():
+                baselines.setdefault("environment", {})[preset] = library_versions()
+            baselines.setdefault("cases", {}).update(cls.measurements)
+            baselines["cases"] = dict(sorted(baselines["cases"].items()))
+            BASELINES_PATH.write_text(json.dumps(baselines, indent=2) + "\n", encoding="utf-8")
+
+    @staticmethod
+    def split(source, template, template_mode, output, out_dir, **kwargs):
+        output_file_type, pdf_engine = split_benchmark.BENCHMARK_OUTPUTS[output]
+        shutil.rmtree(out_dir, ignore_errors=True)
+        started = time.perf_counter()
+        results = split_engine.split_excel_with_template(
+            source_path=source, sheet_name=split_benchmark.SHEET_NAME, key_col=split_benchmark.KEY_HEADER,
+            template_path=template, out_dir=out_dir, header_rows=1, pdf_engine=pdf_engine,
+            template_mode=template_mode, output_file_type=output_file_type, **kwargs,
+        )
+        return time.perf_counter() - started, results
+
+    def measure(self, workload, source, template, template_mode, output) -> dict:
+        out_dir = self.work_dir / "out"
+        # Calibrated next to the timed runs, so both see the same machine load.
+        calibration = calibration_seconds()
+        seconds = []
+        for _ in range(TIMED_RUNS):
+            elapsed, results = self.split(source, template, template_mode, output, out_dir)
+            seconds.append(elapsed)
+        self.assertEqual(len(results), workload.keys)
+        self.split(source, template, template_mode, output, out_dir, capture_profile=True)
+        calls, total_calls = profile_call_counts(out_dir / split_engine.SPLIT_PROFILE_NAME)
+        return {
+            "calls": calls,
+            "total_calls": total_calls,
+            "seconds": round(min(seconds), 4),
+            "normalized_time": round(min(seconds) / calibration, 3),
+        }
+
+    def assert_within_baseline(self, case, current, baseline, environment):
+        failures = []
+        limit = baseline["calls"] * (1 + CALLS_TOLERANCE)
+        if current["calls"] > limit:
+            failures.append(f"calls {current['calls']} > {baseline['calls']} (+{CALLS_TOLERANCE:.0%})")
+        # Library call counts move with pandas/openpyxl releases; only compare
+        # them on the versions the baseline was recorded with.
+        if environment == library_versions():
+            limit = baseline["total_calls"] * (1 + CALLS_TOLERANCE)
+            if current["total_calls"] > limit:
+                failures.append(
+                    f"total calls {current['total_calls']} > {baseline['total_calls']} (+{CALLS_TOLERANCE:.0%})"
+                )
+        limit = baseline["normalized_time"] * (1 + TIME_TOLERANCE)
+        if current["normalized_time"] > limit:
+            failures.append(
+                f"normalized time {current['normalized_time']} > {baseline['normalized_time']} "
+                f"(+{TIME_TOLERANCE:.0%}; {current['seconds']}s)"
+            )
+        if failures:
+            self.fail(f"{case} is slower than its baseline: " + "; ".join(failures))
+
+    def test_split_stays_within_baselines(self):
+        for preset in selected_presets():
+            environment = self.baselines.get("environment", {}).get(preset)
+            for workload in PERF_WORKLOADS[preset]:
+                source = split_benchmark.write_source_workbook(self.work_dir / f"{workload.name}-source.xlsx", workload)
+                template = split_benchmark.write_template_workbook(
+                    self.work_dir / f"{workload.name}-template.xlsx", workload,
+                )
+                for template_mode in split_benchmark.TEMPLATE_MODES:
+                    for output in PERF_OUTPUTS:
+                        case = f"{preset}/{workload.name}/{template_mode}/{output}"
+                        with self.subTest(case=case):
+                            current = self.measure(workload, source, template, template_mode, output)
+                            self.measurements[case] = current
+                            baseline = self.baselines.get("cases", {}).get(case)
+                            if UPDATE_BASELINES:
+                                continue
+                            if baseline is None:
+                                self.skipTest(f"no baseline for {case}; record one with SPLIT_PERF_UPDATE=1")
+                            self.assert_within_baseline(case, current, baseline, environment)
+
+
+if __name__ == "__main__":
+    unittest.main()
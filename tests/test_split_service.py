@@ -0,0 +1,224 @@
+import json
+from pathlib import Path
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import urllib.error
+import urllib.request
+
+from openpyxl import Workbook
+
+import split_service
+
+
+def write_source(path: Path, rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws.append(["Dept", "Name"])
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def job_params(tmp_path: Path, out_name: str = "out") -> dict:
+    return {
+        "source_path": str(tmp_path / "source.xlsx"),
+        "sheet_name": "Data",
+        "key_col": "Dept",
+        "out_dir": str(tmp_path / out_name),
+        "template_mode": "source_template",
+        "source_header_rows": 1,
+        "pdf_engine": "none",
+    }
+
+
+def wait_for(jobs, job_id, states=split_service.FINISHED_STATES, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get(job_id)
+        if job.state in states:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {jobs.get(job_id).state}")
+
+
+class SplitServiceHttpTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp_path = Path(tmp.name)
+        write_source(self.tmp_path / "source.xlsx", [["A", "Alice"], ["B", "Bob"], ["A", "Ann"]])
+        self.jobs = split_service.JobQueue(self.tmp_path / "state", workers=1).start()
+        self.addCleanup(self.jobs.stop)
+        self.server = split_service.serve(self.jobs, port=0, quiet=True)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        self.token = split_service.service_token(self.tmp_path / "state")
+
+    def request(self, method, path, payload=None, headers=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Authorization": f"Bearer {self.token}", "Content-Type": "application/json", **(headers or {})}
+        req = urllib.request.Request(self.base + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_submit_poll_and_download_manifest(self):
+        status, job = self.request("POST", "/jobs", {"params": job_params(self.tmp_path)})
+        self.assertEqual(status, 201, job)
+
+        wait_for(self.jobs, job["id"])
+        status, detail = self.request("GET", f"/jobs/{job['id']}")
+        self.assertEqual(status, 200)
+        self.assertEqual(detail["state"], split_service.DONE, detail)
+        self.assertEqual(detail["progress"], {"total": 2, "done": 2})
+        self.assertFalse(detail["cancel_requested"])
+
+        status, manifest = self.request("GET", f"/jobs/{job['id']}/manifest")
+        self.assertEqual(status, 200)
+        self.assertEqual([result["key"] for result in manifest["results"]], ["A", "B"])
+        self.assertEqual(sorted(manifest["files"]), ["A", "B"])
+        self.assertTrue((self.tmp_path / "out" / "A.xlsx").exists())
+
+        status, listing = self.request("GET", "/jobs")
+        self.assertEqual([item["id"] for item in listing], [job["id"]])
+
+    def test_bad_requests_are_answered_with_json_errors(self):
+        status, body = self.request("POST", "/jobs", {"params": {"sheet_name": "Data"}})
+        self.assertEqual(status, 400)
+        self.assertIn("source_path", body["error"])
+
+        status, body = self.request("POST", "/jobs", {"params": job_params(self.tmp_path), "limits": {"max_keys": 0}})
+        self.assertEqual(status, 400)
+        self.assertIn("max_keys", body["error"])
+
+        status, body = self.request("GET", "/jobs/missing")
+        self.assertEqual(status, 404)
+
+    def test_requests_need_the_token_and_a_json_content_type(self):
+        payload = {"params": job_params(self.tmp_path)}
+        status, body = self.request("POST", "/jobs", payload, headers={"Authorization": ""})
+        self.assertEqual(status, 401)
+        status, body = self.request("GET", "/jobs", headers={"Authorization": "Bearer wrong"})
+        self.assertEqual(status, 401)
+        # What a cross-site "simple" request from a browser looks like.
+        status, body = self.request("POST", "/jobs", payload, headers={"Content-Type": "text/plain"})
+        self.assertEqual(status, 415)
+        self.assertEqual(self.jobs.jobs(), [])
+
+
+class JobQueueTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp_path = Path(tmp.name)
+        write_source(self.tmp_path / "source.xlsx", [["A", "Alice"], ["B", "Bob"], ["C", "Cy"]])
+        self.state_dir = self.tmp_path / "state"
+
+    def test_queue_survives_restart_and_interrupted_jobs_resume(self):
+        jobs = split_service.JobQueue(self.state_dir)
+        queued = jobs.submit(job_params(self.tmp_path, "queued"))
+        interrupted = jobs.submit(job_params(self.tmp_path, "interrupted"))
+        cancelled = jobs.submit(job_params(self.tmp_path, "cancelled"))
+        jobs.cancel(cancelled.id)
+        # Simulate a crash while the second job was running.
+        interrupted.state = split_service.RUNNING
+        jobs._save()
+
+        restarted = split_service.JobQueue(self.state_dir, workers=2)
+        self.assertEqual(restarted.get(interrupted.id).state, split_service.QUEUED)
+        self.assertTrue(restarted.get(interrupted.id).params["resume"])
+        self.assertEqual(restarted.get(cancelled.id).state, split_service.CANCELLED)
+
+        restarted.start()
+        self.addCleanup(restarted.stop)
+        self.assertEqual(wait_for(restarted, queued.id).state, split_service.DONE)
+        resumed = wait_for(restarted, interrupted.id)
+        self.assertEqual(resumed.state, split_service.DONE)
+        self.assertTrue(resumed.resumed)
+        self.assertFalse((self.tmp_path / "cancelled").exists())
+
+    def test_paths_are_confined_and_soffice_path_is_service_configuration(self):
+        jobs = split_service.JobQueue(self.state_dir, allowed_roots=[self.tmp_path], soffice_path="/opt/lo/soffice")
+        outside = dict(job_params(self.tmp_path), event_log_path=str(self.tmp_path.parent / "events.jsonl"))
+        with self.assertRaises(split_service.JobError) as caught:
+            jobs.submit(outside)
+        self.assertEqual(caught.exception.status, 403)
+        self.assertIn("event_log_path", str(caught.exception))
+        with self.assertRaisesRegex(split_service.JobError, "prefix"):
+            jobs.submit(dict(job_params(self.tmp_path), prefix="../../escape"))
+
+        job = jobs.submit(dict(job_params(self.tmp_path), soffice_path="/tmp/evil.exe"))
+        self.assertNotIn("soffice_path", job.params)
+        self.assertEqual(jobs._limited_kwargs(job)["soffice_path"], "/opt/lo/soffice")
+
+    def test_limits_tighten_service_defaults_and_fail_the_job(self):
+        jobs = split_service.JobQueue(self.state_dir, limits=split_service.JobLimits(max_keys=10))
+        job = jobs.submit(job_params(self.tmp_path), limits={"max_keys": 2, "max_seconds": 60})
+        self.assertEqual(job.limits.max_keys, 2)
+        self.assertEqual(jobs.submit(job_params(self.tmp_path, "other"), limits={"max_keys": 50}).limits.max_keys, 10)
+
+        jobs.start()
+        self.addCleanup(jobs.stop)
+        failed = wait_for(jobs, job.id)
+        self.assertEqual(failed.state, split_service.FAILED)
+        self.assertIn("limit of 2", failed.error)
+
+    def test_cancel_running_job_stops_it(self):
+        jobs = split_service.JobQueue(self.state_dir)
+        job = jobs.submit(job_params(self.tmp_path))
+        started = threading.Event()
+        release = threading.Event()
+        real_render = split_service.split_excel_with_template
+
+        def slow_split(**kwargs):
+            started.set()
+            release.wait(10)
+            return real_render(**kwargs)
+
+        with mock.patch.object(split_service, "split_excel_with_template", slow_split):
+            jobs.start()
+            self.addCleanup(jobs.stop)
+            self.assertTrue(started.wait(10))
+            self.assertTrue(jobs.cancel(job.id).cancel_requested)
+            release.set()
+            cancelled = wait_for(jobs, job.id)
+
+        self.assertEqual(cancelled.state, split_service.CANCELLED)
+        self.assertEqual(cancelled.results, [])
+
+
+    def test_status_messages_are_appended_under_the_queue_lock(self):
+        jobs = split_service.JobQueue(self.state_dir)
+        job = jobs.submit(job_params(self.tmp_path))
+        started = threading.Event()
+        go = threading.Event()
+
+        def chatty_split(**kwargs):
+            started.set()
+            go.wait(10)
+            kwargs["status_cb"]("halo")
+            return []
+
+        with mock.patch.object(split_service, "split_excel_with_template", chatty_split):
+            jobs.start()
+            self.addCleanup(jobs.stop)
+            self.assertTrue(started.wait(10))
+            with jobs._lock:
+                go.set()
+                time.sleep(0.2)
+                # A save holding the lock would see the messages unchanged.
+                self.assertNotIn("halo", list(job.messages))
+            done = wait_for(jobs, job.id)
+
+        self.assertIn("halo", jobs.detail(done.id)["messages"])
+
+if __name__ == "__main__":
+    unittest.main()
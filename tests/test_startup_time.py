@@ -0,0 +1,93 @@
+import importlib.util
+import json
+from pathlib import Path
+import subprocess
+import sys
+import unittest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ("pandas", "openpyxl", "xlwings")
+# Generous on purpose: the budgets catch pandas/openpyxl creeping back into
+# startup (hundreds of milliseconds each), not machine-to-machine noise.
+ENGINE_IMPORT_BUDGET = 0.5
+WINDOW_STARTUP_BUDGET = 5.0
+
+ENGINE_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+WINDOW_PROBE = """
+import json, os, sys, tempfile, time
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+started = time.perf_counter()
+from PySide6.QtCore import QSettings
+from PySide6.QtWidgets import QApplication
+import main
+imported = time.perf_counter()
+app = QApplication([])
+with tempfile.TemporaryDirectory() as tmp:
+    window = main.SplitApp(settings=QSettings(os.path.join(tmp, "settings.ini"), QSettings.IniFormat))
+    ready = time.perf_counter()
+    report = {{
+        "import_seconds": imported - started,
+        "seconds": ready - started,
+        "mail_merge_card_built": window._mail_merge_card_built,
+        "heavy": [m for m in {heavy!r} if m in sys.modules],
+    }}
+    window.deleteLater()
+print(json.dumps(report))
+"""
+
+
+def run_probe(script: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    if completed.returncode != 0:
+        raise AssertionError(completed.stderr)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+class StartupTimeTests(unittest.TestCase):
+    timings = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.timings:
+            report = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in cls.timings.items())
+            print(f"\nStartup time: {report}", file=sys.stderr)
+
+    def test_engine_modules_import_without_pandas_or_openpyxl(self):
+        for module in ("split_engine", "split_cli", "mail_merge"):
+            with self.subTest(module=module):
+                result = run_probe(ENGINE_PROBE.format(module=module, heavy=HEAVY_MODULES))
+                self.timings[f"import {module}"] = result["seconds"]
+
+                self.assertEqual(result["heavy"], [])
+                self.assertLess(
+                    result["seconds"], ENGINE_IMPORT_BUDGET,
+                    f"import {module} took {result['seconds']:.3f}s",
+                )
+
+    def test_window_opens_within_budget_without_loading_data_stack(self):
+        for module in ("PySide6", "qfluentwidgets"):
+            if importlib.util.find_spec(module) is None:
+                self.skipTest(f"GUI dependencies are not installed: {module}")
+
+        result = run_probe(WINDOW_PROBE.format(heavy=HEAVY_MODULES))
+        self.timings["import main"] = result["import_seconds"]
+        self.timings["window ready"] = result["seconds"]
+
+        self.assertEqual(result["heavy"], [])
+        self.assertFalse(result["mail_merge_card_built"])
+        self.assertLess(result["seconds"], WINDOW_STARTUP_BUDGET, f"window took {result['seconds']:.3f}s")
+
+
+if __name__ == "__main__":
+    unittest.main()
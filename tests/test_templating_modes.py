@@ -1,23 +1,34 @@
-from contextlib import redirect_stdout
+from dataclasses import replace
 from datetime import datetime
-from io import StringIO
+import json
+import os
+import re
 from pathlib import Path
+import pstats
+import subprocess
+import sys
 import tempfile
+import threading
+import time
 import unittest
+import zlib
+from unittest.mock import patch
 
 from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+import pandas as pd
 
-
-with redirect_stdout(StringIO()):
-    import main
+import mail_merge
+import pdf_bundle
+import split_engine
 
 
 class HeaderMappingTests(unittest.TestCase):
     def test_normalize_header_ignores_case_spaces_and_punctuation(self):
-        self.assertEqual(main.normalize_header(" Employee  Name!"), "employeename")
+        self.assertEqual(split_engine.normalize_header(" Employee  Name!"), "employeename")
 
     def test_auto_map_columns_matches_normalized_headers(self):
-        mapping = main.auto_map_columns(
+        mapping = split_engine.auto_map_columns(
             ["Employee Name", "Dept"],
             ["employee_name", "Dept", "Amount"],
         )
@@ -25,7 +36,7 @@ class HeaderMappingTests(unittest.TestCase):
         self.assertEqual(mapping, {"Employee Name": "employee_name", "Dept": "Dept"})
 
     def test_validate_column_mapping_reports_unmapped_template_columns(self):
-        missing = main.validate_column_mapping(
+        missing = split_engine.validate_column_mapping(
             ["Employee Name", "Dept"],
             {"Employee Name": "Name", "Dept": None},
         )
@@ -44,7 +55,7 @@ class HeaderMappingTests(unittest.TestCase):
             ws.append(["Alice", "A", 10])
             wb.save(path)
 
-            self.assertEqual(main.detect_excel_header_row(path, "Data"), 3)
+            self.assertEqual(split_engine.detect_excel_header_row(path, "Data"), 3)
 
 
 class TemplateFileSplitTests(unittest.TestCase):
@@ -74,7 +85,7 @@ class TemplateFileSplitTests(unittest.TestCase):
             self.make_source_workbook(source)
             self.make_template_workbook(template)
 
-            main.split_excel_with_template(
+            split_engine.split_excel_with_template(
                 source,
                 "Data",
                 "Dept",
@@ -120,7 +131,7 @@ class TemplateFileSplitTests(unittest.TestCase):
             ws.append(["Worker", "Team"])
             wb.save(template)
 
-            main.split_excel_with_template(
+            split_engine.split_excel_with_template(
                 source,
                 "Data",
                 "Dept",
@@ -167,7 +178,7 @@ class TemplateFileSplitTests(unittest.TestCase):
             ws.append(["Dept", date_header])
             wb.save(template)
 
-            main.split_excel_with_template(
+            split_engine.split_excel_with_template(
                 source,
                 "Data",
                 "Dept",
@@ -207,7 +218,7 @@ class TemplateFileSplitTests(unittest.TestCase):
             ws.append(["Name"])
             wb.save(template)
 
-            main.split_excel_with_template(
+            split_engine.split_excel_with_template(
                 source,
                 "Data",
                 str(date_header),
@@ -239,7 +250,7 @@ class TemplateFileSplitTests(unittest.TestCase):
             wb.save(template)
 
             with self.assertRaisesRegex(ValueError, "Header template duplikat"):
-                main.split_excel_with_template(
+                split_engine.split_excel_with_template(
                     source,
                     "Data",
                     "Dept",
@@ -267,7 +278,7 @@ class TemplateFileSplitTests(unittest.TestCase):
             ws.column_dimensions["B"].hidden = True
             wb.save(template)
 
-            main.split_excel_with_template(
+            split_engine.split_excel_with_template(
                 source,
                 "Data",
                 "Dept",
@@ -296,7 +307,7 @@ class TemplateFileSplitTests(unittest.TestCase):
             self.make_template_workbook(template)
 
             with self.assertRaisesRegex(ValueError, "Team"):
-                main.split_excel_with_template(
+                split_engine.split_excel_with_template(
                     source,
                     "Data",
                     "Dept",
@@ -323,7 +334,7 @@ class TemplateFileSplitTests(unittest.TestCase):
             wb.save(template)
 
             with self.assertRaisesRegex(ValueError, "Header template"):
-                main.split_excel_with_template(
+                split_engine.split_excel_with_template(
                     source,
                     "Data",
                     "Dept",
@@ -355,7 +366,7 @@ class SourceTemplateSplitTests(unittest.TestCase):
             other["A1"] = "Should not be copied"
             wb.save(source)
 
-            main.split_excel_with_template(
+            split_engine.split_excel_with_template(
                 source,
                 "Data",
                 "Dept",
@@ -388,14 +399,14 @@ class SourceTemplateSplitTests(unittest.TestCase):
             ws.append(["A", "Alice"])
             wb.save(source)
 
-            original_export = main.export_pdf_via_lo
+            original_export = split_engine.export_pdf_via_lo
 
             def fake_export(xlsx_path, soffice_path=None):
                 xlsx_path.with_suffix(".pdf").write_bytes(b"%PDF-1.4\n")
 
             try:
-                main.export_pdf_via_lo = fake_export
-                main.split_excel_with_template(
+                split_engine.export_pdf_via_lo = fake_export
+                split_engine.split_excel_with_template(
                     source,
                     "Data",
                     "Dept",
@@ -404,10 +415,10 @@ class SourceTemplateSplitTests(unittest.TestCase):
                     1,
                     pdf_engine="libreoffice",
                     template_mode="source_template",
-                    output_file_type=main.OUTPUT_TYPE_PDF,
+                    output_file_type=split_engine.OUTPUT_TYPE_PDF,
                 )
             finally:
-                main.export_pdf_via_lo = original_export
+                split_engine.export_pdf_via_lo = original_export
 
             self.assertTrue((out_dir / "A.pdf").exists())
             self.assertFalse((out_dir / "A.xlsx").exists())
@@ -425,14 +436,14 @@ class SourceTemplateSplitTests(unittest.TestCase):
             ws.append(["A", "Alice"])
             wb.save(source)
 
-            original_export = main.export_pdf_via_lo
+            original_export = split_engine.export_pdf_via_lo
 
             def fake_export(xlsx_path, soffice_path=None):
                 xlsx_path.with_suffix(".pdf").write_bytes(b"%PDF-1.4\n")
 
             try:
-                main.export_pdf_via_lo = fake_export
-                main.split_excel_with_template(
+                split_engine.export_pdf_via_lo = fake_export
+                split_engine.split_excel_with_template(
                     source,
                     "Data",
                     "Dept",
@@ -441,10 +452,10 @@ class SourceTemplateSplitTests(unittest.TestCase):
                     1,
                     pdf_engine="libreoffice",
                     template_mode="source_template",
-                    output_file_type=main.OUTPUT_TYPE_EXCEL_AND_PDF,
+                    output_file_type=split_engine.OUTPUT_TYPE_EXCEL_AND_PDF,
                 )
             finally:
-                main.export_pdf_via_lo = original_export
+                split_engine.export_pdf_via_lo = original_export
 
             self.assertTrue((out_dir / "A.xlsx").exists())
             self.assertTrue((out_dir / "A.pdf").exists())
@@ -461,14 +472,14 @@ class SourceTemplateSplitTests(unittest.TestCase):
             ws.append(["A", "Alice"])
             wb.save(source)
 
-            original_export = main.export_pdf_via_lo
+            original_export = split_engine.export_pdf_via_lo
 
             def fake_export(xlsx_path, soffice_path=None):
                 xlsx_path.with_suffix(".pdf").write_bytes(b"%PDF-1.4\n")
 
             try:
-                main.export_pdf_via_lo = fake_export
-                results = main.split_excel_with_template(
+                split_engine.export_pdf_via_lo = fake_export
+                results = split_engine.split_excel_with_template(
                     source,
                     "Data",
                     "Dept",
@@ -477,16 +488,16 @@ class SourceTemplateSplitTests(unittest.TestCase):
                     1,
                     pdf_engine="libreoffice",
                     template_mode="source_template",
-                    output_file_type=main.OUTPUT_TYPE_EXCEL_AND_PDF,
+                    output_file_type=split_engine.OUTPUT_TYPE_EXCEL_AND_PDF,
                 )
             finally:
-                main.export_pdf_via_lo = original_export
+                split_engine.export_pdf_via_lo = original_export
 
             self.assertEqual(len(results), 1)
             self.assertEqual(results[0].key, "A")
             self.assertEqual(results[0].excel_path, out_dir / "A.xlsx")
             self.assertEqual(results[0].pdf_path, out_dir / "A.pdf")
-            self.assertEqual(results[0].output_file_type, main.OUTPUT_TYPE_EXCEL_AND_PDF)
+            self.assertEqual(results[0].output_file_type, split_engine.OUTPUT_TYPE_EXCEL_AND_PDF)
 
 
 class SplitControlTests(unittest.TestCase):
@@ -508,10 +519,10 @@ class SplitControlTests(unittest.TestCase):
             out_dir = tmp_path / "out"
             self.make_source_workbook(source)
 
-            results = main.split_excel_with_template(
+            results = split_engine.split_excel_with_template(
                 source, "Data", "Dept", source, out_dir, 1,
                 pdf_engine="none", template_mode="source_template",
-                output_file_type=main.OUTPUT_TYPE_EXCEL,
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
                 selected_keys={"A", "C"},
             )
 
@@ -527,10 +538,10 @@ class SplitControlTests(unittest.TestCase):
             out_dir = tmp_path / "out"
             self.make_source_workbook(source)
 
-            results = main.split_excel_with_template(
+            results = split_engine.split_excel_with_template(
                 source, "Data", "Dept", source, out_dir, 1,
                 pdf_engine="none", template_mode="source_template",
-                output_file_type=main.OUTPUT_TYPE_EXCEL,
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
                 selected_keys=None,
             )
 
@@ -552,10 +563,10 @@ class SplitControlTests(unittest.TestCase):
                 calls["count"] += 1
                 return should_stop
 
-            results = main.split_excel_with_template(
+            results = split_engine.split_excel_with_template(
                 source, "Data", "Dept", source, out_dir, 1,
                 pdf_engine="none", template_mode="source_template",
-                output_file_type=main.OUTPUT_TYPE_EXCEL,
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
                 stop_requested=stop,
             )
 
@@ -567,10 +578,19 @@ class SplitControlTests(unittest.TestCase):
             source = Path(tmp) / "source.xlsx"
             self.make_source_workbook(source)
 
-            values = main.read_key_values(source, "Data", "Dept", 1)
+            values = split_engine.read_key_values(source, "Data", "Dept", 1)
 
             self.assertEqual(values, ["A", "B", "C"])
 
+    def test_read_key_counts_counts_rows_per_key_in_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "source.xlsx"
+            self.make_source_workbook(source)
+
+            counts = split_engine.read_key_counts(source, "Data", 1, 1)
+
+            self.assertEqual(list(counts.items()), [("A", 2), ("B", 1), ("C", 1)])
+
     def test_debug_messages_suppressed_unless_verbose(self):
         with tempfile.TemporaryDirectory() as tmp:
             tmp_path = Path(tmp)
@@ -579,19 +599,19 @@ class SplitControlTests(unittest.TestCase):
             self.make_source_workbook(source)
 
             quiet_messages = []
-            main.split_excel_with_template(
+            split_engine.split_excel_with_template(
                 source, "Data", "Dept", source, out_dir, 1,
                 pdf_engine="none", template_mode="source_template",
-                output_file_type=main.OUTPUT_TYPE_EXCEL,
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
                 status_cb=quiet_messages.append, verbose=False,
             )
             self.assertFalse(any(msg.startswith("Debug:") for msg in quiet_messages))
 
             verbose_messages = []
-            main.split_excel_with_template(
+            split_engine.split_excel_with_template(
                 source, "Data", "Dept", source, out_dir, 1,
                 pdf_engine="none", template_mode="source_template",
-                output_file_type=main.OUTPUT_TYPE_EXCEL,
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
                 status_cb=verbose_messages.append, verbose=True,
             )
             self.assertTrue(any(msg.startswith("Debug:") for msg in verbose_messages))
@@ -603,10 +623,10 @@ class SplitControlTests(unittest.TestCase):
             out_dir = tmp_path / "out"
             self.make_source_workbook(source)
 
-            main.split_excel_with_template(
+            split_engine.split_excel_with_template(
                 source, "Data", "Dept", source, out_dir, 1,
                 pdf_engine="none", template_mode="source_template",
-                output_file_type=main.OUTPUT_TYPE_EXCEL,
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
             )
 
             wb = load_workbook(out_dir / "A.xlsx")
@@ -641,10 +661,10 @@ class SplitControlTests(unittest.TestCase):
             tws.cell(row=2, column=2).number_format = "#,##0.00"
             tpl.save(template)
 
-            main.split_excel_with_template(
+            split_engine.split_excel_with_template(
                 source, "Data", "Dept", template, out_dir, 1,
                 pdf_engine="none", template_mode="template_file",
-                output_file_type=main.OUTPUT_TYPE_EXCEL,
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
                 column_mapping={"Dept": "Dept", "Amount": "Amount"},
             )
 
@@ -654,5 +674,1337 @@ class SplitControlTests(unittest.TestCase):
             self.assertEqual(out_ws.cell(row=3, column=2).number_format, "#,##0.00")
 
 
+class PipelineTests(unittest.TestCase):
+    def make_source_workbook(self, path: Path):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Data"
+        ws.append(["Dept", "Name"])
+        for index, dept in enumerate("ABCDABCD"):
+            ws.append([dept, f"Name {index}"])
+        wb.save(path)
+
+    def test_run_pipeline_applies_back_pressure_to_producer(self):
+        produced = []
+        release = threading.Event()
+
+        def items():
+            for index in range(20):
+                produced.append(index)
+                yield index
+
+        def slow(item):
+            release.wait(5)
+            return item
+
+        result = {}
+        runner = threading.Thread(
+            target=lambda: result.update(outputs=split_engine.run_pipeline(items(), [("slow", slow, 1)], queue_size=2)[0])
+        )
+        runner.start()
+        time.sleep(0.3)
+        # One item in the worker, two queued, one blocked in put().
+        self.assertLessEqual(len(produced), 4)
+        release.set()
+        runner.join(5)
+
+        self.assertEqual(sorted(result["outputs"]), list(range(20)))
+
+    def test_run_pipeline_reraises_stage_error_and_stops(self):
+        def explode(item):
+            if item == 3:
+                raise RuntimeError("boom")
+            return item
+
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            split_engine.run_pipeline(iter(range(1000)), [("a", explode, 2), ("b", lambda item: item, 1)])
+
+    def test_run_pipeline_reports_stats_per_stage(self):
+        outputs, stats = split_engine.run_pipeline(
+            iter(range(5)),
+            [("double", lambda item: item * 2, 2), ("drop_odd", lambda item: item if item % 4 else None, 1)],
+        )
+
+        self.assertEqual(sorted(outputs), [2, 6])
+        self.assertEqual([s.name for s in stats], ["partition", "double", "drop_odd"])
+        self.assertEqual([s.items for s in stats], [5, 5, 5])
+        self.assertEqual(stats[1].workers, 2)
+
+    def test_parallel_stages_keep_manifest_in_group_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.make_source_workbook(source)
+
+            messages = []
+            results = split_engine.split_excel_with_template(
+                source, "Data", "Dept", source, out_dir, 1,
+                pdf_engine="none", template_mode="source_template",
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
+                stage_workers={"render": 3, "serialize": 2},
+                pipeline_queue_size=1,
+                status_cb=messages.append,
+            )
+
+            self.assertEqual([result.key for result in results], ["A", "B", "C", "D"])
+            ws = load_workbook(out_dir / "C.xlsx").active
+            self.assertEqual([ws["B2"].value, ws["B3"].value], ["Name 2", "Name 6"])
+            stage_lines = [msg for msg in messages if msg.startswith("Stage ")]
+            self.assertEqual(
+                [line.split(":")[0] for line in stage_lines],
+                ["Stage partition", "Stage render", "Stage serialize", "Stage manifest"],
+            )
+            self.assertIn("3 worker(s)", stage_lines[1])
+
+    def test_timing_percentiles_use_nearest_rank(self):
+        samples = [0.01 * n for n in range(1, 21)]
+
+        self.assertEqual(split_engine.timing_percentiles([]), {})
+        percentiles = split_engine.timing_percentiles(reversed(samples))
+        self.assertEqual(percentiles["p50"], samples[9])
+        self.assertEqual(percentiles["p95"], samples[18])
+        self.assertEqual(percentiles["max"], samples[-1])
+
+    def test_split_writes_run_report_with_phase_and_stage_timings(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.make_source_workbook(source)
+
+            messages = []
+            reports = []
+            split_engine.split_excel_with_template(
+                source, "Data", "Dept", source, out_dir, 1,
+                pdf_engine=split_engine.PDF_ENGINE_NATIVE, template_mode="source_template",
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL_AND_PDF,
+                status_cb=messages.append, report_cb=reports.append,
+            )
+
+            report = json.loads((out_dir / split_engine.SPLIT_REPORT_NAME).read_text(encoding="utf-8"))
+            self.assertEqual(report, reports[0])
+            self.assertEqual(set(report["phases"]), {"source_read", "template_compile", "partition"})
+            self.assertEqual(list(report["stages"]), ["partition", "render", "serialize", "pdf", "manifest"])
+            self.assertEqual(report["keys"], {"total": 4, "generated": 4, "reused": 0})
+            render = report["stages"]["render"]
+            self.assertEqual(render["items"], 4)
+            self.assertLessEqual(render["p50"], render["p95"])
+            self.assertLessEqual(render["p95"], render["max"])
+            self.assertFalse(report["cancelled"])
+            self.assertTrue(any(msg.startswith("Waktu: baca sumber") for msg in messages))
+            self.assertTrue(any(msg.startswith("Stage pdf:") and "p95" in msg for msg in messages))
+
+    def test_throughput_reports_rows_bytes_and_row_weighted_eta(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.make_source_workbook(source)
+
+            kwargs = dict(
+                pdf_engine="none", template_mode="source_template",
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL, selected_keys={"A", "B", "C"},
+                incremental=True,
+            )
+            snapshots = []
+            split_engine.split_excel_with_template(
+                source, "Data", "Dept", source, out_dir, 1, throughput_cb=snapshots.append, **kwargs,
+            )
+
+            self.assertEqual([info.completed_keys for info in snapshots], [1, 2, 3])
+            self.assertEqual([info.completed_rows for info in snapshots], [2, 4, 6])
+            last = snapshots[-1]
+            self.assertEqual((last.total_keys, last.total_rows, last.generated_rows), (3, 6, 6))
+            self.assertEqual(last.bytes_written, sum(path.stat().st_size for path in out_dir.glob("*.xlsx")))
+            self.assertEqual(last.eta_seconds, 0.0)
+            self.assertGreater(last.rows_per_second, 0)
+
+            rerun = []
+            split_engine.split_excel_with_template(
+                source, "Data", "Dept", source, out_dir, 1, throughput_cb=rerun.append, **kwargs,
+            )
+            self.assertEqual(rerun[-1].completed_rows, 6)
+            self.assertEqual((rerun[-1].generated_keys, rerun[-1].bytes_written), (0, 0))
+
+        pending = split_engine.SplitThroughput(
+            total_keys=3, completed_keys=1, total_rows=100, completed_rows=10, bytes_written=0,
+            elapsed=2.0, generated_keys=1, generated_rows=10,
+        )
+        self.assertEqual(pending.rows_per_second, 5.0)
+        self.assertEqual(pending.eta_seconds, 18.0)
+        self.assertIsNone(replace(pending, generated_rows=0).eta_seconds)
+
+    def test_events_reach_callback_json_lines_file_and_status_log(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            events_path = tmp_path / "events.jsonl"
+            self.make_source_workbook(source)
+
+            events = []
+            messages = []
+            split_engine.split_excel_with_template(
+                source, "Data", "Dept", source, out_dir, 1,
+                pdf_engine="none", template_mode="source_template",
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL, selected_keys={"A", "B"},
+                event_cb=events.append, event_log_path=events_path, status_cb=messages.append,
+            )
+
+            kinds = [event.kind for event in events if event.kind != split_engine.EVENT_LOG]
+            self.assertEqual(kinds[0], split_engine.EVENT_RUN_STARTED)
+            self.assertEqual(kinds[-1], split_engine.EVENT_FINISHED)
+            self.assertEqual(kinds.count(split_engine.EVENT_KEY_STARTED), 2)
+            finished = [event for event in events if event.kind == split_engine.EVENT_KEY_FINISHED]
+            self.assertEqual(sorted(event.key for event in finished), ["A", "B"])
+            for event in finished:
+                self.assertEqual(event.data["rows"], 2)
+                self.assertEqual(event.data["bytes"], (out_dir / f"{event.key}.xlsx").stat().st_size)
+                self.assertEqual(set(event.data["stages"]), {"render", "serialize"})
+                self.assertGreaterEqual(event.data["seconds"], event.data["stages"]["render"])
+            self.assertEqual(events[-1].data["report"]["keys"]["generated"], 2)
+            self.assertEqual(messages, [event.message for event in events if event.message])
+            self.assertIn("Proses [1/2] key=A", messages)
+
+            lines = [json.loads(line) for line in events_path.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual([line["kind"] for line in lines], [event.kind for event in events])
+            self.assertEqual(lines[-1]["message"], "Selesai.")
+
+            failed = []
+            with self.assertRaises(FileNotFoundError):
+                split_engine.split_excel_with_template(
+                    tmp_path / "missing.xlsx", "Data", "Dept", source, out_dir, 1,
+                    pdf_engine="none", template_mode="source_template", event_cb=failed.append,
+                )
+            self.assertEqual(failed[-1].kind, split_engine.EVENT_FAILED)
+            self.assertEqual(failed[-1].data["error_type"], "FileNotFoundError")
+
+    def test_memory_tracking_reports_phases_largest_keys_and_budget_warning(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.make_source_workbook(source)
+
+            messages = []
+            reports = []
+            split_engine.split_excel_with_template(
+                source, "Data", "Dept", source, out_dir, 1,
+                pdf_engine="none", template_mode="source_template",
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
+                status_cb=messages.append, report_cb=reports.append,
+                track_memory=True, memory_budget_mb=1,
+            )
+
+            memory = reports[0]["memory"]
+            self.assertFalse(split_engine.tracemalloc.is_tracing())
+            self.assertEqual(set(memory["phases"]), {"source_read", "template_compile", "partition"})
+            self.assertTrue(memory["phases"]["source_read"]["allocated_by_package_mb"])
+            self.assertEqual(len(memory["largest_keys"]), 4)
+            sizes = [item["mb"] for item in memory["largest_keys"]]
+            self.assertEqual(sizes, sorted(sizes, reverse=True))
+            self.assertTrue(memory["budget_warned"])
+            self.assertTrue(any(msg.startswith("Peringatan memori") for msg in messages))
+            self.assertTrue(any(msg.startswith("Memori: puncak RSS") for msg in messages))
+
+    def test_capture_profile_writes_profile_and_stage_summary(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.make_source_workbook(source)
+
+            reports = []
+            split_engine.split_excel_with_template(
+                source, "Data", "Dept", source, out_dir, 1,
+                pdf_engine=split_engine.PDF_ENGINE_NATIVE, template_mode="source_template",
+                output_file_type=split_engine.OUTPUT_TYPE_EXCEL_AND_PDF,
+                stage_workers={"render": 2}, report_cb=reports.append, capture_profile=True,
+            )
+
+            profile = reports[0]["profile"]
+            self.assertEqual(
+                profile["files"], [split_engine.SPLIT_PROFILE_NAME, split_engine.SPLIT_PROFILE_SUMMARY_NAME],
+            )
+            self.assertEqual(set(profile["stages"]), {"render", "serialize", "pdf", "manifest"})
+            self.assertGreater(profile["stages"]["render"], 0)
+            stats = pstats.Stats(str(out_dir / split_engine.SPLIT_PROFILE_NAME))
+            self.assertTrue(any(name == "render_source_template_workbook" for _, _, name in stats.stats))
+            summary = (out_dir / split_engine.SPLIT_PROFILE_SUMMARY_NAME).read_text(encoding="utf-8")
+            self.assertIn("source_read", summary)
+            self.assertIn("Top 30 functions by cumulative time", summary)
+            self.assertIsNone(sys.getprofile())
+
+    def test_unknown_stage_worker_name_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Stage pipeline"):
+            split_engine.resolve_stage_workers({"bogus": 2})
+
+    def test_parallel_libreoffice_workers_use_isolated_profiles(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.make_source_workbook(source)
+
+            original_export = split_engine.export_pdf_via_lo
+            profiles = []
+
+            def fake_export(xlsx_path, soffice_path=None, profile_dir=None):
+                profiles.append(profile_dir)
+                xlsx_path.with_suffix(".pdf").write_bytes(b"%PDF-1.4\n")
+
+            try:
+                split_engine.export_pdf_via_lo = fake_export
+                results = split_engine.split_excel_with_template(
+                    source, "Data", "Dept", source, out_dir, 1,
+                    pdf_engine="libreoffice", template_mode="source_template",
+                    output_file_type=split_engine.OUTPUT_TYPE_PDF,
+                    stage_workers={"pdf": 2},
+                )
+            finally:
+                split_engine.export_pdf_via_lo = original_export
+
+            self.assertEqual(len(profiles), 4)
+            self.assertTrue(all(profile is not None for profile in profiles))
+            self.assertTrue(all(result.pdf_path and not result.excel_path for result in results))
+
+
+class MidKeyCancellationTests(unittest.TestCase):
+    def test_cancel_during_render_discards_interrupted_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            template = tmp_path / "template.xlsx"
+            out_dir = tmp_path / "out"
+
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Data"
+            ws.append(["Dept", "Name"])
+            for index in range(6):
+                ws.append(["A", f"Name {index}"])
+            wb.save(source)
+            tpl = Workbook()
+            tpl.active.append(["Dept", "Name"])
+            tpl.save(template)
+
+            calls = {"count": 0}
+
+            def stop():
+                calls["count"] += 1
+                return calls["count"] > 1
+
+            original_rows = split_engine.CANCEL_CHECK_ROWS
+            messages = []
+            try:
+                split_engine.CANCEL_CHECK_ROWS = 2
+                results = split_engine.split_excel_with_template(
+                    source, "Data", "Dept", template, out_dir, 1,
+                    pdf_engine="none", template_mode="template_file",
+                    output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
+                    stop_requested=stop, status_cb=messages.append,
+                )
+            finally:
+                split_engine.CANCEL_CHECK_ROWS = original_rows
+
+            self.assertEqual(results, [])
+            self.assertFalse((out_dir / "A.xlsx").exists())
+            self.assertIn("Dibatalkan.", messages)
+
+    def test_cancelled_pdf_conversion_removes_partial_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Data"
+            ws.append(["Dept", "Name"])
+            ws.append(["A", "Alice"])
+            ws.append(["B", "Bob"])
+            wb.save(source)
+
+            original_export = split_engine.export_pdf_via_lo
+
+            def fake_export(xlsx_path, soffice_path=None):
+                xlsx_path.with_suffix(".pdf").write_bytes(b"%PDF-1.4\n")
+                if xlsx_path.stem == "B":
+                    raise split_engine.SplitCancelled()
+
+            try:
+                split_engine.export_pdf_via_lo = fake_export
+                results = split_engine.split_excel_with_template(
+                    source, "Data", "Dept", source, out_dir, 1,
+                    pdf_engine="libreoffice", template_mode="source_template",
+                    output_file_type=split_engine.OUTPUT_TYPE_EXCEL_AND_PDF,
+                )
+            finally:
+                split_engine.export_pdf_via_lo = original_export
+
+            self.assertEqual([result.key for result in results], ["A"])
+            self.assertTrue((out_dir / "A.pdf").exists())
+            self.assertFalse((out_dir / "B.xlsx").exists())
+            self.assertFalse((out_dir / "B.pdf").exists())
+
+    def test_run_conversion_command_kills_process_when_scope_cancelled(self):
+        flag = {"stop": False}
+        scope = split_engine.CancelScope(lambda: flag["stop"])
+        threading.Timer(0.3, lambda: flag.update(stop=True)).start()
+
+        started = time.monotonic()
+        with scope.bound(), self.assertRaises(split_engine.SplitCancelled):
+            split_engine.run_conversion_command([sys.executable, "-c", "import time; time.sleep(30)"])
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertIsNone(split_engine.current_cancel_scope())
+
+    def test_run_conversion_command_reports_failures(self):
+        with self.assertRaises(subprocess.CalledProcessError):
+            split_engine.run_conversion_command([sys.executable, "-c", "import sys; sys.exit(3)"])
+
+
+FAKE_SOFFICE = """#!{python}
+import sys
+from pathlib import Path
+
+args = sys.argv[1:]
+log = Path(__file__).with_suffix(".log")
+with log.open("a") as handle:
+    handle.write(" ".join(args) + "\\n")
+outdir = Path(args[args.index("--outdir") + 1])
+for arg in args[args.index("--outdir") + 2:]:
+    if "bad" in Path(arg).stem:
+        sys.stderr.write("cannot convert " + arg)
+        sys.exit(1)
+    (outdir / (Path(arg).stem + ".pdf")).write_bytes(b"%PDF-1.4\\n")
+"""
+
+
+@unittest.skipIf(os.name == "nt", "fake soffice relies on a shebang script")
+class LibreOfficeBatchTests(unittest.TestCase):
+    def make_fake_soffice(self, folder: Path) -> Path:
+        script = folder / "fake_soffice.py"
+        script.write_text(FAKE_SOFFICE.format(python=sys.executable))
+        script.chmod(0o755)
+        return script
+
+    def invocations(self, script: Path) -> list[str]:
+        log = script.with_suffix(".log")
+        return log.read_text().splitlines() if log.exists() else []
+
+    def make_workbooks(self, folder: Path, names) -> list[Path]:
+        paths = []
+        for name in names:
+            path = folder / f"{name}.xlsx"
+            Workbook().save(path)
+            paths.append(path)
+        return paths
+
+    def test_batch_converts_many_files_per_invocation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            soffice = self.make_fake_soffice(tmp_path)
+            paths = self.make_workbooks(tmp_path, ["a", "b", "c", "d", "e"])
+
+            results = split_engine.export_pdfs_via_lo_batch(paths, soffice_path=str(soffice), batch_size=2)
+
+            self.assertEqual(len(self.invocations(soffice)), 3)
+            self.assertEqual([result.source for result in results], paths)
+            self.assertTrue(all(result.ok for result in results))
+            self.assertEqual(results[3].pdf_path, tmp_path / "d.pdf")
+
+    def test_batch_failure_retries_rest_and_reports_broken_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            soffice = self.make_fake_soffice(tmp_path)
+            paths = self.make_workbooks(tmp_path, ["a", "bad", "c", "d"])
+
+            messages = []
+            results = split_engine.export_pdfs_via_lo_batch(
+                paths, soffice_path=str(soffice), batch_size=4, status_cb=messages.append
+            )
+
+            self.assertEqual([result.ok for result in results], [True, False, True, True])
+            self.assertIn("cannot convert", results[1].message)
+            self.assertIsNone(results[1].pdf_path)
+            self.assertTrue(messages)
+
+    def test_split_uses_batched_conversion_when_batch_size_set(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            soffice = self.make_fake_soffice(tmp_path)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Data"
+            ws.append(["Dept", "Name"])
+            for dept in ["A", "B", "C"]:
+                ws.append([dept, f"Name {dept}"])
+            wb.save(source)
+
+            results = split_engine.split_excel_with_template(
+                source, "Data", "Dept", source, out_dir, 1,
+                pdf_engine="libreoffice", soffice_path=str(soffice),
+                template_mode="source_template",
+                output_file_type=split_engine.OUTPUT_TYPE_PDF,
+                pdf_batch_size=3,
+            )
+
+            self.assertEqual(len(self.invocations(soffice)), 1)
+            self.assertEqual([result.key for result in results], ["A", "B", "C"])
+            self.assertTrue(all(result.pdf_path and not result.excel_path for result in results))
+
+    def test_split_reports_failed_keys_the_same_with_and_without_batching(self):
+        for batch_size in (1, 3):
+            with self.subTest(pdf_batch_size=batch_size), tempfile.TemporaryDirectory() as tmp:
+                tmp_path = Path(tmp)
+                soffice = self.make_fake_soffice(tmp_path)
+                source = tmp_path / "source.xlsx"
+                out_dir = tmp_path / "out"
+                wb = Workbook()
+                ws = wb.active
+                ws.title = "Data"
+                ws.append(["Dept", "Name"])
+                for dept in ["A", "bad", "C"]:
+                    ws.append([dept, f"Name {dept}"])
+                wb.save(source)
+
+                messages = []
+                results = split_engine.split_excel_with_template(
+                    source, "Data", "Dept", source, out_dir, 1,
+                    pdf_engine="libreoffice", soffice_path=str(soffice),
+                    template_mode="source_template",
+                    output_file_type=split_engine.OUTPUT_TYPE_PDF,
+                    pdf_batch_size=batch_size,
+                    status_cb=messages.append,
+                )
+
+                self.assertEqual([result.key for result in results], ["A", "bad", "C"])
+                self.assertEqual([bool(result.pdf_path) for result in results], [True, False, True])
+                self.assertTrue(any(
+                    "PDF gagal key=bad" in message and "cannot convert" in message for message in messages
+                ))
+                self.assertTrue(any("PDF gagal untuk 1 key: bad" in message for message in messages))
+
+    def test_reconvert_folder_batches_only_missing_pdfs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            soffice = self.make_fake_soffice(tmp_path)
+            out_dir = tmp_path / "out"
+            out_dir.mkdir()
+            self.make_workbooks(out_dir, ["A", "B", "C"])
+            (out_dir / "B.pdf").write_bytes(b"%PDF-1.4 kept\n")
+
+            results = split_engine.reconvert_folder_pdfs(
+                out_dir, pdf_engine="libreoffice", soffice_path=str(soffice), pdf_batch_size=5,
+            )
+
+            invocations = self.invocations(soffice)
+            self.assertEqual(len(invocations), 1)
+            self.assertIn("A.xlsx", invocations[0])
+            self.assertNotIn("B.xlsx", invocations[0])
+            self.assertEqual((out_dir / "B.pdf").read_bytes(), b"%PDF-1.4 kept\n")
+            self.assertEqual([result.pdf_path.name for result in results], ["A.pdf", "B.pdf", "C.pdf"])
+
+
+class FakeLibreOfficeServer:
+    """In-process stand-in for a pooled soffice instance."""
+
+    def __init__(self, soffice_path=None, profile_dir=None):
+        self.profile_dir = Path(profile_dir)
+        self.running = False
+        self.starts = 0
+        self.killed = threading.Event()
+
+    @property
+    def alive(self):
+        return self.running
+
+    def start(self):
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self.running = True
+        self.killed.clear()
+        self.starts += 1
+
+    def convert(self, xlsx_path, pdf_path):
+        stem = Path(xlsx_path).stem
+        if "crash" in stem:
+            self.running = False
+            raise OSError("connection lost")
+        if "hang" in stem:
+            self.killed.wait(5)
+            raise OSError("connection lost")
+        Path(pdf_path).write_bytes(b"%PDF-1.4\n")
+
+    def kill(self):
+        self.running = False
+        self.killed.set()
+
+    def stop(self):
+        self.running = False
+
+
+class LibreOfficePoolTests(unittest.TestCase):
+    def make_pool(self, size=1, job_timeout=None):
+        servers = []
+
+        def factory(profile):
+            server = FakeLibreOfficeServer(profile_dir=profile)
+            servers.append(server)
+            return server
+
+        pool = split_engine.LibreOfficePool(size, job_timeout=job_timeout, server_factory=factory)
+        return pool, servers
+
+    def test_instances_get_isolated_profiles(self):
+        pool, servers = self.make_pool(size=3)
+        with pool:
+            profiles = {server.profile_dir for server in servers}
+            self.assertEqual(len(profiles), 3)
+            self.assertTrue(all(profile.exists() for profile in profiles))
+        self.assertFalse(any(profile.exists() for profile in profiles))
+
+    def test_crashed_instance_is_restarted(self):
+        pool, servers = self.make_pool()
+        with tempfile.TemporaryDirectory() as tmp, pool:
+            tmp_path = Path(tmp)
+            with self.assertRaises(RuntimeError):
+                pool.convert(tmp_path / "crash.xlsx")
+
+            pdf = pool.convert(tmp_path / "ok.xlsx")
+
+            self.assertEqual(pdf, tmp_path / "ok.pdf")
+            self.assertTrue(pdf.exists())
+            self.assertEqual(pool.restarts, 1)
+            self.assertEqual(servers[0].starts, 2)
+
+    def test_job_timeout_kills_instance(self):
+        pool, servers = self.make_pool(job_timeout=0.3)
+        with tempfile.TemporaryDirectory() as tmp, pool:
+            started = time.monotonic()
+            with self.assertRaises(TimeoutError):
+                pool.convert(Path(tmp) / "hang.xlsx")
+
+            self.assertLess(time.monotonic() - started, 3)
+            self.assertTrue(servers[0].alive)
+            self.assertEqual(pool.restarts, 1)
+
+    def test_cancel_scope_kills_running_job(self):
+        stop = threading.Event()
+        scope = split_engine.CancelScope(stop.is_set)
+        pool, servers = self.make_pool()
+        with tempfile.TemporaryDirectory() as tmp, pool:
+            threading.Timer(0.2, stop.set).start()
+            with scope.bound(), self.assertRaises(split_engine.SplitCancelled):
+                pool.convert(Path(tmp) / "hang.xlsx")
+
+            # The killed instance is left for close(), not booted again.
+            self.assertFalse(servers[0].alive)
+            self.assertEqual(pool.restarts, 0)
+            with scope.bound(), self.assertRaises(split_engine.SplitCancelled):
+                pool.convert(Path(tmp) / "ok.xlsx")
+            self.assertEqual(servers[0].starts, 1)
+
+    def test_split_with_pool_engine_reports_failed_keys(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Data"
+            ws.append(["Dept", "Name"])
+            for dept in ["A", "crash", "C"]:
+                ws.append([dept, f"Name {dept}"])
+            wb.save(source)
+
+            messages = []
+            with patch.object(split_engine, "LibreOfficeServer", FakeLibreOfficeServer):
+                results = split_engine.split_excel_with_template(
+                    source, "Data", "Dept", source, out_dir, 1,
+                    pdf_engine=split_engine.PDF_ENGINE_LO_POOL,
+                    template_mode="source_template",
+                    output_file_type=split_engine.OUTPUT_TYPE_PDF,
+                    stage_workers={"pdf": 2},
+                    status_cb=messages.append,
+                )
+
+            self.assertEqual([result.key for result in results], ["A", "crash", "C"])
+            self.assertEqual([bool(result.pdf_path) for result in results], [True, False, True])
+            self.assertTrue(any("PDF gagal key=crash" in message for message in messages))
+            self.assertTrue(any("dijalankan ulang 1 kali" in message for message in messages))
+
+
+class NativePdfTests(unittest.TestCase):
+    def render(self, ws, pdf_path: Path) -> bytes:
+        split_engine.export_pdf_native(ws.parent, pdf_path)
+        data = pdf_path.read_bytes()
+        self.assertTrue(data.startswith(b"%PDF-"))
+        streams = re.findall(rb"stream\n(.*?)\nendstream", data, re.S)
+        return data + b"".join(zlib.decompress(stream) for stream in streams)
+
+    def page_count(self, data: bytes) -> int:
+        return len(re.findall(rb"/Type /Page\b(?!s)", data))
+
+    def test_format_cell_text_applies_number_formats(self):
+        self.assertEqual(split_engine.format_cell_text(1234.5, "#,##0.00"), "1,234.50")
+        self.assertEqual(split_engine.format_cell_text(-1234.5, "#,##0.00;(#,##0.00)"), "(1,234.50)")
+        self.assertEqual(split_engine.format_cell_text(0.256, "0.0%"), "25.6%")
+        self.assertEqual(split_engine.format_cell_text(5000, '"Rp "#,##0'), "Rp 5,000")
+        self.assertEqual(split_engine.format_cell_text(3.0, "General"), "3")
+        self.assertEqual(split_engine.format_cell_text(datetime(2024, 3, 5, 14, 7), "dd/mm/yyyy hh:mm"), "05/03/2024 14:07")
+        self.assertEqual(split_engine.format_cell_text(None), "")
+
+    def test_long_sheet_paginates_and_repeats_title_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            wb = Workbook()
+            ws = wb.active
+            ws.append(["Dept", "Amount"])
+            for i in range(200):
+                ws.append(["A", i])
+            split_engine.set_print_titles_and_area(ws, 1, 2, 201)
+
+            data = self.render(ws, Path(tmp) / "out.pdf")
+
+            pages = self.page_count(data)
+            self.assertGreater(pages, 1)
+            self.assertEqual(data.count(b"(Dept) Tj"), pages)
+
+    def test_text_width_uses_font_metrics(self):
+        self.assertAlmostEqual(split_engine.pdf_text_width("Hi", "Helvetica", 10), 9.44)
+        self.assertGreater(split_engine.pdf_text_width("Hi", "Helvetica-Bold", 10), split_engine.pdf_text_width("Hi", "Helvetica", 10))
+        self.assertEqual(split_engine.pdf_text_width("abc", "Courier", 10), 18)
+        self.assertEqual(split_engine.wrap_pdf_text("one two three", "Helvetica", 10, 40), ["one two", "three"])
+
+    def test_print_area_limits_rendered_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            wb = Workbook()
+            ws = wb.active
+            ws.append(["Dept", "Amount"])
+            ws.append(["Inside", 1])
+            ws.append(["Outside", 2])
+            split_engine.set_print_titles_and_area(ws, 1, 2, 2)
+
+            data = self.render(ws, Path(tmp) / "out.pdf")
+
+            self.assertIn(b"(Inside) Tj", data)
+            self.assertNotIn(b"(Outside) Tj", data)
+
+    def page_streams(self, pdf_path: Path) -> list[bytes]:
+        streams = re.findall(rb"stream\n(.*?)\nendstream", pdf_path.read_bytes(), re.S)
+        return [zlib.decompress(stream) for stream in streams]
+
+    def test_layouts_draw_what_the_rendered_workbook_would(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Data"
+            ws.append(["Sales report"])
+            ws.merge_cells("A1:C1")
+            ws["A1"].font = Font(bold=True, size=14)
+            ws.append(["Dept", "Amount", "Date"])
+            for i in range(120):
+                ws.append(["A" if i % 3 else "B", 1000.5 * i, datetime(2024, 1, 1 + i % 28)])
+                ws.cell(row=ws.max_row, column=2).number_format = "#,##0.00"
+                ws.cell(row=ws.max_row, column=3).number_format = "dd/mm/yyyy"
+                if i % 5 == 0:
+                    ws.cell(row=ws.max_row, column=1).fill = PatternFill("solid", fgColor="FFEE00")
+            ws.column_dimensions["A"].width = 20
+            source = tmp_path / "source.xlsx"
+            wb.save(source)
+            source_bytes = source.read_bytes()
+
+            template = Workbook()
+            tws = template.active
+            tws.append(["Template title"])
+            tws.append(["Amount", "Note", "Dept"])
+            tws.append([None, "fixed", None])
+            tws["A3"].number_format = "#,##0"
+            tws["C3"].fill = PatternFill("solid", fgColor="DDEEFF")
+            tws.merge_cells("A1:C1")
+            template_path = tmp_path / "template.xlsx"
+            template.save(template_path)
+            template_bytes = template_path.read_bytes()
+
+            df = pd.read_excel(source, sheet_name="Data", header=1, dtype=object)
+            mapped = df[["Amount", "Dept"]]
+            source_layout = split_engine.SourceSheetPdfLayout(source_bytes, "Data", 2)
+            template_layout = split_engine.TemplateFilePdfLayout(template_bytes, 2, [1, 3])
+            for key, group in df.groupby("Dept", sort=False):
+                with self.subTest(mode="source_template", key=key):
+                    split_engine.export_pdf_native(
+                        split_engine.render_source_template_workbook(source_bytes, "Data", 2, group.index),
+                        tmp_path / "via-workbook.pdf",
+                    )
+                    source_layout.render(group, tmp_path / "direct.pdf")
+                    self.assertEqual(
+                        self.page_streams(tmp_path / "direct.pdf"), self.page_streams(tmp_path / "via-workbook.pdf"),
+                    )
+                with self.subTest(mode="template_file", key=key):
+                    rows = mapped.loc[group.index]
+                    split_engine.export_pdf_native(
+                        split_engine.render_template_file_workbook(template_bytes, rows, 2, [1, 3], 1),
+                        tmp_path / "via-workbook.pdf",
+                    )
+                    template_layout.render(rows, tmp_path / "direct.pdf")
+                    self.assertEqual(
+                        self.page_streams(tmp_path / "direct.pdf"), self.page_streams(tmp_path / "via-workbook.pdf"),
+                    )
+
+    def test_split_pdf_only_skips_intermediate_workbook(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Data"
+            ws.append(["Dept", "Name"])
+            for dept in ["A", "B", "A"]:
+                ws.append([dept, f"Name {dept}"])
+            wb.save(source)
+
+            with patch.object(Workbook, "save", autospec=True, side_effect=Workbook.save) as save:
+                results = split_engine.split_excel_with_template(
+                    source, "Data", "Dept", source, out_dir, 1,
+                    pdf_engine=split_engine.PDF_ENGINE_NATIVE,
+                    template_mode="source_template",
+                    output_file_type=split_engine.OUTPUT_TYPE_PDF,
+                )
+
+            self.assertEqual(save.call_count, 0)
+            self.assertEqual([result.key for result in results], ["A", "B"])
+            self.assertTrue(all(result.pdf_path and result.pdf_path.exists() for result in results))
+            self.assertEqual(
+                sorted(path.suffix for path in out_dir.iterdir() if path.name != split_engine.SPLIT_REPORT_NAME),
+                [".pdf", ".pdf"],
+            )
+
+
+    def test_split_writes_combined_pdf_in_key_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Data"
+            ws.append(["Dept", "Name"])
+            for dept in ["C", "A", "B"]:
+                ws.append([dept, f"Name {dept}"])
+            wb.save(source)
+
+            results = split_engine.split_excel_with_template(
+                source, "Data", "Dept", source, out_dir, 1,
+                pdf_engine=split_engine.PDF_ENGINE_NATIVE,
+                template_mode="source_template",
+                output_file_type=split_engine.OUTPUT_TYPE_PDF,
+                stage_workers={"pdf": 3},
+                combined_pdf_path=out_dir / mail_merge.COMBINED_PDF_NAME,
+                keep_key_pdfs=False,
+            )
+
+            self.assertEqual([result.key for result in results], ["C", "A", "B"])
+            self.assertTrue(all(result.pdf_path is None for result in results))
+            self.assertEqual(
+                sorted(path.name for path in out_dir.iterdir()),
+                [mail_merge.COMBINED_PDF_NAME, split_engine.SPLIT_REPORT_NAME],
+            )
+            bundle = pdf_bundle.PdfSource.open(out_dir / mail_merge.COMBINED_PDF_NAME)
+            catalog = bundle.resolve(bundle.trailer["Root"])
+            item = bundle.resolve(bundle.resolve(catalog["Outlines"])["First"])
+            titles = []
+            while item is not None:
+                titles.append(bytes(item["Title"]))
+                item = bundle.resolve(item["Next"]) if "Next" in item else None
+            self.assertEqual(titles, [b"(C)", b"(A)", b"(B)"])
+            self.assertEqual(len(list(bundle.pages())), 3)
+
+    def test_combined_pdf_requires_pdf_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            with self.assertRaises(ValueError):
+                split_engine.split_excel_with_template(
+                    tmp_path / "missing.xlsx", "Data", "Dept", tmp_path / "missing.xlsx", tmp_path, 1,
+                    pdf_engine="none", output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
+                    combined_pdf_path=tmp_path / mail_merge.COMBINED_PDF_NAME,
+                )
+
+
+class ReconvertFolderTests(unittest.TestCase):
+    def make_output_workbook(self, path: Path, value: str):
+        wb = Workbook()
+        wb.active.append([value])
+        wb.save(path)
+
+    def test_only_missing_or_stale_pdfs_are_converted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out_dir = Path(tmp)
+            for key in ["A", "B", "C"]:
+                self.make_output_workbook(out_dir / f"Report {key}.xlsx", f"Value {key}")
+            fresh = out_dir / "Report A.pdf"
+            stale = out_dir / "Report B.pdf"
+            fresh.write_bytes(b"fresh")
+            stale.write_bytes(b"stale")
+            excel_mtime = (out_dir / "Report A.xlsx").stat().st_mtime
+            os.utime(fresh, (excel_mtime + 10, excel_mtime + 10))
+            os.utime(stale, (excel_mtime - 10, excel_mtime - 10))
+
+            messages = []
+            events = []
+            results = split_engine.reconvert_folder_pdfs(
+                out_dir, pdf_engine=split_engine.PDF_ENGINE_NATIVE, prefix="Report",
+                pdf_workers=2, status_cb=messages.append, event_cb=events.append,
+            )
+
+            self.assertIn("2 dari 3 key perlu dikonversi ke PDF.", messages)
+            kinds = [event.kind for event in events]
+            self.assertEqual(kinds[0], split_engine.EVENT_RUN_STARTED)
+            self.assertEqual(kinds[-1], split_engine.EVENT_FINISHED)
+            started = [event for event in events if event.kind == split_engine.EVENT_KEY_STARTED]
+            finished = [event for event in events if event.kind == split_engine.EVENT_KEY_FINISHED]
+            self.assertEqual([event.key for event in started], ["B", "C"])
+            self.assertEqual(started[0].data, {"position": 1, "total": 2})
+            self.assertEqual(sorted(event.key for event in finished), ["B", "C"])
+            self.assertTrue(all(event.data["files"] == [f"Report {event.key}.pdf"] for event in finished))
+            self.assertEqual(fresh.read_bytes(), b"fresh")
+            self.assertTrue(stale.read_bytes().startswith(b"%PDF"))
+            self.assertTrue((out_dir / "Report C.pdf").read_bytes().startswith(b"%PDF"))
+            self.assertEqual([result.key for result in results], ["A", "B", "C"])
+            self.assertTrue(all(
+                result.output_file_type == split_engine.OUTPUT_TYPE_EXCEL_AND_PDF and result.pdf_path.exists()
+                for result in results
+            ))
+
+    def test_reconvert_requires_pdf_engine_and_folder(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                split_engine.reconvert_folder_pdfs(Path(tmp), pdf_engine="none")
+            with self.assertRaises(FileNotFoundError):
+                split_engine.reconvert_folder_pdfs(Path(tmp) / "missing", pdf_engine=split_engine.PDF_ENGINE_NATIVE)
+
+
+class IncrementalSplitTests(unittest.TestCase):
+    def write_source(self, path: Path, rows):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Data"
+        ws.append(["Dept", "Name"])
+        for row in rows:
+            ws.append(row)
+        wb.save(path)
+
+    def split(self, source: Path, out_dir: Path, **kwargs):
+        messages = []
+        results = split_engine.split_excel_with_template(
+            source, "Data", "Dept", source, out_dir, 1,
+            pdf_engine="none", template_mode="source_template",
+            output_file_type=split_engine.OUTPUT_TYPE_EXCEL, incremental=True,
+            status_cb=messages.append, **kwargs,
+        )
+        return results, messages
+
+    def test_rebuilds_only_changed_keys_and_removes_vanished_ones(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.write_source(source, [["A", "Alice"], ["B", "Bob"], ["C", "Cara"]])
+            self.split(source, out_dir)
+            self.assertEqual(set(split_engine.load_split_manifest(out_dir)), {"A", "B", "C"})
+            mtimes = {path.name: path.stat().st_mtime_ns for path in out_dir.glob("*.xlsx")}
+
+            self.write_source(source, [["A", "Alice"], ["B", "Bobby"], ["D", "Dan"]])
+            with patch.object(split_engine, "render_source_template_workbook",
+                              side_effect=split_engine.render_source_template_workbook) as render:
+                results, messages = self.split(source, out_dir)
+
+            self.assertEqual(render.call_count, 2)
+            self.assertEqual([result.key for result in results], ["A", "B", "D"])
+            self.assertEqual(sorted(path.name for path in out_dir.glob("*.xlsx")), ["A.xlsx", "B.xlsx", "D.xlsx"])
+            self.assertEqual((out_dir / "A.xlsx").stat().st_mtime_ns, mtimes["A.xlsx"])
+            self.assertIn("Inkremental: 2 key dibuat ulang, 1 tidak berubah, 1 key lama dihapus.", messages)
+            self.assertEqual(set(split_engine.load_split_manifest(out_dir)), {"A", "B", "D"})
+
+    def test_missing_output_or_changed_options_rebuild_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.write_source(source, [["A", "Alice"], ["B", "Bob"]])
+            self.split(source, out_dir)
+            (out_dir / "A.xlsx").unlink()
+
+            _, messages = self.split(source, out_dir)
+            self.assertIn("Inkremental: 1 key dibuat ulang, 1 tidak berubah, 0 key lama dihapus.", messages)
+
+            _, messages = self.split(source, out_dir, prefix="Report")
+            self.assertIn("Inkremental: 2 key dibuat ulang, 0 tidak berubah, 0 key lama dihapus.", messages)
+            self.assertEqual(sorted(path.name for path in out_dir.glob("*.xlsx")), ["Report A.xlsx", "Report B.xlsx"])
+
+    def test_source_template_header_change_rebuilds_every_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+
+            def write_titled_source(title, bold=False):
+                wb = Workbook()
+                ws = wb.active
+                ws.title = "Data"
+                ws.append([title])
+                ws["A1"].font = Font(bold=bold)
+                ws.append(["Dept", "Name"])
+                ws.append(["A", "Alice"])
+                ws.append(["B", "Bob"])
+                wb.save(source)
+
+            def split():
+                messages = []
+                split_engine.split_excel_with_template(
+                    source, "Data", "Dept", source, out_dir, 2,
+                    pdf_engine="none", template_mode="source_template",
+                    output_file_type=split_engine.OUTPUT_TYPE_EXCEL, incremental=True,
+                    source_header_rows=2, status_cb=messages.append,
+                )
+                return messages
+
+            write_titled_source("TITLE v1")
+            split()
+            write_titled_source("TITLE v1")
+            self.assertIn("Inkremental: 0 key dibuat ulang, 2 tidak berubah, 0 key lama dihapus.", split())
+
+            write_titled_source("TITLE v2")
+            self.assertIn("Inkremental: 2 key dibuat ulang, 0 tidak berubah, 0 key lama dihapus.", split())
+            for key in ("A", "B"):
+                self.assertEqual(load_workbook(out_dir / f"{key}.xlsx")["Data"]["A1"].value, "TITLE v2")
+
+            write_titled_source("TITLE v2", bold=True)
+            self.assertIn("Inkremental: 2 key dibuat ulang, 0 tidak berubah, 0 key lama dihapus.", split())
+
+    def test_full_run_keeps_existing_manifest_current(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.write_source(source, [["A", "Alice"]])
+            self.split(source, out_dir)
+            before = split_engine.load_split_manifest(out_dir)["A"]["hash"]
+
+            self.write_source(source, [["A", "Alicia"]])
+            split_engine.split_excel_with_template(
+                source, "Data", "Dept", source, out_dir, 1, pdf_engine="none",
+                template_mode="source_template", output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
+            )
+
+            self.assertNotEqual(split_engine.load_split_manifest(out_dir)["A"]["hash"], before)
+
+
+class ResumableSplitTests(unittest.TestCase):
+    def write_source(self, path: Path, keys):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Data"
+        ws.append(["Dept", "Name"])
+        for key in keys:
+            ws.append([key, f"Name {key}"])
+        wb.save(path)
+
+    def split(self, source: Path, out_dir: Path, **kwargs):
+        return split_engine.split_excel_with_template(
+            source, "Data", "Dept", source, out_dir, 1,
+            pdf_engine="none", template_mode="source_template",
+            output_file_type=split_engine.OUTPUT_TYPE_EXCEL, **kwargs,
+        )
+
+    def interrupted_split(self, source: Path, out_dir: Path, after: int):
+        """Crash while rendering key number ``after + 1`` once earlier keys are journaled."""
+        journal_path = out_dir / split_engine.SPLIT_JOURNAL_NAME
+        render = split_engine.render_source_template_workbook
+
+        def crashing_render(source_bytes, sheet_name, header_rows, row_indices, **kwargs):
+            if list(row_indices) == [after]:
+                deadline = time.monotonic() + 5
+                while time.monotonic() < deadline:
+                    if journal_path.exists() and len(journal_path.read_text().splitlines()) >= after:
+                        break
+                    time.sleep(0.01)
+                raise RuntimeError("simulated crash")
+            return render(source_bytes, sheet_name, header_rows, row_indices, **kwargs)
+
+        with patch.object(split_engine, "render_source_template_workbook", side_effect=crashing_render):
+            with self.assertRaises(RuntimeError):
+                self.split(source, out_dir, stage_workers={"render": 1}, write_journal=True)
+
+    def test_resume_skips_journaled_keys_and_rebuilds_damaged_ones(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.write_source(source, ["A", "B", "C", "D"])
+            self.interrupted_split(source, out_dir, after=2)
+
+            journal = split_engine.SplitJournal.load(out_dir / split_engine.SPLIT_JOURNAL_NAME)
+            self.assertEqual(list(journal)[:2], ["A", "B"])
+            self.assertEqual(journal["A"]["files"], ["A.xlsx"])
+            (out_dir / "B.xlsx").write_bytes(b"damaged")
+
+            messages = []
+            with patch.object(split_engine, "render_source_template_workbook",
+                              side_effect=split_engine.render_source_template_workbook) as render:
+                results = self.split(source, out_dir, resume=True, status_cb=messages.append)
+
+            self.assertEqual(render.call_count, 3)
+            self.assertEqual([result.key for result in results], ["A", "B", "C", "D"])
+            self.assertTrue(all(result.excel_path.exists() for result in results))
+            self.assertIn("Melanjutkan: 1 key sudah selesai, 3 key diproses.", messages)
+            self.assertFalse((out_dir / split_engine.SPLIT_JOURNAL_NAME).exists())
+
+    def test_journal_ignores_torn_last_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out_dir = Path(tmp)
+            journal = split_engine.SplitJournal(out_dir)
+            journal.append("A", {"hash": "1", "files": ["A.xlsx"], "sha256": {}})
+            journal.close()
+            with open(out_dir / split_engine.SPLIT_JOURNAL_NAME, "a", encoding="utf-8") as handle:
+                handle.write('{"key": "B", "ha')
+
+            resumed = split_engine.SplitJournal(out_dir, resume=True)
+            resumed.append("C", {"hash": "3", "files": ["C.xlsx"], "sha256": {}})
+            resumed.close()
+
+            self.assertEqual(list(split_engine.SplitJournal.load(out_dir / split_engine.SPLIT_JOURNAL_NAME)), ["A", "C"])
+
+    def test_plain_run_leaves_unfinished_journal_alone(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.write_source(source, ["A", "B", "C"])
+            self.interrupted_split(source, out_dir, after=1)
+            journal_path = out_dir / split_engine.SPLIT_JOURNAL_NAME
+            journaled = journal_path.read_bytes()
+
+            messages = []
+            with patch.object(split_engine, "render_source_template_workbook",
+                              side_effect=split_engine.render_source_template_workbook) as render:
+                self.split(source, out_dir, status_cb=messages.append)
+
+            self.assertEqual(render.call_count, 3)
+            self.assertEqual(journal_path.read_bytes(), journaled)
+            self.assertIn("Journal run sebelumnya tidak diubah; aktifkan Resume untuk melanjutkan.", messages)
+
+            with self.assertRaisesRegex(ValueError, "Journal run sebelumnya belum selesai"):
+                self.split(source, out_dir, write_journal=True)
+            self.assertEqual(journal_path.read_bytes(), journaled)
+
+    def test_plain_run_skips_hashing_and_journal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.write_source(source, ["A", "B"])
+            with patch.object(split_engine, "split_row_hashes") as row_hashes, \
+                    patch.object(split_engine, "file_sha256") as checksum:
+                results = self.split(source, out_dir)
+
+            self.assertEqual(len(results), 2)
+            row_hashes.assert_not_called()
+            checksum.assert_not_called()
+            self.assertFalse((out_dir / split_engine.SPLIT_JOURNAL_NAME).exists())
+            self.assertFalse((out_dir / split_engine.SPLIT_MANIFEST_NAME).exists())
+
+
+class WatchSplitTests(unittest.TestCase):
+    def write_source(self, path: Path, rows):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Data"
+        ws.append(["Dept", "Name"])
+        for row in rows:
+            ws.append(row)
+        wb.save(path)
+
+    def test_rebuilds_changed_keys_after_source_settles(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            out_dir = tmp_path / "out"
+            self.write_source(source, [["A", "Alice"], ["B", "Bob"]])
+            reports = []
+            messages = []
+            stop = threading.Event()
+            kwargs = dict(
+                source_path=source, sheet_name="Data", key_col="Dept", template_path=source,
+                out_dir=out_dir, header_rows=1, pdf_engine="none",
+                template_mode="source_template", output_file_type=split_engine.OUTPUT_TYPE_EXCEL,
+            )
+            thread = threading.Thread(target=split_engine.watch_split, args=(kwargs,), kwargs=dict(
+                poll_interval=0.02, settle_seconds=0.05, status_cb=messages.append,
+                report_cb=reports.append, stop_requested=stop.is_set,
+            ))
+            thread.start()
+            self.addCleanup(thread.join)
+            self.addCleanup(stop.set)
+
+            def wait_for(count):
+                deadline = time.monotonic() + 10
+                while len(reports) < count and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                self.assertEqual(len(reports), count)
+
+            wait_for(1)
+            self.assertEqual(sorted(reports[0].rebuilt), ["A", "B"])
+
+            self.write_source(source, [["A", "Alice"], ["C", "Cara"]])
+            wait_for(2)
+            stop.set()
+            thread.join()
+
+            self.assertIsNone(reports[1].error)
+            self.assertEqual(reports[1].changed, ["source.xlsx"])
+            self.assertEqual(reports[1].rebuilt, ["C"])
+            self.assertEqual(reports[1].removed, ["B"])
+            self.assertEqual(reports[1].unchanged, 1)
+            self.assertEqual([result.key for result in reports[1].results], ["A", "C"])
+            self.assertIn(reports[1].summary(), messages)
+
+    def test_touch_without_content_change_does_not_split(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            self.write_source(source, [["A", "Alice"]])
+            messages = []
+            polls = []
+
+            def stop_requested():
+                polls.append(None)
+                if len(polls) == 5:
+                    stat = source.stat()
+                    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+                return any("tidak ada perubahan isi" in message for message in messages)
+
+            with patch.object(split_engine, "split_excel_with_template", return_value=[]) as split:
+                runs = split_engine.watch_split(
+                    dict(source_path=source, template_path=source, out_dir=tmp_path / "out",
+                         template_mode="source_template"),
+                    poll_interval=0.01, settle_seconds=0.01,
+                    status_cb=messages.append, stop_requested=stop_requested,
+                )
+
+            self.assertEqual(runs, 1)
+            self.assertEqual(split.call_count, 1)
+            self.assertTrue(split.call_args.kwargs["incremental"])
+
+
+
+class BatchSplitTests(unittest.TestCase):
+    def write_workbook(self, path: Path, header, rows):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Data"
+        ws.append(header)
+        for row in rows:
+            ws.append(row)
+        wb.save(path)
+
+    def test_jobs_sharing_a_source_read_and_partition_it_once(self):
+        import pandas as pd
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            sales = tmp_path / "sales.xlsx"
+            staff = tmp_path / "staff.xlsx"
+            template = tmp_path / "template.xlsx"
+            self.write_workbook(sales, ["Region", "Rep", "Amount"], [["N", "Ann", 1], ["S", "Bo", 2], ["N", "Cy", 3]])
+            self.write_workbook(staff, ["Dept", "Name"], [["A", "Alice"], ["B", "Bob"]])
+            self.write_workbook(template, ["Rep", "Amount"], [])
+            spec = tmp_path / "jobs.json"
+            spec.write_text(json.dumps({
+                "defaults": {"sheet_name": "Data", "header_rows": 1, "template_header_rows": 1,
+                             "pdf_engine": "none", "output_file_type": "excel"},
+                "jobs": [
+                    {"name": "region", "source_path": "sales.xlsx", "key_col": "Region",
+                     "template_mode": "source_template", "out_dir": "out/region"},
+                    {"name": "staff", "source_path": "staff.xlsx", "key_col": "Dept",
+                     "template_mode": "source_template", "out_dir": "out/staff"},
+                    {"name": "region-template", "source_path": "sales.xlsx", "key_col": "Region",
+                     "template_path": "template.xlsx", "out_dir": "out/region-template", "prefix": "T"},
+                    {"name": "region-rep", "source_path": "sales.xlsx", "key_col": "Region",
+                     "template_path": "template.xlsx", "out_dir": "out/region-rep", "suffix": "Rep"},
+                ],
+            }))
+            jobs = split_engine.load_split_batch_spec(spec)
+            job_progress = []
+            batch_progress = []
+            messages = []
+
+            with patch("pandas.read_excel", side_effect=pd.read_excel) as read_excel, \
+                    patch.object(split_engine, "read_template_header_cells",
+                                 side_effect=split_engine.read_template_header_cells) as read_template:
+                outcomes = split_engine.run_split_batch(
+                    jobs, status_cb=messages.append,
+                    progress_cb=lambda total, done: batch_progress.append((total, done)),
+                    job_progress_cb=lambda name, total, done: job_progress.append((name, total, done)),
+                )
+
+            self.assertEqual([outcome.name for outcome in outcomes], ["region", "staff", "region-template", "region-rep"])
+            self.assertTrue(all(outcome.error is None for outcome in outcomes))
+            # One accessibility probe plus one full read per source.
+            self.assertEqual(read_excel.call_count, 4)
+            self.assertEqual(read_template.call_count, 1)
+            self.assertTrue((tmp_path / "out" / "region-template" / "T N.xlsx").exists())
+            self.assertTrue((tmp_path / "out" / "region-rep" / "S Rep.xlsx").exists())
+            self.assertEqual(load_workbook(tmp_path / "out" / "region-rep" / "N Rep.xlsx").active["A3"].value, "Cy")
+            self.assertEqual([result.key for result in outcomes[1].results], ["A", "B"])
+            self.assertEqual(batch_progress[0], (4, 0))
+            self.assertEqual(batch_progress[-1], (4, 4))
+            self.assertIn(("staff", 2, 2), job_progress)
+            self.assertIn("[staff] Selesai.", messages)
+
+    def test_failing_job_is_reported_and_batch_continues(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "source.xlsx"
+            self.write_workbook(source, ["Dept", "Name"], [["A", "Alice"]])
+            jobs = [
+                split_engine.SplitBatchJob("bad", dict(
+                    source_path=source, sheet_name="Data", key_col="Missing", out_dir=tmp_path / "bad",
+                    header_rows=1, pdf_engine="none", template_mode="source_template",
+                )),
+                split_engine.SplitBatchJob("good", dict(
+                    source_path=source, sheet_name="Data", key_col="Dept", out_dir=tmp_path / "good",
+                    header_rows=1, pdf_engine="none", template_mode="source_template",
+                )),
+            ]
+
+            outcomes = split_engine.run_split_batch(jobs)
+
+            self.assertIn("Missing", outcomes[0].error)
+            self.assertIsNone(outcomes[1].error)
+            self.assertTrue((tmp_path / "good" / "A.xlsx").exists())
+
+    def test_spec_validation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            spec = Path(tmp) / "jobs.json"
+            spec.write_text(json.dumps([{"name": "x", "sheet_name": "Data", "key_col": 1, "out_dir": "out"}]))
+            with self.assertRaisesRegex(ValueError, "source_path"):
+                split_engine.load_split_batch_spec(spec)
+
+            job = {"name": "x", "source_path": "a.xlsx", "sheet_name": "Data", "key_col": 1, "out_dir": "out"}
+            spec.write_text(json.dumps({"jobs": [job, job]}))
+            with self.assertRaisesRegex(ValueError, "duplikat"):
+                split_engine.load_split_batch_spec(spec)
+
+            spec.write_text(json.dumps({"jobs": [dict(job, source_path=str(Path(tmp) / "abs.xlsx"))]}))
+            params = split_engine.load_split_batch_spec(spec)[0].params
+            self.assertEqual(params["source_path"], Path(tmp) / "abs.xlsx")
+            self.assertEqual(params["out_dir"], Path(tmp) / "out")
+
+
 if __name__ == "__main__":
     unittest.main()
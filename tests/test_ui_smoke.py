@@ -1,19 +1,34 @@
 import os
 from contextlib import redirect_stdout
+from dataclasses import replace
 from io import StringIO
 from pathlib import Path
+import logging
 import tempfile
+import threading
+import time
 import unittest
+from unittest.mock import patch
 
 from openpyxl import Workbook
 
+from split_engine import (
+    EVENT_FINISHED,
+    EVENT_KEY_FINISHED,
+    EVENT_KEY_STARTED,
+    EVENT_WARNING,
+    SplitEvent,
+    SplitResult,
+    SplitThroughput,
+)
+
 
 os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 if os.name == "nt" and os.path.isdir(r"C:\Windows\Fonts"):
     os.environ.setdefault("QT_QPA_FONTDIR", r"C:\Windows\Fonts")
 
 try:
-    from PySide6.QtCore import QSettings
+    from PySide6.QtCore import QSettings, Qt
     from PySide6.QtWidgets import QApplication
     from qfluentwidgets import Theme, isDarkTheme, qconfig
     with redirect_stdout(StringIO()):
@@ -248,6 +263,7 @@ class UISmokeTests(unittest.TestCase):
             window.edit_source.setText(str(source))
 
             window.refresh_source_options()
+            self.assertTrue(window.task_runner.wait_until_idle())
 
             self.assertEqual(window.cmb_sheet.currentText(), "Data")
             self.assertEqual(window.spin_source_header_rows.value(), 1)
@@ -279,9 +295,86 @@ class UISmokeTests(unittest.TestCase):
             self.addCleanup(window.deleteLater)
 
             window.refresh_source_options()
+            self.assertTrue(window.task_runner.wait_until_idle())
 
             self.assertEqual(window.cmb_key.currentText(), "Name")
 
+    def test_source_loading_runs_in_background_with_panel_busy_indicator(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "source.xlsx"
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "Data"
+            ws.append(["Dept", "Name"])
+            other = wb.create_sheet("Other")
+            other.append(["Region", "Amount"])
+            wb.save(source)
+
+            window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
+            self.addCleanup(window.deleteLater)
+            window.edit_source.setText(str(source))
+            ring, cancel = window.panel_busy_widgets["Source"]
+
+            window.refresh_source_options()
+            self.assertTrue(window.task_runner.is_busy(main.TASK_SHEETS))
+            self.assertFalse(ring.isHidden())
+            self.assertTrue(window.task_runner.wait_until_idle())
+            self.assertTrue(ring.isHidden())
+            self.assertTrue(cancel.isHidden())
+
+            channels = []
+            submit = window.task_runner.submit
+            window.task_runner.submit = lambda channel, *args: (channels.append(channel), submit(channel, *args))
+            for sheet in ("Other", "Data", "Other"):
+                window.cmb_sheet.setCurrentText(sheet)
+            self.assertEqual(channels, [])
+            deadline = time.monotonic() + 5
+            while not channels and time.monotonic() < deadline:
+                self.app.processEvents()
+                time.sleep(0.01)
+            self.assertTrue(window.task_runner.wait_until_idle())
+            self.assertEqual(channels, [main.TASK_HEADERS])
+            self.assertEqual(window.source_headers, ["Region", "Amount"])
+
+            window.cmb_key.setCurrentText("Region")
+            window.load_keys()
+            cancel = window.panel_busy_widgets["Keys"][1]
+            cancel.click()
+            self.assertFalse(window.task_runner.is_busy(main.TASK_KEYS))
+            self.assertTrue(window.task_runner.wait_until_idle())
+            self.assertEqual(window.key_model.key_count(), 0)
+
+    def test_task_runner_coalesces_superseded_requests_and_drops_cancelled_ones(self):
+        runner = main.TaskRunner()
+        gate = threading.Event()
+        started, delivered, errors, busy = [], [], [], []
+        runner.busyChanged.connect(lambda channel, state: busy.append(state))
+
+        def slow(value):
+            def run():
+                started.append(value)
+                gate.wait(5)
+                if value == "boom":
+                    raise ValueError(value)
+                return value
+            return run
+
+        for value in (1, 2, 3):
+            runner.submit("sheets", slow(value), delivered.append)
+        gate.set()
+        self.assertTrue(runner.wait_until_idle())
+        self.assertEqual(started, [1, 3])
+        self.assertEqual(delivered, [3])
+        self.assertEqual(busy, [True, False])
+
+        runner.submit("sheets", slow(4), delivered.append)
+        runner.cancel("sheets")
+        runner.submit("keys", slow("boom"), delivered.append, errors.append)
+        self.assertTrue(runner.wait_until_idle())
+        runner.shutdown()
+        self.assertEqual(delivered, [3])
+        self.assertEqual([str(error) for error in errors], ["boom"])
+
     def test_template_header_row_sits_in_template_workbook_row(self):
         with tempfile.TemporaryDirectory() as tmp:
             window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
@@ -299,6 +392,50 @@ class UISmokeTests(unittest.TestCase):
             window.set_busy(True)
             self.assertFalse(window.progress_bar.isHidden())
 
+    def test_throughput_rides_on_progress_throttle_and_shows_in_footer(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
+            self.addCleanup(window.deleteLater)
+
+            worker = main.SplitWorker({})
+            emitted = []
+            worker.throughput.connect(emitted.append)
+            worker.throughput.connect(window.set_throughput)
+            info = SplitThroughput(
+                total_keys=4, completed_keys=1, total_rows=4000, completed_rows=1000, bytes_written=2048,
+                elapsed=2.0, generated_keys=1, generated_rows=1000,
+            )
+            window.set_busy(True)
+            worker.store_throughput(info)
+            worker.emit_progress(4, 1)
+            worker.store_throughput(replace(info, completed_keys=2))
+            worker.emit_progress(4, 2)
+
+            self.assertEqual(emitted, [info])
+            self.assertFalse(window.lbl_throughput.isHidden())
+            self.assertEqual(
+                window.lbl_throughput.text(), "1,000 / 4,000 rows · 0.5 keys/s · 500 rows/s · 2.0 KB · ETA 0:06",
+            )
+            window.set_busy(False)
+            self.assertFalse(window.lbl_throughput.isHidden())
+            window.set_busy(True)
+            self.assertEqual(window.lbl_throughput.text(), "")
+
+    def test_worker_logs_events_by_kind(self):
+        worker = main.SplitWorker({})
+        logged = []
+        worker.status.connect(logged.append)
+        worker.warned.connect(lambda message: logged.append(f"warning: {message}"))
+
+        for position in (1, 2):
+            worker.emit_event(SplitEvent(EVENT_KEY_STARTED, f"Proses [{position}/2] key={position}", str(position)))
+        worker.emit_event(SplitEvent(EVENT_KEY_FINISHED, key="1", data={"rows": 3}))
+        worker.emit_event(SplitEvent(EVENT_WARNING, "PDF gagal key=2: timeout", "2"))
+        worker.emit_event(SplitEvent(EVENT_FINISHED, "Selesai."))
+
+        self.assertEqual(logged, ["Proses [1/2] key=1", "warning: PDF gagal key=2: timeout", "Selesai."])
+        self.assertEqual(worker.warnings, ["PDF gagal key=2: timeout"])
+
     def test_mail_merge_button_is_available_without_split_results(self):
         with tempfile.TemporaryDirectory() as tmp:
             window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
@@ -313,7 +450,7 @@ class UISmokeTests(unittest.TestCase):
             self.assertIn("No split files", window.lbl_mail_merge_summary.text())
 
             window.current_split_results = [
-                main.SplitResult(key="A", excel_path=Path(tmp) / "A.xlsx", output_file_type=main.OUTPUT_TYPE_EXCEL)
+                SplitResult(key="A", excel_path=Path(tmp) / "A.xlsx", output_file_type=main.OUTPUT_TYPE_EXCEL)
             ]
             window.update_mail_merge_entry_state()
 
@@ -324,7 +461,7 @@ class UISmokeTests(unittest.TestCase):
             window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
             self.addCleanup(window.deleteLater)
             window.current_split_results = [
-                main.SplitResult(key="A", excel_path=Path(tmp) / "A.xlsx", output_file_type=main.OUTPUT_TYPE_EXCEL)
+                SplitResult(key="A", excel_path=Path(tmp) / "A.xlsx", output_file_type=main.OUTPUT_TYPE_EXCEL)
             ]
 
             window.show_mail_merge_panel()
@@ -422,6 +559,36 @@ class UISmokeTests(unittest.TestCase):
             self.assertTrue(hasattr(window, "btn_cancel_split"))
             self.assertFalse(window.btn_cancel_split.isVisible())
 
+    def test_reconvert_button_starts_pdf_only_worker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            window = main.SplitApp(settings=self.make_settings(tmp_path / "settings.ini"))
+            self.addCleanup(window.deleteLater)
+            window.edit_outdir.setText(str(tmp_path))
+            window.cmb_pdf_engine.setCurrentText(main.PDF_ENGINE_NATIVE)
+
+            started = []
+            original_start = main.ReconvertPdfWorker.start
+            main.ReconvertPdfWorker.start = lambda worker: started.append(worker)
+            self.addCleanup(setattr, main.ReconvertPdfWorker, "start", original_start)
+            window.on_reconvert_clicked()
+
+            self.assertEqual(len(started), 1)
+            self.assertEqual(started[0].params["out_dir"], tmp_path)
+            self.assertEqual(started[0].params["pdf_engine"], main.PDF_ENGINE_NATIVE)
+            self.assertFalse(window.btn_reconvert_pdf.isEnabled())
+
+    def test_watch_button_is_disabled_while_busy(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
+            self.addCleanup(window.deleteLater)
+
+            self.assertTrue(window.btn_watch.isEnabled())
+            window.set_busy(True)
+            self.assertFalse(window.btn_watch.isEnabled())
+            window.set_busy(False)
+            self.assertTrue(window.btn_watch.isEnabled())
+
     def test_split_app_has_key_count_label(self):
         with tempfile.TemporaryDirectory() as tmp:
             window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
@@ -464,15 +631,134 @@ class UISmokeTests(unittest.TestCase):
             window.spin_source_header_rows.setValue(1)
 
             window.load_keys()
-            self.assertEqual(len(window.key_checkboxes), 3)
+            self.assertTrue(window.task_runner.wait_until_idle())
+            self.assertEqual(window.key_model.rowCount(), 3)
             # All checked => no filtering.
             self.assertIsNone(window.collect_selected_keys())
 
             # Uncheck "B".
-            for checkbox in window.key_checkboxes:
-                if checkbox.text() == "B":
-                    checkbox.setChecked(False)
+            row = window.key_model.keys().index("B")
+            window.key_model.setData(window.key_model.index(row), Qt.Unchecked, Qt.CheckStateRole)
             self.assertEqual(window.collect_selected_keys(), {"A", "C"})
+            self.assertEqual(window.lbl_key_count.text(), "2 / 3 keys")
+
+    def test_unfinished_journal_is_only_discarded_when_user_starts_over(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            journal_path = tmp_path / main.SPLIT_JOURNAL_NAME
+            journal_path.write_text('{"key": "A"}\n', encoding="utf-8")
+            window = main.SplitApp(settings=self.make_settings(tmp_path / "settings.ini"))
+            self.addCleanup(window.deleteLater)
+            params = {
+                "out_dir": tmp_path, "write_journal": True, "resume": False,
+                "pdf_engine": "none", "selected_keys": None,
+            }
+
+            for choice, resumed, kept in ((None, None, True), ("resume", True, True), ("restart", False, False)):
+                with patch.object(window, "_collect_split_params", return_value=dict(params)), \
+                        patch.object(window, "_ask_unfinished_journal", return_value=choice), \
+                        patch.object(main, "SplitWorker") as worker, \
+                        patch.object(window, "_start_split_worker"):
+                    window.on_run_clicked()
+                window.set_busy(False)
+                if resumed is None:
+                    worker.assert_not_called()
+                else:
+                    self.assertEqual(worker.call_args.args[0]["resume"], resumed)
+                self.assertEqual(journal_path.exists(), kept)
+
+    def test_key_list_handles_a_million_keys_with_bulk_toggles(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
+            self.addCleanup(window.deleteLater)
+            keys = [f"K{index:07d}" for index in range(1_000_000)]
+
+            started = time.perf_counter()
+            window.key_model.set_keys(keys)
+            window.clear_all_keys()
+            self.assertEqual(window.lbl_keys_summary.text(), "0 / 1000000 keys selected")
+            self.assertEqual(window.collect_selected_keys(), set())
+            window.key_model.setData(window.key_model.index(42), Qt.Checked, Qt.CheckStateRole)
+            self.assertEqual(window.collect_selected_keys(), {"K0000042"})
+            window.select_all_keys()
+            self.assertIsNone(window.collect_selected_keys())
+            window.show()
+            self.app.processEvents()
+            window.keys_view.scrollToBottom()
+            self.app.processEvents()
+            self.assertLess(time.perf_counter() - started, 5.0)
+            self.assertEqual(window.key_model.data(window.key_model.index(999_999)), "K0999999")
+
+    def test_key_search_sorts_filters_and_selects_matching(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
+            self.addCleanup(window.deleteLater)
+            model = window.key_model
+            model.set_keys(["North-1", "south-2", "North-3", "East-4"], counts=[2, 5, 1, 3])
+
+            window.keys_view.sortByColumn(main.KEY_COLUMN_ROWS, Qt.DescendingOrder)
+            self.assertEqual([model.data(model.index(row)) for row in range(4)], ["south-2", "East-4", "North-1", "North-3"])
+            self.assertEqual(model.data(model.index(0, main.KEY_COLUMN_ROWS)), "5")
+
+            window.edit_key_search.setText("NORTH")
+            window.apply_key_filter()
+            self.assertEqual([model.data(model.index(row)) for row in range(model.rowCount())], ["North-1", "North-3"])
+            self.assertEqual(window.lbl_key_matches.text(), "2 matching")
+            window.select_matching_keys()
+            self.assertEqual(window.collect_selected_keys(), {"North-1", "North-3"})
+
+            window.cmb_key_match.setCurrentText(main.KEY_MATCH_REGEX)
+            window.edit_key_search.setText("-[24]$")
+            window.apply_key_filter()
+            self.assertEqual(model.rowCount(), 2)
+            window.edit_key_search.setText("(")
+            self.assertFalse(window.apply_key_filter())
+            self.assertTrue(window.lbl_key_matches.text().startswith("Invalid regex"))
+
+            window.cmb_key_match.setCurrentText(main.KEY_MATCH_LIST)
+            window.edit_key_search.setText("East-4\nsouth-2, West-9")
+            window.select_matching_keys()
+            self.assertEqual(window.collect_selected_keys(), {"East-4", "south-2"})
+            self.assertEqual(window.lbl_key_matches.text(), "2 matching · 1 not found: West-9")
+
+            window.keys_view.sortByColumn(main.KEY_SORT_ORIGINAL, Qt.AscendingOrder)
+            window.edit_key_search.clear()
+            window.apply_key_filter()
+            self.assertEqual(model.keys(), [model.data(model.index(row)) for row in range(4)])
+
+    def test_key_search_stays_fast_on_a_million_keys(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
+            self.addCleanup(window.deleteLater)
+            keys = [f"K{index:07d}" for index in range(1_000_000)]
+            window.key_model.set_keys(keys, counts=[index % 7 for index in range(len(keys))])
+
+            started = time.perf_counter()
+            for text in ("K0", "K000", "K00004", "K000042"):
+                window.edit_key_search.setText(text)
+                window.apply_key_filter()
+            window.select_matching_keys()
+            self.assertLess(time.perf_counter() - started, 5.0)
+            self.assertEqual(window.key_model.rowCount(), 10)
+            self.assertEqual(window.key_model.checked_count(), 10)
+            self.assertEqual(window.lbl_keys_summary.text(), "10 / 1000000 keys selected")
+
+    def test_stage_worker_counts_are_remembered_and_passed_to_worker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings_path = Path(tmp) / "settings.ini"
+            window = main.SplitApp(settings=self.make_settings(settings_path))
+            self.addCleanup(window.deleteLater)
+            self.assertIsNone(window.collect_stage_workers())
+            self.assertEqual(window.stage_worker_spins["render"].text(), "Auto")
+
+            window.stage_worker_spins["render"].setValue(3)
+            window.stage_worker_spins["pdf"].setValue(2)
+            self.assertEqual(window.collect_stage_workers(), {"render": 3, "pdf": 2})
+
+            window.settings.sync()
+            reopened = main.SplitApp(settings=QSettings(str(settings_path), QSettings.IniFormat))
+            self.addCleanup(reopened.deleteLater)
+            self.assertEqual(reopened.collect_stage_workers(), {"render": 3, "pdf": 2})
 
     def test_split_app_has_verbose_toggle(self):
         with tempfile.TemporaryDirectory() as tmp:
@@ -482,13 +768,30 @@ class UISmokeTests(unittest.TestCase):
             self.assertTrue(hasattr(window, "chk_verbose_logging"))
             self.assertFalse(window.chk_verbose_logging.isChecked())
 
+    def test_capture_profile_toggle_is_not_remembered(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings_path = Path(tmp) / "settings.ini"
+            window = main.SplitApp(settings=self.make_settings(settings_path))
+            self.addCleanup(window.deleteLater)
+            self.assertFalse(window.chk_capture_profile.isChecked())
+
+            window.chk_capture_profile.setChecked(True)
+            window.chk_verbose_logging.setChecked(True)
+            window.save_settings()
+
+            window.settings.sync()
+            second = main.SplitApp(settings=QSettings(str(settings_path), QSettings.IniFormat))
+            self.addCleanup(second.deleteLater)
+            self.assertTrue(second.chk_verbose_logging.isChecked())
+            self.assertFalse(second.chk_capture_profile.isChecked())
+
     def test_mail_merge_attachment_options_follow_split_outputs(self):
         with tempfile.TemporaryDirectory() as tmp:
             window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
             self.addCleanup(window.deleteLater)
 
             window.current_split_results = [
-                main.SplitResult(key="A", excel_path=None, pdf_path=Path(tmp) / "A.pdf", output_file_type=main.OUTPUT_TYPE_PDF)
+                SplitResult(key="A", excel_path=None, pdf_path=Path(tmp) / "A.pdf", output_file_type=main.OUTPUT_TYPE_PDF)
             ]
             window.show_mail_merge_panel()
 
@@ -555,7 +858,7 @@ class UISmokeTests(unittest.TestCase):
             window.edit_suffix.setText("Final")
             window.worker = type("FakeWorker", (), {
                 "results": [
-                    main.SplitResult(
+                    SplitResult(
                         key="A",
                         excel_path=excel_a,
                         output_file_type=main.OUTPUT_TYPE_EXCEL,
@@ -579,12 +882,51 @@ class UISmokeTests(unittest.TestCase):
             window.log("first")
             window.log("second")
 
-            self.assertEqual(window.txt_log.toPlainText(), "")
+            self.assertEqual(window.log_model.text(), "")
 
             window.flush_pending_logs()
 
-            self.assertIn("first", window.txt_log.toPlainText())
-            self.assertIn("second", window.txt_log.toPlainText())
+            self.assertIn("first", window.log_model.text())
+            self.assertIn("second", window.log_model.text())
+
+    def test_log_panel_keeps_a_filtered_tail_and_saves_the_full_log(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            window = main.SplitApp(settings=self.make_settings(Path(tmp) / "settings.ini"))
+            self.addCleanup(window.deleteLater)
+            window.spin_log_max_lines.setValue(1000)
+
+            for index in range(5000):
+                window.log(f"Debug: line {index}" if index % 2 else f"line {index}")
+            window.log("PDF gagal key=7: timeout", logging.WARNING)
+            window.log("Error: boom", logging.ERROR)
+            window.flush_pending_logs()
+
+            model = window.log_model
+            self.assertEqual(model.line_count(), 1000)
+            self.assertEqual(model.rowCount(), 1000)
+            self.assertEqual(model.data(model.index(0)), "line 4002")
+            self.assertEqual(model.data(model.index(998), Qt.ForegroundRole), main.LOG_LEVEL_COLORS[logging.WARNING])
+
+            window.cmb_log_level.setCurrentText("Info")
+            self.assertEqual(model.rowCount(), 501)
+            window.cmb_log_level.setCurrentText("Warnings")
+            self.assertEqual(model.text(), "PDF gagal key=7: timeout\nError: boom")
+            window.log("line after filter")
+            window.spin_log_max_lines.setValue(500)
+            window.flush_pending_logs()
+            self.assertEqual(model.line_count(), 500)
+            self.assertEqual(model.rowCount(), 2)
+
+            saved = Path(tmp) / "full.log"
+            window.write_full_log(saved)
+            lines = saved.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 5003)
+            self.assertTrue(lines[1].endswith("DEBUG   Debug: line 1"))
+            self.assertTrue(lines[-2].endswith("ERROR   Error: boom"))
+            window.log("still streaming")
+            window.flush_pending_logs()
+            window.write_full_log(saved)
+            self.assertEqual(saved.read_text(encoding="utf-8").splitlines()[-1][-15:], "still streaming")
 
 
 if __name__ == "__main__":